@@ -1,4 +1,5 @@
 # user_party.py
+from session_manager import SessionProxy
 
 class UserParty:
     def __init__(self):
@@ -22,5 +23,5 @@ class UserParty:
     def get_pokemon(self, name):
         return self.team.get(name)
 
-# 전역 인스턴스 생성 (어디서든 불러다 쓸 수 있게)
-my_party = UserParty()
\ No newline at end of file
+# 전역 접근점 (어디서든 불러다 쓸 수 있게) - 실제 파티는 세션마다 따로 (session_manager)
+my_party = SessionProxy("party", UserParty)
\ No newline at end of file
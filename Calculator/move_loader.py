@@ -1,14 +1,19 @@
 import requests
 import json
 import os
+import threading
 
 # 1. 캐시 파일 경로 설정
 # (현재 파일 위치 기준으로 moves_cache.json 파일을 찾거나 생성)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 CACHE_FILE = os.path.join(BASE_DIR, "moves_cache.json")
 
+# 오프라인 (벤치마크 스텁 / 테스트): PokeAPI를 부르지 않음. 캐시에 없는 기술은 고정 값 (위력 80 노말 물리)
+POKEAPI_OFFLINE = os.getenv("POKEAPI_OFFLINE", "").lower() in ("1", "true", "yes")
+
 # 2. 메모리 캐시 로드
 _MEMORY_CACHE = {}
+_SAVE_LOCK = threading.Lock()   # 백그라운드 프리페치 스레드가 동시에 저장할 수 있음
 
 def load_cache_from_disk():
     """ 파일에서 캐시 로드 """
@@ -23,13 +28,23 @@ def load_cache_from_disk():
 def save_cache_to_disk():
     """ 메모리 캐시를 파일에 저장 """
     try:
-        with open(CACHE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(_MEMORY_CACHE, f, indent=2)
+        # 임시 파일에 쓰고 교체 -> 여러 프로세스(replay_ingest 작업자 등)가 동시에 저장해도 파일이 깨지지 않음
+        tmp_file = f"{CACHE_FILE}.{os.getpid()}.tmp"
+        with _SAVE_LOCK:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(dict(_MEMORY_CACHE), f, indent=2)
+            os.replace(tmp_file, CACHE_FILE)
     except Exception as e:
         print(f"⚠️ 캐시 저장 실패: {e}")
 
-# 초기 실행 시 캐시 로드
-_MEMORY_CACHE = load_cache_from_disk()
+# 캐시 파일은 처음 조회할 때 로드 (임포트 시점 비용 제거)
+_CACHE_LOADED = False
+
+def ensure_cache_loaded():
+    global _MEMORY_CACHE, _CACHE_LOADED
+    if not _CACHE_LOADED:
+        _MEMORY_CACHE = {**load_cache_from_disk(), **_MEMORY_CACHE}
+        _CACHE_LOADED = True
 
 # 3. 핵심 함수: 기술 정보 가져오기
 def get_move_data(move_name):
@@ -40,8 +55,11 @@ def get_move_data(move_name):
     api_name = move_name.lower().replace(" ", "-")
     
     # 캐시에 있으면 반환
+    ensure_cache_loaded()
     if move_name in _MEMORY_CACHE:
         return _MEMORY_CACHE[move_name]
+    if POKEAPI_OFFLINE:
+        return {"name": move_name, "type": "Normal", "category": "Physical", "power": 80, "priority": 0, "accuracy": 100}
 
     # API 호출
     url = f"https://pokeapi.co/api/v2/move/{api_name}"
@@ -77,6 +77,8 @@ def calculate_priority_bonus(priority, move_cat, move_type, ability, hp_percent)
 def check_turn_order(my_spec, opp_spec, field_spec, my_move_spec, opp_move_spec=None):
     """
     [최종 턴 순서 판정]
+    opp_spec['speed_range']: 선후공 관측으로 좁힌 상대 스피드 구간 (도구 포함, speed_bounds.SpeedBounds)
+      -> 상대 스피드 추정치를 구간 안으로 보정하고, 구간 전체가 한쪽이면 확정 (certain)
     """
     # 1. 스피드 계산
     my_field = {
@@ -104,6 +106,15 @@ def check_turn_order(my_spec, opp_spec, field_spec, my_move_spec, opp_move_spec=
         opp_spec.get('ability'), opp_field
     )
 
+    # 1-1. 상대 스피드 구간 (도구 배율은 구간에 이미 포함)
+    opp_range = None
+    if opp_spec.get('speed_range'):
+        opp_range = tuple(calculate_dynamic_speed(
+            {'spe': bound}, opp_spec.get('ranks', {}), None,
+            opp_spec.get('status'), opp_spec.get('ability'), opp_field
+        ) for bound in opp_spec['speed_range'])
+        opp_speed = min(max(opp_speed, opp_range[0]), opp_range[1])
+
     # 2. 우선도 계산
     my_prio = calculate_priority_bonus(
         my_spec.get('priority', 0), 
@@ -148,10 +159,15 @@ def check_turn_order(my_spec, opp_spec, field_spec, my_move_spec, opp_move_spec=
                 is_my_turn = (my_speed > opp_speed)
                 reason = "스피드 우위" if is_my_turn else "스피드 열세"
 
+    # 우선도가 갈랐거나, 상대 스피드 구간 전체가 내 스피드 한쪽에 있으면 확정
+    certain = my_prio != opp_prio or bool(opp_range) and not opp_range[0] <= my_speed <= opp_range[1]
+
     return {
         "is_my_turn": is_my_turn,
         "reason": reason,
         "my_final_speed": my_speed,
         "opp_final_speed": opp_speed,
+        "opp_speed_range": opp_range,
+        "certain": certain,
         "details": f"나(S{my_speed}/P{my_prio}) vs 상대(S{opp_speed}/P{opp_prio})"
     }
\ No newline at end of file
@@ -1,9 +1,11 @@
 # Calculator/stat_estimator.py
 
 import requests
+import copy
 import json
 import os
 import sys
+import threading
 
 # --- [모듈 임포트 경로 설정] ---
 # 같은 폴더(Calculator)에 있는 stat_utils.py를 불러오기 위한 설정
@@ -21,23 +23,111 @@ except ImportError:
             sys.path.append(current_dir)
         from stat_utils import calculate_stat, parse_smogon_spread, NATURE_MODS
 
-# API 호출 횟수를 줄이기 위한 캐시
+# 오프라인 (벤치마크 스텁 / 테스트): PokeAPI를 부르지 않음. 디스크 캐시에 없으면 고정 값으로 대신함
+# -> 측정 / 테스트 결과가 네트워크 상태에 좌우되지 않음 (캐시 파일에도 저장하지 않음)
+POKEAPI_OFFLINE = os.getenv("POKEAPI_OFFLINE", "").lower() in ("1", "true", "yes")
+OFFLINE_BASE_STATS = {"hp": 80, "atk": 80, "def": 80, "spa": 80, "spd": 80, "spe": 80}
+
+# API 호출 횟수를 줄이기 위한 캐시 (메모리 + 디스크)
 POKEAPI_CACHE = {}
+BASE_STATS_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "base_stats_cache.json")
+_DISK_CACHE_LOADED = False
+
+# 포켓몬 타입 캐시 (자속/상성 계산용, 종족값과 같은 API 응답에서 채움)
+POKEAPI_TYPES_CACHE = {}
+TYPES_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "types_cache.json")
+_TYPES_CACHE_LOADED = False
+
+# 랭크배틀 데이터 / 추정 결과 캐시 (매 호출마다 JSON을 다시 읽지 않도록)
+_RANK_DATA_CACHE = {}
+_ESTIMATE_CACHE = {}
+_SAVE_LOCK = threading.Lock()   # 백그라운드 프리페치 스레드가 동시에 저장할 수 있음
+
+def _write_json(path, data):
+    """ 임시 파일에 쓰고 교체 -> 여러 프로세스(replay_ingest 작업자 등)가 동시에 저장해도 파일이 깨지지 않음 """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with _SAVE_LOCK:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+
+def load_base_stats_cache():
+    """ 디스크의 종족값 캐시를 처음 한 번만 메모리로 로드 """
+    global _DISK_CACHE_LOADED
+    if _DISK_CACHE_LOADED: return
+    _DISK_CACHE_LOADED = True
+    if os.path.exists(BASE_STATS_CACHE_FILE):
+        try:
+            with open(BASE_STATS_CACHE_FILE, 'r', encoding='utf-8') as f:
+                POKEAPI_CACHE.update({**json.load(f), **POKEAPI_CACHE})
+        except Exception:
+            pass
+
+def save_base_stats_cache():
+    try:
+        _write_json(BASE_STATS_CACHE_FILE, dict(POKEAPI_CACHE))
+    except Exception as e:
+        print(f"⚠️ 종족값 캐시 저장 실패: {e}")
+
+def load_types_cache():
+    """ 디스크의 타입 캐시를 처음 한 번만 메모리로 로드 """
+    global _TYPES_CACHE_LOADED
+    if _TYPES_CACHE_LOADED: return
+    _TYPES_CACHE_LOADED = True
+    if os.path.exists(TYPES_CACHE_FILE):
+        try:
+            with open(TYPES_CACHE_FILE, 'r', encoding='utf-8') as f:
+                POKEAPI_TYPES_CACHE.update({**json.load(f), **POKEAPI_TYPES_CACHE})
+        except Exception:
+            pass
+
+def save_types_cache():
+    try:
+        _write_json(TYPES_CACHE_FILE, dict(POKEAPI_TYPES_CACHE))
+    except Exception as e:
+        print(f"⚠️ 타입 캐시 저장 실패: {e}")
+
+def to_api_name(pokemon_name):
+    """ Smogon 이름 -> PokeAPI 이름 ("Flutter Mane" -> "flutter-mane") """
+    return pokemon_name.lower().replace(" ", "-").replace(".", "").replace(":", "")
+
+def _store_types(api_name, data):
+    """ PokeAPI 응답의 타입 정보를 캐시에 저장 ("dragon" -> "Dragon") """
+    types = [t['type']['name'].capitalize() for t in data.get('types', [])]
+    if types:
+        load_types_cache()
+        POKEAPI_TYPES_CACHE[api_name] = types
+        save_types_cache()
+    return types
+
+def load_rank_data(smogon_data_path):
+    """ 랭크배틀 JSON을 경로별로 한 번만 로드 (없으면 None) """
+    if smogon_data_path not in _RANK_DATA_CACHE:
+        try:
+            with open(smogon_data_path, 'r', encoding='utf-8') as f:
+                _RANK_DATA_CACHE[smogon_data_path] = json.load(f)
+        except FileNotFoundError:
+            print(f"❌ [Error] 데이터 파일을 찾을 수 없습니다.\n경로 확인: {smogon_data_path}")
+            return None
+    return _RANK_DATA_CACHE[smogon_data_path]
 
 def get_base_stats(pokemon_name):
     """
     PokeAPI를 통해 포켓몬의 종족값(Base Stats)을 가져옵니다.
     """
     # 이름 정규화 (Smogon: "Flutter Mane" -> API: "flutter-mane")
-    api_name = pokemon_name.lower().replace(" ", "-").replace(".", "").replace(":", "")
+    api_name = to_api_name(pokemon_name)
     
     # 캐시 확인
+    load_base_stats_cache()
     if api_name in POKEAPI_CACHE:
         return POKEAPI_CACHE[api_name]
+    if POKEAPI_OFFLINE:
+        return dict(OFFLINE_BASE_STATS)
 
     url = f"https://pokeapi.co/api/v2/pokemon/{api_name}"
     try:
-        res = requests.get(url)
+        res = requests.get(url, timeout=2)
         if res.status_code != 200:
             print(f"⚠️ PokeAPI 검색 실패: {api_name} (Status: {res.status_code})")
             return None
@@ -57,11 +147,37 @@ def get_base_stats(pokemon_name):
             "spe": stats['speed']
         }
         POKEAPI_CACHE[api_name] = formatted_stats
+        save_base_stats_cache()
+        _store_types(api_name, data)
         return formatted_stats
     except Exception as e:
         print(f"API 에러: {e}")
         return None
 
+def get_pokemon_types(pokemon_name):
+    """
+    PokeAPI를 통해 포켓몬의 타입 리스트를 가져옵니다. (예: ["Dragon", "Dark"])
+    찾지 못하면 빈 리스트를 반환합니다. (자속/상성 보정 없이 계산됨)
+    """
+    api_name = to_api_name(pokemon_name)
+
+    load_types_cache()
+    if api_name in POKEAPI_TYPES_CACHE:
+        return list(POKEAPI_TYPES_CACHE[api_name])
+    if POKEAPI_OFFLINE:
+        return []
+
+    url = f"https://pokeapi.co/api/v2/pokemon/{api_name}"
+    try:
+        res = requests.get(url, timeout=2)
+        if res.status_code != 200:
+            print(f"⚠️ PokeAPI 타입 검색 실패: {api_name} (Status: {res.status_code})")
+            return []
+        return _store_types(api_name, res.json())
+    except Exception as e:
+        print(f"API 에러: {e}")
+        return []
+
 def estimate_stats(pokemon_name, smogon_data_path=None):
     """
     Smogon 데이터의 1순위 샘플을 기반으로 포켓몬의 실능(Stats)을 추정합니다.
@@ -80,17 +196,21 @@ def estimate_stats(pokemon_name, smogon_data_path=None):
         smogon_data_path = os.path.join(project_root, "Statistics", "rank_battle_data.json")
     # --------------------------------
 
+    # 0. 이전 추정 결과 재사용
+    cache_key = (pokemon_name, smogon_data_path)
+    if cache_key in _ESTIMATE_CACHE:
+        cached = _ESTIMATE_CACHE[cache_key]
+        return copy.deepcopy(cached)   # evs / stats까지 복사 -> 호출 측이 고쳐도 캐시는 그대로
+
     # 1. Smogon 데이터 로드
-    try:
-        with open(smogon_data_path, 'r', encoding='utf-8') as f:
-            rank_data = json.load(f)
-    except FileNotFoundError:
-        print(f"❌ [Error] 데이터 파일을 찾을 수 없습니다.\n경로 확인: {smogon_data_path}")
+    rank_data = load_rank_data(smogon_data_path)
+    if rank_data is None:
         return None
     
     if pokemon_name not in rank_data:
         # 데이터에 없으면 None 반환 (나중에 기본값 처리 등 필요)
         print(f"⚠️ Smogon 데이터에 없는 포켓몬: {pokemon_name}")
+        _ESTIMATE_CACHE[cache_key] = None
         return None
 
     # 2. 가장 많이 쓰이는 성격/노력치(Spread) 가져오기 (0번 인덱스 = 1순위)
@@ -120,12 +240,14 @@ def estimate_stats(pokemon_name, smogon_data_path=None):
         mod = NATURE_MODS.get(nature, {}).get(stat_name, 1.0)
         final_stats[stat_name] = calculate_stat(base_stats[stat_name], iv, evs[stat_name], mod, is_hp=False)
     
-    return {
+    result = {
         "pokemon": pokemon_name,
         "nature": nature,
         "evs": evs,
         "stats": final_stats
     }
+    _ESTIMATE_CACHE[cache_key] = result
+    return copy.deepcopy(result)
 
 # --- 테스트 실행 코드 ---
 if __name__ == "__main__":
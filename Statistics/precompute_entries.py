@@ -0,0 +1,137 @@
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# 경로 설정 (프로젝트 루트의 entry.py 등을 쓰기 위함)
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from rag_retriever import get_smogon_db
+from team_cache import get_team_cache, make_team_key, party_fingerprint
+
+# --- 설정 구간 ---
+TOP_TEAMS = 100      # 사전 분석할 파티 수
+BEAM_WIDTH = 300     # 빔 서치 폭
+BATCH_SIZE = 5       # LLM 호출 1회당 파티 수 (서브 배치)
+MAX_WORKERS = 4      # 동시 LLM 호출 수
+TEAM_SIZE = 6
+
+
+def get_teammate_probs(pokemon_name):
+    """ Teammates 가중치를 합이 1인 조건부 확률로 정규화 {동료: 확률} """
+    smogon_db = get_smogon_db()
+    teammates = [(name, w) for name, w in smogon_db.get(pokemon_name, {}).get("Teammates", [])
+                 if name in smogon_db and w > 0]
+    total = sum(w for _, w in teammates)
+    if total <= 0: return {}
+    return {name: w / total for name, w in teammates}
+
+
+def generate_probable_teams(top_n=TOP_TEAMS, beam_width=BEAM_WIDTH):
+    """
+    [빔 서치] Usage_Rate(시작 확률)와 Teammates(동료 조건부 확률)로 유력한 6마리 파티를 생성합니다.
+    점수 = 시작 포켓몬 사용률 x 추가된 포켓몬마다 (기존 멤버들의 동료 확률 평균)
+    Returns: [(team_list, score), ...] (점수 내림차순)
+    """
+    smogon_db = get_smogon_db()
+    teammate_probs = {name: get_teammate_probs(name) for name in smogon_db}
+
+    beam = [((name,), data.get("Usage_Rate", 0) / 100) for name, data in smogon_db.items()]
+    beam = sorted(beam, key=lambda x: x[1], reverse=True)[:beam_width]
+
+    for _ in range(TEAM_SIZE - 1):
+        candidates = {}
+        for team, score in beam:
+            next_probs = {}
+            for member in team:
+                for mate, prob in teammate_probs[member].items():
+                    if mate not in team:
+                        next_probs[mate] = next_probs.get(mate, 0) + prob / len(team)
+
+            for mate, prob in next_probs.items():
+                new_team = tuple(sorted(team + (mate,)))
+                new_score = score * prob
+                # 같은 구성은 점수가 높은 경로만 유지
+                if new_score > candidates.get(new_team, 0):
+                    candidates[new_team] = new_score
+
+        beam = sorted(candidates.items(), key=lambda x: x[1], reverse=True)[:beam_width]
+
+    return [(list(team), score) for team, score in beam[:top_n]]
+
+
+def run_sub_batch(sub_batch, party):
+    """
+    서브 배치 하나에 대해 전략 분석 실행 -> 내 파티 지문(party)으로 저장
+    (캐시에는 리포트만 저장되고 선출은 재사용 시점에 리포트에서 다시 추출하므로, 선출 추출 호출과 그 토큰은 넣지 않음)
+    """
+    from entry import analyze_entry_strategy
+
+    start_time = time.time()
+    analysis, tokens = analyze_entry_strategy(sub_batch, use_team_cache=False)
+    elapsed = time.time() - start_time
+
+    per_team_latency = elapsed / len(sub_batch)
+    per_team_tokens = tokens["total_tokens"] / len(sub_batch)
+
+    stored = 0
+    for party_id, team in sub_batch.items():
+        report = analysis.get(party_id)
+        if isinstance(report, str):
+            get_team_cache().store(team, report, per_team_latency, per_team_tokens, source="precomputed", party=party)
+            stored += 1
+    return stored, elapsed
+
+
+def precompute_entries(top_n=TOP_TEAMS, batch_size=BATCH_SIZE, max_workers=MAX_WORKERS):
+    from Battle_Preparing.party_loader import load_party_from_file
+    from Battle_Preparing.user_party import my_party
+
+    if not my_party.team:
+        load_party_from_file(os.path.join(project_root, "my_team.txt"))
+
+    teams = generate_probable_teams(top_n)
+    print(f"🧮 유력 파티 {len(teams)}개 생성 완료 (1위: {', '.join(teams[0][0])})")
+
+    # 이미 (같은 내 파티 기준으로) 사전 분석된 파티는 건너뜀
+    party = party_fingerprint(my_party.team)
+    pending = [team for team, _ in teams if get_team_cache().find_similar(team, party)[1] < 1.0]
+    print(f"📦 사전 분석 대상: {len(pending)}개 (기존 {len(teams) - len(pending)}개 스킵)")
+
+    sub_batches = [
+        {f"party_{i}": team for i, team in enumerate(pending[start:start + batch_size])}
+        for start in range(0, len(pending), batch_size)
+    ]
+
+    start_time = time.time()
+    total_stored = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(run_sub_batch, batch, party) for batch in sub_batches]
+        for done, future in enumerate(as_completed(futures), 1):
+            try:
+                stored, elapsed = future.result()
+                total_stored += stored
+                print(f"✅ [{done}/{len(sub_batches)}] {stored}개 저장 ({elapsed:.1f}초)")
+            except Exception as e:
+                print(f"❌ 서브 배치 실패: {e}")
+
+    print(f"🎉 완료! {total_stored}개 파티 사전 분석 저장 (총 {time.time() - start_time:.1f}초)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="유력 상대 파티 선출 분석 사전 계산")
+    parser.add_argument("--top", type=int, default=TOP_TEAMS)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    parser.add_argument("--dry-run", action="store_true", help="파티 목록만 출력")
+    args = parser.parse_args()
+
+    if args.dry_run:
+        for team, score in generate_probable_teams(args.top):
+            print(f"{score:.6f} | {make_team_key(team)}")
+    else:
+        precompute_entries(args.top, args.batch_size, args.workers)
@@ -1,13 +1,21 @@
 import streamlit as st
 import os
+import copy
+import uuid
 from dotenv import load_dotenv
 
 # --- [모듈 임포트] ---
 from Battle_Preparing.party_loader import load_party_from_file
 from Battle_Preparing.user_party import my_party
-from battle_state import current_battle  # Single Source of Truth
-from entry import analyze_entry_strategy, parse_opponent_input, parse_recommended_selection
+from battle_state import current_battle  # Single Source of Truth (세션별, session_manager)
+from entry import run_entry_analysis
 from battle import analyze_battle_turn
+from rollout import rollout_pool
+from llm_provider import get_provider_name, get_llm
+from rag_retriever import get_smogon_db, get_lead_stats
+from session_manager import session_manager
+from job_queue import job_queue
+from telemetry import telemetry, start_metrics_server
 
 # 1. 페이지 설정
 st.set_page_config(layout="wide", page_title="Pokémon AI Consultant")
@@ -25,12 +33,48 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# 3. 초기화 (세션 상태 관리)
-if "initialized" not in st.session_state:
+# 사이드바 현황판 자동 갱신 주기 (초). 0이면 채팅 턴마다 전체 화면을 다시 그림
+DASHBOARD_REFRESH_SEC = float(os.getenv("APP_DASHBOARD_REFRESH_SEC", 2))
+# 선출 분석 작업 진행률 폴링 주기 (초)
+JOB_POLL_SEC = float(os.getenv("APP_JOB_POLL_SEC", 0.5))
+STAGE_LABELS = {"parse": "이름 해석", "analysis": "전략 분석", "selection": "선출 추출"}
+PARTY_FILE = "my_team.txt"
+
+# 3. 프로세스 공유 자원 (모든 세션이 같이 씀, 한 번만 준비)
+@st.cache_resource(show_spinner="파티 실수치를 계산하고 있습니다...")
+def load_shared_party(path, mtime):
+    """ 파티 파일 -> {이름: 정보} (종족값 조회 포함, 파일이 바뀌면(mtime) 다시 계산) """
+    load_party_from_file(path)
+    return copy.deepcopy(my_party.team)
+
+@st.cache_resource(show_spinner="사용률 통계 / LLM 클라이언트를 준비하고 있습니다...")
+def warm_shared_resources(provider):
+    """
+    불변 메타 데이터(Smogon 사용률 / 선봉 통계) + LLM 클라이언트 + 롤아웃 작업 프로세스를 첫 화면에서 미리 만들어 둠
+    (인스턴스는 각 모듈의 지연 초기화 접근자가 프로세스 전역으로 보관 -> 여기서는 반환하지 않음)
+    엔트리 분석을 건너뛰고 바로 배틀을 시작해도 첫 턴 롤아웃이 프로세스 기동 비용을 치르지 않음
+    """
+    get_smogon_db()
+    get_lead_stats()
+    get_llm(temperature=0.1)
+    rollout_pool.prewarm()
+
+def activate_session():
+    """ 이번 실행(전체 / 프래그먼트)의 current_battle / my_party / 계측 구간을 이 세션 것으로 """
+    return session_manager.activate(st.session_state.session_id)
+
+# 4. 초기화 (세션 상태 관리)
+if "session_id" not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+session = activate_session()
+
+# 처음 접속했거나, 오래 유휴 상태라 배틀 상태가 정리된(새로 만들어진) 세션이면 처음부터
+if "initialized" not in st.session_state or st.session_state.get("battle_session") is not session:
     load_dotenv()
     
-    # [Step 1] 파티 로드
-    load_party_from_file("my_team.txt")
+    # [Step 1] 파티 로드 (계산은 프로세스당 한 번, 세션에는 복사본)
+    party = load_shared_party(PARTY_FILE, os.path.getmtime(PARTY_FILE) if os.path.exists(PARTY_FILE) else 0)
+    my_party.team = copy.deepcopy(party)
     
     # [Step 2] BattleState 초기화 (중요)
     current_battle.refresh_my_party()
@@ -46,20 +90,20 @@ if "initialized" not in st.session_state:
     if "battle_tokens" not in st.session_state:
         st.session_state.battle_tokens = {"parser": 0, "analysis": 0} 
     
+    st.session_state.battle_session = session
     st.session_state.initialized = True
 
+if os.getenv("TELEMETRY_PORT"):
+    start_metrics_server()
+
 # ==============================================================================
 # [사이드바] 배틀 상태 뷰어 (View Only Dashboard)
+# 프래그먼트: 채팅 턴이 끝나도 전체를 다시 그리지 않고, 현황판만 주기적으로 갱신
 # ==============================================================================
-with st.sidebar:
-    st.header("📊 배틀 현황판")
-    st.info("모든 상태 조작은 채팅으로 명령하세요.\n(예: '상대 딩루 교체', '내 피 50%')")
-    
-    if not os.getenv("GOOGLE_API_KEY"):
-        st.error("API Key가 없습니다.")
-        st.stop()
-
-    st.divider()
+@st.fragment(run_every=DASHBOARD_REFRESH_SEC or None)
+def render_dashboard():
+    if activate_session() is not st.session_state.get("battle_session"):
+        st.rerun()   # 세션이 정리되어 새로 만들어졌으면 전체 초기화부터
 
     # --- 1. 나의 상태 (My Status) ---
     st.subheader("🟢 나의 필드")
@@ -111,17 +155,24 @@ with st.sidebar:
             st.markdown(f"<span class='rank-text'>{', '.join(opp_ranks)}</span>", unsafe_allow_html=True)
 
         # 정보 (확정 여부 표시)
-        item_txt = f"{opp.info['item']} (확정)" if opp.confirmed['item'] else "❓ 미확인"
+        item_txt = opp.describe_item() if opp.confirmed['item'] or opp.info.get('posterior') else "❓ 미확인"
         st.markdown(f"🎒 도구: {item_txt}")
         
         # 휘발성 상태
         opp_volatiles = [k for k,v in opp.volatile_status.items() if v]
         if opp_volatiles:
             st.warning(f"⚠️ {', '.join(opp_volatiles)}")
-        
+
     else:
         st.markdown("*(대기 중)*")
 
+    # 상대 명단 백그라운드 준비 상황
+    prefetch = current_battle.get_prefetch_progress()
+    if prefetch['total'] and prefetch['done'] < prefetch['total']:
+        st.progress(prefetch['done'] / prefetch['total'])
+        st.caption(f"📥 상대 데이터 준비: {prefetch['done']}/{prefetch['total']}"
+                   + (f" | 실패: {', '.join(prefetch['failed'])}" if prefetch['failed'] else ""))
+
     st.divider()
 
     # --- 3. 필드 환경 (Environment) ---
@@ -157,11 +208,79 @@ with st.sidebar:
         else: st.write(", ".join(o_effs))
 
 
+with st.sidebar:
+    st.header("📊 배틀 현황판")
+    st.info("모든 상태 조작은 채팅으로 명령하세요.\n(예: '상대 딩루 교체', '내 피 50%')")
+    
+    if get_provider_name() == "gemini" and not os.getenv("GOOGLE_API_KEY"):
+        st.error("API Key가 없습니다.")
+        st.stop()
+    warm_shared_resources(get_provider_name())
+
+    st.divider()
+    render_dashboard()
+
+
 # ==============================================================================
 # [메인 화면] 채팅 인터페이스
 # ==============================================================================
 st.title("🤖 포켓몬 배틀 AI 컨설턴트")
 
+# 선출 분석 작업 진행 상황 (작업이 있을 때만 그려지고, 끝나면 전체 화면을 다시 그림)
+@st.fragment(run_every=JOB_POLL_SEC)
+def render_entry_job():
+    if activate_session() is not st.session_state.get("battle_session"):
+        st.rerun()
+    job = job_queue.get(st.session_state.entry_job)
+    if job and job["status"] in ("queued", "running"):
+        status_text = "분석 대기 중..." if job["status"] == "queued" else f"분석 중... ({job['elapsed']:.0f}s)"
+        st.caption(status_text)
+        for stage, (done, total) in job["stages"].items():
+            st.progress(done / total if total else 0.0, text=f"{STAGE_LABELS.get(stage, stage)}: {done}/{total}")
+        if st.button("분석 취소"):
+            job_queue.cancel(job["job_id"])
+        return
+
+    # 끝난 작업 -> 결과 반영 / 알림을 남기고 전체 화면을 다시 그림 (폴링 종료)
+    st.session_state.entry_job = None
+    apply_entry_job(job)
+    st.rerun()
+
+def apply_entry_job(job):
+    """ 끝난 선출 분석 작업 -> 세션 / BattleState 반영 (실패면 알림만 남기고 False) """
+    if job is None: return False   # 보관 기간이 지나 정리된 작업
+    if job["status"] == "cancelled":
+        st.session_state.entry_notice = "분석이 취소되었습니다."
+        return False
+    if job["status"] == "failed":
+        st.session_state.entry_notice = f"분석 실패: {job['error']}"
+        return False
+    opp_list, analysis, selection = job["result"]
+    if not opp_list:
+        st.session_state.entry_notice = "입력 해석 실패"
+        return False
+
+    st.session_state.opponent_list = opp_list
+    st.session_state.entry_analysis = analysis
+    
+    # BattleState 초기화 + 선출 반영 (첫 번째 파티 기준)
+    first_party = next(iter(opp_list.values()), [])
+    current_battle.initialize_opponent(first_party)
+    try:
+        rec = next(iter(selection.values()), None) if selection else None
+        rec_team = [rec.get("lead"), rec.get("back1"), rec.get("back2")] if rec else []
+        if rec_team and rec_team[0] in my_party.team:
+            current_battle.set_my_selection([name for name in rec_team if name in my_party.team])
+    except Exception as e:
+        print(f"선출 자동 반영 실패: {e}")
+
+    # [New] 토큰 정보 저장 (작업 제출 이후 늘어난 entry.* 누적 합계, 소요 시간은 작업의 실제 경과 시간)
+    st.session_state.entry_tokens = telemetry.summarize(
+        session=st.session_state.session_id, stage_prefix="entry.", baseline=st.session_state.get("entry_baseline")
+    )
+    st.session_state.entry_tokens["latency"] = job["elapsed"]
+    return True
+
 tab1, tab2 = st.tabs(["📋 선출 분석 (Entry)", "⚔️ 실시간 배틀 (Battle)"])
 
 # --- Tab 1: 선출 ---
@@ -170,46 +289,23 @@ with tab1:
     st.info("상대 포켓몬 6마리를 입력하세요.")
     
     entry_input = st.text_input("입력 (예: 날치머 망나뇽 딩루 물거폰 우라오스 미라이돈 ...)")
+    fc1, fc2 = st.columns(2)
+    fast_mode = fc1.toggle("⚡ 빠른 선출 모드", help="LLM 없이 계산기로 선출/선봉 결정 (1초 이내)")
+    fast_explain = fc2.checkbox("AI 해설 추가", disabled=not fast_mode, help="계산 결과의 승리 플랜 설명만 LLM으로 생성")
     
     if st.button("분석 시작"):
         if entry_input:
-            with st.spinner("Gemini 3.0이 시뮬레이션을 돌리고 있습니다..."):
-                # 1. 파싱
-                opp_list, t1 = parse_opponent_input(entry_input)
-                
-                if opp_list:
-                    st.session_state.opponent_list = opp_list
-                    
-                    # 2. BattleState 초기화
-                    current_battle.initialize_opponent(opp_list)
-                    
-                    # 3. 분석 실행
-                    analysis, t2 = analyze_entry_strategy(opp_list)
-                    st.session_state.entry_analysis = analysis
-                    
-                    # 4. 선출 추출
-                    t3 = {"total_tokens": 0}
-                    try:
-                        rec_team, t3 = parse_recommended_selection(analysis)
-                        if rec_team:
-                            lead = rec_team[0]
-                            if lead in my_party.team:
-                                current_battle.set_active("me", lead)
-                                current_battle.set_my_selection(rec_team)
-                    except Exception as e:
-                        print(f"선출 자동 반영 실패: {e}")
-
-                    # [New] 토큰 정보 저장
-                    st.session_state.entry_tokens = {
-                        "input_tokens": t1.get('input_tokens', 0) + t2.get('input_tokens', 0) + t3.get('input_tokens', 0),
-                        "output_tokens": t1.get('output_tokens') + t2.get('output_tokens', 0) + t3.get('output_tokens', 0),
-                        "total_tokens": t1.get('total_tokens', 0) + t2.get('total_tokens', 0) + t3.get('total_tokens', 0)
-                    }
-
-                    st.success("✅ 전략 수립 및 선출 반영 완료!")
-                    st.rerun()
-                else:
-                    st.error("입력 해석 실패")
+            # 분석은 작업 큐에서 실행 (스크립트 스레드는 바로 반환, 아래 진행 상황 영역이 폴링)
+            if st.session_state.get("entry_job"): job_queue.cancel(st.session_state.entry_job)
+            st.session_state.entry_baseline = telemetry.session_totals(st.session_state.session_id)
+            st.session_state.entry_job = job_queue.submit(
+                st.session_state.session_id, "entry", run_entry_analysis, entry_input, fast=fast_mode, explain=fast_explain
+            )
+
+    if st.session_state.get("entry_job"):
+        render_entry_job()
+    if st.session_state.get("entry_notice"):
+        st.error(st.session_state.pop("entry_notice"))
     
     if st.session_state.entry_analysis:
         st.markdown("---")
@@ -259,9 +355,15 @@ with tab1:
         c1.metric("1. 입력 토큰", f"{et['input_tokens']}")
         c2.metric("2. 출력 토큰", f"{et['output_tokens']}")
         c3.metric("3. 총 사용량", f"{et['total_tokens']}")
+        c4.metric("4. 소요 시간", f"{et.get('latency', 0):.1f}s")
 
 # --- Tab 2: 배틀 ---
-with tab2:
+# 프래그먼트: 턴 입력은 채팅 영역만 다시 실행 (사이드바 / 선출 탭은 그대로, 현황판은 자체 갱신)
+@st.fragment
+def render_chat():
+    if activate_session() is not st.session_state.get("battle_session"):
+        st.rerun()
+
     # 대화 기록 표시
     chat_container = st.container()
     with chat_container:
@@ -278,23 +380,28 @@ with tab2:
             user_input = st.chat_input("상황을 입력하세요 (예: 상대 미라이돈 등장, 내 피 50%)")
         with c2:
             opp_first = st.checkbox("상대 선공?", key="chk_opp_first", help="체크 시 스피드/스카프 추론 작동")
+            fused = st.checkbox("⚡ 통합 모드", key="chk_fused", help="상태 파싱 + 조언을 LLM 한 번으로 처리 (결과가 달라질 때만 재요청)")
 
         if user_input:
-            # 1. 사용자 메시지
+            # 1. 사용자 메시지 (기록 컨테이너에 이어서 그림)
             st.session_state.messages.append({"role": "user", "content": user_input})
-            with st.chat_message("user"):
+            with chat_container, st.chat_message("user"):
                 st.markdown(user_input)
             
             # 2. AI 응답 (상태 업데이트 + 계산 + 조언)
-            with st.chat_message("assistant"):
+            with chat_container, st.chat_message("assistant"):
                 place = st.empty()
                 with st.spinner("계산 및 전략 수립 중..."):
                     # [핵심] battle.py 호출 -> 상태 갱신 -> 조언 생성
-                    response, parser_tokens, analyze_tokens = analyze_battle_turn(user_input, opp_first)
+                    sid = st.session_state.session_id
+                    before = telemetry.session_totals(sid)
+                    result = analyze_battle_turn(user_input, opp_first, fused=fused)
+                    response = result[0] if isinstance(result, tuple) else result
                     
-                    # [Token Update] 채팅 턴마다 토큰 누적 (Index 2: Total Token 가정)
-                    p_cnt = parser_tokens[2] if parser_tokens and len(parser_tokens) > 2 else 0
-                    a_cnt = analyze_tokens[2] if analyze_tokens and len(analyze_tokens) > 2 else 0
+                    # [Token Update] 이번 턴에 늘어난 파서/조언 구간의 토큰 합계 (세션 누적 합계 차이)
+                    p_cnt = sum(telemetry.summarize(session=sid, stage_prefix=stage, baseline=before)["total_tokens"]
+                                for stage in ("battle.parse", "battle.fused"))
+                    a_cnt = telemetry.summarize(session=sid, stage_prefix="battle.advisor", baseline=before)["total_tokens"]
                     
                     st.session_state.battle_tokens["parser"] += p_cnt
                     st.session_state.battle_tokens["analysis"] += a_cnt
@@ -308,10 +415,10 @@ with tab2:
             # 저장할 때도 토큰 정보가 포함된 버전을 저장
             st.session_state.messages.append({"role": "assistant", "content": full_response})
             
-            # 3. 화면 갱신 (변경된 상태를 사이드바에 반영)
-            st.rerun()
+            # 3. 화면 갱신: 현황판 자동 갱신을 끈 경우에만 전체를 다시 그림
+            if not DASHBOARD_REFRESH_SEC: st.rerun()
 
-    # [New] 하단 토큰 리포트 (배틀 누적)
+    # [New] 하단 토큰 리포트 (배틀 누적, 이번 턴 반영 후 그림)
     st.divider()
     bt = st.session_state.battle_tokens
     total_battle = bt['parser'] + bt['analysis']
@@ -320,4 +427,7 @@ with tab2:
     bc1, bc2, bc3 = st.columns(3)
     bc1.metric("1. 상황 파싱", f"{bt['parser']}")
     bc2.metric("2. 전략 분석", f"{bt['analysis']}")
-    bc3.metric("💰 Total", f"{total_battle}", delta_color="off")
\ No newline at end of file
+    bc3.metric("💰 Total", f"{total_battle}", delta_color="off")
+
+with tab2:
+    render_chat()
@@ -0,0 +1,252 @@
+# batch_entry.py
+"""
+[헤드리스 선출 분석 배치]
+상대 파티 수천 개를 파일 / 표준입력으로 받아 Entry 파이프라인(이름 해석 -> 전략 분석 -> 선출 추출)을 돌리고,
+파티별 결과를 끝나는 대로 JSONL로 내보냅니다. (야간 메타 분석용, 화면 없음)
+
+입력 (줄 단위, 형식 자동 판별):
+- input.txt 형식: "날치머, 물라오스, 망나뇽, ... / 딩루, 어써러셔, ..." (한 줄에 여러 파티, '/' 구분)
+- JSONL: {"id": "t1", "team": ["Flutter Mane", ...]} 또는 {"id": "t1", "text": "날치머, 물라오스, ..."}
+출력 (JSONL, 파티당 한 줄, 끝난 순서):
+  {"id", "team", "analysis", "selection", "cached", "elapsed", "tokens", "error"}
+  tokens / elapsed: 배치로 묶인 호출의 비용은 그 호출에 들어간 파티 수로 나눠 기록
+
+- 입력은 CHUNK 파티씩 읽어서 처리 -> 파일 전체를 메모리에 올리지 않음
+- 청크는 최대 INFLIGHT개까지 동시에 진행 -> 한 청크의 마지막 호출을 기다리는 동안에도 LLM 할당량을 채움
+- LLM 동시 호출 수 / 서브 배치 크기 / 캐시 사용 여부는 인자로 조정 (기본값은 entry.py 설정)
+- 실패한 파티는 error를 기록하고 계속 진행. --resume이면 출력 파일에 이미 있는 id는 건너뜀
+
+사용 예:
+    python batch_entry.py input.txt -o results.jsonl
+    python batch_entry.py teams.jsonl -o results.jsonl --concurrency 8 --sub-batch 3 --resume
+    cat teams.txt | python batch_entry.py - > results.jsonl
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import itertools
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+TEAM_PATH = os.path.join(current_dir, "my_team.txt")
+
+BATCH_CHUNK = int(os.getenv("BATCH_CHUNK", 32))        # 한 번에 읽어서 이름 해석하는 파티 수
+BATCH_INFLIGHT = int(os.getenv("BATCH_INFLIGHT", 2))   # 동시에 진행하는 청크 수
+
+TOKEN_KEYS = ("input_tokens", "output_tokens", "total_tokens")
+
+
+def _share(tokens, count):
+    """ 배치 호출 토큰을 파티 수로 나눈 1개 몫 """
+    return {k: tokens.get(k, 0) / max(1, count) for k in TOKEN_KEYS}
+
+def _add(total, part):
+    for k in TOKEN_KEYS: total[k] = total.get(k, 0) + part.get(k, 0)
+    return total
+
+
+# --------------------------------------------------------------------------
+# [1] 입력
+# --------------------------------------------------------------------------
+def read_teams(stream, fmt="auto"):
+    """
+    입력 줄 -> {"id", "team"(영어 이름 리스트) 또는 "text"(해석 전 한 줄)} 를 하나씩 (지연 읽기)
+    id가 없으면 입력 순서 번호 (team_0, team_1, ...)
+    """
+    counter = itertools.count()
+    for line_no, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line: continue
+        if fmt == "jsonl" or (fmt == "auto" and line.startswith("{")):
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"⚠️ [Batch] {line_no}번째 줄 JSON 오류, 건너뜀: {e}", file=sys.stderr)
+                continue
+            index = next(counter)
+            team, text = record.get("team"), record.get("text")
+            if isinstance(team, str): team, text = None, team
+            yield {"id": str(record.get("id", f"team_{index}")), "team": team, "text": text}
+        else:
+            for party in (p.strip() for p in line.split("/")):
+                if party: yield {"id": f"team_{next(counter)}", "team": None, "text": party}
+
+def load_done_ids(path):
+    """ --resume: 기존 출력 파일에서 오류 없이 끝난 id """
+    done = set()
+    if not path or not os.path.exists(path): return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if not record.get("error"): done.add(record.get("id"))
+    return done
+
+
+# --------------------------------------------------------------------------
+# [2] 파이프라인
+# --------------------------------------------------------------------------
+class BatchRunner:
+    """
+    청크 단위 Entry 파이프라인 + JSONL 출력
+    - 청크: 이름 해석 (사전으로 안 되는 줄만 LLM 1회) -> 서브 배치별로 분석 + 선출 (동시)
+    - 모든 LLM 호출은 하나의 세마포어(concurrency)를 공유
+    """
+    def __init__(self, out, concurrency=None, sub_batch=None, use_cache=True, chunk=BATCH_CHUNK, inflight=BATCH_INFLIGHT):
+        import entry
+        self.entry = entry
+        self.out = out
+        self.concurrency = concurrency or entry.ENTRY_MAX_CONCURRENCY
+        self.sub_batch = max(1, sub_batch or entry.ENTRY_SUB_BATCH_SIZE)
+        self.use_cache = use_cache
+        self.chunk = max(1, chunk)
+        self.inflight = max(1, inflight)
+        self.stats = {"teams": 0, "errors": 0, "cached": 0, "tokens": {k: 0 for k in TOKEN_KEYS}}
+
+    def _emit(self, record):
+        self.out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.out.flush()
+        self.stats["teams"] += 1
+        self.stats["errors"] += bool(record["error"])
+        self.stats["cached"] += bool(record["cached"])
+        _add(self.stats["tokens"], record["tokens"])
+
+    def _emit_error(self, record, error, started, tokens=None):
+        self._emit({"id": record["id"], "team": record.get("team"), "analysis": None, "selection": None,
+                    "cached": False, "elapsed": round(time.perf_counter() - started, 3),
+                    "tokens": tokens or {k: 0 for k in TOKEN_KEYS}, "error": error})
+
+    async def run(self, records):
+        """ records(지연 반복자)를 청크로 나누어 최대 inflight개씩 진행 -> 통계 """
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        start = time.perf_counter()
+        pending = set()
+        iterator = iter(records)
+        while True:
+            chunk = list(itertools.islice(iterator, self.chunk))
+            if chunk: pending.add(asyncio.create_task(self._run_chunk(chunk)))
+            if not pending: break
+            if len(pending) >= self.inflight or not chunk:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done: task.result()
+        self.stats["elapsed"] = time.perf_counter() - start
+        return self.stats
+
+    async def _run_chunk(self, chunk):
+        """ 청크 이름 해석 -> 서브 배치 동시 분석 """
+        started = time.perf_counter()
+        teams, parse_tokens = dict(enumerate(r["team"] for r in chunk)), {}
+        texts = {i: r["text"] for i, r in enumerate(chunk) if not r["team"]}
+        if texts:
+            # 이름 해석: 사전 변환은 비용 없음, 나머지 줄만 LLM 1회 (토큰은 그 줄들이 나눠 가짐)
+            keys = list(texts)
+            _, _, unresolved = self.entry.split_party_input([texts[i] for i in keys])
+            try:
+                async with self.semaphore:
+                    parsed, tokens = await self.entry.parse_opponent_input_async([texts[i] for i in keys])
+            except Exception as e:
+                parsed, tokens = {}, {}
+                print(f"⚠️ [Batch] 이름 해석 실패: {e}", file=sys.stderr)
+            for n, i in enumerate(keys):
+                teams[i] = parsed.get(f"party_{n}")
+                if f"party_{n}" in unresolved: parse_tokens[i] = _share(tokens, len(unresolved))
+
+        units, unit = [], []
+        for i, record in enumerate(chunk):
+            if not teams[i]:
+                self._emit_error(record, "이름 해석 실패", started, parse_tokens.get(i))
+                continue
+            unit.append(i)
+            if len(unit) == self.sub_batch: units.append(unit); unit = []
+        if unit: units.append(unit)
+        await asyncio.gather(*(self._run_unit(chunk, teams, unit, parse_tokens, started) for unit in units))
+
+    async def _run_unit(self, chunk, teams, unit, parse_tokens, started):
+        """ 서브 배치 1개: (캐시 조회) -> 전략 분석 LLM 1회 -> 선출 추출 -> 파티별 출력 """
+        entry = self.entry
+        batch = {f"party_{n}": teams[i] for n, i in enumerate(unit)}
+        try:
+            cached = entry.lookup_cached_analyses(batch) if self.use_cache else {}
+            live = {pid: team for pid, team in batch.items() if pid not in cached}
+            analysis, a_tokens = dict(cached), {}
+            if live:
+                contexts = await asyncio.to_thread(lambda: {pid: entry.build_party_context(pid, team) for pid, team in live.items()})
+                result, a_tokens = await entry.analyze_entry_strategy_async(
+                    live, use_team_cache=False, contexts=contexts, sub_batch_size=len(live), semaphore=self.semaphore,
+                    store_team_cache=self.use_cache
+                )
+                if "error" not in result: analysis.update(result)
+            async with self.semaphore:
+                selection, s_tokens = await entry.parse_recommended_selection_async(analysis)
+        except Exception as e:
+            for i in unit: self._emit_error(chunk[i], f"{type(e).__name__}: {e}", started, parse_tokens.get(i))
+            return
+
+        elapsed = round(time.perf_counter() - started, 3)
+        for n, i in enumerate(unit):
+            pid = f"party_{n}"
+            tokens = _add(dict(parse_tokens.get(i) or {k: 0 for k in TOKEN_KEYS}), _share(s_tokens, len(batch)))
+            if pid in live: _add(tokens, _share(a_tokens, len(live)))
+            report = analysis.get(pid)
+            self._emit({
+                "id": chunk[i]["id"], "team": teams[i], "analysis": report, "selection": selection.get(pid),
+                "cached": pid in cached, "elapsed": elapsed, "tokens": {k: round(v, 1) for k, v in tokens.items()},
+                "error": None if report else "분석 결과 없음",
+            })
+
+
+# --------------------------------------------------------------------------
+# [3] CLI
+# --------------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="상대 파티 대량 선출 분석 (JSONL 출력)")
+    parser.add_argument("input", help="입력 파일 (input.txt 형식 또는 JSONL, '-'면 표준입력)")
+    parser.add_argument("-o", "--output", help="출력 JSONL 파일 (없으면 표준출력)")
+    parser.add_argument("--format", default="auto", choices=["auto", "text", "jsonl"])
+    parser.add_argument("--team", default=TEAM_PATH, help="내 파티 파일")
+    parser.add_argument("--concurrency", type=int, default=None, help="LLM 동시 호출 수 (기본: ENTRY_MAX_CONCURRENCY)")
+    parser.add_argument("--sub-batch", type=int, default=None, help="LLM 1회에 넣는 파티 수 (기본: ENTRY_SUB_BATCH_SIZE)")
+    parser.add_argument("--chunk", type=int, default=BATCH_CHUNK, help="한 번에 읽어서 처리하는 파티 수")
+    parser.add_argument("--inflight", type=int, default=BATCH_INFLIGHT, help="동시에 진행하는 청크 수")
+    parser.add_argument("--no-cache", action="store_true", help="LLM 응답 / 파티 분석 캐시를 쓰지 않음")
+    parser.add_argument("--resume", action="store_true", help="출력 파일에 이미 있는 id는 건너뛰고 이어서 기록")
+    args = parser.parse_args(argv)
+
+    # 캐시 설정은 모듈 임포트 전에 결정
+    if args.no_cache:
+        os.environ["LLM_CACHE_DISABLED"] = "1"
+    if current_dir not in sys.path:
+        sys.path.append(current_dir)
+
+    # 진행 로그는 stderr로 (stdout은 결과 JSONL 전용)
+    log, sys.stdout = sys.stdout, sys.stderr
+    from Battle_Preparing.party_loader import load_party_from_file
+    from Battle_Preparing.user_party import my_party
+    load_party_from_file(args.team)
+    if not my_party.team:
+        print("❌ 내 파티를 불러오지 못했습니다.")
+        return 1
+
+    done = load_done_ids(args.output) if args.resume else set()
+    source = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+    out = open(args.output, "a" if args.resume else "w", encoding="utf-8") if args.output else log
+    try:
+        records = (r for r in read_teams(source, args.format) if r["id"] not in done)
+        runner = BatchRunner(out, args.concurrency, args.sub_batch, not args.no_cache, args.chunk, args.inflight)
+        stats = asyncio.run(runner.run(records))
+    finally:
+        if source is not sys.stdin: source.close()
+        if out is not log: out.close()
+
+    throughput = stats["teams"] / stats["elapsed"] if stats["elapsed"] > 0 else 0
+    print(f"🚀 [Batch] {stats['teams']}개 파티 / {stats['elapsed']:.1f}초 = {throughput:.2f}개/초 "
+          f"(캐시 {stats['cached']}, 실패 {stats['errors']}, 건너뜀 {len(done)}, 토큰 {stats['tokens']['total_tokens']:.0f})")
+    return 1 if stats["errors"] and stats["errors"] == stats["teams"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
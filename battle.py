@@ -1,7 +1,7 @@
 import os
 import json
 import ast
-from dotenv import load_dotenv
+import time
 
 # --- [모듈 임포트] ---
 from battle_state import current_battle
@@ -10,31 +10,31 @@ from Calculator.speed_checker import check_turn_order
 from Calculator.move_loader import get_move_data
 from Calculator.stat_estimator import estimate_stats
 from entry import extract_clean_content
+from battle_log_parser import parse_battle_log
+from speculator import Speculator, SimulationCache, state_key
+from turn_search import search_turn, format_search_report, SEARCH_BUDGET_MS
+from rollout import estimate_win_rates, format_rollout_report, ROLLOUT_BUDGET_MS
+from endgame import solve_endgame, format_endgame_report, tablebase_stats, ENDGAME_BUDGET_MS
+from llm_cache import cached_invoke
+from telemetry import telemetry, extract_usage
 
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.prompts import PromptTemplate
-
-# 1. 환경 설정
-load_dotenv()
-if not os.getenv("GOOGLE_API_KEY"):
-    raise ValueError("GOOGLE_API_KEY가 설정되지 않았습니다.")
-
-llm = ChatGoogleGenerativeAI(
-    model="gemini-3-flash-preview", 
-    temperature=0.1, # 배틀 분석은 정확성이 중요하므로 낮게 설정
-    google_api_key=os.getenv("GOOGLE_API_KEY")
-)
+# LLM 클라이언트는 처음 호출될 때 생성 (get_llm)
+from llm_provider import get_llm
 
 # -------------------------------------------------------------------------
 # [Helper] 스펙 포장 함수 (시뮬레이션 & 업데이트 공용)
 # -------------------------------------------------------------------------
-def pack_specs():
-    """ 현재 BattleState를 계산기 입력용 Spec으로 변환 """
-    if not current_battle.my_active or not current_battle.opp_active:
+def pack_specs(my_poke=None, opp_poke=None, global_effects=None, side_effects=None):
+    """
+    현재 BattleState를 계산기 입력용 Spec으로 변환
+    (인자를 주면 그 포켓몬/필드 기준 -> speculator.py의 가정 상태 계산용)
+    """
+    my_poke = my_poke or current_battle.my_active
+    opp_poke = opp_poke or current_battle.opp_active
+    global_effects = global_effects or current_battle.global_effects
+    side_effects = side_effects or current_battle.side_effects
+    if not my_poke or not opp_poke:
         return None, None, None
-
-    my_poke = current_battle.my_active
-    opp_poke = current_battle.opp_active
     
     # 상대 스탯 (확정 아니면 추정치)
     opp_stats = opp_poke.info.get('stats')
@@ -51,16 +51,17 @@ def pack_specs():
     opp_spec = {
         'stats': opp_stats, 'ranks': opp_poke.ranks,
         'item': opp_poke.info['item'], 'status': opp_poke.status_condition,
-        'screens': current_battle.side_effects['opp'],
-        'ability': opp_poke.info['ability']
+        'screens': side_effects['opp'],
+        'ability': opp_poke.info['ability'],
+        'speed_range': opp_poke.info.get('speed_range')
     }
     
     field_spec = {
-        'weather': current_battle.global_effects['weather'],
-        'terrain': current_battle.global_effects['terrain'],
-        'trick_room': current_battle.global_effects['trick_room'],
-        'tailwind_me': current_battle.side_effects['me']['tailwind'],
-        'tailwind_opp': current_battle.side_effects['opp']['tailwind']
+        'weather': global_effects['weather'],
+        'terrain': global_effects['terrain'],
+        'trick_room': global_effects['trick_room'],
+        'tailwind_me': side_effects['me']['tailwind'],
+        'tailwind_opp': side_effects['opp']['tailwind']
     }
     
     return my_spec, opp_spec, field_spec
@@ -68,31 +69,8 @@ def pack_specs():
 # -------------------------------------------------------------------------
 # [Step 1] 파서 & 자동 계산 로직
 # -------------------------------------------------------------------------
-def parse_and_update_state(user_input):
-    """
-    사용자의 자연어 입력을 분석하여 BattleState를 갱신합니다.
-    """
-    print("🔄 [Logic] 사용자 입력 분석 및 자동 계산 시작...")
-    
-    my_name = current_battle.my_active.name if current_battle.my_active else "None"
-    opp_name = current_battle.opp_active.name if current_battle.opp_active else "None"
-    
-    # 교체 후보 리스트 (파싱 정확도 향상용)
-    my_roster = list(current_battle.my_party_status.keys())
-    opp_roster = current_battle.opp_full_roster
-
-    # [핵심 수정] 프롬프트 대폭 강화 (모든 변수 캡처)
-    parser_template = """
-    당신은 '포켓몬 배틀 로그 파서(Parser)'입니다. 
-    사용자의 입력을 보고 상태 변경 사항을 정확한 JSON으로 추출하세요.
-
-    [현재 필드]
-    - 나: {my_name} (대기: {my_roster})
-    - 상대: {opp_name} (엔트리: {opp_roster})
-
-    [사용자 입력]
-    "{user_input}"
-
+# 추출 규칙 + JSON 스키마 (파서 / 통합 모드 프롬프트 공용)
+PARSER_RULES = """
     [추출 규칙]
     1. **교체**: 
        - "상대 미라이돈 등장" -> "opp_switch": "Miraidon"
@@ -101,7 +79,7 @@ def parse_and_update_state(user_input):
     3. **HP 변화**: 사용자가 수치를 말했으면 기입(음수=데미지), 말 안 했으면 null.
     4. **상태이상**: "화상 입음" -> "Burn", "마비" -> "Paralysis", "잠듦" -> "Sleep".
     5. **랭크**: "칼춤췄어(+2공)" -> {{"atk": 2}}, "위협(-1공)" -> {{"atk": -1}}.
-    6. **필드/날씨**: "비 내림" -> weather: "Rain", "벽 설치" -> opp_reflect: true.
+    6. **필드/날씨**: "비 내림" -> weather: "Rain", "벽 설치" -> reflect_opp: true, "상대 순풍" -> tailwind_opp: true.
 
     [JSON 스키마]
     {{
@@ -112,8 +90,8 @@ def parse_and_update_state(user_input):
         "my_hp_change_input": int or null,
         "opp_hp_change_input": int or null,
         
-        "my_status_change": str or null,
-        "opp_status_change": str or null,
+        "my_status": str or null,
+        "opp_status": str or null,
         
         "my_rank_change": {{"atk": int, "def": int, "spa": int, "spd": int, "spe": int}},
         "opp_rank_change": {{"atk": int, "def": int, "spa": int, "spd": int, "spe": int}},
@@ -122,44 +100,106 @@ def parse_and_update_state(user_input):
         "terrain": str or null,
         "trick_room": bool or null,
         
-        "my_tailwind": bool or null,
-        "opp_reflect": bool or null,
-        "opp_light_screen": bool or null,
+        "tailwind_me": bool or null,
+        "tailwind_opp": bool or null,
+        "reflect_opp": bool or null,
+        "light_screen_opp": bool or null,
         "turn_end": bool
     }}
-    """
-    
-    prompt = PromptTemplate.from_template(parser_template)
-    chain = prompt | llm
-    
+"""
+
+BATTLE_PARSER_TEMPLATE = """
+    당신은 '포켓몬 배틀 로그 파서(Parser)'입니다. 
+    사용자의 입력을 보고 상태 변경 사항을 정확한 JSON으로 추출하세요.
+
+    [현재 필드]
+    - 나: {my_name} (대기: {my_roster})
+    - 상대: {opp_name} (엔트리: {opp_roster})
+
+    [사용자 입력]
+    "{user_input}"
+""" + PARSER_RULES
+
+def get_field_context():
+    """ 파서 프롬프트용 현재 필드 정보 (내/상대 활성 포켓몬, 교체 후보) """
+    return {
+        "my_name": current_battle.my_active.name if current_battle.my_active else "None",
+        "opp_name": current_battle.opp_active.name if current_battle.opp_active else "None",
+        # 교체 후보 리스트 (파싱 정확도 향상용)
+        "my_roster": ", ".join(current_battle.my_party_status.keys()),
+        "opp_roster": ", ".join(current_battle.opp_full_roster)
+    }
+
+# 규칙 파서 신뢰도가 이 값 이상이면 LLM 파서를 건너뜀
+RULE_PARSER_THRESHOLD = float(os.getenv("BATTLE_RULE_PARSER_THRESHOLD", 0.9))
+
+def rule_parse(user_input):
+    """ 규칙 기반 파서 (LLM 없음). 신뢰도가 기준 미만이면 None """
+    start = time.perf_counter()
+    parsed_data, confidence = parse_battle_log(user_input, current_battle)
+    matched = parsed_data is not None and confidence >= RULE_PARSER_THRESHOLD
+    telemetry.record("battle.parse_rule", time.perf_counter() - start,
+                     cache_hit=matched, confidence=round(confidence, 2))
+    if not matched: return None
+
+    print(f"⚡ 규칙 파싱 결과 (신뢰도 {confidence:.2f}): {parsed_data}")
+    return parsed_data
+
+def parse_json_reply(response):
+    """ LLM 응답 -> dict (코드 블럭 제거 후 JSON) """
+    return json.loads(extract_clean_content(response).replace("```json", "").replace("```", "").strip())
+
+def is_json_reply(response):
+    """ 응답 캐시 저장 조건 (validate): JSON 객체로 파싱되는 응답만 """
     try:
-        response = chain.invoke({
-            "user_input": user_input, 
-            "my_name": my_name, 
-            "opp_name": opp_name,
-            "my_roster": ", ".join(my_roster),
-            "opp_roster": ", ".join(opp_roster)
-        })
-
-        usage = response.usage_metadata
-        token_result = [
-            usage.get('input_tokens', 0),
-            usage.get('output_tokens', 0),
-            usage.get('total_tokens', 0)
-        ]
-
-        print(token_result)
-        
-        json_text = extract_clean_content(response)
-        json_text = json_text.replace("```json", "").replace("```", "").strip()
-        parsed_data = json.loads(json_text)
-        print(f"🧩 파싱 결과: {parsed_data}")
-        
-    except Exception as e:
-        print(f"❌ 파싱 실패: {e}")
-        return False, "파싱 오류 발생"
+        return isinstance(parse_json_reply(response), dict)
+    except ValueError:
+        return False
+
+def parse_and_update_state(user_input, parsed_data=None, try_rules=True):
+    """
+    사용자의 자연어 입력을 분석하여 BattleState를 갱신합니다.
+    규칙 파서로 읽을 수 있는 입력은 LLM 없이 처리하고, 나머지만 LLM 파서로 보냅니다.
+    parsed_data: 호출 측에서 이미 규칙 파싱한 결과 (있으면 그대로 반영)
+    try_rules: False면 규칙 파서를 건너뜀 (호출 측에서 이미 시도해 실패한 입력)
+    """
+    print("🔄 [Logic] 사용자 입력 분석 및 자동 계산 시작...")
+
+    if parsed_data is None and try_rules:
+        parsed_data = rule_parse(user_input)
+    token_result = [0, 0, 0]
+
+    if parsed_data is None:
+        from langchain_core.prompts import PromptTemplate
+
+        prompt = PromptTemplate.from_template(BATTLE_PARSER_TEMPLATE)
+
+        try:
+            response = cached_invoke(get_llm(temperature=0.1), prompt.format(
+                user_input=user_input, **get_field_context()
+            ), stage="battle.parse", validate=is_json_reply)
+
+            usage = extract_usage(response)
+            token_result = [usage['input_tokens'], usage['output_tokens'], usage['total_tokens']]
 
-    # 2. 상태 업데이트 적용 (Logic Layer)
+            print(token_result)
+
+            parsed_data = parse_json_reply(response)
+            print(f"🧩 파싱 결과: {parsed_data}")
+
+        except Exception as e:
+            print(f"❌ 파싱 실패: {e}")
+            return False, "파싱 오류 발생", [0, 0, 0]
+
+    updates_log = apply_parsed_update(parsed_data)
+    return True, f"✅ 상태 반영됨: {', '.join(updates_log)}", token_result
+
+def apply_parsed_update(parsed_data):
+    """
+    파싱된 상태 변화(JSON)를 BattleState에 적용 (Logic Layer)
+    HP 수치가 없으면 계산기로 데미지를 계산해서 반영합니다.
+    Returns: 변경 내역 리스트
+    """
     updates_log = []
     
     # (1) 교체 처리
@@ -176,8 +216,9 @@ def parse_and_update_state(user_input):
     # (2) 자동 데미지 계산 (Auto-Calc)
     # 교체가 없을 때만 수행
     if not parsed_data.get("my_switch") and not parsed_data.get("opp_switch"):
+        calc_start = time.perf_counter()
         my_spec, opp_spec, field_spec = pack_specs()
-        
+    
         # Case A: 내가 공격
         my_move = parsed_data.get("my_move_used")
         if my_move and my_spec:
@@ -185,6 +226,10 @@ def parse_and_update_state(user_input):
                 dmg = parsed_data["opp_hp_change_input"]
                 current_battle.opp_active.update_hp(dmg)
                 updates_log.append(f"상대 HP {dmg}% (입력)")
+                # 실제 데미지 수치 -> 상대 HP/방어 노력치 사후분포 갱신
+                current_battle.opp_active.observe_damage(
+                    "defender", current_battle.my_active.name, my_spec, opp_spec, get_move_data(my_move),
+                    field_spec, -dmg, current_battle.opp_active.is_fainted)
             else:
                 move_info = get_move_data(my_move)
                 if move_info['power'] > 0:
@@ -198,11 +243,15 @@ def parse_and_update_state(user_input):
         opp_move = parsed_data.get("opp_move_used")
         if opp_move and opp_spec:
             current_battle.opp_active.add_known_move(opp_move)
-            
+        
             if parsed_data.get("my_hp_change_input") is not None:
                 dmg = parsed_data["my_hp_change_input"]
                 current_battle.my_active.update_hp(dmg)
                 updates_log.append(f"내 HP {dmg}% (입력)")
+                # 실제 데미지 수치 -> 상대 공격 노력치 x 도구 사후분포 갱신
+                current_battle.opp_active.observe_damage(
+                    "attacker", current_battle.my_active.name, opp_spec, my_spec, get_move_data(opp_move),
+                    field_spec, -dmg, current_battle.my_active.is_fainted)
             else:
                 move_info = get_move_data(opp_move)
                 if move_info['power'] > 0:
@@ -212,6 +261,8 @@ def parse_and_update_state(user_input):
                     current_battle.my_active.update_hp(avg_dmg)
                     updates_log.append(f"내 HP {avg_dmg:.1f}% (계산)")
 
+        telemetry.record("battle.auto_calc", time.perf_counter() - calc_start)
+
     # (3) 턴 증가
     if parsed_data.get("turn_end"):
         current_battle.turn_count += 1
@@ -220,77 +271,128 @@ def parse_and_update_state(user_input):
     # [최종 반영] 랭크/상태이상/필드 등 나머지 변수 일괄 적용
     current_battle.apply_llm_update(parsed_data)
 
-    return True, f"✅ 상태 반영됨: {', '.join(updates_log)}", token_result
+    return updates_log
 
 # -------------------------------------------------------------------------
 # [Step 2] 시뮬레이션 및 조언 (Advisor)
 # -------------------------------------------------------------------------
+# 시뮬레이션 항목별로 다시 계산해야 하는 변경 (BattleState.pop_changes 필드 이름)
+ROW_DEPENDENCIES = {
+    "speed": {"my_active", "opp_active", "opp_stats", "my_spe_rank", "opp_spe_rank", "my_status", "opp_status",
+              "my_item", "opp_item", "opp_ability", "opp_speed_range", "weather", "terrain", "trick_room", "tailwind"},
+    "offense": {"my_active", "opp_active", "opp_stats", "my_atk_ranks", "opp_def_ranks", "my_status",
+                "my_item", "opp_ability", "weather", "terrain", "screens"},
+    "defense": {"my_active", "opp_active", "opp_stats", "opp_atk_ranks", "my_def_ranks", "opp_status",
+                "opp_item", "opp_ability", "weather", "terrain"},
+}
+
+@telemetry.traced("battle.simulation")
 def run_battle_simulation_report():
-    """ 현재 상태 기준으로 승리 플랜 시뮬레이션 """
-    my_spec, opp_spec, field_spec = pack_specs()
+    """
+    현재 상태 기준으로 승리 플랜 시뮬레이션
+    - 직전 턴 이후 speculator가 같은 상태를 미리 계산해 두었으면 그 결과를 그대로 사용
+    - 아니면 지난 계산 이후 바뀐 필드에 걸린 항목(스피드/공격/방어)만 다시 계산
+    """
+    if not current_battle.my_active or not current_battle.opp_active: return "⚠️ 정보 부족", {}
+    args = (current_battle.my_active, current_battle.opp_active,
+            current_battle.global_effects, current_battle.side_effects)
+
+    # 항목별 계산 결과는 현재 세션의 배틀에 저장 (변경 표시와 같은 주인)
+    with current_battle.simulation_lock:
+        rows = current_battle.simulation_rows
+        changes = current_battle.pop_changes("simulation")
+        for section, deps in ROW_DEPENDENCIES.items():
+            if changes & deps: rows.pop(section, None)
+
+        key = state_key(*args)
+        cached = simulation_cache.get(key)
+        telemetry.record("battle.simulation_cache", 0.0, cache_hit=cached is not None)
+        if cached is not None:
+            print("⚡ [Speculator] 미리 계산된 시뮬레이션 사용")
+            return cached
+
+        start = time.perf_counter()
+        reused = _count_rows(rows)
+        result = simulate_matchup(*args, rows=rows)
+        telemetry.record("battle.simulation_rows", time.perf_counter() - start,
+                         reused=reused, computed=_count_rows(rows) - reused, changes=sorted(changes))
+    simulation_cache.put(key, result)
+    return result
+
+def _count_rows(rows):
+    return int("speed" in rows) + len(rows.get("offense", {})) + len(rows.get("defense", {}))
+
+def simulate_matchup(my_poke, opp_poke, global_effects, side_effects, rows=None):
+    """
+    주어진 대면/필드 상태의 스피드 + 공격/방어 시뮬레이션 -> (리포트, 메타)
+    rows: 항목별 계산 결과 저장소 {"speed", "offense": {기술: 결과}, "defense": {기술: 결과}}
+          -> 이미 들어 있는 항목은 다시 계산하지 않음
+    """
+    my_spec, opp_spec, field_spec = pack_specs(my_poke, opp_poke, global_effects, side_effects)
     if not my_spec: return "⚠️ 정보 부족", {}
+    if rows is None: rows = {}
 
     report = ""
+    ko_results = []
     # 1. 스피드 판정
-    speed_res = check_turn_order(my_spec, opp_spec, field_spec, {}, {})
+    if "speed" not in rows:
+        rows["speed"] = check_turn_order(my_spec, opp_spec, field_spec, {}, {})
+    speed_res = rows["speed"]
     icon = "🚀선공" if speed_res['is_my_turn'] else "🐢후공"
     if speed_res['is_my_turn'] is None: icon = "⚖️동속"
-    report += f"⚡ [스피드] {icon} (나:{speed_res['my_final_speed']} vs 상대:{speed_res['opp_final_speed']})\n"
-
-    # 2. 공격 시뮬레이션
-    report += f"⚔️ [공격] {current_battle.my_active.name} -> {current_battle.opp_active.name}\n"
-    for move_name in current_battle.my_active.info['moves']:
-        m_info = get_move_data(move_name)
-        if m_info['power'] > 0:
-            res = run_calculation(my_spec, opp_spec, m_info, field_spec)
-            report += f" - {move_name}: {res['damage']['percent_range']} ({res['damage']['ko_result']})\n"
-
-    # 3. 방어 시뮬레이션
-    report += f"🛡️ [방어] {current_battle.opp_active.name} 공격 예상\n"
+    report += f"⚡ [스피드] {icon} (나:{speed_res['my_final_speed']} vs 상대:{speed_res['opp_final_speed']})"
+    if speed_res.get('opp_speed_range'):
+        lo, hi = speed_res['opp_speed_range']
+        report += f" | 상대 범위 {lo}~{hi} ({'확정' if speed_res['certain'] else '추정'})"
+    report += "\n"
+
+    # 2. 공격 시뮬레이션 (기술별 결과: (퍼센트 범위, 확정 판정) 또는 변화기면 None)
+    report += f"⚔️ [공격] {my_poke.name} -> {opp_poke.name}\n"
+    offense = rows.setdefault("offense", {})
+    for move_name in my_poke.info['moves']:
+        if move_name not in offense:
+            m_info = get_move_data(move_name)
+            offense[move_name] = None
+            if m_info['power'] > 0:
+                res = run_calculation(my_spec, opp_spec, m_info, field_spec)
+                offense[move_name] = (res['damage']['percent_range'], res['damage']['ko_result'])
+        if offense[move_name]:
+            percent_range, ko_result = offense[move_name]
+            report += f" - {move_name}: {percent_range} ({ko_result})\n"
+            ko_results.append((move_name, ko_result))
+
+    # 3. 방어 시뮬레이션 (위협적인 기술만 표시)
+    report += f"🛡️ [방어] {opp_poke.name} 공격 예상\n"
     # 확인된 기술 + 예측 기술
-    potential_moves = current_battle.opp_active.info['moves'] + current_battle.opp_active.info['predictions']['moves']
+    potential_moves = opp_poke.info['moves'] + opp_poke.info['predictions']['moves']
     unique_moves = list(dict.fromkeys(potential_moves))[:5]
-    
-    if unique_moves:
-        for move_name in unique_moves:
+    defense = rows.setdefault("defense", {})
+
+    for move_name in unique_moves:
+        if move_name not in defense:
             m_info = get_move_data(move_name)
+            defense[move_name] = None
             if m_info['power'] > 0:
                 res = run_calculation(opp_spec, my_spec, m_info, field_spec)
                 dmg_min = int(res['damage']['damage_range'].split('~')[0])
                 if (dmg_min / my_spec['stats']['hp'] > 0.3) or "확정" in res['damage']['ko_result']:
-                    report += f" - ⚠️ {move_name}: {res['damage']['percent_range']} ({res['damage']['ko_result']})\n"
-
-    return report, {"my_real_speed": speed_res['my_final_speed']}
-
-# -------------------------------------------------------------------------
-# [Main API] 통합 분석 함수
-# -------------------------------------------------------------------------
-def analyze_battle_turn(user_input, opp_moved_first=False):
-    """
-    1. 파싱 및 상태 업데이트 (자동 계산 포함)
-    2. 시뮬레이션 재실행
-    3. AI 조언 생성
-    """
-    
-    # 1. 상태 업데이트 (LLM Parser)
-    success, update_msg, parser_tokens = parse_and_update_state(user_input)
-    
-    # 2. 시뮬레이션 (업데이트된 상태 기준)
-    sim_report, meta = run_battle_simulation_report()
-    
-    # 3. 역산 로직
-    inference_msg = ""
-    if current_battle.opp_active and not current_battle.opp_active.is_mine:
-        inferred = current_battle.opp_active.infer_speed_nature(
-            meta.get('my_real_speed', 0), opp_moved_first, current_battle.side_effects
-        )
-        if inferred: inference_msg = f"\n🕵️ **[정보 역산 성공]** {inferred}\n"
-
-    # 4. 최종 프롬프트 (Advisor)
-    state_text = current_battle.get_state_report()
-    opp_info_text = current_battle.opp_active.get_summary_text() if current_battle.opp_active else ""
-
-    template = """
+                    defense[move_name] = (res['damage']['percent_range'], res['damage']['ko_result'])
+        if defense[move_name]:
+            percent_range, ko_result = defense[move_name]
+            report += f" - ⚠️ {move_name}: {percent_range} ({ko_result})\n"
+            ko_results.append((f"opp:{move_name}", ko_result))
+
+    # 조언을 바꿀 만한 요소 (대면 / 선후공 / 확정·난수 판정)
+    signature = (my_poke.name, opp_poke.name, icon, tuple(ko_results))
+    return report, {"my_real_speed": speed_res['my_final_speed'], "signature": signature}
+
+# 다음 턴 후보 상태 선계산 (턴 처리 후 백그라운드에서 채움)
+simulation_cache = SimulationCache()
+speculator = Speculator(simulate_matchup, simulation_cache)
+telemetry.register_collector("speculator", speculator.get_stats)
+telemetry.register_collector("endgame", tablebase_stats)
+
+ADVISOR_TEMPLATE = """
     당신은 포켓몬 배틀 AI 코치입니다.
     사용자의 입력에 따라 **상태가 이미 업데이트**되었습니다. 
     현재의 상태와 계산 결과를 바탕으로 **다음 행동**을 지시하세요.
@@ -313,35 +415,198 @@ def analyze_battle_turn(user_input, opp_moved_first=False):
     1. **상태 변화 인지**: HP 감소, 랭크 변화, 상태이상 등을 확인하고 전략을 수정하세요.
     2. **공격 체크**: 공격 시뮬레이션에서 1타가 나면 공격을 우선시하세요.
     3. **방어 체크**: 방어 시뮬레이션에서 내가 위험하고 후공이라면, 교체나 방어를 고려하세요.
+    4. **탐색 결과**: [탐색 추천]이 있으면 기대값 순위를 근거로 인용하세요. (변화기/테라스탈은 탐색에 포함되지 않음)
+    5. **승률**: [롤아웃 승률]이 있으면 추천 행동의 승률을 함께 제시하세요.
+    6. **엔드게임**: [엔드게임 해석]이 있으면 정확히 계산된 결과이므로 그 추천 행동과 수순을 그대로 따르세요.
 
     [답변 양식]
     - 💡 **추천 행동**: [기술명] or [교체]
     - 📊 **근거**: (변경된 상태와 계산 결과를 인용하여 설명)
     """
+
+# 한 번의 호출로 상태 변화 추출 + 조언 (통합 모드)
+FUSED_TEMPLATE = """
+    당신은 '통합 배틀 턴 처리기'입니다. 아래 두 작업을 한 번에 수행하고 JSON 하나로 답하세요.
+    (A) 사용자 입력에서 상태 변화(delta)를 추출
+    (B) delta가 반영된 이후의 상황을 기준으로 다음 행동을 조언(advice)
+
+    [현재 필드]
+    - 나: {my_name} (대기: {my_roster})
+    - 상대: {opp_name} (엔트리: {opp_roster})
+
+    {state_text}
+    [상대 상세 정보]
+    {opp_info_text}
+    ---
+    [입력 전 상태 기준 시뮬레이션]
+    {sim_report}
+    ---
+    [사용자 입력]
+    "{user_input}"
+
+    (A) delta 작성 규칙:
+""" + PARSER_RULES + """
+    (B) advice 작성 규칙:
+    - HP 감소, 랭크 변화, 교체를 반영해서 판단하세요. 1타가 나면 공격 우선, 위험하고 후공이면 교체/방어 고려.
+    - 양식: "- 💡 **추천 행동**: [기술명] or [교체]\n- 📊 **근거**: ..."
+
+    [출력 형식 (JSON Only, Markdown 코드 블럭 금지)]
+    {{"delta": {{ ...JSON 스키마... }}, "advice": "..."}}
+    """
+
+def get_inference_msg(opp_moved_first):
+    """ 선후공 결과로 상대 스피드 구간 / 스카프 역산 (BattleState.observe_turn_order) """
+    inferred = current_battle.observe_turn_order(opp_moved_first)
+    if inferred: return f"\n🕵️ **[정보 역산 성공]** {inferred}\n"
+    return ""
+
+def get_search_report(snapshot=None):
+    """ 로컬 Expectimax 탐색 결과 (행동별 기대값 순위) -> 어드바이저가 인용할 텍스트 """
+    if SEARCH_BUDGET_MS <= 0: return ""
+    try:
+        return format_search_report(search_turn(snapshot or current_battle.snapshot()))
+    except Exception as e:
+        print(f"⚠️ [Search] 탐색 실패: {e}")
+        return ""
+
+def get_rollout_report(snapshot=None):
+    """ 남은 3vs3를 몬테카를로로 끝까지 플레이한 행동별 승률 -> 어드바이저가 인용할 텍스트 """
+    if ROLLOUT_BUDGET_MS <= 0: return ""
+    try:
+        return format_rollout_report(estimate_win_rates(snapshot or current_battle.snapshot()))
+    except Exception as e:
+        print(f"⚠️ [Rollout] 롤아웃 실패: {e}")
+        return ""
+
+def get_endgame_report(snapshot=None):
+    """ 1vs1 / 2vs1 엔드게임이면 정확 해석 결과 (아니거나 시간 초과면 빈 문자열) """
+    if ENDGAME_BUDGET_MS <= 0: return ""
+    try:
+        return format_endgame_report(solve_endgame(snapshot or current_battle.snapshot()))
+    except Exception as e:
+        print(f"⚠️ [Endgame] 해석 실패: {e}")
+        return ""
+
+def get_lookahead_report():
+    """ 엔드게임이면 정확 해석, 아니면 탐색 기대값 + 롤아웃 승률 (모두 같은 스냅샷 기준) """
+    snapshot = current_battle.snapshot()
+    return get_endgame_report(snapshot) or get_search_report(snapshot) + get_rollout_report(snapshot)
+
+def run_advisor(user_input, update_msg, sim_report, inference_msg):
+    """ 업데이트된 상태 기준 조언 생성 -> (조언 텍스트, 토큰 리스트) """
+    from langchain_core.prompts import PromptTemplate
+
+    prompt = PromptTemplate.from_template(ADVISOR_TEMPLATE)
+    res = cached_invoke(get_llm(temperature=0.1), prompt.format(
+        state_text=current_battle.get_state_report(),
+        opp_info_text=current_battle.opp_active.get_summary_text() if current_battle.opp_active else "",
+        sim_report=sim_report,
+        inference_msg=inference_msg,
+        user_input=user_input,
+        update_msg=update_msg
+    ), stage="battle.advisor")
+
+    usage = extract_usage(res)
+    analyze_tokens = [usage['input_tokens'], usage['output_tokens'], usage['total_tokens']]
+    print(analyze_tokens)
+    return extract_clean_content(res), analyze_tokens
+
+# -------------------------------------------------------------------------
+# [Main API] 통합 분석 함수
+# -------------------------------------------------------------------------
+# 기본 동작 모드 (BATTLE_FUSED_MODE=1 이면 통합 모드)
+FUSED_MODE_DEFAULT = os.getenv("BATTLE_FUSED_MODE", "").lower() in ("1", "true", "yes")
+
+def analyze_battle_turn(user_input, opp_moved_first=False, fused=None):
+    """
+    1. 파싱 및 상태 업데이트 (자동 계산 포함)
+    2. 시뮬레이션 재실행
+    3. AI 조언 생성
+    fused=True면 1+3을 한 번의 LLM 호출로 처리 (analyze_battle_turn_fused)
+    Returns: (조언 텍스트, 파서 토큰 리스트, 조언 토큰 리스트)
+    """
+    if fused is None: fused = FUSED_MODE_DEFAULT
+    rule_data = None
+    if fused:
+        # 규칙 파서로 읽히는 입력은 파싱 비용이 0이므로 조언 호출 1회로 충분
+        rule_data = rule_parse(user_input)
+        if rule_data is None:
+            return analyze_battle_turn_fused(user_input, opp_moved_first)
+    return run_two_step_turn(user_input, opp_moved_first, parsed_data=rule_data)
+
+def run_two_step_turn(user_input, opp_moved_first=False, parsed_data=None, try_rules=True):
+    """ 2단계 방식 (파싱 -> 조언). parsed_data / try_rules는 parse_and_update_state로 전달 """
+    # 1. 상태 업데이트 (규칙 파서 -> LLM Parser)
+    success, update_msg, parser_tokens = parse_and_update_state(user_input, parsed_data=parsed_data,
+                                                                try_rules=try_rules)
     
-    prompt = PromptTemplate.from_template(template)
-    chain = prompt | llm
+    # 2. 시뮬레이션 (업데이트된 상태 기준) -> 조언을 기다리는 동안 다음 턴 후보 선계산
+    sim_report, meta = run_battle_simulation_report()
+    speculator.schedule(current_battle)
+    sim_report += get_lookahead_report()
     
+    # 3. 역산 로직
+    inference_msg = get_inference_msg(opp_moved_first)
+
+    # 4. 최종 프롬프트 (Advisor)
     try:
-        res = chain.invoke({
-            "state_text": state_text,
-            "opp_info_text": opp_info_text,
-            "sim_report": sim_report,
-            "inference_msg": inference_msg,
-            "user_input": user_input,
-            "update_msg": update_msg
-        })
-
-        usage = res.usage_metadata
-
-        analyze_tokens = [
-            usage.get('input_tokens', 0),
-            usage.get('output_tokens', 0),
-            usage.get('total_tokens', 0)
-        ]
-
-        print(analyze_tokens)
-
-        return extract_clean_content(res), parser_tokens, analyze_tokens
+        advice, analyze_tokens = run_advisor(user_input, update_msg, sim_report, inference_msg)
+        return advice, parser_tokens, analyze_tokens
     except Exception as e:
-        return f"Error: {e}"
\ No newline at end of file
+        return f"Error: {e}", parser_tokens, [0, 0, 0]
+
+def analyze_battle_turn_fused(user_input, opp_moved_first=False):
+    """
+    [통합 모드] 상태 변화 추출 + 조언을 한 번의 구조화된 호출로 처리
+    1. 입력 전 상태의 시뮬레이션을 붙여 delta + advice를 한 번에 요청
+    2. delta는 기존 로직(apply_parsed_update)으로 반영 -> HP 등 수치는 계산기가 검증/보정
+    3. 반영 후 시뮬레이션의 핵심 요소(대면/선후공/확정·난수 판정)가 달라졌을 때만 조언을 다시 요청
+    Returns: analyze_battle_turn과 같은 (조언 텍스트, 통합 호출 토큰, 재요청 토큰)
+    """
+    print("🔄 [Logic] 통합 모드: 상태 변화 추출 + 조언 동시 요청...")
+    pre_report, pre_meta = run_battle_simulation_report()
+
+    from langchain_core.prompts import PromptTemplate
+
+    prompt = PromptTemplate.from_template(FUSED_TEMPLATE)
+    try:
+        response = cached_invoke(get_llm(temperature=0.1), prompt.format(
+            user_input=user_input,
+            state_text=current_battle.get_state_report(),
+            opp_info_text=current_battle.opp_active.get_summary_text() if current_battle.opp_active else "",
+            sim_report=pre_report,
+            **get_field_context()
+        ), stage="battle.fused", validate=is_json_reply)
+
+        usage = extract_usage(response)
+        fused_tokens = [usage['input_tokens'], usage['output_tokens'], usage['total_tokens']]
+        print(fused_tokens)
+
+        fused_data = parse_json_reply(response)
+        parsed_data = fused_data.get("delta") or {}
+        advice = fused_data.get("advice") or ""
+        print(f"🧩 통합 파싱 결과: {parsed_data}")
+    except Exception as e:
+        # 통합 응답을 못 쓰면 기존 2단계 방식으로 처리 (규칙 파서는 analyze_battle_turn에서 이미 실패)
+        print(f"❌ 통합 모드 실패, 2단계 방식으로 전환: {e}")
+        return run_two_step_turn(user_input, opp_moved_first, try_rules=False)
+
+    updates_log = apply_parsed_update(parsed_data)
+    update_msg = f"✅ 상태 반영됨: {', '.join(updates_log)}"
+
+    sim_report, meta = run_battle_simulation_report()
+    speculator.schedule(current_battle)
+    lookahead = get_lookahead_report()
+    inference_msg = get_inference_msg(opp_moved_first)
+
+    # 조언 근거가 바뀌었으면 (또는 조언이 비었으면) 반영된 상태로 다시 요청
+    if not advice or meta.get("signature") != pre_meta.get("signature"):
+        print("🔁 [Fused] 시뮬레이션 결과가 달라져 조언을 다시 요청합니다.")
+        try:
+            advice, analyze_tokens = run_advisor(user_input, update_msg, sim_report + lookahead, inference_msg)
+        except Exception as e:
+            return f"Error: {e}", fused_tokens, [0, 0, 0]
+        return advice, fused_tokens, analyze_tokens
+
+    # 조언은 그대로 -> 반영된 상태의 탐색 / 롤아웃 / 엔드게임 결과는 뒤에 붙여서 보여줌
+    return advice + inference_msg + lookahead, fused_tokens, [0, 0, 0]
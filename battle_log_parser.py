@@ -0,0 +1,347 @@
+# battle_log_parser.py
+"""
+[규칙 기반 배틀 로그 파서]
+"상대 X 등장", "내 피 50%", "상대 칼춤", "비 내림", "트릭룸" 같은 자주 쓰는 입력을
+LLM 없이 로컬 사전(name_aliases) + 어절 분석으로 battle.py 파서와 같은 JSON 스키마로 변환합니다.
+
+- 어절마다 사전에서 가장 긴 표기부터 맞춰 나감 (포켓몬 / 기술 / 키워드 / 조사·어미)
+- 신뢰도 = 해석된 어절 수 / 전체 어절 수 (상태 변화가 하나도 없으면 0)
+- battle.parse_and_update_state는 신뢰도가 기준(BATTLE_RULE_PARSER_THRESHOLD) 미만일 때만 LLM 파서를 호출
+"""
+import re
+import functools
+
+from name_aliases import POKEMON_KO_TO_EN, MOVE_KO_TO_EN, get_aliases
+
+# --- [사전] ---
+# 능력 랭크를 올리는 기술 (랭크를 따로 말하지 않았을 때 적용)
+SETUP_BOOSTS = {
+    "Swords Dance": {"atk": 2}, "Nasty Plot": {"spa": 2}, "Dragon Dance": {"atk": 1, "spe": 1},
+    "Calm Mind": {"spa": 1, "spd": 1}, "Bulk Up": {"atk": 1, "def": 1}, "Agility": {"spe": 2},
+    "Shell Smash": {"atk": 2, "spa": 2, "spe": 2, "def": -1, "spd": -1},
+    "Quiver Dance": {"spa": 1, "spd": 1, "spe": 1}, "Iron Defense": {"def": 2},
+}
+
+# 표기 -> (종류, 값)
+KEYWORDS = {
+    # 진영
+    "상대": ("side", "opp"), "상대방": ("side", "opp"), "상대편": ("side", "opp"), "적": ("side", "opp"),
+    "내": ("side", "me"), "나": ("side", "me"), "우리": ("side", "me"), "아군": ("side", "me"),
+    # 교체 / 등장
+    "등장": ("switch", None), "선봉": ("switch", None), "교체": ("switch", None), "투입": ("switch", None),
+    "나와": ("switch", None), "나왔": ("switch", None), "나옴": ("switch", None), "나오": ("switch", None),
+    "꺼냄": ("switch", None), "꺼냈": ("switch", None), "내보냄": ("switch", None), "내보냈": ("switch", None),
+    # HP ("피 50%" = 남은 HP, "50% 깎임" = 데미지)
+    "피": ("hp", None), "hp": ("hp", None), "체력": ("hp", None),
+    "깎": ("hp_verb", -1), "깎임": ("hp_verb", -1), "깎였": ("hp_verb", -1), "데미지": ("hp_verb", -1),
+    "뎀": ("hp_verb", -1), "피해": ("hp_verb", -1), "닳": ("hp_verb", -1), "닳았": ("hp_verb", -1),
+    "회복": ("hp_verb", 1), "남": ("hp_verb", 0), "남음": ("hp_verb", 0), "남았": ("hp_verb", 0),
+    # 랭크 ("+2공", "스피드 -1", "특공 2랭크 상승")
+    "공": ("stat", "atk"), "공격": ("stat", "atk"), "방": ("stat", "def"), "방어력": ("stat", "def"),
+    "특공": ("stat", "spa"), "특방": ("stat", "spd"), "스피드": ("stat", "spe"), "스핏": ("stat", "spe"),
+    "속도": ("stat", "spe"),
+    "상승": ("rank_verb", 1), "올라": ("rank_verb", 1), "올랐": ("rank_verb", 1), "업": ("rank_verb", 1),
+    "하락": ("rank_verb", -1), "떨어": ("rank_verb", -1), "떨어졌": ("rank_verb", -1), "다운": ("rank_verb", -1),
+    "위협": ("intimidate", None),
+    # 상태이상
+    "화상": ("status", "Burn"), "마비": ("status", "Paralysis"), "잠듦": ("status", "Sleep"),
+    "잠들": ("status", "Sleep"), "잠": ("status", "Sleep"), "수면": ("status", "Sleep"),
+    "독": ("status", "Poison"), "맹독": ("status", "Toxic"), "얼음": ("status", "Freeze"), "얼었": ("status", "Freeze"),
+    # 날씨 / 필드
+    "비": ("weather", "Rain"), "비바라기": ("weather", "Rain"), "쾌청": ("weather", "Sun"), "햇살": ("weather", "Sun"),
+    "모래바람": ("weather", "Sand"), "모래": ("weather", "Sand"), "설경": ("weather", "Snow"), "눈": ("weather", "Snow"),
+    "일렉트릭필드": ("terrain", "Electric"), "일렉필드": ("terrain", "Electric"),
+    "그래스필드": ("terrain", "Grassy"), "사이코필드": ("terrain", "Psychic"), "미스트필드": ("terrain", "Misty"),
+    "트릭룸": ("field", "trick_room"), "순풍": ("field", "tailwind"),
+    "리플렉터": ("field", "reflect"), "리플": ("field", "reflect"), "벽": ("field", "reflect"),
+    "빛의장막": ("field", "light_screen"),
+    "끝": ("end", None), "끝남": ("end", None), "끝났": ("end", None), "종료": ("end", None),
+    "풀림": ("end", None), "풀렸": ("end", None), "해제": ("end", None),
+    "턴": ("turn", None), "턴종료": ("turn_end", None), "턴끝": ("turn_end", None),
+}
+
+# 의미 없는 조사 / 동사 어간 / 어미
+FILLERS = (
+    "이", "가", "은", "는", "을", "를", "로", "으로", "의", "에", "에게", "한테", "도", "와", "과", "랑", "이랑", "에서",
+    "사용", "썼", "씀", "쓰", "써", "맞", "맞았", "맞음", "깔", "깔렸", "깔림", "깔았", "깔아", "깔려",
+    "했", "함", "하", "해", "됐", "됨", "되", "돼", "내림", "내려", "내렸", "옴", "왔", "췄", "춰",
+    "펼침", "펼쳤", "설치", "세움", "세웠", "발동", "입", "입음", "입었", "걸", "걸림", "걸렸",
+    "당", "당했", "받", "받음", "받았", "랭크", "단계", "그리고", "그래서", "이번", "방금", "다시", "또",
+    "었", "았", "어", "어요", "요", "음", "다", "서", "고", "며", "네", "지", "습니다",
+)
+
+# 필드 효과 -> {진영: 스키마 키} (BattleState.apply_llm_update가 읽는 키, 없는 조합(내 벽)은 LLM에 맡김)
+FIELD_KEYS = {"trick_room": {"me": "trick_room", "opp": "trick_room"},
+              "tailwind": {"me": "tailwind_me", "opp": "tailwind_opp"},
+              "reflect": {"opp": "reflect_opp"}, "light_screen": {"opp": "light_screen_opp"}}
+# 진영을 말하지 않았을 때 (순풍은 내 쪽, 벽은 상대 쪽)
+FIELD_DEFAULT_SIDE = {"trick_room": "me", "tailwind": "me", "reflect": "opp", "light_screen": "opp"}
+
+PREFIX = {"me": "my", "opp": "opp"}   # 진영 -> 스키마 키 접두어
+
+CLAUSE_SPLIT = re.compile(r"[,/.;·\n]+")
+NUMBER = re.compile(r"([+-]?)(\d{1,3}(?:\.\d+)?)(%?)")
+
+
+def empty_result():
+    """ battle.py 파서 JSON 스키마의 기본값 """
+    return {
+        "my_switch": None, "opp_switch": None,
+        "my_move_used": None, "opp_move_used": None,
+        "my_hp_change_input": None, "opp_hp_change_input": None,
+        "my_status": None, "opp_status": None,
+        "my_rank_change": {}, "opp_rank_change": {},
+        "weather": None, "terrain": None, "trick_room": None,
+        "tailwind_me": None, "tailwind_opp": None, "reflect_opp": None, "light_screen_opp": None,
+        "turn_end": False
+    }
+
+
+def _compact(text):
+    return text.lower().replace(" ", "")
+
+
+@functools.lru_cache(maxsize=1)
+def _static_lexicon():
+    lexicon = {word: ("filler", None) for word in FILLERS}
+    lexicon.update(KEYWORDS)
+    for ko, en in POKEMON_KO_TO_EN.items():
+        lexicon[ko] = ("pokemon", en)
+        lexicon[_compact(en)] = ("pokemon", en)
+    for ko, en in MOVE_KO_TO_EN.items():
+        lexicon[ko] = ("move", en)
+        lexicon[_compact(en)] = ("move", en)
+    return lexicon
+
+
+@functools.lru_cache(maxsize=32)
+def _build_lexicon(my_roster, opp_roster, known_moves):
+    """ 현재 배틀의 엔트리 / 기술로 사전 확장 -> (사전, 띄어쓰기 있는 영어 표기, 진영 판별표) """
+    lexicon = dict(_static_lexicon())
+    phrases = {_compact(en): en.lower() for en in known_moves}
+    for move in known_moves:
+        lexicon[_compact(move)] = ("move", move)
+
+    owner = {}
+    for side, roster in (("me", my_roster), ("opp", opp_roster)):
+        for name in roster:
+            owner.setdefault(name, set()).add(side)
+            for alias in get_aliases(name):
+                lexicon[_compact(alias)] = ("pokemon", name)
+                if " " in alias: phrases[_compact(alias)] = alias.lower()
+    for en in list(POKEMON_KO_TO_EN.values()) + list(MOVE_KO_TO_EN.values()):
+        if " " in en: phrases[_compact(en)] = en.lower()
+
+    owner = {name: next(iter(sides)) for name, sides in owner.items() if len(sides) == 1}
+    phrases = sorted(((spaced, compact) for compact, spaced in phrases.items()), key=lambda p: -len(p[0]))
+    return lexicon, tuple(phrases), owner, max(len(k) for k in lexicon)
+
+
+def _segment(word, lexicon, max_len):
+    """ 어절을 사전 표기 단위로 분해 (가장 긴 표기 우선). 못 읽는 부분이 있으면 None """
+    pieces = []
+    i = 0
+    while i < len(word):
+        for j in range(min(len(word), i + max_len), i, -1):
+            entry = lexicon.get(word[i:j])
+            if entry:
+                if entry[0] != "filler": pieces.append(entry)
+                i = j
+                break
+        else:
+            # 사전에 없으면 수치 ("+2", "50%") 확인
+            number = NUMBER.match(word, i)
+            if not number: return None
+            sign, value, percent = number.groups()
+            pieces.append(("number", (float(value) * (-1 if sign == "-" else 1), bool(sign), bool(percent))))
+            i = number.end()
+    return pieces
+
+
+class _Clause:
+    """ 절 하나를 해석하는 동안의 문맥 (명시된 진영, 마지막으로 언급된 포켓몬) """
+    def __init__(self):
+        self.side = None
+        self.pokemon = None
+        self.pokemon_side = None
+        self.last_kind = None
+        self.last_stat = None
+        self.last_field = None
+        self.move_used = False
+
+    def actor(self):
+        return self.pokemon_side or self.side
+
+
+def parse_battle_log(user_input, battle):
+    """
+    [Rule Parser] 사용자 입력 -> (파서 JSON, 신뢰도 0~1)
+    battle: BattleState (엔트리 / 현재 HP / 보유 기술을 참고)
+    """
+    my_active, opp_active = battle.my_active, battle.opp_active
+    known_moves = tuple(sorted(set(
+        (my_active.info.get("moves", []) if my_active else [])
+        + (opp_active.info.get("moves", []) if opp_active else [])
+    )))
+    lexicon, phrases, owner, max_len = _build_lexicon(
+        tuple(battle.my_party_status.keys()), tuple(battle.opp_full_roster), known_moves
+    )
+    my_moves = {m.lower() for m in (my_active.info.get("moves", []) if my_active else [])}
+    current_hp = {
+        "me": my_active.current_hp_percent if my_active else 100.0,
+        "opp": opp_active.current_hp_percent if opp_active else 100.0
+    }
+
+    text = user_input.lower().replace("(", " ").replace(")", " ")
+    for spaced, compact in phrases:
+        if spaced in text: text = text.replace(spaced, compact)
+
+    result = empty_result()
+    implied = {"me": {}, "opp": {}}
+    total_words, good_words, events = 0, 0, 0
+
+    for clause_text in CLAUSE_SPLIT.split(text):
+        words = clause_text.split()
+        if not words: continue
+        total_words += len(words)
+
+        # 어절 분해 -> (종류, 값, 어절 번호) 나열
+        bad = set()
+        pieces = []
+        for w, word in enumerate(words):
+            segmented = _segment(word, lexicon, max_len)
+            if segmented is None:
+                bad.add(w)
+                continue
+            pieces += [(kind, value, w) for kind, value in segmented]
+
+        ctx = _Clause()
+        used = set()
+        for i, (kind, value, w) in enumerate(pieces):
+            if i in used: continue
+            nxt = pieces[i + 1] if i + 1 < len(pieces) else (None, None, None)
+            ok = True
+
+            if kind == "side":
+                ctx.side, ctx.pokemon_side = value, None
+
+            elif kind == "pokemon":
+                ctx.pokemon_side = owner.get(value) or ctx.side
+                ctx.pokemon = value
+
+            elif kind == "switch":
+                if ctx.last_kind in ("pokemon", "switch") and ctx.pokemon_side:
+                    result[f"{PREFIX[ctx.pokemon_side]}_switch"] = ctx.pokemon
+                    current_hp[ctx.pokemon_side] = 100.0
+                    events += 1
+                else:
+                    ok = False
+
+            elif kind == "move":
+                actor = ctx.actor() or ("me" if value.lower() in my_moves else "opp")
+                result[f"{PREFIX[actor]}_move_used"] = value
+                for stat, change in SETUP_BOOSTS.get(value, {}).items():
+                    implied[actor][stat] = implied[actor].get(stat, 0) + change
+                ctx.move_used = True
+                events += 1
+
+            elif kind == "hp":
+                ok = nxt[0] == "number"
+
+            elif kind == "number":
+                amount, signed, percent = value
+                actor = ctx.actor()
+                if percent or ctx.last_kind == "hp":
+                    verb = nxt[1] if nxt[0] == "hp_verb" else None
+                    if verb is not None: used.add(i + 1)
+                    if signed: change = amount
+                    elif verb in (-1, 1): change = verb * amount
+                    elif verb == 0 or ctx.last_kind == "hp": change = amount - current_hp.get(actor, 100.0)
+                    else: actor = None
+                    if actor:
+                        result[f"{PREFIX[actor]}_hp_change_input"] = round(change, 1)
+                        events += 1
+                    else:
+                        ok = False
+                else:
+                    # "+2공" (수치 -> 능력치) / "공 +2" (능력치 -> 수치) / "특공 2랭크 상승"
+                    stat = nxt[1] if nxt[0] == "stat" else (ctx.last_stat if ctx.last_kind == "stat" else None)
+                    if nxt[0] == "stat": used.add(i + 1)
+                    after = i + 2 if nxt[0] == "stat" else i + 1
+                    direction = pieces[after][1] if after < len(pieces) and pieces[after][0] == "rank_verb" else None
+                    if direction is not None: used.add(after)
+                    if signed: change = amount
+                    elif direction is not None: change = direction * amount
+                    else: stat = None
+                    if actor and stat:
+                        result[f"{PREFIX[actor]}_rank_change"][stat] = int(change)
+                        events += 1
+                    else:
+                        ok = False
+
+            elif kind == "stat":
+                ctx.last_stat = value
+                if nxt[0] == "rank_verb" and ctx.actor():
+                    # "스피드 상승" -> 1랭크
+                    used.add(i + 1)
+                    result[f"{PREFIX[ctx.actor()]}_rank_change"][value] = nxt[1]
+                    events += 1
+                else:
+                    ok = nxt[0] == "number" and not nxt[1][2]
+
+            elif kind == "intimidate":
+                target = "me" if ctx.actor() == "opp" else "opp"
+                implied[target]["atk"] = implied[target].get("atk", 0) - 1
+                events += 1
+
+            elif kind == "status":
+                actor = ctx.actor()
+                # "상대 도깨비불 맞아서 화상" 처럼 기술 뒤 상태이상은 대상이 모호 -> LLM
+                if actor and not ctx.move_used:
+                    result[f"{PREFIX[actor]}_status"] = value
+                    events += 1
+                else:
+                    ok = False
+
+            elif kind in ("weather", "terrain"):
+                result[kind] = value
+                events += 1
+
+            elif kind == "field":
+                key = FIELD_KEYS[value].get(ctx.actor() or FIELD_DEFAULT_SIDE[value])
+                if key is None:
+                    ok = False
+                else:
+                    result[key] = True
+                    ctx.last_field = key
+                    events += 1
+
+            elif kind == "end":
+                if ctx.last_kind == "turn":
+                    result["turn_end"] = True
+                    events += 1
+                elif ctx.last_kind == "field" and ctx.last_field:
+                    result[ctx.last_field] = False
+                else:
+                    ok = False
+
+            elif kind == "turn_end":
+                result["turn_end"] = True
+                events += 1
+
+            elif kind in ("hp_verb", "rank_verb"):
+                ok = False
+
+            if not ok: bad.add(w)
+            ctx.last_kind = kind
+
+        good_words += len(words) - len(bad)
+
+    # 기술로 오른 랭크 / 위협은 랭크를 직접 말하지 않은 능력치에만 반영
+    for side, boosts in implied.items():
+        for stat, change in boosts.items():
+            result[f"{PREFIX[side]}_rank_change"].setdefault(stat, change)
+
+    if not events or not total_words:
+        return None, 0.0
+    return result, good_words / total_words
@@ -0,0 +1,215 @@
+# battle_snapshot.py
+"""
+[배틀 상태 스냅샷 - 불변 / 구조 공유 / 안정 해시]
+BattleState / BattlePokemon은 dict가 많은 가변 객체라서, 가정(what-if) 분석을 하려면 deepcopy를 하거나
+전역 current_battle을 직접 바꿔야 했습니다. 스냅샷은 같은 속성 이름으로 읽을 수 있는 불변 사본입니다.
+
+- 불변: __slots__ + 대입 금지, dict -> FrozenMap / list -> tuple
+- 구조 공유: replace()로 바뀐 필드만 새로 만들고 나머지는 원본 객체를 그대로 공유
+             live 객체의 info가 그대로면 이전 스냅샷의 info를 재사용 (BattlePokemon.snapshot)
+- 안정 해시: .key = 내용 기반 blake2b 다이제스트 (프로세스/세션이 달라도 같은 상태면 같은 키)
+             -> 치환표 / 디스크 캐시 키로 사용. hash()/==도 key 기준
+
+탐색(turn_search) / 롤아웃 / 엔드게임 / speculator는 스냅샷을 받아 실행되므로 실제 상태를 건드리지 않습니다.
+"""
+import hashlib
+from collections.abc import Mapping
+
+_UNSET = object()
+
+
+def freeze(value):
+    """ dict -> FrozenMap, list/tuple/set -> tuple (재귀) / 이미 불변이면 그대로 """
+    if isinstance(value, (FrozenMap, str, int, float, bool, type(None))): return value
+    if isinstance(value, Mapping): return FrozenMap(value)
+    if isinstance(value, (list, tuple)): return tuple(freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)): return tuple(sorted(freeze(v) for v in value))
+    return value
+
+def _digest(payload):
+    return hashlib.blake2b(repr(payload).encode("utf-8"), digest_size=16).hexdigest()
+
+def _canonical(value):
+    """ 키 계산용 정렬된 표현 (dict 순서와 무관) """
+    if isinstance(value, _Immutable): return (type(value).__name__, value.key)
+    if isinstance(value, tuple): return tuple(_canonical(v) for v in value)
+    if isinstance(value, float) and value.is_integer(): return int(value)
+    return value
+
+
+class _Immutable:
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__}는 불변 객체입니다. replace()로 사본을 만드세요.")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__}는 불변 객체입니다.")
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __eq__(self, other):
+        return type(other) is type(self) and other.key == self.key
+
+    def __reduce__(self):
+        # pickle (프로세스 풀 전달용): 슬롯 값으로 다시 생성
+        return (_rebuild, (type(self), tuple(getattr(self, s) for s in self.__slots__ if s != "_key")))
+
+
+def _rebuild(cls, values):
+    obj = object.__new__(cls)
+    for slot, value in zip((s for s in cls.__slots__ if s != "_key"), values):
+        object.__setattr__(obj, slot, value)
+    object.__setattr__(obj, "_key", None)
+    return obj
+
+
+class FrozenMap(_Immutable, Mapping):
+    """ 읽기 전용 dict (Mapping 인터페이스: [], get, items, in ...) """
+    __slots__ = ("_data", "_key")
+
+    def __init__(self, data=()):
+        object.__setattr__(self, "_data", {k: freeze(v) for k, v in dict(data).items()})
+        object.__setattr__(self, "_key", None)
+
+    def __getitem__(self, key): return self._data[key]
+    def __iter__(self): return iter(self._data)
+    def __len__(self): return len(self._data)
+    def __repr__(self): return f"FrozenMap({self._data!r})"
+    def __hash__(self): return hash(self.key)
+
+    def __eq__(self, other):
+        # 일반 dict와도 내용이 같으면 같음
+        if isinstance(other, FrozenMap): return other.key == self.key
+        return isinstance(other, Mapping) and self._data == dict(other)
+
+    @property
+    def key(self):
+        if self._key is None:
+            object.__setattr__(self, "_key", _digest(sorted(
+                (repr(k), _canonical(v)) for k, v in self._data.items())))
+        return self._key
+
+    def set(self, **changes):
+        """ 일부 값만 바꾼 사본 (나머지 값 객체는 공유) """
+        return FrozenMap({**self._data, **changes})
+
+
+# --------------------------------------------------------------------------
+# [포켓몬 스냅샷]
+# --------------------------------------------------------------------------
+class PokemonSnapshot(_Immutable):
+    """ BattlePokemon과 같은 속성 이름 (name, info, ranks, current_hp_percent, ...) """
+    __slots__ = ("name", "is_mine", "current_hp_percent", "status_condition", "is_fainted",
+                 "ranks", "volatile_status", "info", "confirmed", "_key")
+
+    def __init__(self, name, is_mine, current_hp_percent, status_condition, is_fainted,
+                 ranks, volatile_status, info, confirmed):
+        for slot, value in (("name", name), ("is_mine", is_mine), ("current_hp_percent", current_hp_percent),
+                            ("status_condition", status_condition), ("is_fainted", is_fainted),
+                            ("ranks", freeze(ranks)), ("volatile_status", freeze(volatile_status)),
+                            ("info", freeze(info)), ("confirmed", freeze(confirmed)), ("_key", None)):
+            object.__setattr__(self, slot, value)
+
+    @property
+    def key(self):
+        if self._key is None:
+            object.__setattr__(self, "_key", _digest((
+                self.name, self.is_mine, _canonical(float(self.current_hp_percent)), self.status_condition,
+                self.is_fainted, self.ranks.key, self.volatile_status.key, self.info.key, self.confirmed.key)))
+        return self._key
+
+    def replace(self, **changes):
+        """ 바뀐 필드만 새로 (info 등 나머지는 원본과 공유) """
+        clone = object.__new__(type(self))
+        for slot in self.__slots__:
+            value = changes[slot] if slot in changes else getattr(self, slot)
+            if slot in changes and slot in ("ranks", "volatile_status", "info", "confirmed"): value = freeze(value)
+            object.__setattr__(clone, slot, value)
+        object.__setattr__(clone, "_key", None)
+        return clone
+
+    def boosted(self, boosts):
+        """ 랭크 변화(-6 ~ +6)를 적용한 사본 """
+        ranks = {stat: max(-6, min(6, self.ranks.get(stat, 0) + boosts.get(stat, 0))) for stat in self.ranks}
+        return self.replace(ranks=ranks)
+
+    def switched_in(self):
+        """ 교체로 나온 상태 (랭크 / 휘발성 상태 초기화) """
+        return self.replace(ranks={k: 0 for k in self.ranks}, volatile_status={k: False for k in self.volatile_status})
+
+    def with_known_move(self, move_name):
+        if move_name in self.info['moves']: return self
+        return self.replace(info=self.info.set(moves=self.info['moves'] + (move_name,)))
+
+    def __repr__(self):
+        return f"PokemonSnapshot({self.name}, HP {self.current_hp_percent:.0f}%, ranks={dict(self.ranks)})"
+
+
+# --------------------------------------------------------------------------
+# [배틀 스냅샷]
+# --------------------------------------------------------------------------
+class BattleSnapshot(_Immutable):
+    """ BattleState와 같은 속성 이름 (my_active, opp_active, my_party_status, global_effects, ...) """
+    __slots__ = ("turn_count", "my_active", "opp_active", "opp_full_roster", "opp_revealed_party",
+                 "my_party_status", "my_entry_selection", "global_effects", "side_effects", "_key")
+
+    def __init__(self, turn_count, my_active, opp_active, opp_full_roster, opp_revealed_party,
+                 my_party_status, my_entry_selection, global_effects, side_effects):
+        for slot, value in (("turn_count", turn_count), ("my_active", my_active), ("opp_active", opp_active),
+                            ("opp_full_roster", tuple(opp_full_roster)),
+                            ("opp_revealed_party", FrozenMap(opp_revealed_party)),
+                            ("my_party_status", FrozenMap(my_party_status)),
+                            ("my_entry_selection", tuple(my_entry_selection)),
+                            ("global_effects", freeze(global_effects)), ("side_effects", freeze(side_effects)),
+                            ("_key", None)):
+            object.__setattr__(self, slot, value)
+
+    @property
+    def key(self):
+        """ 턴 수는 제외 (같은 배틀 상태면 턴이 달라도 같은 키) """
+        if self._key is None:
+            active = lambda poke: poke.key if poke else None
+            object.__setattr__(self, "_key", _digest((
+                active(self.my_active), active(self.opp_active), self.opp_full_roster,
+                self.opp_revealed_party.key, self.my_party_status.key, self.my_entry_selection,
+                self.global_effects.key, self.side_effects.key)))
+        return self._key
+
+    def replace(self, **changes):
+        clone = object.__new__(type(self))
+        for slot in self.__slots__:
+            value = changes.get(slot, _UNSET)
+            if value is _UNSET: value = getattr(self, slot)
+            elif slot in ("opp_revealed_party", "my_party_status", "global_effects", "side_effects"):
+                value = freeze(value)
+            elif slot in ("opp_full_roster", "my_entry_selection"):
+                value = tuple(value)
+            object.__setattr__(clone, slot, value)
+        object.__setattr__(clone, "_key", None)
+        return clone
+
+    def with_pokemon(self, side, poke):
+        """ side("me"/"opp")의 poke를 교체한 사본 (활성 포켓몬이면 활성도 같이 갱신) """
+        party_slot = "my_party_status" if side == "me" else "opp_revealed_party"
+        active_slot = "my_active" if side == "me" else "opp_active"
+        changes = {party_slot: getattr(self, party_slot).set(**{poke.name: poke})}
+        current = getattr(self, active_slot)
+        if current is not None and current.name == poke.name: changes[active_slot] = poke
+        return self.replace(**changes)
+
+    def with_active(self, side, poke):
+        """ side의 활성 포켓몬을 poke로 (파티 목록에도 반영) """
+        return self.with_pokemon(side, poke).replace(**{"my_active" if side == "me" else "opp_active": poke})
+
+    def with_effects(self, global_effects=None, side=None, **side_changes):
+        """ 필드 효과 일부만 바꾼 사본 (global_effects: dict / side: "me"|"opp" + 바꿀 값) """
+        changes = {}
+        if global_effects: changes["global_effects"] = self.global_effects.set(**global_effects)
+        if side and side_changes:
+            changes["side_effects"] = self.side_effects.set(**{side: self.side_effects[side].set(**side_changes)})
+        return self.replace(**changes)
+
+    def snapshot(self):
+        return self
@@ -1,5 +1,8 @@
 import sys
 import os
+import copy
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 # --- [경로 설정] ---
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -8,13 +11,26 @@ if current_dir not in sys.path:
 
 # --- [모듈 임포트] ---
 from Battle_Preparing.user_party import my_party
-from Calculator.stat_estimator import estimate_stats, get_base_stats
+from Calculator.stat_estimator import estimate_stats, get_pokemon_types, get_base_stats
+from Calculator.move_loader import get_move_data
+from Calculator.speed_checker import calculate_priority_bonus
 from rag_retriever import get_pokemon_raw_data 
+from telemetry import telemetry
+from battle_snapshot import PokemonSnapshot, BattleSnapshot
+from opponent_belief import SetBelief
+from speed_bounds import SpeedBounds, SCARF, paradox_speed_boost, effective_speed
+from name_aliases import move_to_english
+from session_manager import SessionProxy
+
+# 상대 명단 백그라운드 준비 (0이면 교체 시점에 동기 생성)
+PREFETCH_WORKERS = int(os.getenv("BATTLE_PREFETCH_WORKERS", 3))
 
 class BattlePokemon:
     """ 
     [개별 포켓몬 상태 객체]
     HP, 랭크, 상태이상, 정보 신뢰도(확정/예측) 관리
+    상대 포켓몬은 샘플 믿음 상태(belief, opponent_belief.SetBelief)의 사후분포로 예측/확정 여부를 채움
+    상대 스피드는 선후공 관측으로 좁힌 구간(speed_bounds, speed_bounds.SpeedBounds)을 info['speed_range']에 둠
     """
     def __init__(self, name, is_mine=True):
         self.name = name
@@ -38,20 +54,30 @@ class BattlePokemon:
         self.info = {
             "item": None, "ability": None, "tera_type": None, 
             "moves": [], "stats": {},
-            "predictions": {"moves": [], "items": [], "teras": []}
+            "predictions": {"moves": [], "items": [], "abilities": [], "teras": []}
         }
         
         self.confirmed = {
             "item": is_mine, "ability": is_mine, "tera_type": is_mine, "stats": is_mine
         }
 
+        # 5. 스냅샷 재사용 (info가 바뀔 때만 버전 증가)
+        self._info_version = 0
+        self._snapshot_cache = None
+
+        # 6. 상대 샘플 사후분포 (관측할 때마다 갱신 -> _sync_belief로 info에 반영)
+        self.belief = None
+        self.speed_bounds = None
+
         if is_mine: self._load_my_data()
         else: self._load_smogon_data()
 
     def _load_my_data(self):
         data = my_party.get_pokemon(self.name)
-        if data: self.info.update(data)
+        # 파티 원본(세션 간 공유될 수 있음)과 stats / moves를 공유하지 않도록 복사
+        if data: self.info.update(copy.deepcopy(data))
 
+    @telemetry.traced("data.opponent_load")
     def _load_smogon_data(self):
         est = estimate_stats(self.name)
         if est: self.info['stats'] = est['stats']
@@ -59,7 +85,12 @@ class BattlePokemon:
         if raw:
             self.info['predictions']['moves'] = raw['predicted_moves']
             self.info['predictions']['items'] = raw['predicted_items']
+            self.info['predictions']['abilities'] = raw['predicted_abilities']
             self.info['predictions']['teras'] = raw['predicted_teras']
+        base = get_base_stats(self.name)
+        if base: self.speed_bounds = SpeedBounds(base['spe'])
+        self.belief = SetBelief.from_usage(self.name)
+        self._sync_belief()
 
     # --- [상태 조작] ---
     def update_hp(self, amount):
@@ -81,42 +112,225 @@ class BattlePokemon:
     def reveal_info(self, category, value):
         self.info[category] = value
         self.confirmed[category] = True
+        self._info_version += 1
         print(f"💡 [정보 갱신] {self.name} {category} -> {value}")
+        if self.belief and category in ("item", "ability", "tera_type"):
+            self.belief.reveal(category, value)
+            self._sync_belief()
 
     def add_known_move(self, move_name):
         if move_name not in self.info['moves']:
             self.info['moves'].append(move_name)
+            self._info_version += 1
+            if self.belief and self.belief.observe_move(move_name): self._sync_belief()
+
+    # --- [샘플 추론] ---
+    def _sync_belief(self):
+        """ 사후분포 -> 예측 목록 순서 / 추정 실수치 / 확정 여부 / 프롬프트용 확률 (info) """
+        belief = self.belief
+        if belief is None: return
+        posterior = belief.to_posterior()
+        self.info['posterior'] = posterior
+        predictions = self.info['predictions']
+        predictions['moves'] = [m for m, _ in posterior['moves'] if m in belief.move_pool]
+        predictions['items'] = [label for label, _ in belief.top("item") if label != "other"]
+        predictions['abilities'] = [label for label, _ in belief.top("ability")]
+        predictions['teras'] = [label for label, _ in belief.top("tera_type") if label != "other"]
+        if not self.confirmed['stats']:
+            self.info['stats'] = belief.map_stats() or self.info['stats']
+            self.confirmed['stats'] = belief.certain("spread") is not None
+
+        for category in ("item", "ability", "tera_type"):
+            label = belief.certain(category)
+            if label and not self.confirmed[category]:
+                self.info[category] = belief.item_label(label) if category == "item" else label
+                self.confirmed[category] = True
+        self._sync_speed()
+        self._info_version += 1
+
+    def _sync_speed(self):
+        """ 스피드 구간 -> 추정 실수치를 구간 안으로 / info['speed_range'] (도구 포함 스피드) """
+        bounds = self.speed_bounds
+        if bounds is None: return
+        if self.confirmed['item']: bounds.fix_item(self.info['item'])
+        scarf = self.confirmed['item'] and self.info['item'] == SCARF
+        raw = bounds.raw_range(SCARF if scarf else None) or bounds.raw_range(SCARF)
+        stats = self.info['stats']
+        if raw and 'spe' in stats and not raw[0] <= stats['spe'] <= raw[1]:
+            self.info['stats'] = {**stats, 'spe': min(max(stats['spe'], raw[0]), raw[1])}
+        self.info['speed_range'] = bounds.held_range()
+
+    def observe_damage(self, role, other_name, att_spec, def_spec, move_info, field_spec, percent, target_fainted=False):
+        """
+        데미지 수치로 사후분포 갱신
+        role: "attacker"(이 포켓몬이 때림) / "defender"(이 포켓몬이 맞음), other_name: 상대편 포켓몬 (타입 조회)
+        percent: 맞은 쪽 최대 HP 대비 %
+        """
+        if not self.belief or percent <= 0: return
+        own, other = {'types': get_pokemon_types(self.name)}, {'types': get_pokemon_types(other_name)}
+        att_spec = {**att_spec, **(own if role == "attacker" else other)}
+        def_spec = {**def_spec, **(other if role == "attacker" else own)}
+        if self.belief.observe_damage(role, att_spec, def_spec, move_info, field_spec, percent, capped=target_fainted):
+            self._sync_belief()
+
+    def describe_item(self):
+        """ 도구 표시: 확정이면 이름, 아니면 사후확률 상위 2개 """
+        if self.confirmed['item']: return f"{self.info['item']} (확정)"
+        top = [(label, p) for label, p in self.info.get('posterior', {}).get('item', []) if label != "other"][:2]
+        if not top: return f"{self.info['item'] or 'Unknown'} (예측)"
+        return f"예측({', '.join(f'{label} {p:.0%}' for label, p in top)})"
+
+    # --- [스냅샷] ---
+    def snapshot(self):
+        """
+        불변 스냅샷 (battle_snapshot.PokemonSnapshot)
+        바뀐 것이 없으면 이전 스냅샷을 그대로, info가 그대로면 이전 스냅샷의 info를 공유
+        """
+        fingerprint = (self.current_hp_percent, self.status_condition, self.is_fainted,
+                       tuple(self.ranks.items()), tuple(self.volatile_status.items()), self._info_version)
+        cached = self._snapshot_cache
+        if cached and cached[0] == fingerprint: return cached[1]
 
-    # --- [추론 로직] ---
-    def infer_speed_nature(self, my_real_speed, opponent_moved_first, field_state):
-        if self.is_mine: return None
-        base_stats = get_base_stats(self.name)
-        if not base_stats: return None
-        
-        base_spe = base_stats['spe']
-        speed_neutral = int((2 * base_spe + 31 + 63) * 0.5 + 5)
-        speed_positive = int(speed_neutral * 1.1)
-        
-        if field_state.get('tailwind_opp') or self.status_condition == 'Paralysis': return None
-
-        if opponent_moved_first:
-            if my_real_speed >= speed_positive:
-                if not self.confirmed['item']:
-                    self.reveal_info('item', 'Choice Scarf')
-                    return f"❗ 상대가 최속 한계({speed_positive})보다 빠릅니다. **구애스카프** 확정."
-            elif my_real_speed >= speed_neutral:
-                return f"❗ 상대가 준속({speed_neutral})보다 빠릅니다. **최속 보정**입니다."
+        if cached and cached[0][-1] == self._info_version:
+            info, confirmed = cached[1].info, cached[1].confirmed
         else:
-            if my_real_speed < speed_positive:
-                return f"✅ 상대가 최속({speed_positive})보다 느립니다. 내구 보정 가능성."
+            info, confirmed = self.info, self.confirmed
+        snap = PokemonSnapshot(self.name, self.is_mine, self.current_hp_percent, self.status_condition,
+                               self.is_fainted, self.ranks, self.volatile_status, info, confirmed)
+        self._snapshot_cache = (fingerprint, snap)
+        return snap
+
+    # --- [추론 로직] ---
+    def infer_speed_nature(self, my_real_speed, opponent_moved_first, field_state, boost=(1.0, 1.0),
+                           ranks=None, status=None):
+        """
+        선후공 결과 -> 스피드 구간 교집합 -> 사후분포 갱신 (노력치 x 구애스카프)
+        field_state: 스피드 계산용 필드 (weather / terrain / trick_room / tailwind = 상대 순풍)
+        boost: 상대 고대활성/쿼크차지 (최소, 최대) 배율 (speed_bounds.paradox_speed_boost)
+        ranks / status: 행동 전 랭크 / 상태이상 (ranks를 안 주면 둘 다 현재 값)
+        Returns: 추정이 눈에 띄게 바뀌었으면 알림 메시지
+        """
+        if self.is_mine or not self.belief or not self.speed_bounds or not my_real_speed: return None
+        if ranks is None: ranks, status = self.ranks, self.status_condition
+        before_range = self.speed_bounds.held_range()
+        dropped = self.speed_bounds.observe(my_real_speed, opponent_moved_first, ranks, status,
+                                            self.info.get('ability'), field_state,
+                                            field_state.get('trick_room', False), boost)
+        if dropped is None: return None   # 어느 가설과도 안 맞는 관측 (입력 오류 등) -> 무시
+
+        scarf_prob = lambda: dict(self.info['posterior']['item']).get(SCARF, 0.0)
+        before_scarf, before_spread = scarf_prob(), self.belief.top("spread", 1)[0][0]
+        if None in dropped and not self.confirmed['item']:
+            self.reveal_info("item", SCARF)   # 스카프 없이는 불가능한 선후공
+        self.belief.observe_speed_range(self.speed_bounds.raw_range)
+        self._sync_belief()
+
+        after_range = self.info['speed_range']
+        span = f"(스피드 {after_range[0]}~{after_range[1]})"
+        after_scarf = scarf_prob()
+        spread, spread_prob = self.belief.top("spread", 1)[0]
+        if None in dropped:
+            return f"❗ 상대가 노력치만으로는 낼 수 없는 스피드입니다. **구애스카프** 확정. {span}"
+        if SCARF in dropped:
+            return f"✅ 상대가 더 느립니다. 구애스카프 배제. {span}"
+        if after_scarf - before_scarf >= 0.1:
+            return f"❗ 상대가 예상보다 빠릅니다. **구애스카프** 확률 {before_scarf:.0%} → {after_scarf:.0%} {span}"
+        if before_scarf - after_scarf >= 0.1:
+            return f"✅ 상대가 더 느립니다. 구애스카프 확률 {before_scarf:.0%} → {after_scarf:.0%} {span}"
+        if spread != before_spread:
+            return f"📐 노력치 추정 변경: {spread} ({spread_prob:.0%}) {span}"
+        if after_range != before_range:
+            return f"📐 상대 스피드 범위: {before_range[0]}~{before_range[1]} → {after_range[0]}~{after_range[1]}"
         return None
 
     def get_summary_text(self):
         if self.is_mine: return ""
-        moves = self.info['moves'] + self.info['predictions']['moves'][:5]
-        moves = list(dict.fromkeys(moves))[:5]
-        item = self.info['item'] if self.confirmed['item'] else f"예측({', '.join(self.info['predictions']['items'][:2])})"
-        return f"[{self.name}] 도구:{item} | 기술:{', '.join(moves)}"
+        posterior = self.info.get('posterior')
+        if not posterior:
+            moves = self.info['moves'] + self.info['predictions']['moves'][:5]
+            moves = list(dict.fromkeys(moves))[:5]
+            item = self.info['item'] if self.confirmed['item'] else f"예측({', '.join(self.info['predictions']['items'][:2])})"
+            return f"[{self.name}] 도구:{item} | 기술:{', '.join(moves)}"
+
+        # 사후확률 표시 (확인된 기술은 이름만, 나머지는 채용 확률)
+        known = self.info['moves']
+        likely = [f"{m} {p:.0%}" for m, p in posterior['moves'] if p < 0.995][:max(0, 5 - len(known))]
+        tera = self.info['tera_type'] if self.confirmed['tera_type'] else \
+            ", ".join(f"{t} {p:.0%}" for t, p in posterior['tera_type'][:2])
+        spread, spread_prob = posterior['spread'][0]
+        return (f"[{self.name}] 도구:{self.describe_item()} | 기술:{', '.join(known + likely)}"
+                f" | 테라:{tera} | 노력치:{spread} ({spread_prob:.0%})")
+
+
+class RosterPrefetcher:
+    """
+    [상대 명단 프리페치]
+    상대 BattlePokemon 생성(실수치 추정 + RAG 데이터)과 예측 기술/타입 데이터 로드는 PokeAPI를 탈 수 있어서,
+    상대가 교체해 들어오는 순간(사용자가 기다리는 시점)에 하면 느립니다.
+    initialize_opponent 때 6마리를 백그라운드에서 미리 만들어 두고, 교체 시에는 꺼내 쓰기만 합니다.
+    """
+    _executor = None          # 스레드 풀은 모든 세션이 공유
+    _executor_lock = threading.Lock()
+
+    def __init__(self, workers=PREFETCH_WORKERS):
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._futures = {}   # name -> Future[BattlePokemon]
+
+    @classmethod
+    def _get_executor(cls, workers):
+        with cls._executor_lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+            return cls._executor
+
+    def start(self, roster):
+        """ 명단 전체를 백그라운드로 준비 (이전 명단의 대기 작업은 취소) """
+        if self.workers <= 0: return
+        executor = self._get_executor(self.workers)
+        with self._lock:
+            for future in self._futures.values(): future.cancel()
+            self._futures = {name: executor.submit(self._build, name) for name in roster}
+
+    @staticmethod
+    def _build(name):
+        with telemetry.span("battle.prefetch") as span:
+            span["pokemon"] = name
+            poke = BattlePokemon(name, is_mine=False)
+            get_pokemon_types(name)
+            moves = poke.info['predictions']['moves']
+            for move in moves:
+                get_move_data(move_to_english(move) or move)
+            span["moves"] = len(moves)
+        return poke
+
+    def take(self, name):
+        """ 준비된 BattlePokemon (아직 만드는 중이면 완료까지 대기) / 대상이 아니거나 실패면 None """
+        with self._lock:
+            future = self._futures.get(name)
+        if future is None or future.cancelled(): return None
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"⚠️ [Prefetch] {name} 준비 실패: {e}")
+            return None
+
+    def get_progress(self):
+        """ 사이드바 표시용 진행 상황 """
+        with self._lock:
+            futures = dict(self._futures)
+        finished = {n: f for n, f in futures.items() if f.done() and not f.cancelled()}
+        failed = [n for n, f in finished.items() if f.exception() is not None]
+        return {"total": len(futures), "done": len(finished) - len(failed), "failed": failed,
+                "pending": [n for n in futures if n not in finished]}
+
+
+def _move_priority(move_name, poke):
+    """ 이번 턴에 쓴 기술의 최종 우선도 (모르면 0) """
+    if not move_name: return 0
+    move = get_move_data(move_to_english(move_name) or move_name)
+    return calculate_priority_bonus(move.get('priority', 0), move.get('category'), move.get('type'),
+                                    poke.info.get('ability'), poke.current_hp_percent)
 
 
 class BattleState:
@@ -141,6 +355,20 @@ class BattleState:
             "opp": {"tailwind": False, "reflect": False, "light_screen": False, "stealth_rock": False}
         }
         
+        # 직전에 반영한 턴의 행동 (선후공 역산용: 서로 쓴 기술 / 교체 여부 / 행동 전 스피드 관련 상태)
+        self.last_turn = {}
+
+        # 변경 추적: 소비자(시뮬레이션 등)별 마지막으로 확인한 필드 값
+        self._change_marks = {}
+
+        # 시뮬레이션 항목별 계산 결과 (변경된 항목만 비우고 재사용, battle.run_battle_simulation_report)
+        # 변경 표시(_change_marks)와 같이 이 배틀에 속함 -> 세션끼리 섞이지 않음. 앱 프래그먼트 / 작업 큐 / speculator가 동시에 부를 수 있어 lock
+        self.simulation_rows = {}
+        self.simulation_lock = threading.Lock()
+
+        # 상대 명단 백그라운드 준비
+        self.prefetcher = RosterPrefetcher()
+
         self.refresh_my_party()
 
     def refresh_my_party(self):
@@ -150,6 +378,10 @@ class BattleState:
 
     def initialize_opponent(self, roster_list):
         self.opp_full_roster = roster_list
+        self.prefetcher.start(roster_list)   # 교체 시점에는 꺼내 쓰기만 하도록 미리 생성
+
+    def get_prefetch_progress(self):
+        return self.prefetcher.get_progress()
 
     # [NEW] 선출 확정 메서드
     def set_my_selection(self, selection_list):
@@ -168,13 +400,20 @@ class BattleState:
                 self.my_active.reset_battle_status() # 교체 시 랭크 리셋
         else:
             if pokemon_name not in self.opp_revealed_party:
-                self.opp_revealed_party[pokemon_name] = BattlePokemon(pokemon_name, is_mine=False)
+                poke = self.prefetcher.take(pokemon_name)
+                self.opp_revealed_party[pokemon_name] = poke or BattlePokemon(pokemon_name, is_mine=False)
             self.opp_active = self.opp_revealed_party[pokemon_name]
             self.opp_active.reset_battle_status() # 교체 시 랭크 리셋
 
     # --- [LLM 파싱 데이터 적용] ---
     def apply_llm_update(self, update_data):
         print(f"🔄 [State Update] 적용: {update_data}")
+        # 선후공은 행동 전 상태로 정해짐 -> 이번 업데이트(랭크업 / 마비 / 순풍 등)를 반영하기 전에 기록
+        self.last_turn = {
+            "my_move": update_data.get("my_move_used"), "opp_move": update_data.get("opp_move_used"),
+            "switched": bool(update_data.get("my_switch") or update_data.get("opp_switch")),
+            "before": self.speed_state(),
+        }
         
         if update_data.get("my_switch"): self.set_active("me", update_data["my_switch"])
         if update_data.get("opp_switch"): self.set_active("opp", update_data["opp_switch"])
@@ -213,6 +452,96 @@ class BattleState:
         if update_data.get("turn_end"):
             self.turn_count += 1
 
+    # --- [선후공 역산] ---
+    def speed_state(self):
+        """ 선후공과 관련된 현재 상태 (활성 포켓몬 / 랭크 / 상태이상, 날씨 / 필드 / 트릭룸, 순풍) 복사본 """
+        my, opp = self.my_active, self.opp_active
+        return {
+            "my_name": my.name if my else None, "opp_name": opp.name if opp else None,
+            "my_ranks": dict(my.ranks) if my else {}, "opp_ranks": dict(opp.ranks) if opp else {},
+            "my_status": my.status_condition if my else None, "opp_status": opp.status_condition if opp else None,
+            "global": dict(self.global_effects),
+            "tailwind": {side: effects['tailwind'] for side, effects in self.side_effects.items()},
+        }
+
+    def observe_turn_order(self, opp_moved_first, before=None):
+        """
+        직전 턴의 선후공 -> 상대 스피드 구간 / 사후분포 갱신 (BattlePokemon.infer_speed_nature)
+        교체가 있었거나, 한쪽이 기술을 쓰지 않았거나, 서로 우선도가 다르면 스피드와 무관하므로 건너뜀
+        before: 행동 전 speed_state() (기본: apply_llm_update가 기록한 last_turn["before"])
+                -> 같은 턴에 오른 랭크 / 걸린 마비 / 깔린 순풍은 이번 선후공에 반영하지 않음
+        Returns: 알림 메시지 또는 None
+        """
+        my, opp, turn = self.my_active, self.opp_active, self.last_turn
+        if not my or not opp or opp.is_mine or turn.get("switched"): return None
+        if not turn.get("my_move") or not turn.get("opp_move"): return None   # 한쪽만 행동 -> 선후공 없음
+        if _move_priority(turn.get("my_move"), my) != _move_priority(turn.get("opp_move"), opp): return None
+        before = before or turn.get("before") or self.speed_state()
+        if (before["my_name"], before["opp_name"]) != (my.name, opp.name): return None
+
+        my_field = {**before["global"], 'tailwind': before["tailwind"]['me']}
+        opp_field = {**before["global"], 'tailwind': before["tailwind"]['opp']}
+        my_boost = paradox_speed_boost(my.info.get('ability'), [my.info.get('item')], my_field, my.info['stats'])[0]
+        my_speed = effective_speed(my.info['stats'].get('spe', 0), before["my_ranks"], my.info.get('item'),
+                                   before["my_status"], my.info.get('ability'), my_field, my_boost)
+
+        # 상대: 특성은 확정 또는 최다 채용, 도구는 확정이 아니면 후보 전체 (부스트에너지 가능성)
+        ability = opp.info.get('ability') or next(iter(opp.info['predictions']['abilities']), None)
+        items = [opp.info['item']] if opp.confirmed['item'] else \
+            [label for label, _ in opp.info.get('posterior', {}).get('item', [])]
+        opp_boost = paradox_speed_boost(ability, items, opp_field, opp.info['stats'] if opp.confirmed['stats'] else None)
+        return opp.infer_speed_nature(my_speed, opp_moved_first, opp_field, opp_boost,
+                                      ranks=before["opp_ranks"], status=before["opp_status"])
+
+    # --- [스냅샷] ---
+    def snapshot(self):
+        """ 현재 상태의 불변 스냅샷 (탐색 / 롤아웃 / 선계산 / 가정 분석용, 실제 상태는 건드리지 않음) """
+        return BattleSnapshot(
+            self.turn_count,
+            self.my_active.snapshot() if self.my_active else None,
+            self.opp_active.snapshot() if self.opp_active else None,
+            self.opp_full_roster,
+            {name: poke.snapshot() for name, poke in self.opp_revealed_party.items()},
+            {name: poke.snapshot() for name, poke in self.my_party_status.items()},
+            self.my_entry_selection,
+            self.global_effects,
+            self.side_effects,
+        )
+
+    # --- [변경 추적] ---
+    def get_tracked_fields(self):
+        """ 시뮬레이션 결과에 영향을 주는 필드들의 현재 값 (턴 수 / HP 등은 제외) """
+        my, opp = self.my_active, self.opp_active
+        def ranks(poke, *stats):
+            return tuple(poke.ranks.get(stat, 0) for stat in stats) if poke else None
+
+        return {
+            "my_active": my.name if my else None,
+            "opp_active": opp.name if opp else None,
+            "opp_stats": tuple(sorted((opp.info.get('stats') or {}).items())) if opp else None,
+            "my_atk_ranks": ranks(my, 'atk', 'spa'), "my_def_ranks": ranks(my, 'def', 'spd'), "my_spe_rank": ranks(my, 'spe'),
+            "opp_atk_ranks": ranks(opp, 'atk', 'spa'), "opp_def_ranks": ranks(opp, 'def', 'spd'), "opp_spe_rank": ranks(opp, 'spe'),
+            "my_status": my.status_condition if my else None,
+            "opp_status": opp.status_condition if opp else None,
+            "my_item": my.info.get('item') if my else None,
+            "opp_item": opp.info.get('item') if opp else None,
+            "opp_ability": opp.info.get('ability') if opp else None,
+            "opp_speed_range": opp.info.get('speed_range') if opp else None,
+            "weather": self.global_effects['weather'],
+            "terrain": self.global_effects['terrain'],
+            "trick_room": self.global_effects['trick_room'],
+            "tailwind": (self.side_effects['me']['tailwind'], self.side_effects['opp']['tailwind']),
+            "screens": (self.side_effects['opp']['reflect'], self.side_effects['opp']['light_screen']),
+        }
+
+    def pop_changes(self, consumer):
+        """ consumer가 마지막으로 확인한 뒤 바뀐 필드 이름 집합 (처음이면 전체) """
+        current = self.get_tracked_fields()
+        previous = self._change_marks.get(consumer)
+        self._change_marks[consumer] = current
+        if previous is None: return set(current)
+        return {name for name, value in current.items() if previous.get(name) != value}
+
     def get_state_report(self):
         if not self.my_active or not self.opp_active: return "⚠️ 배틀 준비 중..."
         
@@ -220,7 +549,7 @@ class BattleState:
         unknown = 3 - len(self.opp_revealed_party)
         
         opp = self.opp_active
-        opp_item = f"{opp.info['item']} (확정)" if opp.confirmed['item'] else f"{opp.info['item'] or 'Unknown'} (예측)"
+        opp_item = opp.describe_item()
         
         vol_my = [k for k,v in self.my_active.volatile_status.items() if v]
         vol_opp = [k for k,v in opp.volatile_status.items() if v]
@@ -257,4 +586,5 @@ class BattleState:
         🛡️ **벽/순풍**: 나[{'순풍' if self.side_effects['me']['tailwind'] else ''}] vs 상대[{'순풍' if self.side_effects['opp']['tailwind'] else ''}]
         """
 
-current_battle = BattleState()
\ No newline at end of file
+# 실제 배틀 상태는 세션마다 따로 (session_manager), 세션 지정이 없으면 기본 세션
+current_battle = SessionProxy("battle", BattleState)
\ No newline at end of file
@@ -0,0 +1,176 @@
+# benchmark.py
+"""
+[파이프라인 벤치마크]
+input.txt의 입력으로 analyze_entry_strategy / analyze_battle_turn 전체 파이프라인을 구동하고
+단계별 지연 시간(latency)과 처리량(throughput)을 보고합니다.
+
+기본값은 오프라인 스텁 LLM (LLM_PROVIDER=stub) 이며, 캐시는 끄고 측정합니다.
+스텁일 때는 PokeAPI도 부르지 않음 (POKEAPI_OFFLINE: 디스크 캐시에 없는 기술 / 종족값은 고정 값)
+-> 네트워크 지연이 측정에 섞이지 않음. 실제 조회까지 재려면 --online-data
+    python benchmark.py                       # 스텁, 캐시 OFF
+    python benchmark.py --repeat 5 --concurrency 4
+    python benchmark.py --provider gemini     # 실제 Gemini 호출
+    python benchmark.py --use-cache           # 캐시 효과 포함 측정
+    python benchmark.py --async-entry         # Entry를 비동기 파이프라인으로 한 번에 처리
+    python benchmark.py --online-data         # 스텁 LLM + 실제 PokeAPI 조회
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+from telemetry import telemetry
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+INPUT_PATH = os.path.join(current_dir, "input.txt")
+TEAM_PATH = os.path.join(current_dir, "my_team.txt")
+
+
+class StageTimer:
+    """
+    모듈 함수를 감싸서 호출별 소요 시간을 telemetry 구간으로 기록하고,
+    LLM / 데이터 조회 / 계산기 구간과 함께 단계별 통계로 보고
+    """
+    def record(self, stage, elapsed):
+        telemetry.record(stage, elapsed)
+
+    def wrap(self, module, func_name, stage):
+        original = getattr(module, func_name)
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self.record(stage, time.perf_counter() - start)
+
+        setattr(module, func_name, timed)
+        return original
+
+    def report(self, wall_times):
+        samples = {}
+        for span in telemetry.get_spans():
+            samples.setdefault(span["stage"], []).append(span)
+
+        lines = [f"{'Stage':<28}{'Count':>7}{'Mean(ms)':>11}{'P50(ms)':>11}{'P95(ms)':>11}{'Max(ms)':>11}{'Tokens':>9}{'Hit':>6}"]
+        for stage in sorted(samples):
+            spans = samples[stage]
+            ordered = sorted(s["latency"] for s in spans)
+            p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+            tokens = sum(s["input_tokens"] + s["output_tokens"] for s in spans)
+            hits = sum(s["cache_hit"] for s in spans)
+            lines.append(
+                f"{stage:<28}{len(spans):>7}{statistics.mean(ordered) * 1000:>11.1f}"
+                f"{statistics.median(ordered) * 1000:>11.1f}{p95 * 1000:>11.1f}{ordered[-1] * 1000:>11.1f}"
+                f"{tokens:>9}{hits:>6}"
+            )
+        lines.append("")
+        for name, (count, elapsed) in wall_times.items():
+            throughput = count / elapsed if elapsed > 0 else 0
+            lines.append(f"🚀 {name}: {count}건 / {elapsed:.2f}초 = {throughput:.2f}건/초")
+        return "\n".join(lines)
+
+
+def load_inputs(path=INPUT_PATH):
+    """ input.txt -> (entry 파티 입력 리스트, 배틀 입력 리스트) """
+    with open(path, "r", encoding="utf-8") as f:
+        lines = [line.strip() for line in f if line.strip()]
+    entry_inputs = [p.strip() for p in lines[0].split("/") if p.strip()] if lines else []
+    battle_inputs = [p.strip() for p in lines[1].split("/") if p.strip()] if len(lines) > 1 else []
+    return entry_inputs, battle_inputs
+
+
+def run_benchmark(repeat=1, concurrency=1, use_cache=False, async_entry=False):
+    # 캐시 설정은 모듈 임포트 전에 결정
+    if not use_cache:
+        os.environ["LLM_CACHE_DISABLED"] = "1"
+
+    import entry
+    import battle
+    from battle_state import current_battle
+    from Battle_Preparing.party_loader import load_party_from_file
+    from Battle_Preparing.user_party import my_party
+
+    # LLM 호출 / 데이터 조회 / 계산기 구간은 telemetry로 기록되므로 파이프라인 단위만 감쌈
+    timer = StageTimer()
+    timer.wrap(entry, "parse_opponent_input", "pipeline.entry_parse")
+    timer.wrap(entry, "analyze_entry_strategy", "pipeline.entry_analyze")
+    timer.wrap(entry, "parse_recommended_selection", "pipeline.entry_selection")
+    timer.wrap(battle, "parse_and_update_state", "pipeline.battle_parse_update")
+    timer.wrap(battle, "analyze_battle_turn", "pipeline.battle_turn")
+
+    if not my_party.team:
+        load_party_from_file(TEAM_PATH)
+    current_battle.refresh_my_party()
+
+    entry_inputs, battle_inputs = load_inputs()
+    print(f"📂 입력: 파티 {len(entry_inputs)}개, 배틀 입력 {len(battle_inputs)}개 (x{repeat}, 동시성 {concurrency})")
+
+    # 1. Entry Phase (파티 1개 = 파싱 -> 분석 -> 선출)
+    def run_entry(party_text):
+        start = time.perf_counter()
+        parsed, _ = entry.parse_opponent_input(party_text)
+        analysis, _ = entry.analyze_entry_strategy(parsed, use_team_cache=use_cache)
+        selection, _ = entry.parse_recommended_selection(analysis)
+        timer.record("pipeline.entry_total", time.perf_counter() - start)
+        return parsed, selection
+
+    jobs = entry_inputs * repeat
+    start = time.perf_counter()
+    if async_entry:
+        # 전체 입력을 한 번에 파이프라인에 넣음 (서브 배치 동시 분석)
+        import asyncio
+        entry_results = []
+        for _ in range(repeat):
+            parsed, _, selection, _ = asyncio.run(entry.run_entry_pipeline_async(entry_inputs, use_team_cache=use_cache))
+            entry_results += [({pid: opp}, {pid: selection[pid]} if pid in selection else {}) for pid, opp in parsed.items()]
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            entry_results = list(executor.map(run_entry, jobs))
+    entry_elapsed = time.perf_counter() - start
+
+    # 2. Battle Phase (첫 번째 파티를 상대로 배틀 입력을 순서대로 적용)
+    battle_elapsed = 0.0
+    parsed, selection = entry_results[0] if entry_results else ({}, {})
+    first_party = next(iter(parsed.values()), [])
+    first_pick = next(iter(selection.values()), None) if selection else None
+    if first_party and battle_inputs:
+        current_battle.initialize_opponent(first_party)
+        if first_pick:
+            current_battle.set_my_selection([first_pick["lead"], first_pick["back1"], first_pick["back2"]])
+        elif my_party.team:
+            current_battle.set_my_selection(list(my_party.team.keys())[:3])
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for user_input in battle_inputs:
+                battle.analyze_battle_turn(user_input)
+        battle_elapsed = time.perf_counter() - start
+
+    wall_times = {
+        "Entry 처리량 (파티)": (len(jobs), entry_elapsed),
+        "Battle 처리량 (턴)": (len(battle_inputs) * repeat if first_party else 0, battle_elapsed),
+    }
+    return timer.report(wall_times)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Entry/Battle 파이프라인 벤치마크")
+    parser.add_argument("--provider", default=os.getenv("LLM_PROVIDER", "stub"), choices=["stub", "gemini"])
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--use-cache", action="store_true", help="LLM/파티 분석 캐시 사용")
+    parser.add_argument("--async-entry", action="store_true", help="Entry를 비동기 파이프라인(run_entry_pipeline_async)으로 측정")
+    parser.add_argument("--online-data", action="store_true", help="스텁 모드에서도 PokeAPI 조회 (기본은 오프라인)")
+    args = parser.parse_args()
+
+    os.environ["LLM_PROVIDER"] = args.provider
+    # 데이터 조회 모듈 임포트 전에 결정
+    if args.provider == "stub" and not args.online_data:
+        os.environ.setdefault("POKEAPI_OFFLINE", "1")
+    if current_dir not in sys.path:
+        sys.path.append(current_dir)
+
+    print(run_benchmark(args.repeat, args.concurrency, args.use_cache, args.async_entry))
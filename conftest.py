@@ -0,0 +1,50 @@
+# conftest.py
+"""
+[테스트 공통 설정]
+테스트는 네트워크 / API 키 없이 돌아가야 하므로 모듈 임포트 전에 오프라인 설정을 지정합니다.
+- LLM: 스텁 (지연 0), 응답 캐시 끔
+- PokeAPI: 오프라인 (디스크 캐시에 없으면 고정 값, Calculator.move_loader / stat_estimator)
+- 상대 명단 프리페치 / 롤아웃 작업자: 백그라운드 스레드 / 프로세스 없이 동기 실행
+- battle_session: 세션 + 내 파티 + 상대 명단을 준비하고 테스트 후 세션 정리 (공통 픽스처)
+"""
+import os
+
+import pytest
+
+os.environ.setdefault("LLM_PROVIDER", "stub")
+os.environ.setdefault("STUB_LLM_LATENCY_BASE", "0")
+os.environ.setdefault("LLM_CACHE_DISABLED", "1")
+os.environ.setdefault("POKEAPI_OFFLINE", "1")
+os.environ.setdefault("BATTLE_PREFETCH_WORKERS", "0")
+os.environ.setdefault("BATTLE_ROLLOUT_WORKERS", "1")
+
+
+@pytest.fixture
+def battle_session():
+    """
+    배틀 세션 시작 헬퍼: start(session_id, party={이름: (스탯, 기술 목록)}, opponents=[상대 명단]) -> current_battle
+    - 내 선출 = party 순서 (첫 번째가 선봉), 상대는 명단 첫 번째가 활성
+    - 테스트가 끝나면 시작한 세션을 모두 정리
+    """
+    from battle_state import current_battle
+    from Battle_Preparing.user_party import my_party
+    from session_manager import session_manager
+
+    started = []
+
+    def start(session_id, party=None, opponents=None):
+        session_manager.activate(session_id)
+        started.append(session_id)
+        for name, (stats, moves) in (party or {}).items():
+            my_party.add_pokemon(name, dict(stats), moves=list(moves))
+        if party:
+            current_battle.refresh_my_party()
+            current_battle.set_my_selection(list(party))
+        if opponents:
+            current_battle.initialize_opponent(list(opponents))
+            current_battle.set_active("opp", opponents[0])
+        return current_battle
+
+    yield start
+    for session_id in started:
+        session_manager.drop(session_id)
@@ -0,0 +1,549 @@
+# endgame.py
+"""
+[엔드게임 해석기 - 1vs1 / 2vs1 정확 해석 + 테이블베이스]
+양쪽 남은 포켓몬이 적어지면 (한쪽 1마리 이하, 다른 쪽 2마리 이하 / 상대 3마리 모두 공개) 상태 공간이 작아지므로
+끝까지 정확히 풀어 "보장 승률"과 승리 수순을 돌려줍니다. 어드바이저는 이 결과를 그대로 추천합니다.
+
+- 상태: (활성 번호, HP 구간, 활성 포켓몬 랭크, 무진행 턴 수) / HP는 BATTLE_ENDGAME_HP_STEP(%) 단위로 양자화
+- 전이: 계산기(calculate_damage_math) 16단계 난수 + 명중률, 스피드 체커로 선후공 (동속 50/50), 마비 행동불능 25%,
+        랭크업 기술(SETUP_BOOSTS), 교체(랭크 초기화), 화상/독 턴 종료 데미지, 기절 시 교체 선택
+- 값: 내 행동을 먼저 정하고 상대가 최악의 응수를 하는 max-min (= 상대가 무엇을 해도 보장되는 승률)
+- 순환 방지: HP가 전혀 줄지 않은 턴이 STALL_LIMIT번 이어지면 무승부(0.5)로 판정
+- 반복 심화: 처음 보는 시나리오는 끝까지 푸는 데 제한 시간을 넘길 수 있으므로 ITERATIVE_HORIZONS 턴 앞까지만 먼저 풀고
+  (끝나지 않은 위치는 남은 HP 비율로 평가) 시간이 남는 만큼 깊게 -> 첫 턴부터 "추정 승률"이라도 반환
+  정확히 풀린 위치(끝까지 탐색)만 테이블베이스에 저장하므로, 다음 턴에는 이어서 정확한 해석에 가까워짐
+- 테이블베이스: 시나리오(포켓몬/기술/스탯/필드) 해시 -> {상태: (값, 최선 행동)}
+  같은 시나리오는 다음 턴/다른 세션에서도 이어서 사용 (.cache/endgame_tablebase.sqlite3, JSON 행 목록)
+  메모리에는 최근 시나리오 BATTLE_ENDGAME_MAX_TABLES개만 보관 (LRU, 밀려날 때 미저장 위치는 디스크에 반영)
+
+[단순화]
+- 상대 기술은 확인된 기술 + 예측 상위로 4개를 채운 구성으로 고정
+- 급소 / 테라스탈 / 추가 효과 / 회복 / 수면·얼음 / 날씨 턴 수는 제외
+"""
+import os
+import sys
+import time
+import json
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from Calculator.calculator import calculate_damage_math
+from Calculator.speed_checker import check_turn_order
+from Calculator.move_loader import get_move_data
+from Calculator.stat_estimator import estimate_stats
+from battle_log_parser import SETUP_BOOSTS
+from name_aliases import move_to_english
+from resources import lazy_resource
+from telemetry import telemetry
+from turn_search import _calc_spec
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+TABLEBASE_PATH = os.path.join(current_dir, ".cache", "endgame_tablebase.sqlite3")
+
+ENDGAME_BUDGET_MS = float(os.getenv("BATTLE_ENDGAME_BUDGET_MS", 1500))   # 0이면 해석 생략
+HP_STEP = int(os.getenv("BATTLE_ENDGAME_HP_STEP", 4))                      # HP 양자화 단위 (%)
+MAX_TABLES = int(os.getenv("BATTLE_ENDGAME_MAX_TABLES", 32))               # 메모리에 보관할 시나리오 수
+STALL_LIMIT = 3
+ITERATIVE_HORIZONS = (2, 4, 8, 16, 32)   # 반복 심화 단계 (턴 수), 마지막에는 제한 없이
+SET_SIZE = 4
+TIME_CHECK_INTERVAL = 256
+RECURSION_LIMIT = 20000
+STATS = ('atk', 'def', 'spa', 'spd', 'spe')
+NO_RANKS = (0, 0, 0, 0, 0)
+CHIP_DAMAGE = {"Burn": 6, "Poison": 12, "Toxic": 12}     # 턴 종료 데미지 (%)
+FULL_PARALYSIS = 0.25
+
+
+class EndgameTimeout(Exception):
+    pass
+
+
+# --------------------------------------------------------------------------
+# [1] 시나리오 (해석 대상 포켓몬 / 기술 / 필드)
+# --------------------------------------------------------------------------
+def _bucket(hp_percent):
+    """ HP % -> 구간 (살아 있으면 최소 1) """
+    if hp_percent <= 0: return 0
+    return max(1, int(round(hp_percent / HP_STEP)))
+
+def _usable_moves(names):
+    """ 공격기 + 랭크업 기술만 (나머지 변화기는 해석에서 제외) """
+    moves = []
+    for name in names:
+        move = get_move_data(move_to_english(name) or name)
+        if move['power'] > 0 or move['name'] in SETUP_BOOSTS: moves.append(move)
+    return moves
+
+def _opp_moves(poke):
+    known = [move_to_english(m) or m for m in poke.info.get('moves', [])]
+    ordered = list(dict.fromkeys(known + [move_to_english(m) or m for m in poke.info['predictions']['moves']]))
+    return _usable_moves(ordered)[:max(SET_SIZE, len(known))]
+
+def build_scenario(battle):
+    """
+    현재 배틀이 엔드게임이면 해석용 시나리오, 아니면 None
+    Returns: {key, sides: [[{name, spec, moves}], ...], field, root}
+    """
+    my_active, opp_active = battle.my_active, battle.opp_active
+    if not my_active or not opp_active: return None
+    if len(battle.opp_revealed_party) < 3: return None     # 미공개 포켓몬이 남아 있으면 정확 해석 불가
+
+    names = battle.my_entry_selection or list(battle.my_party_status.keys())
+    my_alive = [battle.my_party_status[n] for n in names
+                if n in battle.my_party_status and not battle.my_party_status[n].is_fainted]
+    if my_active not in my_alive:
+        if my_active.is_fainted: return None
+        my_alive.insert(0, my_active)
+    opp_alive = [p for p in battle.opp_revealed_party.values() if not p.is_fainted]
+    if opp_active not in opp_alive: return None
+    if max(len(my_alive), len(opp_alive)) > 2 or min(len(my_alive), len(opp_alive)) > 1: return None
+
+    sides = [[], []]
+    for side, pokes, screens in ((0, my_alive, battle.side_effects['me']), (1, opp_alive, battle.side_effects['opp'])):
+        for poke in pokes:
+            stats = poke.info.get('stats') or (estimate_stats(poke.name) or {}).get('stats')
+            if not stats: return None
+            moves = _usable_moves(poke.info.get('moves', [])) if side == 0 else _opp_moves(poke)
+            sides[side].append({
+                "name": poke.name, "spec": _calc_spec(poke, stats, {}, screens), "moves": moves,
+                "status": poke.status_condition,
+            })
+    if not any(m['power'] > 0 for mon in sides[0] + sides[1] for m in mon['moves']): return None
+
+    field = {
+        'weather': battle.global_effects['weather'], 'terrain': battle.global_effects['terrain'],
+        'trick_room': battle.global_effects['trick_room'],
+        'tailwind_me': battle.side_effects['me']['tailwind'], 'tailwind_opp': battle.side_effects['opp']['tailwind']
+    }
+    ranks = lambda poke: tuple(max(-6, min(6, poke.ranks.get(s, 0))) for s in STATS)
+    root = (
+        (my_alive.index(my_active), opp_alive.index(opp_active)),
+        (tuple(_bucket(p.current_hp_percent) for p in my_alive), tuple(_bucket(p.current_hp_percent) for p in opp_alive)),
+        (ranks(my_active), ranks(opp_active)),
+        0
+    )
+    payload = repr((HP_STEP, STALL_LIMIT, sorted(field.items()), [
+        [(mon['name'], sorted(mon['spec']['stats'].items()), mon['spec']['item'], mon['spec']['ability'],
+          mon['status'], sorted(mon['spec']['screens'].items()), [m['name'] for m in mon['moves']],
+          mon['spec'].get('speed_range'))
+         for mon in side] for side in sides]))
+    key = hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+    return {"key": key, "sides": sides, "field": field, "root": root}
+
+
+# --------------------------------------------------------------------------
+# [2] 테이블베이스 (시나리오별 해석 결과, 세션/프로세스 간 공유)
+# --------------------------------------------------------------------------
+def _tuples(value):
+    """ JSON 리스트 -> 튜플 (상태/행동은 딕셔너리 키로 쓰이므로 해시 가능해야 함) """
+    return tuple(_tuples(v) for v in value) if isinstance(value, list) else value
+
+def encode_positions(positions):
+    """ {상태: (값, 행동)} -> JSON 문자열 ([상태, 값, 행동] 행 목록) """
+    return json.dumps([[state, value, action] for state, (value, action) in positions.items()],
+                      separators=(",", ":"))
+
+def decode_positions(blob):
+    if isinstance(blob, bytes): blob = blob.decode("utf-8")
+    return {_tuples(state): (value, _tuples(action)) for state, value, action in json.loads(blob)}
+
+
+class Tablebase:
+    """ 시나리오 키 -> {상태: (값, 최선 행동)} / 메모리 LRU + SQLite """
+    def __init__(self, path=TABLEBASE_PATH, max_tables=MAX_TABLES):
+        self.path = path
+        self.max_tables = max_tables
+        self._lock = threading.Lock()
+        self._tables = OrderedDict()
+        self._saved_sizes = {}
+        self.stats = {"lookups": 0, "hits": 0, "positions_saved": 0, "evicted": 0}
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS scenarios (
+                    key TEXT PRIMARY KEY,
+                    positions BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def table(self, key):
+        """ 시나리오의 위치 표 (처음이면 디스크에서 로드, 오래된 표는 밀어냄) """
+        with self._lock:
+            if key in self._tables:
+                self._tables.move_to_end(key)
+                return self._tables[key]
+
+        positions = {}
+        try:
+            with self._connect() as conn:
+                row = conn.execute("SELECT positions FROM scenarios WHERE key = ?", (key,)).fetchone()
+            if row: positions = decode_positions(row[0])
+        except (sqlite3.Error, ValueError, TypeError) as e:
+            # 예전 pickle 형식 행도 여기서 걸러짐 -> 빈 표로 다시 풀어서 덮어씀
+            print(f"⚠️ [Endgame] 테이블베이스 로드 실패: {e}")
+            positions = {}
+
+        evicted = []
+        with self._lock:
+            if key in self._tables:        # 그 사이 다른 스레드가 먼저 로드
+                self._tables.move_to_end(key)
+                return self._tables[key]
+            self._tables[key] = positions
+            self._saved_sizes[key] = len(positions)
+            while len(self._tables) > max(1, self.max_tables):
+                old_key, old_positions = self._tables.popitem(last=False)
+                if len(old_positions) != self._saved_sizes.pop(old_key, 0):
+                    evicted.append((old_key, old_positions))
+                self.stats["evicted"] += 1
+        for old_key, old_positions in evicted:
+            self.save(old_key, old_positions)
+        return positions
+
+    def record_lookup(self, hit):
+        with self._lock:
+            self.stats["lookups"] += 1
+            if hit: self.stats["hits"] += 1
+
+    def save(self, key, positions=None):
+        """ 새로 풀린 위치가 있으면 디스크에 반영 (positions: 메모리에서 밀려난 표를 직접 넘길 때) """
+        with self._lock:
+            if positions is None: positions = self._tables.get(key)
+            if positions is None or len(positions) == self._saved_sizes.get(key): return
+            blob = encode_positions(positions)
+            size = len(positions)
+            before = self._saved_sizes.get(key, 0)
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO scenarios (key, positions, size, updated_at) VALUES (?, ?, ?, ?)",
+                    (key, blob, size, time.time())
+                )
+            with self._lock:
+                self.stats["positions_saved"] += max(0, size - before)
+                if key in self._tables: self._saved_sizes[key] = size
+        except sqlite3.Error as e:
+            print(f"⚠️ [Endgame] 테이블베이스 저장 실패: {e}")
+
+    def get_stats(self):
+        with self._lock:
+            lookups = self.stats["lookups"]
+            return {**self.stats, "scenarios": len(self._tables),
+                    "positions": sum(len(t) for t in self._tables.values()),
+                    "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0}
+
+
+# --------------------------------------------------------------------------
+# [3] 해석기
+# --------------------------------------------------------------------------
+class EndgameSolver:
+    """
+    상태: ((내 활성, 상대 활성), (내 HP 구간들, 상대 HP 구간들), (내 랭크, 상대 랭크), 무진행 턴 수)
+    행동: ("move", 기술 번호) / ("switch", 포켓몬 번호)
+    """
+    def __init__(self, scenario, table, deadline=float("inf")):
+        self.sides = scenario["sides"]
+        self.field = scenario["field"]
+        self.table = table
+        self.deadline = deadline
+        self.nodes = 0
+        self.horizon = None     # 반복 심화 중 탐색할 턴 수 (None = 끝까지)
+        self.cutoffs = 0        # 탐색 한계에서 평가로 끊은 횟수 (정확한 값인지 판별)
+        self.shallow = {}       # (상태, 남은 턴 수) -> (값, 최선 행동) / 한계가 있는 값, 이번 해석에서만 사용
+        self.latest = {}        # 상태 -> 가장 최근에 계산한 (값, 최선 행동) (수순 표시용)
+        self._damage = {}
+        self._speed = {}
+
+    # --- [계산기 조회 (메모이즈)] ---
+    def _spec(self, side, idx, ranks):
+        return {**self.sides[side][idx]['spec'], 'ranks': dict(zip(STATS, ranks))}
+
+    def damage(self, side, att, dfn, move_idx, att_ranks, def_ranks):
+        """ side의 att가 상대 dfn에게 기술 사용 -> ((HP 구간 데미지, 확률), ...) (빗나감 포함) """
+        key = (side, att, dfn, move_idx, att_ranks, def_ranks)
+        cached = self._damage.get(key)
+        if cached is not None: return cached
+        move = self.sides[side][att]['moves'][move_idx]
+        att_spec, def_spec = self._spec(side, att, att_ranks), self._spec(1 - side, dfn, def_ranks)
+        max_damage = int(calculate_damage_math(att_spec, def_spec, move, self.field)['damage_range'].split('~')[1])
+        hp = def_spec['stats']['hp']
+        accuracy = 1.0 if move.get('accuracy') is None else move['accuracy'] / 100
+        dist = {}
+        for roll in range(85, 101):
+            buckets = int(round(max_damage * roll // 100 / hp * 100 / HP_STEP))
+            dist[buckets] = dist.get(buckets, 0.0) + accuracy / 16
+        if accuracy < 1: dist[0] = dist.get(0, 0.0) + 1 - accuracy
+        self._damage[key] = tuple(dist.items())
+        return self._damage[key]
+
+    def my_first(self, active, ranks):
+        """ 같은 우선도일 때 내가 먼저 움직일 확률 """
+        key = (active, ranks)
+        if key not in self._speed:
+            res = check_turn_order(self._spec(0, active[0], ranks[0]), self._spec(1, active[1], ranks[1]),
+                                   self.field, {}, {})
+            self._speed[key] = 0.5 if res['is_my_turn'] is None else float(res['is_my_turn'])
+        return self._speed[key]
+
+    # --- [규칙] ---
+    def actions(self, state, side):
+        active, hps, _, _ = state
+        idx = active[side]
+        acts = [("move", k) for k in range(len(self.sides[side][idx]['moves']))]
+        return acts + [("switch", j) for j, hp in enumerate(hps[side]) if j != idx and hp > 0]
+
+    def _act(self, side, move_idx, active, hps, ranks):
+        """ side가 기술 사용 -> [(확률, hps, ranks)] """
+        mon = self.sides[side][active[side]]
+        move = mon['moves'][move_idx]
+        results = []
+        act_prob = 1.0 - FULL_PARALYSIS if mon['status'] == "Paralysis" else 1.0
+        if act_prob < 1: results.append((1.0 - act_prob, hps, ranks))
+
+        if move['power'] <= 0:
+            boosts = SETUP_BOOSTS.get(move['name'], {})
+            new = tuple(max(-6, min(6, r + boosts.get(s, 0))) for s, r in zip(STATS, ranks[side]))
+            results.append((act_prob, hps, (new, ranks[1]) if side == 0 else (ranks[0], new)))
+            return results
+
+        target = 1 - side
+        t_idx = active[target]
+        for dmg, p in self.damage(side, active[side], t_idx, move_idx, ranks[side], ranks[target]):
+            t_hps = list(hps[target])
+            t_hps[t_idx] = max(0, t_hps[t_idx] - dmg)
+            new_hps = (hps[0], tuple(t_hps)) if target == 1 else (tuple(t_hps), hps[1])
+            results.append((act_prob * p, new_hps, ranks))
+        return results
+
+    def _end_of_turn(self, active, hps):
+        new = []
+        for side in (0, 1):
+            side_hps = list(hps[side])
+            idx = active[side]
+            chip = CHIP_DAMAGE.get(self.sides[side][idx]['status'])
+            if chip and side_hps[idx] > 0:
+                side_hps[idx] = max(0, side_hps[idx] - max(1, int(round(chip / HP_STEP))))
+            new.append(tuple(side_hps))
+        return tuple(new)
+
+    def outcomes(self, state, my_action, opp_action):
+        """ 한 턴 진행 -> [(확률, active, hps, ranks)] (턴 종료 데미지 포함, 기절 교체 전) """
+        active, hps, ranks, _ = state
+        active, ranks = list(active), list(ranks)
+        movers = []
+        for side, action in ((0, my_action), (1, opp_action)):
+            if action[0] == "switch":
+                active[side], ranks[side] = action[1], NO_RANKS
+            else:
+                movers.append((side, action[1]))
+        active, ranks = tuple(active), tuple(ranks)
+
+        if len(movers) == 2:
+            prio = [self.sides[s][active[s]]['moves'][k].get('priority', 0) for s, k in movers]
+            p_me = 1.0 if prio[0] > prio[1] else 0.0 if prio[0] < prio[1] else self.my_first(active, ranks)
+            orders = [(p, order) for p, order in ((p_me, movers), (1 - p_me, movers[::-1])) if p > 0]
+        else:
+            orders = [(1.0, movers)]
+
+        results = []
+        for p_order, order in orders:
+            branches = [(p_order, hps, ranks)]
+            for side, k in order:
+                next_branches = []
+                for p, b_hps, b_ranks in branches:
+                    if b_hps[side][active[side]] <= 0:       # 먼저 맞고 기절 -> 행동 못 함
+                        next_branches.append((p, b_hps, b_ranks))
+                        continue
+                    next_branches.extend((p * q, h, r) for q, h, r in self._act(side, k, active, b_hps, b_ranks))
+                branches = next_branches
+            results.extend((p, active, self._end_of_turn(active, h), r) for p, h, r in branches)
+        return results
+
+    # --- [해석] ---
+    def settle(self, active, hps, ranks, stall, depth=0):
+        """ 턴 종료 후: 승패 판정 / 기절 교체 선택 (나 max, 상대 min) """
+        my_left, opp_left = any(hps[0]), any(hps[1])
+        if not my_left and not opp_left: return 0.5
+        if not opp_left: return 1.0
+        if not my_left: return 0.0
+        my_opts = [active[0]] if hps[0][active[0]] else [j for j, hp in enumerate(hps[0]) if hp]
+        opp_opts = [active[1]] if hps[1][active[1]] else [j for j, hp in enumerate(hps[1]) if hp]
+        return max(
+            min(self.value(((i, j), hps,
+                            (ranks[0] if i == active[0] else NO_RANKS, ranks[1] if j == active[1] else NO_RANKS),
+                            stall), depth)
+                for j in opp_opts)
+            for i in my_opts
+        )
+
+    def q_value(self, state, my_action, opp_action, depth=0):
+        _, hps, _, stall = state
+        total = 0.0
+        for p, active, new_hps, ranks in self.outcomes(state, my_action, opp_action):
+            next_stall = stall + 1 if new_hps == hps else 0
+            total += p * self.settle(active, new_hps, ranks, next_stall, depth + 1)
+        return total
+
+    def estimate(self, state):
+        """ 탐색 한계: 남은 HP 비율 차이로 평가 (rollout.py 턴 제한 판정과 같은 방식) """
+        _, hps, _, _ = state
+        full = 100 / HP_STEP
+        my_frac = sum(hps[0]) / (full * len(hps[0]))
+        opp_frac = sum(hps[1]) / (full * len(hps[1]))
+        return max(0.0, min(1.0, 0.5 + (my_frac - opp_frac) / 2))
+
+    def value(self, state, depth=0):
+        if state[3] >= STALL_LIMIT: return 0.5
+        entry = self.table.get(state)
+        if entry is not None: return entry[0]
+        if self.horizon is not None:
+            remaining = self.horizon - depth
+            if remaining <= 0:
+                self.cutoffs += 1
+                return self.estimate(state)
+            entry = self.shallow.get((state, remaining))
+            if entry is not None:
+                self.cutoffs += 1       # 한계가 있는 값을 썼으므로 이 위치도 정확하지 않음
+                return entry[0]
+
+        self.nodes += 1
+        if self.nodes % TIME_CHECK_INTERVAL == 0 and time.perf_counter() > self.deadline:
+            raise EndgameTimeout()
+
+        cutoffs = self.cutoffs
+        best, best_action = -1.0, None
+        opp_actions = self.actions(state, 1)
+        for action in self.actions(state, 0):
+            worst = 2.0
+            for opp_action in opp_actions:
+                worst = min(worst, self.q_value(state, action, opp_action, depth))
+                if worst <= best: break       # 이미 더 나은 행동이 있음
+            if worst > best: best, best_action = worst, action
+        if self.cutoffs == cutoffs: self.table[state] = (best, best_action)     # 끝까지 풀린 위치만 저장
+        else: self.shallow[(state, self.horizon - depth)] = (best, best_action)
+        self.latest[state] = (best, best_action)
+        return best
+
+    def worst_reply(self, state, action):
+        return min(self.actions(state, 1), key=lambda opp_action: self.q_value(state, action, opp_action))
+
+    def principal_line(self, state, turns=4):
+        """ 최선 행동 / 상대 최악 응수 / 가장 가능성 높은 결과를 따라간 수순 """
+        line = []
+        for _ in range(turns):
+            if state[3] >= STALL_LIMIT or not any(state[1][0]) or not any(state[1][1]): break
+            entry = self.table.get(state) or self.latest.get(state)
+            if not entry or entry[1] is None: break
+            action = entry[1]
+            reply = self.worst_reply(state, action)
+            line.append((state[0], action, reply))
+            p, active, hps, ranks = max(self.outcomes(state, action, reply), key=lambda o: o[0])
+            if not any(hps[0]) or not any(hps[1]): break
+            active = tuple(a if hps[s][a] else next((j for j, hp in enumerate(hps[s]) if hp), a)
+                           for s, a in enumerate(active))
+            state = (active, hps, ranks, 0)
+        return line
+
+
+# --------------------------------------------------------------------------
+# [4] 메인 함수
+# --------------------------------------------------------------------------
+def action_label(scenario, side, active, action):
+    if action[0] == "switch": return f"교체 -> {scenario['sides'][side][action[1]]['name']}"
+    return scenario['sides'][side][active]['moves'][action[1]]['name']
+
+def solve_endgame(battle, budget_ms=ENDGAME_BUDGET_MS, tablebase=None):
+    """
+    [Interface Function]
+    엔드게임이면 보장 승률 / 최선 행동 / 승리 수순을 반환합니다.
+    battle: BattleState 또는 BattleSnapshot (읽기만 함)
+    Returns: {win_prob, action, label, line, exact, depth, nodes, positions, cached, elapsed_ms}
+             exact=False면 끝까지 풀지 못해 depth턴 앞까지만 본 추정치
+             또는 None (엔드게임 아님 / 가장 얕은 단계도 제한 시간 초과)
+    """
+    start = time.perf_counter()
+    scenario = build_scenario(battle)
+    if not scenario: return None
+    tablebase = tablebase or get_endgame_tablebase()
+
+    # 남은 HP만큼 턴이 이어지므로 재귀가 깊어질 수 있음
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), RECURSION_LIMIT))
+    with telemetry.span("battle.endgame") as span:
+        root = scenario["root"]
+        table = tablebase.table(scenario["key"])
+        cached = root in table
+        tablebase.record_lookup(cached)
+        solver = EndgameSolver(scenario, table, deadline=start + budget_ms / 1000)
+        depth = None
+        try:
+            # 반복 심화: 얕은 단계부터 풀고, 한계 안에서 끝까지 풀리면(root가 표에 들어가면) 종료
+            for horizon in ITERATIVE_HORIZONS + (None,):
+                if root in table: break
+                solver.horizon = horizon
+                solver.value(root)
+                depth = horizon
+        except EndgameTimeout:
+            pass
+        finally:
+            # 시간이 모자라도 끝까지 풀린 위치는 저장 -> 다음 턴에 이어서 사용
+            tablebase.save(scenario["key"], table)
+
+        exact = root in table
+        span.update(cache_hit=cached, nodes=solver.nodes, positions=len(table), solved=exact, depth=depth)
+        if not exact and depth is None: return None
+
+        solver.horizon = None if exact else depth
+        win_prob, action = table[root] if exact else solver.latest[root]
+        solver.deadline = float("inf")     # 수순은 이미 계산된 위치를 따라가므로 제한 없이
+        line = [
+            (action_label(scenario, 0, active[0], mine), action_label(scenario, 1, active[1], reply))
+            for active, mine, reply in solver.principal_line(root)
+        ]
+        return {
+            "win_prob": round(win_prob, 3),
+            "action": action,
+            "label": action_label(scenario, 0, root[0][0], action),
+            "line": line,
+            "exact": exact,
+            "depth": None if exact else depth,
+            "nodes": solver.nodes,
+            "positions": len(table),
+            "cached": cached,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1)
+        }
+
+def format_endgame_report(result):
+    """ 어드바이저 프롬프트용 요약 """
+    if not result: return ""
+    if not result.get("exact", True): verdict = f"추정 승률 ({result['depth']}턴 앞까지)"
+    else: verdict = "확정 승리" if result["win_prob"] >= 0.999 else "확정 패배" if result["win_prob"] <= 0.001 else "보장 승률"
+    lines = [f"♟️ [엔드게임 해석] {verdict} {result['win_prob'] * 100:.1f}% -> 추천: {result['label']} "
+             f"(위치 {result['positions']}개, {result['elapsed_ms']}ms)"]
+    if result["line"]:
+        lines.append(" 수순: " + " / ".join(f"{turn}턴 {mine} vs {reply}"
+                                         for turn, (mine, reply) in enumerate(result["line"], 1)))
+    return "\n".join(lines) + "\n"
+
+
+# 전역 인스턴스 (처음 쓰일 때 생성)
+@lazy_resource("endgame_tablebase")
+def get_endgame_tablebase():
+    return Tablebase()
+
+def tablebase_stats():
+    """ 계측용 통계 (테이블베이스를 아직 만들지 않았으면 빈 dict) """
+    return get_endgame_tablebase().get_stats() if get_endgame_tablebase.is_initialized() else {}
@@ -1,12 +1,16 @@
 import os
+import re
 import time
 import json
 import ast
-from dotenv import load_dotenv
 
 # --- [모듈 임포트] ---
-from rag_retriever import get_opponent_party_report, SMOGON_DB, LEAD_STATS
+from rag_retriever import get_opponent_party_report, get_lead_stats
 from Battle_Preparing.user_party import my_party
+from name_aliases import get_aliases, to_english
+from llm_cache import cached_invoke, cached_ainvoke
+from team_cache import get_team_cache, party_fingerprint
+from telemetry import telemetry, extract_usage
 
 # 계산기 모듈
 from Calculator.calculator import run_calculation
@@ -14,46 +18,20 @@ from Calculator.speed_checker import check_turn_order
 from Calculator.stat_estimator import estimate_stats 
 from Calculator.move_loader import get_move_data # [NEW] API기반 기술 로더
 
-# LangChain
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.prompts import PromptTemplate
-
-# 1. 환경 설정
-load_dotenv()
-if not os.getenv("GOOGLE_API_KEY"):
-    raise ValueError("GOOGLE_API_KEY가 .env 파일에 설정되지 않았습니다.")
-
-llm = ChatGoogleGenerativeAI(
-    model="gemini-3-flash-preview", 
-    temperature=0.1, 
-    google_api_key=os.getenv("GOOGLE_API_KEY")
-)
+# LLM 클라이언트는 처음 호출될 때 생성 (get_llm), LangChain은 프롬프트를 만들 때 임포트
+from llm_provider import get_llm
 
 # --------------------------------------------------------------------------
 # [Helper 0] 토큰 정보 추출 함수
 # --------------------------------------------------------------------------
 def get_token_info(response):
-    """LangChain 응답 객체에서 토큰 사용량을 추출합니다."""
-    try:
-        usage = None
-        if hasattr(response, 'usage_metadata') and response.usage_metadata:
-            usage = response.usage_metadata
-        elif hasattr(response, 'response_metadata') and 'usage_metadata' in response.response_metadata:
-            usage = response.response_metadata['usage_metadata']
-            
-        if usage:
-            return {
-                "input_tokens": usage.get('input_tokens', 0),
-                "output_tokens": usage.get('output_tokens', 0),
-                "total_tokens": usage.get('total_tokens', 0)
-            }
-    except Exception:
-        pass
-    return {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+    """LangChain 응답 객체에서 토큰 사용량을 추출합니다. (telemetry.extract_usage와 동일)"""
+    return extract_usage(response)
 
 # --------------------------------------------------------------------------
 # [Helper 1] 시뮬레이션 실행 함수 (수정됨)
 # --------------------------------------------------------------------------
+@telemetry.traced("entry.simulation")
 def run_simulation(my_party_data, opponent_list):
     """
     [핵심] 내 포켓몬 vs 상대 주요 선봉의 대면 시뮬레이션 실행
@@ -61,7 +39,8 @@ def run_simulation(my_party_data, opponent_list):
     report = "=== ⚔️ 선봉 대면 시뮬레이션 (Simulation Report) ===\n"
     
     # 1. 상대 선봉 후보 선정 (Top 3)
-    sorted_opps = sorted(opponent_list, key=lambda x: LEAD_STATS.get(x, 0), reverse=True)[:3]
+    lead_stats = get_lead_stats()
+    sorted_opps = sorted(opponent_list, key=lambda x: lead_stats.get(x, 0), reverse=True)[:3]
     report += f"🎯 상대 유력 선봉 TOP 3: {', '.join(sorted_opps)}\n\n"
 
     for my_name, my_data in my_party_data.items():
@@ -166,27 +145,16 @@ def extract_clean_content(response):
     except Exception as e:
         return f"Error: {e}"
         
-def parse_opponent_input(user_input_batch):
-    """
-    [Batch Process] 여러 파티 정보를 한번에 번역
-    Input: "파티1 / 파티2 / ..." (슬래시로 구분된 문자열)
-    Returns: (parsed_data_dict, token_usage_dict)
-    Output schema: { "party_0": ["Mon1",...], "party_1": ["Mon1",...] }
-    """
-    
-    # 입력 전처리: 슬래시(/)로 구분하여 리스트화
-    if isinstance(user_input_batch, list):
-        party_list = user_input_batch
-    else:
-        # 슬래시로 분리하고 빈 항목 제거
-        party_list = [p.strip() for p in str(user_input_batch).split('/') if p.strip()]
-        
-    input_text = "\n".join(party_list)
-        
-    line_count = len(party_list)
-    print(f"🔄 입력된 {line_count}개 파티 정보를 일괄 표준화(Batch Processing) 중입니다...")
-
-    parser_template = """
+def parse_party_line_locally(line):
+    """ 이름 사전으로 파티 한 줄을 변환 (모든 이름을 인식했을 때만 리스트 반환) """
+    separator = "," if "," in line else None
+    names = [n.strip() for n in line.split(separator) if n.strip()]
+    translated = [to_english(n) for n in names]
+    if not translated or None in translated:
+        return None
+    return translated
+
+NAME_PARSER_TEMPLATE = """
     당신은 '포켓몬 이름 번역기'입니다. 비용 절감을 위해 배치 처리(Batch Processing)를 수행합니다.
     입력된 데이터는 개행문자(New Line)로 구분된 여러 상대방의 포켓몬 파티입니다.
     각 줄(Line)에 포함된 한국어 포켓몬 이름(약어/별명 포함)을 **Smogon/Showdown 영어 공식 명칭**으로 변환하세요.
@@ -205,32 +173,101 @@ def parse_opponent_input(user_input_batch):
         "party_1": ["Gholdengo", "Ogerpon-Wellspring", "Ting-Lu", ...]
     }}
     """
+
+def parse_json_content(response):
+    """ LLM 응답 -> dict (코드 블럭 제거 후 JSON, 실패 시 파이썬 리터럴로 재시도 / 둘 다 실패하면 예외) """
+    content = extract_clean_content(response)
+    clean_content = content.replace("```json", "").replace("```python", "").replace("```", "").strip()
     try:
-        response = llm.invoke(parser_template.format(user_input=input_text))
-        
-        # 토큰 정보 추출
-        token_info = get_token_info(response)
-        print(f"💰 [Batch Parser] Tokens: I:{token_info['input_tokens']} + O:{token_info['output_tokens']} = {token_info['total_tokens']}")
+        return json.loads(clean_content)
+    except:
+        return ast.literal_eval(clean_content)
 
-        content = extract_clean_content(response)
-        clean_content = content.replace("```json", "").replace("```python", "").replace("```", "").strip()
-        
-        parsed_data = {}
-        try:
-            parsed_data = json.loads(clean_content)
-        except:
-            try:
-                parsed_data = ast.literal_eval(clean_content)
-            except Exception as parse_err:
-                 print(f"⚠️ 파싱 포맷 에러: {parse_err}")
-                 # 실패 시 빈 딕셔너리 반환
-                 return {}, token_info
-        
-        return parsed_data, token_info
-        
+def is_json_response(response):
+    """ 응답 캐시 저장 조건 (validate): dict로 파싱되는 응답만 """
+    try:
+        return isinstance(parse_json_content(response), dict)
+    except Exception:
+        return False
+
+def split_party_input(user_input_batch):
+    """
+    입력 전처리 + 로컬 변환
+    Returns: (파티 줄 리스트, 로컬 변환 결과 {party_N: [...]}, LLM에 보낼 줄 {party_N: "..."})
+    """
+    # 입력 전처리: 슬래시(/)로 구분하여 리스트화
+    if isinstance(user_input_batch, list):
+        party_list = user_input_batch
+    else:
+        # 슬래시로 분리하고 빈 항목 제거
+        party_list = [p.strip() for p in str(user_input_batch).split('/') if p.strip()]
+
+    # 로컬 변환 (토큰 비용 없음)
+    local_data = {}
+    unresolved = {}
+    for idx, line in enumerate(party_list):
+        translated = parse_party_line_locally(line)
+        if translated: local_data[f"party_{idx}"] = translated
+        else: unresolved[f"party_{idx}"] = line
+    return party_list, local_data, unresolved
+
+def merge_parsed_names(party_list, local_data, unresolved, parsed_data):
+    """ LLM 결과의 키(party_0..)를 원래 줄 번호로 되돌리고 입력 순서대로 병합 """
+    for llm_idx, party_id in enumerate(unresolved):
+        if f"party_{llm_idx}" in parsed_data:
+            local_data[party_id] = parsed_data[f"party_{llm_idx}"]
+    return {f"party_{i}": local_data[f"party_{i}"] for i in range(len(party_list)) if f"party_{i}" in local_data}
+
+def parse_opponent_input(user_input_batch):
+    """
+    [Batch Process] 여러 파티 정보를 한번에 번역
+    이름 사전으로 전부 인식되는 줄은 로컬에서 변환하고, 나머지 줄만 LLM에 보냅니다.
+    Input: "파티1 / 파티2 / ..." (슬래시로 구분된 문자열)
+    Returns: (parsed_data_dict, token_usage_dict)
+    Output schema: { "party_0": ["Mon1",...], "party_1": ["Mon1",...] }
+    """
+    party_list, local_data, unresolved = split_party_input(user_input_batch)
+
+    if not unresolved:
+        print(f"⚡ [Local Parser] {len(party_list)}개 파티 이름을 로컬에서 변환했습니다.")
+        return local_data, {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+
+    print(f"🔄 입력된 {len(unresolved)}개 파티 정보를 일괄 표준화(Batch Processing) 중입니다...")
+    try:
+        response = cached_invoke(get_llm(temperature=0.1), NAME_PARSER_TEMPLATE.format(user_input="\n".join(unresolved.values())), stage="entry.parse_names", validate=is_json_response)
+        return finish_name_parse(response, party_list, local_data, unresolved)
     except Exception as e:
         print(f"❌ 배치 이름 변환 실패: {e}")
-        return {}, {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+        return local_data, {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+
+async def parse_opponent_input_async(user_input_batch):
+    """ parse_opponent_input의 비동기 버전 (ainvoke) """
+    party_list, local_data, unresolved = split_party_input(user_input_batch)
+
+    if not unresolved:
+        print(f"⚡ [Local Parser] {len(party_list)}개 파티 이름을 로컬에서 변환했습니다.")
+        return local_data, {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+
+    print(f"🔄 입력된 {len(unresolved)}개 파티 정보를 일괄 표준화(Batch Processing) 중입니다...")
+    try:
+        response = await cached_ainvoke(get_llm(temperature=0.1), NAME_PARSER_TEMPLATE.format(user_input="\n".join(unresolved.values())), stage="entry.parse_names", validate=is_json_response)
+        return finish_name_parse(response, party_list, local_data, unresolved)
+    except Exception as e:
+        print(f"❌ 배치 이름 변환 실패: {e}")
+        return local_data, {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+
+def finish_name_parse(response, party_list, local_data, unresolved):
+    # 토큰 정보 추출
+    token_info = get_token_info(response)
+    print(f"💰 [Batch Parser] Tokens: I:{token_info['input_tokens']} + O:{token_info['output_tokens']} = {token_info['total_tokens']}")
+
+    try:
+        parsed_data = parse_json_content(response)
+    except Exception as parse_err:
+        print(f"⚠️ 파싱 포맷 에러: {parse_err}")
+        # 실패 시 로컬 변환분만 반환
+        return local_data, token_info
+    return merge_parsed_names(party_list, local_data, unresolved, parsed_data), token_info
 
 def format_my_party_info():
     if not my_party.team: return "❌ 내 파티 정보 없음"
@@ -242,66 +279,7 @@ def format_my_party_info():
         text += f"[{name}] @ {data['item']} | {data['ability']} | {data['tera_type']} Tera | Stats: {stat_str} | Moves: {moves}\n"
     return text
 
-# --------------------------------------------------------------------------
-# [Main Function] 분석 실행
-# --------------------------------------------------------------------------
-def analyze_entry_strategy(opponent_input):
-    """
-    [Entry Phase] 배치 처리 지원 (Batch Supported)
-    Calculates simulations for ALL parties, then sends ONE prompt to LLM.
-    
-    Args:
-        opponent_input: Raw string (lines of parties) OR List of strings
-        
-    Returns: 
-        (analysis_result_dict, token_usage_dict)
-        Output schema: { "party_0": "Report Text...", "party_1": "Report Text..." }
-    """
-    total_tokens = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
-    
-    # 1. 입력 파싱 (배치 파서 사용)
-    # opponent_input이 이미 딕셔너리라면 파싱 건너뜀 (확장성 고려)
-    if isinstance(opponent_input, dict):
-        parsed_batch = opponent_input
-    else:
-        parsed_batch, parse_tokens = parse_opponent_input(opponent_input)
-        for k in total_tokens: total_tokens[k] += parse_tokens[k]
-
-    if not parsed_batch: 
-        return {}, total_tokens
-
-    party_count = len(parsed_batch)
-    print(f"🔍 [Entry Phase] {party_count}개 파티에 대한 시뮬레이션 및 배치 분석 준비 중...")
-
-    # 2. Python 내부 연산 (RAG + Simulation) - 토큰 비용 없음
-    # 각 파티별로 Context를 미리 생성하여 텍스트 덩어리로 만듭니다.
-    my_team_basic = format_my_party_info()
-    
-    batch_context_text = ""
-    
-    for party_id, opp_list in parsed_batch.items():
-        # A. 상대 파티 RAG 데이터
-        opp_context = get_opponent_party_report(opp_list)
-        
-        # B. 대면 시뮬레이션 (계산기)
-        try:
-            sim_report = run_simulation(my_party.team, opp_list)
-        except Exception as e:
-            sim_report = f"Simulation Error: {e}"
-            
-        # C. 텍스트 결합
-        batch_context_text += f"""
-        [[ {party_id} 상세 데이터 ]]
-        1. Opponent Team Info:
-        {opp_context}
-        
-        2. Simulation Report:
-        {sim_report}
-        --------------------------------------------------
-        """
-
-    # 3. 배치 프롬프트 설계
-    template = """
+STRATEGY_TEMPLATE = """
     당신은 '포켓몬 랭크배틀(3vs3 싱글)' 전문 AI 코치입니다.
     
     아래에는 **사용자의 파티(My Team)** 정보 하나와, **여러 명의 상대방(Opponents)** 데이터가 나열되어 있습니다.
@@ -343,61 +321,329 @@ def analyze_entry_strategy(opponent_input):
     **주의**: Markdown 코드 블럭 없이 순수 JSON만 출력하세요.
     """
 
-    prompt = PromptTemplate.from_template(template)
-    chain = prompt | llm
+# 비동기 파이프라인의 서브 배치 크기 / 동시 LLM 호출 수
+ENTRY_SUB_BATCH_SIZE = int(os.getenv("ENTRY_SUB_BATCH_SIZE", 2))
+ENTRY_MAX_CONCURRENCY = int(os.getenv("ENTRY_MAX_CONCURRENCY", 4))
+
+def build_party_context(party_id, opp_list):
+    """ 파티 1개의 RAG 데이터 + 대면 시뮬레이션 텍스트 (토큰 비용 없음) """
+    # A. 상대 파티 RAG 데이터
+    opp_context = get_opponent_party_report(opp_list)
     
+    # B. 대면 시뮬레이션 (계산기)
     try:
-        start_time = time.time()
+        sim_report = run_simulation(my_party.team, opp_list)
+    except Exception as e:
+        sim_report = f"Simulation Error: {e}"
         
-        response = chain.invoke({
-            "my_team_context": my_team_basic,
-            "batch_context_text": batch_context_text
-        })
+    # C. 텍스트 결합
+    return f"""
+        [[ {party_id} 상세 데이터 ]]
+        1. Opponent Team Info:
+        {opp_context}
         
-        end_time = time.time()
-        print(f"⏱️ 배치 분석 완료! (소요 시간: {end_time - start_time:.2f}초)")
+        2. Simulation Report:
+        {sim_report}
+        --------------------------------------------------
+        """
 
-        # 토큰 정보 추출
-        main_tokens = get_token_info(response)
-        print(f"💰 [Strategy Batch] Tokens: I:{main_tokens['input_tokens']} + O:{main_tokens['output_tokens']} = {main_tokens['total_tokens']}")
+def lookup_cached_analyses(parsed_batch):
+    """ 파티 분석 캐시 조회 (동일/유사 파티는 LLM 분석 생략) -> {party_id: report} """
+    cached_results = {}
+    party = party_fingerprint(my_party.team)   # 내 파티가 같을 때만 재사용
+    for party_id, opp_list in parsed_batch.items():
+        with telemetry.span("entry.team_cache") as span:
+            report, similarity = get_team_cache().lookup(opp_list, party)
+            span["cache_hit"] = report is not None
+        if report:
+            cached_results[party_id] = report
+            print(f"♻️ [Team Cache] {party_id} 재사용 (유사도 {similarity:.2f})")
+    return cached_results
+
+def format_strategy_prompt(batch_context_text):
+    from langchain_core.prompts import PromptTemplate
+
+    prompt = PromptTemplate.from_template(STRATEGY_TEMPLATE)
+    return prompt.format(
+        my_team_context=format_my_party_info(),
+        batch_context_text=batch_context_text
+    )
+
+def finish_strategy_response(response, parsed_batch, elapsed, store=True):
+    """
+    배치 분석 응답 처리: 파싱 + 파티 분석 캐시 저장 (store=False면 저장 생략)
+    Returns: (result_dict 또는 파싱 실패 시 None, token_info)
+    """
+    print(f"⏱️ 배치 분석 완료! (소요 시간: {elapsed:.2f}초)")
+
+    # 토큰 정보 추출
+    main_tokens = get_token_info(response)
+    print(f"💰 [Strategy Batch] Tokens: I:{main_tokens['input_tokens']} + O:{main_tokens['output_tokens']} = {main_tokens['total_tokens']}")
+
+    # 결과 파싱
+    try:
+        result_dict = parse_json_content(response)
+    except Exception as e:
+        print(f"⚠️ 배치 결과 JSON 파싱 실패: {e}")
+        return None, main_tokens
+
+    if not store:
+        return result_dict, main_tokens
+
+    # 파티별 분석 저장 (배치 비용을 파티 수로 나누어 기록)
+    per_party_latency = elapsed / len(parsed_batch)
+    per_party_tokens = main_tokens['total_tokens'] / len(parsed_batch)
+    party = party_fingerprint(my_party.team)
+    for party_id, report in result_dict.items():
+        if party_id in parsed_batch:
+            get_team_cache().store(parsed_batch[party_id], report, per_party_latency, per_party_tokens, party=party)
+    return result_dict, main_tokens
+
+# --------------------------------------------------------------------------
+# [Main Function] 분석 실행
+# --------------------------------------------------------------------------
+def analyze_entry_strategy(opponent_input, use_team_cache=True, store_team_cache=True):
+    """
+    [Entry Phase] 배치 처리 지원 (Batch Supported)
+    Calculates simulations for ALL parties, then sends ONE prompt to LLM.
+    
+    Args:
+        opponent_input: Raw string (lines of parties) OR List of strings
+        use_team_cache: False면 이전/사전 분석을 재사용하지 않고 새로 분석 (사전 계산 배치용)
+        store_team_cache: False면 분석 결과를 파티 분석 캐시에 저장하지 않음 (--no-cache 실행용)
         
+    Returns: 
+        (analysis_result_dict, token_usage_dict)
+        Output schema: { "party_0": "Report Text...", "party_1": "Report Text..." }
+    """
+    total_tokens = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+    
+    # 1. 입력 파싱 (배치 파서 사용)
+    # opponent_input이 이미 딕셔너리라면 파싱 건너뜀 (확장성 고려)
+    if isinstance(opponent_input, dict):
+        parsed_batch = opponent_input
+    else:
+        parsed_batch, parse_tokens = parse_opponent_input(opponent_input)
+        for k in total_tokens: total_tokens[k] += parse_tokens[k]
+
+    if not parsed_batch: 
+        return {}, total_tokens
+
+    # 1-1. 파티 분석 캐시 조회 (동일/유사 파티는 LLM 분석 생략)
+    cached_results = lookup_cached_analyses(parsed_batch) if use_team_cache else {}
+
+    parsed_batch = {pid: opp for pid, opp in parsed_batch.items() if pid not in cached_results}
+    if not parsed_batch:
+        return cached_results, total_tokens
+
+    print(f"🔍 [Entry Phase] {len(parsed_batch)}개 파티에 대한 시뮬레이션 및 배치 분석 준비 중...")
+
+    # 2. Python 내부 연산 (RAG + Simulation) - 토큰 비용 없음
+    # 각 파티별로 Context를 미리 생성하여 텍스트 덩어리로 만듭니다.
+    batch_context_text = "".join(build_party_context(pid, opp) for pid, opp in parsed_batch.items())
+
+    # 3. 배치 프롬프트 호출
+    try:
+        start_time = time.time()
+        response = cached_invoke(get_llm(temperature=0.1), format_strategy_prompt(batch_context_text), stage="entry.strategy", validate=is_json_response)
+        result_dict, main_tokens = finish_strategy_response(response, parsed_batch, time.time() - start_time,
+                                                           store=store_team_cache)
+
         # 토큰 누적
         for k in total_tokens: total_tokens[k] += main_tokens[k]
+        if result_dict is None:
+            return cached_results, total_tokens
 
-        # 결과 파싱
-        content = extract_clean_content(response)
-        clean_content = content.replace("```json", "").replace("```", "").strip()
-        
-        result_dict = {}
-        try:
-            result_dict = json.loads(clean_content)
-        except:
-            try:
-                result_dict = ast.literal_eval(clean_content)
-            except Exception as e:
-                print(f"⚠️ 배치 결과 JSON 파싱 실패: {e}")
-                return {}, total_tokens
-
+        result_dict.update(cached_results)
         return result_dict, total_tokens
 
     except Exception as e:
         return {"error": f"❌ Gemini 분석 중 오류 발생: {str(e)}"}, total_tokens
-    
-def parse_recommended_selection(ai_response_batch):
+
+async def analyze_entry_strategy_async(opponent_input, use_team_cache=True, contexts=None,
+                                       sub_batch_size=ENTRY_SUB_BATCH_SIZE, semaphore=None,
+                                       store_team_cache=True):
     """
-    [New] 배치 처리된 전략 리포트 딕셔너리에서 선출 정보를 일괄 추출
-    Input: { "party_0": "Report...", "party_1": "Report..." }
-    Returns: ( { "party_0": {lead, back1, back2}, ... }, token_usage_dict )
+    [Entry Phase - Async] analyze_entry_strategy의 비동기 버전
+    캐시에 없는 파티를 sub_batch_size개씩 나누어 동시에 분석합니다. (ainvoke + asyncio.gather)
+    contexts: 미리 만들어 둔 {party_id: build_party_context 결과} (없는 파티만 새로 계산)
+    semaphore: 동시 LLM 호출 수 제한 (여러 호출이 공유할 때 전달, 기본: ENTRY_MAX_CONCURRENCY)
+    store_team_cache: False면 분석 결과를 파티 분석 캐시에 저장하지 않음
     """
-    if not ai_response_batch or not isinstance(ai_response_batch, dict):
-        return {}, {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+    import asyncio
 
-    print("🔄 AI 추천 선출을 일괄 파싱(Batch Parsing)하여 상태에 반영 중...")
-    
-    # 입력 데이터를 JSON 문자열로 변환하여 프롬프트에 삽입
-    input_json_str = json.dumps(ai_response_batch, ensure_ascii=False)
+    total_tokens = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+
+    if isinstance(opponent_input, dict):
+        parsed_batch = opponent_input
+    else:
+        parsed_batch, parse_tokens = await parse_opponent_input_async(opponent_input)
+        for k in total_tokens: total_tokens[k] += parse_tokens[k]
+
+    if not parsed_batch:
+        return {}, total_tokens
+
+    cached_results = lookup_cached_analyses(parsed_batch) if use_team_cache else {}
+    parsed_batch = {pid: opp for pid, opp in parsed_batch.items() if pid not in cached_results}
+    if not parsed_batch:
+        return cached_results, total_tokens
+
+    contexts = dict(contexts or {})
+    for pid, opp in parsed_batch.items():
+        if pid not in contexts: contexts[pid] = build_party_context(pid, opp)
+
+    step = max(1, sub_batch_size)
+    party_ids = list(parsed_batch)
+    sub_batches = [party_ids[i:i + step] for i in range(0, len(party_ids), step)]
+    print(f"🔍 [Entry Phase] {len(party_ids)}개 파티를 {len(sub_batches)}개 서브 배치로 동시 분석 중...")
+
+    semaphore = semaphore or asyncio.Semaphore(ENTRY_MAX_CONCURRENCY)
+
+    async def analyze_sub_batch(ids):
+        sub_batch = {pid: parsed_batch[pid] for pid in ids}
+        async with semaphore:
+            start_time = time.time()
+            response = await cached_ainvoke(
+                get_llm(temperature=0.1),
+                format_strategy_prompt("".join(contexts[pid] for pid in ids)),
+                stage="entry.strategy", validate=is_json_response
+            )
+        return finish_strategy_response(response, sub_batch, time.time() - start_time, store=store_team_cache)
+
+    results = await asyncio.gather(*(analyze_sub_batch(ids) for ids in sub_batches), return_exceptions=True)
+
+    result_dict = {}
+    for outcome in results:
+        if isinstance(outcome, Exception):
+            print(f"❌ 서브 배치 분석 실패: {outcome}")
+            continue
+        sub_result, main_tokens = outcome
+        for k in total_tokens: total_tokens[k] += main_tokens[k]
+        if sub_result: result_dict.update(sub_result)
+
+    if not result_dict and not cached_results:
+        return {"error": "❌ Gemini 분석 중 오류 발생: 모든 서브 배치 실패"}, total_tokens
+
+    result_dict.update(cached_results)
+    return result_dict, total_tokens
+
+def analyze_entry_fast(opponent_input, explain=False):
+    """
+    [Entry Phase - 빠른 선출 모드]
+    matchup_engine으로 선출/선봉을 로컬 계산 (LLM 없음, 선출 시간 제한 대응).
+    explain=True면 계산 결과에 대한 승리 플랜 설명만 LLM에 한 번 요청합니다.
+
+    Returns: analyze_entry_strategy와 같은 (analysis_result_dict, token_usage_dict)
+    """
+    from matchup_engine import recommend_selection, format_fast_report
+
+    total_tokens = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+
+    if isinstance(opponent_input, dict):
+        parsed_batch = opponent_input
+    else:
+        parsed_batch, parse_tokens = parse_opponent_input(opponent_input)
+        for k in total_tokens: total_tokens[k] += parse_tokens[k]
+
+    result_dict = {}
+    for party_id, opp_list in parsed_batch.items():
+        try:
+            result = recommend_selection(opp_list)
+        except Exception as e:
+            print(f"⚠️ [Fast Mode] {party_id} 계산 실패: {e}")
+            continue
+        if result:
+            result_dict[party_id] = format_fast_report(result)
+            print(f"⚡ [Fast Mode] {party_id} 선출 계산 완료 ({result['elapsed'] * 1000:.0f}ms)")
 
-    parser_template = """
+    if not explain or not result_dict:
+        return result_dict, total_tokens
+
+    # 계산 결과 해설 (실패하면 로컬 리포트 그대로 반환)
+    template = """
+    당신은 포켓몬 랭크배틀 선출 결과 해설가입니다.
+    아래 각 파티(Key: party_0, party_1...)의 선출은 계산기로 이미 확정되었습니다. 선출은 바꾸지 마세요.
+    각 파티에 대해 선봉 대면과 후속 운영을 2~3줄의 한국어 승리 플랜으로 설명하세요.
+
+    [계산 결과 (JSON)]
+    {reports_json}
+
+    [출력 형식 (JSON Only)]
+    {{ "party_0": "승리 플랜 설명", ... }}
+    """
+    from langchain_core.prompts import PromptTemplate
+
+    prompt = PromptTemplate.from_template(template)
+    try:
+        response = cached_invoke(get_llm(temperature=0.1), prompt.format(
+            reports_json=json.dumps(result_dict, ensure_ascii=False)
+        ), stage="entry.explain", validate=is_json_response)
+
+        explain_tokens = get_token_info(response)
+        for k in total_tokens: total_tokens[k] += explain_tokens[k]
+
+        plans = parse_json_content(response)
+        for party_id, plan in plans.items():
+            if party_id in result_dict and isinstance(plan, str):
+                result_dict[party_id] = re.sub(r"3\. 승리 플랜: [^\n]*", lambda _: f"3. 승리 플랜: {plan.strip()}", result_dict[party_id])
+    except Exception as e:
+        print(f"⚠️ [Fast Mode] 해설 생성 실패 (계산 결과만 반환): {e}")
+
+    return result_dict, total_tokens
+
+# --------------------------------------------------------------------------
+# [Helper 3] 로컬 선출 추출 (LLM 호출 없음)
+# --------------------------------------------------------------------------
+# 리포트 양식의 고정 마커: "선봉(Lead): ..." / "후속(Back): ..." / "세 마리 구성 요약: ..."
+LEAD_PATTERN = re.compile(r"선봉\s*\(Lead\)\s*[:：]\s*([^\n]*)")
+BACK_PATTERN = re.compile(r"후속\s*\(Back\)\s*[:：]\s*([^\n]*)")
+SUMMARY_PATTERN = re.compile(r"세\s*마리\s*구성\s*요약\s*[:：]\s*([^\n]*)")
+
+def find_party_names(text, party_names):
+    """ 텍스트 조각에서 내 파티 포켓몬 이름(한국어 별칭 포함)을 등장 순서대로 반환 """
+    lowered = text.lower()
+    found = []
+    for name in party_names:
+        positions = [lowered.find(alias.lower()) for alias in get_aliases(name)]
+        positions = [pos for pos in positions if pos >= 0]
+        if positions:
+            found.append((min(positions), name))
+    return [name for _, name in sorted(found)]
+
+def extract_selection_locally(report_text, party_names):
+    """
+    [Local Parser] 리포트의 '선봉(Lead)' / '후속(Back)' 구간에서 선출 3마리를 추출합니다.
+    Returns: {lead, back1, back2} 또는 None (파싱 불가 시)
+    """
+    if not isinstance(report_text, str) or not party_names:
+        return None
+
+    # 마크다운 강조 표시 제거 ("**선봉(Lead): 랜드로스**")
+    text = report_text.replace("\\n", "\n").replace("**", "")
+
+    lead_match = LEAD_PATTERN.search(text)
+    if not lead_match: return None
+    lead_names = find_party_names(lead_match.group(1), party_names)
+    if not lead_names: return None
+    lead = lead_names[0]
+
+    back_names = []
+    back_match = BACK_PATTERN.search(text)
+    if back_match:
+        back_names = [n for n in find_party_names(back_match.group(1), party_names) if n != lead]
+
+    # 후속 구간이 불완전하면 '세 마리 구성 요약'으로 보완
+    if len(back_names) < 2:
+        summary_match = SUMMARY_PATTERN.search(text)
+        if summary_match:
+            for n in find_party_names(summary_match.group(1), party_names):
+                if n != lead and n not in back_names:
+                    back_names.append(n)
+
+    if len(back_names) < 2: return None
+    return {"lead": lead, "back1": back_names[0], "back2": back_names[1]}
+
+SELECTION_PARSER_TEMPLATE = """
     당신은 '포켓몬 선출 리포트 파서'입니다. 배치 처리 모드입니다.
     입력된 JSON 객체는 여러 게임에 대한 분석 리포트(Value)를 담고 있습니다.
     각 리포트 텍스트에서 AI가 추천한 **[나의 선출 포켓몬 3마리]**를 추출하여 구조화된 JSON으로 반환하세요.
@@ -416,31 +662,193 @@ def parse_recommended_selection(ai_response_batch):
         ...
     }}
     """
-    
-    prompt = PromptTemplate.from_template(parser_template)
-    chain = prompt | llm
-    
+
+def split_selection_locally(ai_response_batch):
+    """ 로컬 추출 (토큰 비용 없음) -> (추출 결과, LLM에 보낼 리포트) """
+    party_names = list(my_party.team.keys())
+    parsed_result = {}
+    unresolved = {}
+    for party_id, report in ai_response_batch.items():
+        selection = extract_selection_locally(report, party_names)
+        if selection:
+            parsed_result[party_id] = selection
+        else:
+            unresolved[party_id] = report
+
+    print(f"⚡ [Selection Local] {len(parsed_result)}/{len(ai_response_batch)}개 리포트 로컬 추출 완료")
+    return parsed_result, unresolved
+
+def parse_recommended_selection(ai_response_batch):
+    """
+    [New] 배치 처리된 전략 리포트 딕셔너리에서 선출 정보를 일괄 추출
+    로컬 파서로 먼저 추출하고, 파싱에 실패한 리포트만 LLM에 보냅니다.
+    Input: { "party_0": "Report...", "party_1": "Report..." }
+    Returns: ( { "party_0": {lead, back1, back2}, ... }, token_usage_dict )
+    """
+    if not ai_response_batch or not isinstance(ai_response_batch, dict):
+        return {}, {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+
+    # 1. 로컬 추출 (토큰 비용 없음)
+    parsed_result, unresolved = split_selection_locally(ai_response_batch)
+    if not unresolved:
+        return parsed_result, {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+
+    # 2. 로컬 파싱 실패분만 LLM 배치 파싱
+    llm_result, token_info = parse_recommended_selection_llm(unresolved)
+    parsed_result.update(llm_result)
+    return parsed_result, token_info
+
+async def parse_recommended_selection_async(ai_response_batch):
+    """ parse_recommended_selection의 비동기 버전 (LLM 폴백에 ainvoke 사용) """
+    if not ai_response_batch or not isinstance(ai_response_batch, dict):
+        return {}, {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+
+    parsed_result, unresolved = split_selection_locally(ai_response_batch)
+    if not unresolved:
+        return parsed_result, {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+
+    print("🔄 AI 추천 선출을 일괄 파싱(Batch Parsing)하여 상태에 반영 중...")
     try:
-        response = chain.invoke({"input_json": input_json_str})
-        
-        # 토큰 정보 추출
-        token_info = get_token_info(response)
-        print(f"💰 [Selection Batch] Tokens: I:{token_info['input_tokens']} + O:{token_info['output_tokens']} = {token_info['total_tokens']}")
+        response = await cached_ainvoke(get_llm(temperature=0.1), format_selection_prompt(unresolved), stage="entry.selection", validate=is_json_response)
+        llm_result, token_info = finish_selection_response(response)
+    except Exception as e:
+        print(f"❌ 배치 선출 파싱 실패: {e}")
+        llm_result, token_info = {}, {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+    parsed_result.update(llm_result)
+    return parsed_result, token_info
 
-        content = extract_clean_content(response)
-        clean_json = content.replace("```json", "").replace("```", "").strip()
-        
-        parsed_result = {}
-        try:
-            parsed_result = json.loads(clean_json)
-        except:
-            parsed_result = ast.literal_eval(clean_json)
-            
-        return parsed_result, token_info
+def format_selection_prompt(ai_response_batch):
+    from langchain_core.prompts import PromptTemplate
+
+    # 입력 데이터를 JSON 문자열로 변환하여 프롬프트에 삽입
+    prompt = PromptTemplate.from_template(SELECTION_PARSER_TEMPLATE)
+    return prompt.format(input_json=json.dumps(ai_response_batch, ensure_ascii=False))
+
+def finish_selection_response(response):
+    # 토큰 정보 추출
+    token_info = get_token_info(response)
+    print(f"💰 [Selection Batch] Tokens: I:{token_info['input_tokens']} + O:{token_info['output_tokens']} = {token_info['total_tokens']}")
+    return parse_json_content(response), token_info
+
+def parse_recommended_selection_llm(ai_response_batch):
+    """
+    [LLM Fallback] 로컬 파서가 처리하지 못한 리포트에서 선출 정보를 일괄 추출
+    Input: { "party_0": "Report...", "party_1": "Report..." }
+    Returns: ( { "party_0": {lead, back1, back2}, ... }, token_usage_dict )
+    """
+    if not ai_response_batch or not isinstance(ai_response_batch, dict):
+        return {}, {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+
+    print("🔄 AI 추천 선출을 일괄 파싱(Batch Parsing)하여 상태에 반영 중...")
+    try:
+        response = cached_invoke(get_llm(temperature=0.1), format_selection_prompt(ai_response_batch), stage="entry.selection", validate=is_json_response)
+        return finish_selection_response(response)
         
     except Exception as e:
         print(f"❌ 배치 선출 파싱 실패: {e}")
         return {}, {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+
+# --------------------------------------------------------------------------
+# [Async Pipeline] 파싱 -> 분석 -> 선출을 겹쳐서 실행
+# --------------------------------------------------------------------------
+def _no_progress(stage, done, total):
+    pass
+
+async def run_entry_pipeline_async(user_input_batch, use_team_cache=True, sub_batch_size=ENTRY_SUB_BATCH_SIZE,
+                                   progress=_no_progress):
+    """
+    [Entry Phase - Async Pipeline]
+    1. 이름 사전으로 변환된 파티는 이름 파싱 LLM 응답을 기다리지 않고 바로 RAG/시뮬레이션 -> 분석 시작
+       (로컬 변환 결과는 LLM 결과와 병합할 때 그대로 유지되므로 미리 진행해도 안전)
+    2. 파티들을 서브 배치로 나누어 분석을 동시에 요청하고, 끝난 서브 배치부터 바로 선출 추출
+    -> 전체 소요 시간 ≈ 가장 긴 LLM 호출 경로 (세 단계의 합이 아님)
+    progress(stage, done, total): 단계별 진행 보고 ("parse" / "analysis" / "selection", 파티 수 기준)
+
+    Returns: (parsed_dict, analysis_dict, selection_dict, token_usage_dict)
+    """
+    import asyncio
+
+    step = max(1, sub_batch_size)
+    semaphore = asyncio.Semaphore(ENTRY_MAX_CONCURRENCY)
+    party_list, local_data, _ = split_party_input(user_input_batch)
+    total = len(party_list)
+    finished = {"analysis": 0, "selection": 0}
+
+    def advance(stage, count):
+        finished[stage] += count
+        progress(stage, finished[stage], total)
+
+    async def analyze_and_select(chunk):
+        # 파티 분석 캐시를 먼저 조회 -> 캐시에 없는 파티만 RAG/시뮬레이션 (스레드에서 계산, 이벤트 루프를 막지 않음)
+        cached = lookup_cached_analyses(chunk) if use_team_cache else {}
+        live = {pid: opp for pid, opp in chunk.items() if pid not in cached}
+        analysis, a_tokens = dict(cached), {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+        if live:
+            contexts = await asyncio.to_thread(lambda: {pid: build_party_context(pid, opp) for pid, opp in live.items()})
+            result, a_tokens = await analyze_entry_strategy_async(
+                live, use_team_cache=False, contexts=contexts, sub_batch_size=step, semaphore=semaphore
+            )
+            # 캐시 적중분이 있으면 "모든 서브 배치 실패" 오류 대신 적중분만 반환 (analyze_entry_strategy_async와 같은 규칙)
+            analysis.update({} if cached and "error" in result else result)
+        advance("analysis", len(chunk))
+        selection, s_tokens = await parse_recommended_selection_async(
+            {pid: report for pid, report in analysis.items() if pid in chunk}
+        )
+        advance("selection", len(chunk))
+        return analysis, selection, [a_tokens, s_tokens]
+
+    def start_chunks(batch):
+        ids = list(batch)
+        return [asyncio.create_task(analyze_and_select({pid: batch[pid] for pid in ids[i:i + step]}))
+                for i in range(0, len(ids), step)]
+
+    # 1. 로컬 변환분은 즉시 분석 시작, 이름 파싱 LLM 호출은 동시에 진행
+    for stage, stage_total in (("parse", 1), ("analysis", total), ("selection", total)):
+        progress(stage, 0, stage_total)
+    tasks = start_chunks(local_data)
+
+    parsed_batch, parse_tokens = await parse_opponent_input_async(user_input_batch)
+    token_parts = [parse_tokens]
+    progress("parse", 1, 1)
+
+    # 2. LLM으로 변환된 파티 분석 시작
+    tasks += start_chunks({pid: opp for pid, opp in parsed_batch.items() if pid not in local_data})
+
+    analysis_dict, selection_dict = {}, {}
+    for analysis, selection, tokens in await asyncio.gather(*tasks):
+        analysis_dict.update(analysis)
+        selection_dict.update(selection)
+        token_parts += tokens
+
+    # 입력 순서대로 정렬 (party_0, party_1, ...)
+    order = {pid: idx for idx, pid in enumerate(parsed_batch)}
+    analysis_dict = dict(sorted(analysis_dict.items(), key=lambda x: order.get(x[0], len(order))))
+    selection_dict = dict(sorted(selection_dict.items(), key=lambda x: order.get(x[0], len(order))))
+
+    total_tokens = {k: sum(t[k] for t in token_parts) for k in ("input_tokens", "output_tokens", "total_tokens")}
+    return parsed_batch, analysis_dict, selection_dict, total_tokens
+
+def run_entry_analysis(user_input_batch, fast=False, explain=False, progress=_no_progress):
+    """
+    [Entry Phase - 백그라운드 작업] "분석 시작" 한 번 = 파싱 -> 분석 -> 선출 추출 (job_queue 작업자 스레드에서 실행)
+    fast=True면 빠른 선출 모드 (로컬 계산, explain=True면 해설만 LLM), 아니면 비동기 파이프라인
+    Returns: (parsed_dict, analysis_dict, selection_dict)
+    """
+    if not fast:
+        import asyncio
+        parsed_batch, analysis, selection, _ = asyncio.run(run_entry_pipeline_async(user_input_batch, progress=progress))
+        return parsed_batch, analysis, selection
+
+    progress("parse", 0, 1)
+    parsed_batch, _ = parse_opponent_input(user_input_batch)
+    progress("parse", 1, 1)
+    progress("analysis", 0, len(parsed_batch))
+    analysis, _ = analyze_entry_fast(parsed_batch, explain=explain) if parsed_batch else ({}, None)
+    progress("analysis", len(parsed_batch), len(parsed_batch))
+    progress("selection", 0, 1)
+    selection, _ = parse_recommended_selection(analysis)
+    progress("selection", 1, 1)
+    return parsed_batch, analysis, selection
     
 # --------------------------------------------------------------------------
 # [실행 예시]
@@ -0,0 +1,165 @@
+# job_queue.py
+"""
+[백그라운드 작업 큐]
+선출 분석("분석 시작")처럼 LLM 응답을 여러 번 기다리는 작업을 Streamlit 스크립트 스레드 밖에서 실행합니다.
+
+- submit(session_id, kind, func, *args) -> 작업 ID. func는 progress(stage, done, total) 콜백을 키워드 인자로 받음
+- 작업자 수 제한 (JOB_WORKERS). 대기열은 세션별로 나눠 라운드로빈으로 배정하고, 세션당 동시 실행은 1개
+  -> 한 사용자가 작업을 여러 번 넣어도 다른 사용자의 작업이 밀리지 않음
+- 단계별 진행률: 작업 함수가 progress로 보고 -> UI는 get(job_id)로 폴링
+- 취소: cancel(job_id). 대기 중이면 바로 취소, 실행 중이면 다음 progress 보고 때 JobCancelled로 중단 (협력적 취소)
+- 결과 보관: 끝난 작업은 JOB_RETENTION_SEC 동안 보관 후 정리
+- 작업은 제출 시점의 contextvars로 실행 -> current_battle / my_party / 계측 구간이 제출한 세션 것
+
+사용 예:
+    job_id = job_queue.submit(session_id, "entry", run_entry_analysis, entry_input)
+    job_queue.get(job_id)   # {"status": "running", "stages": {"parse": (1, 1), "analysis": (2, 6)}, ...}
+"""
+import os
+import time
+import uuid
+import threading
+import contextvars
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from telemetry import telemetry
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 4))
+JOB_RETENTION_SEC = float(os.getenv("JOB_RETENTION_SEC", 900))
+
+FINISHED = ("done", "failed", "cancelled")
+
+
+class JobCancelled(Exception):
+    """ 취소된 작업이 진행을 보고할 때 발생 (작업 함수 밖으로 전파되어 중단) """
+
+
+class Job:
+    def __init__(self, session_id, kind, func, args, kwargs):
+        self.job_id = uuid.uuid4().hex[:12]
+        self.session_id = session_id
+        self.kind = kind
+        self.func, self.args, self.kwargs = func, args, kwargs
+        self.context = contextvars.copy_context()
+        self.status = "queued"
+        self.stages = {}        # 단계 -> (완료, 전체), 보고된 순서
+        self.result = self.error = None
+        self.created_at = time.time()
+        self.started_at = self.finished_at = None
+        self._cancel = threading.Event()
+
+    def progress(self, stage, done, total):
+        """ 작업 함수가 호출하는 단계별 진행 보고 (취소 요청이 있으면 JobCancelled) """
+        if self._cancel.is_set(): raise JobCancelled(self.job_id)
+        self.stages[stage] = (done, total)
+
+    @property
+    def finished(self):
+        return self.status in FINISHED
+
+    def to_dict(self):
+        end = self.finished_at or time.time()
+        return {
+            "job_id": self.job_id, "kind": self.kind, "status": self.status,
+            "stages": dict(self.stages), "result": self.result, "error": self.error,
+            "created_at": self.created_at, "started_at": self.started_at, "finished_at": self.finished_at,
+            "waited": (self.started_at or end) - self.created_at,
+            "elapsed": end - self.started_at if self.started_at else 0.0,
+        }
+
+
+class JobQueue:
+    def __init__(self, workers=JOB_WORKERS, retention_sec=JOB_RETENTION_SEC):
+        self.workers = max(1, workers)
+        self.retention_sec = retention_sec
+        self._lock = threading.Lock()
+        self._jobs = {}                 # 작업 ID -> Job (끝난 작업은 보관 기간 동안)
+        self._pending = OrderedDict()   # 세션 ID -> 대기 작업 deque (라운드로빈 순서)
+        self._busy = set()              # 작업이 실행 중인 세션
+        self._executor = None
+        self.stats = {"submitted": 0, "done": 0, "failed": 0, "cancelled": 0}
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job")
+        return self._executor
+
+    # --- [제출 / 배정] ---
+    def submit(self, session_id, kind, func, *args, **kwargs):
+        job = Job(session_id, kind, func, args, kwargs)
+        with self._lock:
+            self._gc(time.time())
+            self._jobs[job.job_id] = job
+            self._pending.setdefault(session_id, deque()).append(job)
+            self.stats["submitted"] += 1
+            self._dispatch()
+        return job.job_id
+
+    def _dispatch(self):
+        """ (lock 보유) 빈 작업자에 대기 세션을 라운드로빈으로 배정 (실행 중인 세션은 건너뜀) """
+        for session_id in list(self._pending):
+            if len(self._busy) >= self.workers: break
+            if session_id in self._busy: continue
+            queue = self._pending.pop(session_id)
+            job = queue.popleft()
+            if queue: self._pending[session_id] = queue   # 남은 작업은 맨 뒤로 -> 다음 배정은 다른 세션부터
+            self._busy.add(session_id)
+            job.status, job.started_at = "running", time.time()
+            self._get_executor().submit(job.context.run, self._run, job)
+
+    def _run(self, job):
+        try:
+            job.result = job.func(*job.args, progress=job.progress, **job.kwargs)
+            status = "cancelled" if job._cancel.is_set() else "done"
+        except JobCancelled:
+            status = "cancelled"
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            status = "failed"
+            print(f"⚠️ [JobQueue] {job.kind} 작업 실패 ({job.job_id}): {e}")
+
+        with self._lock:
+            job.status, job.finished_at = status, time.time()
+            self.stats[status] += 1
+            self._busy.discard(job.session_id)
+            self._dispatch()
+        telemetry.record(f"job.{job.kind}", job.finished_at - job.started_at,
+                         status=status, waited=round(job.started_at - job.created_at, 3))
+
+    # --- [조회 / 취소] ---
+    def get(self, job_id):
+        """ 폴링용 상태 복사본 (없거나 보관 기간이 지났으면 None) """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.to_dict() if job else None
+
+    def cancel(self, job_id):
+        """ 취소 요청 -> 요청이 받아들여졌는지 (이미 끝난 작업이면 False) """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished: return False
+            job._cancel.set()
+            if job.status == "queued":
+                queue = self._pending[job.session_id]
+                queue.remove(job)
+                if not queue: del self._pending[job.session_id]
+                job.status, job.finished_at = "cancelled", time.time()
+                self.stats["cancelled"] += 1
+            return True
+
+    def _gc(self, now):
+        """ (lock 보유) 보관 기간이 지난 끝난 작업 정리 """
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished and now - job.finished_at > self.retention_sec]
+        for job_id in expired: del self._jobs[job_id]
+
+    def get_stats(self):
+        with self._lock:
+            return {**self.stats, "workers": self.workers, "running": len(self._busy),
+                    "queued": sum(len(queue) for queue in self._pending.values()), "retained": len(self._jobs)}
+
+
+# 전역 인스턴스 생성
+job_queue = JobQueue()
+telemetry.register_collector("jobs", job_queue.get_stats)
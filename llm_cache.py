@@ -0,0 +1,246 @@
+# llm_cache.py
+"""
+[LLM 응답 캐시]
+모델명 + temperature + 렌더링된 프롬프트 해시를 키로 하는 디스크 캐시입니다.
+같은 프롬프트를 다시 보내면 Gemini를 호출하지 않고 저장된 응답을 즉시 반환합니다. (토큰 0)
+
+- 저장소: SQLite (WAL 모드) -> Streamlit 세션/스레드/프로세스 간 공유 안전
+- TTL 만료, 최대 개수 초과 시 가장 오래 안 쓰인 항목부터 제거 (LRU)
+- 적중률(hit rate) 통계 제공
+- 빈 응답 / 호출 측 검사(validate)를 통과하지 못한 응답은 저장하지 않음 -> 같은 프롬프트를 다시 보내면 재시도
+- 저장소는 처음 쓰일 때 생성 (LLM_CACHE_DISABLED=1이면 파일을 만들지 않음)
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from contextlib import contextmanager
+
+from resources import lazy_resource
+from telemetry import telemetry, extract_usage
+
+# --- [경로 및 설정] ---
+current_dir = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(current_dir, ".cache")
+LLM_CACHE_PATH = os.path.join(CACHE_DIR, "llm_cache.sqlite3")
+
+DEFAULT_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL", 60 * 60 * 24))     # 기본 24시간
+DEFAULT_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 5000))
+CACHE_DISABLED = os.getenv("LLM_CACHE_DISABLED", "").lower() in ("1", "true", "yes")
+
+
+class CachedResponse:
+    """ 캐시에서 복원된 응답 (LangChain AIMessage와 같은 속성 제공) """
+    def __init__(self, content):
+        self.content = content
+        # 캐시 적중은 토큰을 쓰지 않음
+        self.usage_metadata = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+        self.response_metadata = {"cache_hit": True}
+
+
+class LLMResponseCache:
+    def __init__(self, path=LLM_CACHE_PATH, ttl_seconds=DEFAULT_TTL_SECONDS, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        # 프로세스 내 적중 통계
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    model TEXT,
+                    content TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    hit_count INTEGER DEFAULT 0
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON responses(last_access)")
+
+    @contextmanager
+    def _connect(self):
+        # 연결은 호출마다 새로 생성 (sqlite 연결은 스레드 간 공유 불가)
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(model, temperature, prompt_text):
+        raw = f"{model}|{temperature}|{prompt_text}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """ 저장된 응답 content 반환 (없거나 만료되면 None) """
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT content, created_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row and now - row[1] <= self.ttl_seconds:
+                    conn.execute(
+                        "UPDATE responses SET last_access = ?, hit_count = hit_count + 1 WHERE key = ?",
+                        (now, key)
+                    )
+                    self._count(hit=True)
+                    return json.loads(row[0])
+                if row:
+                    conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            print(f"⚠️ [LLM Cache] 조회 실패: {e}")
+
+        self._count(hit=False)
+        return None
+
+    def set(self, key, model, content):
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, model, content, created_at, last_access, hit_count) "
+                    "VALUES (?, ?, ?, ?, ?, 0)",
+                    (key, model, json.dumps(content, ensure_ascii=False), now, now)
+                )
+                self._evict(conn, now)
+        except (sqlite3.Error, TypeError) as e:
+            print(f"⚠️ [LLM Cache] 저장 실패: {e}")
+
+    def _evict(self, conn, now):
+        """ TTL 만료 항목 삭제 후, 최대 개수를 넘으면 LRU 순으로 제거 """
+        conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+        count = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        if count > self.max_entries:
+            conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)",
+                (count - self.max_entries,)
+            )
+
+    def _count(self, hit):
+        with self._lock:
+            if hit: self.hits += 1
+            else: self.misses += 1
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM responses")
+
+    def get_stats(self):
+        """ 적중률 통계 (프로세스 내 + 디스크 누적) """
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        entries, stored_hits = 0, 0
+        try:
+            with self._connect() as conn:
+                entries, stored_hits = conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(hit_count), 0) FROM responses"
+                ).fetchone()
+        except sqlite3.Error:
+            pass
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 3) if total else 0.0,
+            "entries": entries,
+            "stored_hit_count": stored_hits
+        }
+
+
+# 전역 인스턴스 (처음 쓰일 때 생성)
+@lazy_resource("llm_cache")
+def get_response_cache():
+    return LLMResponseCache()
+
+def _cache_stats():
+    return get_response_cache().get_stats() if get_response_cache.is_initialized() else {}
+
+telemetry.register_collector("llm_cache", _cache_stats)
+
+
+def get_model_name(llm):
+    return getattr(llm, "model", None) or getattr(llm, "model_name", "unknown")
+
+
+def _lookup(llm, prompt_text, model):
+    """ -> (캐시, 키, 저장된 content) / 캐시를 끈 경우 (None, None, None) """
+    if CACHE_DISABLED: return None, None, None
+    cache = get_response_cache()
+    key = cache.make_key(model, getattr(llm, "temperature", None), prompt_text)
+    return cache, key, cache.get(key)
+
+def cached_invoke(llm, prompt_text, stage="llm", validate=None):
+    """
+    [Interface Function]
+    llm.invoke(prompt_text)와 같지만, 같은 모델/온도/프롬프트의 응답이 캐시에 있으면 재사용합니다.
+    stage: 계측(telemetry)에 기록될 단계 이름 (예: "entry.strategy")
+    validate: 응답 -> bool. 호출 측이 쓸 수 있는 응답(JSON 파싱 성공 등)만 저장 (없으면 빈 응답만 거름)
+    호출이 예외(할당량 / 시간 초과 등)로 끝나도 구간은 error=<예외 타입>으로 기록됩니다.
+    """
+    model = get_model_name(llm)
+    with telemetry.span(stage, model=model) as span:
+        cache, key, content = _lookup(llm, prompt_text, model)
+        if content is not None:
+            print(f"⚡ [LLM Cache] 적중 ({model})")
+            span["cache_hit"] = True
+            return CachedResponse(content)
+        response = llm.invoke(prompt_text)
+        span.update(_usage_fields(response))
+
+    if cache is not None: _store(cache, key, model, response, validate)
+    return response
+
+
+async def cached_ainvoke(llm, prompt_text, stage="llm", validate=None):
+    """
+    [Interface Function]
+    cached_invoke의 비동기 버전 (llm.ainvoke 사용). 여러 호출을 asyncio.gather로 동시에 보낼 수 있습니다.
+    """
+    model = get_model_name(llm)
+    with telemetry.span(stage, model=model) as span:
+        cache, key, content = _lookup(llm, prompt_text, model)
+        if content is not None:
+            print(f"⚡ [LLM Cache] 적중 ({model})")
+            span["cache_hit"] = True
+            return CachedResponse(content)
+        response = await llm.ainvoke(prompt_text)
+        span.update(_usage_fields(response))
+
+    if cache is not None: _store(cache, key, model, response, validate)
+    return response
+
+
+def _store(cache, key, model, response, validate):
+    """ 쓸 수 있는 응답만 저장 (잘못된 응답이 TTL 동안 계속 재사용되지 않도록) """
+    content = response.content
+    if not content or (isinstance(content, str) and not content.strip()):
+        print(f"⚠️ [LLM Cache] 빈 응답은 저장하지 않음 ({model})")
+        return
+    if validate is not None:
+        try:
+            valid = validate(response)
+        except Exception:
+            valid = False
+        if not valid:
+            print(f"⚠️ [LLM Cache] 검사를 통과하지 못한 응답은 저장하지 않음 ({model})")
+            return
+    cache.set(key, model, content)
+
+def _usage_fields(response):
+    """ 토큰 + 재시도 횟수 (클라이언트가 response_metadata에 남긴 경우만, 없으면 0) """
+    usage = extract_usage(response)
+    metadata = getattr(response, "response_metadata", None) or {}
+    return {"input_tokens": usage["input_tokens"], "output_tokens": usage["output_tokens"],
+            "retries": int(metadata.get("retries", 0) or 0)}
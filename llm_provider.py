@@ -0,0 +1,246 @@
+# llm_provider.py
+"""
+[LLM 공급자 인터페이스]
+entry.py / battle.py는 get_llm()으로 공유 LLM 클라이언트를 받습니다. (처음 호출될 때 생성)
+환경변수 LLM_PROVIDER로 공급자를 선택합니다.
+
+- "gemini" (기본값): ChatGoogleGenerativeAI (GOOGLE_API_KEY 필요)
+- "stub": 네트워크 없이 동작하는 결정적(Deterministic) 로컬 스텁
+          -> 오프라인 벤치마크 / 부하 테스트용. 프롬프트 종류별로 스키마에 맞는 응답을 생성합니다.
+"""
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+
+from name_aliases import to_english
+from resources import record_init
+
+DEFAULT_MODEL = "gemini-3-flash-preview"
+
+# --- [스텁 지연/토큰 모델 설정] ---
+STUB_LATENCY_BASE = float(os.getenv("STUB_LLM_LATENCY_BASE", 0.5))                  # 호출당 고정 지연 (초)
+STUB_SEC_PER_INPUT_TOKEN = float(os.getenv("STUB_LLM_SEC_PER_INPUT_TOKEN", 0.00005))
+STUB_SEC_PER_OUTPUT_TOKEN = float(os.getenv("STUB_LLM_SEC_PER_OUTPUT_TOKEN", 0.004))
+STUB_CHARS_PER_TOKEN = float(os.getenv("STUB_LLM_CHARS_PER_TOKEN", 2.5))
+
+
+def get_provider_name():
+    return os.getenv("LLM_PROVIDER", "gemini").lower()
+
+
+def create_llm(model=DEFAULT_MODEL, temperature=0.1):
+    """
+    [Interface Function]
+    설정된 공급자의 LLM 클라이언트를 생성합니다.
+    반환 객체는 invoke(prompt_text) / ainvoke(prompt_text)와 model / temperature 속성을 제공합니다.
+    """
+    provider = get_provider_name()
+
+    if provider == "stub":
+        return StubLLM(model=f"stub-{model}", temperature=temperature)
+
+    if provider == "gemini":
+        from dotenv import load_dotenv
+        from langchain_google_genai import ChatGoogleGenerativeAI
+
+        load_dotenv()
+        if not os.getenv("GOOGLE_API_KEY"):
+            raise ValueError("GOOGLE_API_KEY가 .env 파일에 설정되지 않았습니다.")
+        return ChatGoogleGenerativeAI(
+            model=model,
+            temperature=temperature,
+            google_api_key=os.getenv("GOOGLE_API_KEY")
+        )
+
+    raise ValueError(f"알 수 없는 LLM_PROVIDER: {provider}")
+
+
+# 공유 클라이언트 (model, temperature) -> 인스턴스
+_CLIENTS = {}
+_CLIENTS_LOCK = threading.Lock()
+
+def get_llm(model=DEFAULT_MODEL, temperature=0.1):
+    """
+    [Accessor] 공유 LLM 클라이언트를 반환합니다. (처음 호출될 때 생성)
+    entry.py / battle.py가 같은 설정이면 하나의 클라이언트를 같이 씁니다.
+    """
+    key = (get_provider_name(), model, temperature)
+    client = _CLIENTS.get(key)
+    if client is not None: return client
+
+    with _CLIENTS_LOCK:
+        if key not in _CLIENTS:
+            start = time.perf_counter()
+            _CLIENTS[key] = create_llm(model, temperature)
+            record_init(f"llm:{key[0]}:{model}", time.perf_counter() - start)
+        return _CLIENTS[key]
+
+def is_llm_initialized():
+    return bool(_CLIENTS)
+
+
+# --------------------------------------------------------------------------
+# [Stub] 오프라인 LLM 대역
+# --------------------------------------------------------------------------
+class StubResponse:
+    """ LangChain AIMessage와 같은 속성 제공 """
+    def __init__(self, content, input_tokens, output_tokens):
+        self.content = content
+        self.usage_metadata = {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens
+        }
+        self.response_metadata = {"provider": "stub"}
+
+
+class StubLLM:
+    def __init__(self, model="stub", temperature=0.1,
+                 latency_base=STUB_LATENCY_BASE,
+                 sec_per_input_token=STUB_SEC_PER_INPUT_TOKEN,
+                 sec_per_output_token=STUB_SEC_PER_OUTPUT_TOKEN,
+                 chars_per_token=STUB_CHARS_PER_TOKEN):
+        self.model = model
+        self.temperature = temperature
+        self.latency_base = latency_base
+        self.sec_per_input_token = sec_per_input_token
+        self.sec_per_output_token = sec_per_output_token
+        self.chars_per_token = chars_per_token
+
+    # --- [호출 인터페이스] ---
+    def invoke(self, prompt_text):
+        content, delay, input_tokens, output_tokens = self._respond(prompt_text)
+        time.sleep(delay)
+        return StubResponse(content, input_tokens, output_tokens)
+
+    async def ainvoke(self, prompt_text):
+        import asyncio
+        content, delay, input_tokens, output_tokens = self._respond(prompt_text)
+        await asyncio.sleep(delay)
+        return StubResponse(content, input_tokens, output_tokens)
+
+    def _respond(self, prompt_text):
+        prompt_text = str(prompt_text)
+        content = self.generate(prompt_text)
+        input_tokens = self.count_tokens(prompt_text)
+        output_tokens = self.count_tokens(content)
+        delay = (self.latency_base
+                 + input_tokens * self.sec_per_input_token
+                 + output_tokens * self.sec_per_output_token)
+        return content, delay, input_tokens, output_tokens
+
+    def count_tokens(self, text):
+        return max(1, int(len(text) / self.chars_per_token))
+
+    # --- [프롬프트 종류별 응답 생성] ---
+    def generate(self, prompt_text):
+        if "통합 배틀 턴 처리기" in prompt_text:
+            return self._fused_turn(prompt_text)
+        if "포켓몬 이름 번역기" in prompt_text:
+            return self._name_translation(prompt_text)
+        if "선출 리포트 파서" in prompt_text:
+            return self._selection_parse(prompt_text)
+        if "포켓몬 배틀 로그 파서" in prompt_text:
+            return self._battle_log_parse(prompt_text)
+        if "랭크배틀(3vs3 싱글)" in prompt_text:
+            return self._entry_strategy(prompt_text)
+        if "배틀 AI 코치" in prompt_text:
+            return self._battle_advice(prompt_text)
+        return "OK"
+
+    @staticmethod
+    def _section(prompt_text, header, next_header):
+        start = prompt_text.find(header)
+        if start < 0: return ""
+        start += len(header)
+        end = prompt_text.find(next_header, start)
+        return prompt_text[start:end if end >= 0 else None].strip()
+
+    @staticmethod
+    def _seed(text):
+        return int(hashlib.md5(text.encode("utf-8")).hexdigest(), 16)
+
+    def _name_translation(self, prompt_text):
+        lines = self._section(prompt_text, "[입력 데이터]", "[출력 형식").splitlines()
+        result = {}
+        for idx, line in enumerate(l for l in lines if l.strip()):
+            separator = "," if "," in line else None
+            names = [n.strip() for n in line.split(separator) if n.strip()]
+            result[f"party_{idx}"] = [to_english(n) or n for n in names]
+        return json.dumps(result, ensure_ascii=False)
+
+    def _entry_strategy(self, prompt_text):
+        my_names = re.findall(r"^\s*\[([^\]]+)\] @", self._section(prompt_text, "[My Team Info]", "[Batch Opponent Data]"), re.M)
+        party_ids = re.findall(r"\[\[ (\S+) 상세 데이터 \]\]", prompt_text)
+        if not my_names: my_names = ["Unknown"]
+
+        result = {}
+        for party_id in party_ids:
+            # 파티 데이터 해시로 선출 순서를 결정 (같은 입력 -> 같은 출력)
+            rotate = self._seed(party_id + prompt_text[:2000]) % len(my_names)
+            picks = (my_names[rotate:] + my_names[:rotate] + my_names * 3)[:3]
+            result[party_id] = (
+                f"1. 상대 예상 선출: (스텁 분석)\n"
+                f"2. 나의 추천 선출:\n"
+                f"   - 세 마리 구성 요약: {', '.join(picks)}\n"
+                f"   - 선봉(Lead): {picks[0]}\n"
+                f"   - 후속(Back): {picks[1]}, {picks[2]}\n"
+                f"3. 승리 플랜: 시뮬레이션 결과 기준으로 선공 가능한 대면을 우선합니다."
+            )
+        return json.dumps(result, ensure_ascii=False)
+
+    def _selection_parse(self, prompt_text):
+        raw = self._section(prompt_text, "[입력 데이터 (JSON)]", "[출력 형식")
+        try:
+            reports = json.loads(raw)
+        except json.JSONDecodeError:
+            reports = {}
+        result = {}
+        for party_id, report in reports.items():
+            lead = re.search(r"선봉\(Lead\): ([^\n]+)", str(report))
+            back = re.search(r"후속\(Back\): ([^\n]+)", str(report))
+            backs = [b.strip() for b in back.group(1).split(",")] if back else []
+            result[party_id] = {
+                "lead": lead.group(1).strip() if lead else None,
+                "back1": backs[0] if len(backs) > 0 else None,
+                "back2": backs[1] if len(backs) > 1 else None
+            }
+        return json.dumps(result, ensure_ascii=False)
+
+    def _battle_log_parse(self, prompt_text):
+        match = re.search(r'\[사용자 입력\]\s*"(.*)"', prompt_text)
+        user_input = match.group(1) if match else ""
+        result = {
+            "my_switch": None, "opp_switch": None,
+            "my_move_used": None, "opp_move_used": None,
+            "my_hp_change_input": None, "opp_hp_change_input": None,
+            "my_status": None, "opp_status": None,
+            "my_rank_change": {}, "opp_rank_change": {},
+            "weather": None, "terrain": None, "trick_room": None,
+            "tailwind_me": None, "tailwind_opp": None, "reflect_opp": None, "light_screen_opp": None,
+            "turn_end": False
+        }
+        opp = re.search(r"상대\s*([가-힣A-Za-z\-]+?)(?:이|가|은|는)?\s*(?:선봉|등장|교체|나)", user_input)
+        if opp:
+            result["opp_switch"] = to_english(opp.group(1))
+        if "비" in user_input: result["weather"] = "Rain"
+        elif "쾌청" in user_input: result["weather"] = "Sun"
+        if "일렉필드" in user_input: result["terrain"] = "Electric"
+        elif "그래스필드" in user_input: result["terrain"] = "Grassy"
+        return json.dumps(result, ensure_ascii=False)
+
+    def _fused_turn(self, prompt_text):
+        return json.dumps({
+            "delta": json.loads(self._battle_log_parse(prompt_text)),
+            "advice": self._battle_advice(prompt_text)
+        }, ensure_ascii=False)
+
+    def _battle_advice(self, prompt_text):
+        moves = re.findall(r"^\s*- ([^:⚠️\n]+): [\d.]+%~[\d.]+% \(([^)]+)\)", prompt_text, re.M)
+        if moves:
+            move, ko = moves[0]
+            return f"- 💡 **추천 행동**: [{move.strip()}]\n- 📊 **근거**: 시뮬레이션 결과 {ko} (스텁 응답)"
+        return "- 💡 **추천 행동**: [교체]\n- 📊 **근거**: 계산 정보 부족 (스텁 응답)"
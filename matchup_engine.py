@@ -0,0 +1,275 @@
+# matchup_engine.py
+"""
+[로컬 상성 엔진 - 빠른 선출 모드]
+LLM 없이 계산기(calculator / speed_checker)만으로 3마리 선출과 선봉을 결정합니다.
+
+1. 내 6마리 x 상대 6마리 행렬: 스피드 순서 / 최고 데미지(%) / 1타 KO 확률 / 1:1 승률
+2. 내 선출 20가지 x 상대 선출 20가지 (6C3) 점수 행렬 생성
+3. 제로섬 행렬 게임으로 보고 가상 플레이(Fictitious Play)로 혼합 전략 균형 근사
+4. 균형에서 가장 비중이 큰 선출 + 상대 선봉 통계 기반 선봉 결정
+
+[단순화]
+- 상대 기술은 자속 타입의 위력 90 기술로 가정 (공격/특공 중 높은 쪽)
+- 테라스탈, 특성 효과, 지닌 도구(상대)는 고려하지 않음
+"""
+import time
+import math
+import itertools
+
+from Calculator.calculator import calculate_damage_math
+from Calculator.speed_checker import check_turn_order
+from Calculator.move_loader import get_move_data
+from Calculator.stat_estimator import estimate_stats, get_pokemon_types
+from Battle_Preparing.user_party import my_party
+from rag_retriever import get_lead_stats
+from telemetry import telemetry
+
+ASSUMED_STAB_POWER = 90     # 상대 기술 가정 위력
+SOLVER_ITERATIONS = 3000    # 가상 플레이 반복 횟수
+
+
+# --------------------------------------------------------------------------
+# [1] 스펙 구성
+# --------------------------------------------------------------------------
+def build_my_spec(name, data):
+    """ 내 포켓몬 -> (계산기 스펙, 공격 기술 스펙 리스트) """
+    spec = {
+        'stats': data['stats'],
+        'ranks': {},
+        'item': data.get('item'),
+        'status': None,
+        'ability': data.get('ability'),
+        'types': get_pokemon_types(name),
+        'is_terastal': False,
+        'screens': {}
+    }
+    moves = [info for info in (get_move_data(m) for m in data.get('moves', [])) if info['power'] > 0]
+    return spec, moves
+
+def build_opp_spec(name):
+    """ 상대 포켓몬 -> (계산기 스펙, 자속 가정 기술 리스트) / 통계가 없으면 (None, []) """
+    est = estimate_stats(name)
+    if not est: return None, []
+
+    types = get_pokemon_types(name)
+    stats = est['stats']
+    spec = {
+        'stats': stats,
+        'ranks': {},
+        'item': None,
+        'status': None,
+        'ability': None,
+        'types': types,
+        'is_terastal': False,
+        'screens': {}
+    }
+    category = "Physical" if stats['atk'] >= stats['spa'] else "Special"
+    moves = [
+        {"name": f"{t} STAB", "type": t, "category": category, "power": ASSUMED_STAB_POWER, "priority": 0}
+        for t in types
+    ] or [{"name": "Normal Attack", "type": "Normal", "category": category, "power": ASSUMED_STAB_POWER, "priority": 0}]
+    return spec, moves
+
+
+# --------------------------------------------------------------------------
+# [2] 1:1 대면 계산
+# --------------------------------------------------------------------------
+def best_hit(att_spec, def_spec, moves):
+    """ 가장 센 기술의 (기술 스펙, 최소%, 최대%, 1타 KO 확률) """
+    best = (None, 0.0, 0.0, 0.0)
+    hp = def_spec['stats']['hp']
+    for move in moves:
+        res = calculate_damage_math(att_spec, def_spec, move, field_spec={})
+        min_dmg, max_dmg = (int(v) for v in res['damage_range'].split('~'))
+        min_pct, max_pct = min_dmg / hp * 100, max_dmg / hp * 100
+
+        # 난수 16단계가 균등하다고 보고 1타 확률을 선형 근사
+        if min_dmg >= hp: ko_prob = 1.0
+        elif max_dmg < hp: ko_prob = 0.0
+        else: ko_prob = (max_dmg - hp + 1) / (max_dmg - min_dmg + 1)
+
+        if (min_pct + max_pct) > (best[1] + best[2]):
+            best = (move, min_pct, max_pct, ko_prob)
+    return best
+
+def hits_to_ko(percent):
+    return math.ceil(100 / percent) if percent > 0 else 99
+
+def duel_win_rate(my_min, my_max, opp_min, opp_max, speed_order):
+    """
+    1:1 맞다이 승률 근사 (최소/최대 난수 조합 4가지의 평균)
+    speed_order: 1 = 내가 선공, 0 = 동속, -1 = 후공
+    """
+    first = {1: 1.0, 0: 0.5, -1: 0.0}[speed_order]
+    total = 0.0
+    for mine in (my_min, my_max):
+        for theirs in (opp_min, opp_max):
+            my_hits, opp_hits = hits_to_ko(mine), hits_to_ko(theirs)
+            if my_hits < opp_hits: total += 1.0
+            elif my_hits == opp_hits: total += first
+    return total / 4
+
+def build_matchup_matrices(my_names, opp_names):
+    """
+    내 N x 상대 M 행렬 생성
+    Returns: {speed, damage, ko_prob, opp_damage, win_rate, best_move} (각 [i][j])
+    """
+    my_specs = {n: build_my_spec(n, my_party.get_pokemon(n)) for n in my_names}
+    opp_specs = {n: build_opp_spec(n) for n in opp_names}
+
+    rows = len(my_names)
+    cols = len(opp_names)
+    m = {key: [[0.0] * cols for _ in range(rows)] for key in ("speed", "damage", "ko_prob", "opp_damage", "win_rate")}
+    m["best_move"] = [[None] * cols for _ in range(rows)]
+
+    for i, my_name in enumerate(my_names):
+        my_spec, my_moves = my_specs[my_name]
+        for j, opp_name in enumerate(opp_names):
+            opp_spec, opp_moves = opp_specs[opp_name]
+            if opp_spec is None:
+                # 통계 없는 포켓몬은 5:5로 취급
+                m["win_rate"][i][j] = 0.5
+                continue
+
+            move, my_min, my_max, ko_prob = best_hit(my_spec, opp_spec, my_moves)
+            _, opp_min, opp_max, _ = best_hit(opp_spec, my_spec, opp_moves)
+
+            speed_res = check_turn_order(
+                my_spec, opp_spec, field_spec={},
+                my_move_spec=move or {'priority': 0}, opp_move_spec={'priority': 0}
+            )
+            speed_order = 0 if speed_res['is_my_turn'] is None else (1 if speed_res['is_my_turn'] else -1)
+
+            m["speed"][i][j] = speed_order
+            m["damage"][i][j] = (my_min + my_max) / 2
+            m["ko_prob"][i][j] = ko_prob
+            m["opp_damage"][i][j] = (opp_min + opp_max) / 2
+            m["win_rate"][i][j] = duel_win_rate(my_min, my_max, opp_min, opp_max, speed_order)
+            m["best_move"][i][j] = move['name'] if move else None
+    return m
+
+
+# --------------------------------------------------------------------------
+# [3] 선출 행렬 게임
+# --------------------------------------------------------------------------
+def selection_value(win_rate, my_sel, opp_sel):
+    """
+    내 3마리 vs 상대 3마리 점수 (-1 ~ 1)
+    = 상대 각 포켓몬을 잡아낼 최선의 카드 평균 - 내 각 포켓몬이 당할 최악의 대면 평균
+    """
+    answer = sum(max(win_rate[i][j] for i in my_sel) for j in opp_sel) / len(opp_sel)
+    threat = sum(max(1 - win_rate[i][j] for j in opp_sel) for i in my_sel) / len(my_sel)
+    return answer - threat
+
+def solve_matrix_game(payoff, iterations=SOLVER_ITERATIONS):
+    """
+    제로섬 행렬 게임 (행 = 나, 최대화 / 열 = 상대, 최소화)의 혼합 전략 균형 근사 (Fictitious Play)
+    Returns: (내 전략 확률, 상대 전략 확률, 게임 값)
+    """
+    rows, cols = len(payoff), len(payoff[0])
+    row_counts, col_counts = [0] * rows, [0] * cols
+    row_totals = [0.0] * rows    # 상대 누적 전략에 대한 각 행의 누적 이득
+    col_totals = [0.0] * cols    # 내 누적 전략에 대한 각 열의 누적 손실
+
+    row, col = 0, 0
+    for _ in range(iterations):
+        row_counts[row] += 1
+        col_counts[col] += 1
+        for j in range(cols): col_totals[j] += payoff[row][j]
+        for i in range(rows): row_totals[i] += payoff[i][col]
+        row = max(range(rows), key=row_totals.__getitem__)
+        col = min(range(cols), key=col_totals.__getitem__)
+
+    row_strategy = [c / iterations for c in row_counts]
+    col_strategy = [c / iterations for c in col_counts]
+    value = sum(row_strategy[i] * col_strategy[j] * payoff[i][j] for i in range(rows) for j in range(cols))
+    return row_strategy, col_strategy, value
+
+
+# --------------------------------------------------------------------------
+# [4] 메인 함수
+# --------------------------------------------------------------------------
+@telemetry.traced("entry.fast_engine")
+def recommend_selection(opponent_list, my_names=None):
+    """
+    [Interface Function]
+    상대 6마리에 대한 추천 선출을 로컬 계산만으로 반환합니다.
+    Returns: {lead, back1, back2, value, opp_bring, opp_lead, alternatives, matrices, elapsed}
+    """
+    start = time.perf_counter()
+    my_names = list(my_names or my_party.team.keys())
+    opp_names = list(opponent_list)
+    if len(my_names) < 3 or len(opp_names) < 3:
+        return None
+
+    matrices = build_matchup_matrices(my_names, opp_names)
+    win_rate = matrices["win_rate"]
+
+    my_selections = list(itertools.combinations(range(len(my_names)), 3))
+    opp_selections = list(itertools.combinations(range(len(opp_names)), 3))
+    payoff = [[selection_value(win_rate, s, t) for t in opp_selections] for s in my_selections]
+    my_strategy, opp_strategy, value = solve_matrix_game(payoff)
+
+    # 상대 포켓몬별 선출 확률 (균형 전략의 주변 확률)
+    bring_prob = [0.0] * len(opp_names)
+    for prob, sel in zip(opp_strategy, opp_selections):
+        for j in sel: bring_prob[j] += prob
+
+    # 상대 선봉 가중치 = 선출 확률 x 선봉 통계
+    lead_stats = get_lead_stats()
+    lead_weight = [bring_prob[j] * (lead_stats.get(n, 0) + 1.0) for j, n in enumerate(opp_names)]
+    weight_sum = sum(lead_weight) or 1.0
+    lead_weight = [w / weight_sum for w in lead_weight]
+
+    ranked = sorted(range(len(my_selections)), key=lambda k: (-my_strategy[k], -sum(payoff[k]) / len(opp_selections)))
+    best = my_selections[ranked[0]]
+
+    # 선봉: 상대 유력 선봉들에 대한 기대 승률이 가장 높은 포켓몬
+    lead_score = {i: sum(lead_weight[j] * win_rate[i][j] for j in range(len(opp_names))) for i in best}
+    order = sorted(best, key=lambda i: -lead_score[i])
+
+    return {
+        "lead": my_names[order[0]],
+        "back1": my_names[order[1]],
+        "back2": my_names[order[2]],
+        "value": round(value, 3),
+        "opp_bring": {n: round(bring_prob[j], 3) for j, n in enumerate(opp_names)},
+        "opp_lead": {n: round(lead_weight[j], 3) for j, n in enumerate(opp_names)},
+        "alternatives": [
+            ([my_names[i] for i in my_selections[k]], round(my_strategy[k], 3))
+            for k in ranked[:3] if my_strategy[k] >= 0.05
+        ],
+        "my_names": my_names,
+        "opp_names": opp_names,
+        "matrices": matrices,
+        "elapsed": time.perf_counter() - start
+    }
+
+
+def format_fast_report(result):
+    """ 엔진 결과 -> LLM 리포트와 같은 3단 형식 텍스트 (선출 파서가 그대로 읽을 수 있음) """
+    opp_bring = sorted(result["opp_bring"].items(), key=lambda x: -x[1])
+    expected = [n for n, _ in opp_bring[:3]]
+    likely_lead = max(result["opp_lead"].items(), key=lambda x: x[1])[0]
+    picks = [result["lead"], result["back1"], result["back2"]]
+
+    m = result["matrices"]
+    my_idx = {n: i for i, n in enumerate(result["my_names"])}
+    opp_idx = {n: j for j, n in enumerate(result["opp_names"])}
+    i, j = my_idx[result["lead"]], opp_idx[likely_lead]
+    speed_txt = {1: "선공", 0: "동속", -1: "후공"}[m["speed"][i][j]]
+
+    lines = [
+        f"1. 상대 예상 선출: {', '.join(expected)} (유력 선봉: {likely_lead})",
+        "2. 나의 추천 선출:",
+        f"   - 세 마리 구성 요약: {', '.join(picks)}",
+        f"   - 선봉(Lead): {picks[0]}",
+        f"   - 후속(Back): {picks[1]}, {picks[2]}",
+        f"3. 승리 플랜: {picks[0]} vs {likely_lead} {speed_txt}, "
+        f"{m['best_move'][i][j] or '-'} 약 {m['damage'][i][j]:.0f}% (대면 승률 {m['win_rate'][i][j] * 100:.0f}%). "
+        f"선출 균형 점수 {result['value']:+.2f}",
+    ]
+    alternatives = [f"{'/'.join(sel)} ({prob * 100:.0f}%)" for sel, prob in result["alternatives"][1:]]
+    if alternatives:
+        lines.append(f"   - 혼합 전략 대안: {', '.join(alternatives)}")
+    return "\n".join(lines)
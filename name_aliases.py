@@ -0,0 +1,161 @@
+# name_aliases.py
+"""
+[한국어 이름 사전]
+한국어 포켓몬 이름(약어/별명 포함) / 기술 이름 -> Smogon/Showdown 영어 공식 명칭 매핑.
+LLM 없이 로컬에서 이름을 매칭할 때 사용합니다. (entry.py 선출 추출, battle_log_parser.py 규칙 파싱 등)
+별칭은 한 포켓몬만 가리키는 것만 둡니다. (타입 이름 / 다른 포켓몬과 겹치는 별명은 제외)
+"""
+from collections import Counter
+
+# 한국어(약어/별명 포함) -> 영어 공식 명칭
+POKEMON_KO_TO_EN = {
+    # --- 내 파티 (my_team.txt) ---
+    "고동치는달": "Roaring Moon", "고동달": "Roaring Moon",
+    "타부자고": "Gholdengo",
+    "물라오스": "Urshifu-Rapid-Strike", "연격우라오스": "Urshifu-Rapid-Strike", "우라오스(연격)": "Urshifu-Rapid-Strike",
+    "어흥염": "Incineroar",
+    "랜드로스": "Landorus-Therian", "영물랜드로스": "Landorus-Therian",
+    "뽀록나": "Amoonguss",
+
+    # --- 랭크배틀 주요 포켓몬 ---
+    "딩루": "Ting-Lu",
+    "흑마버드렉스": "Calyrex-Shadow", "흑마": "Calyrex-Shadow",
+    "백마버드렉스": "Calyrex-Ice", "백마": "Calyrex-Ice",
+    "콜로솔트": "Garganacl",
+    "코라이돈": "Koraidon",
+    "미라이돈": "Miraidon",
+    "킬라플로르": "Glimmora",
+    "악라오스": "Urshifu", "일격우라오스": "Urshifu",
+    "아르세우스": "Arceus",
+    "글라이온": "Gliscor",
+    "파오젠": "Chien-Pao",
+    "위유이": "Chi-Yu",
+    "총지엔": "Wo-Chien",
+    "고릴타": "Rillaboom",
+    "루나아라": "Lunala",
+    "라우드본": "Skeledirge",
+    "칠색조": "Ho-Oh",
+    "어써러셔": "Dondozo",
+    "날개치는머리": "Flutter Mane", "날치머": "Flutter Mane",
+    "브리두라스": "Archaludon",
+    "망나뇽": "Dragonite",
+    "버섯모": "Breloom",
+    "따라큐": "Mimikyu",
+    "달투곰": "Ursaluna-Bloodmoon",
+    "다투곰": "Ursaluna",
+    "가이오가": "Kyogre",
+    "토오": "Clodsire",
+    "물거폰": "Ogerpon-Wellspring",
+    "화덕거폰": "Ogerpon-Hearthflame", "불거폰": "Ogerpon-Hearthflame",
+    "무쇠바퀴": "Iron Treads",
+    "무쇠머리": "Iron Jugulis",
+    "무쇠무인": "Iron Valiant",
+    "무쇠손": "Iron Hands",
+    "무쇠보따리": "Iron Bundle",
+    "폴리곤2": "Porygon2",
+    "자시안": "Zacian-Crowned",
+    "자마젠타": "Zamazenta",
+    "무한다이노": "Eternatus",
+    "닥트리오": "Dugtrio",
+    "질뻐기": "Muk-Alola",
+    "오롱털": "Grimmsnarl",
+    "테라파고스": "Terapagos",
+    "루브도": "Smeargle",
+    "메타몽": "Ditto",
+    "맘복치": "Alomomola",
+    "바우첼": "Dachsbun",
+    "브리무음": "Hatterene",
+    "포푸니크": "Sneasler",
+    "모래털가죽": "Sandy Shocks",
+    "땅을기는날개": "Slither Wing",
+    "엘풍": "Whimsicott",
+    "키키링": "Farigiraf",
+    "토네로스": "Tornadus",
+}
+
+# 한국어 기술 이름 -> 영어 공식 명칭
+# (날씨/필드/트릭룸/순풍/벽처럼 필드 효과로 처리되는 기술은 battle_log_parser.py에서 따로 다룸)
+MOVE_KO_TO_EN = {
+    # --- 내 파티 (my_team.txt) ---
+    "애크러뱃": "Acrobatics", "탁쳐서떨구기": "Knock Off", "탁떨": "Knock Off", "방어": "Protect",
+    "골드러시": "Make It Rain", "섀도볼": "Shadow Ball", "10만볼트": "Thunderbolt", "트릭": "Trick",
+    "수류연타": "Surging Strikes", "인파이트": "Close Combat", "아쿠아제트": "Aqua Jet", "판별": "Detect",
+    "속이다": "Fake Out", "막말내뱉기": "Parting Shot", "플레어드라이브": "Flare Blitz", "플드": "Flare Blitz",
+    "지진": "Earthquake", "유턴": "U-turn", "스텔스록": "Stealth Rock", "도발": "Taunt",
+    "버섯포자": "Spore", "분노가루": "Rage Powder", "꽃가루경단": "Pollen Puff", "클리어스모그": "Clear Smog",
+
+    # --- 랭크배틀 주요 기술 ---
+    "용성군": "Draco Meteor", "라이트닝드라이브": "Electro Drift", "볼트체인지": "Volt Switch",
+    "테라버스트": "Tera Blast", "매지컬샤인": "Dazzling Gleam", "문포스": "Moonblast",
+    "카타스트로피": "Ruination", "날려버리기": "Whirlwind", "압정뿌리기": "Spikes",
+    "아스트랄비트": "Astral Barrage", "블리자드랜스": "Glacial Lance", "근원의파도": "Origin Pulse",
+    "해수스파우팅": "Water Spout", "파도타기": "Surf", "하이드로펌프": "Hydro Pump", "냉동빔": "Ice Beam",
+    "불대문자": "Fire Blast", "화염방사": "Flamethrower", "오버히트": "Overheat", "열풍": "Heat Wave",
+    "신속": "Extreme Speed", "역린": "Outrage", "드래곤클로": "Dragon Claw", "날개쉬기": "Roost",
+    "기습": "Sucker Punch", "그래스슬라이더": "Grassy Glide", "우드해머": "Wood Hammer",
+    "10만마력": "High Horsepower", "스톤에지": "Stone Edge", "스톤샤워": "Rock Slide",
+    "아이언헤드": "Iron Head", "거수참": "Behemoth Blade", "거수탄": "Behemoth Bash",
+    "바디프레스": "Body Press", "철벽": "Iron Defense", "하품": "Yawn", "대타출동": "Substitute",
+    "도깨비불": "Will-O-Wisp", "전기자석파": "Thunder Wave", "사이코키네시스": "Psychic",
+    "사이코쇼크": "Psyshock", "악의파동": "Dark Pulse", "기합구슬": "Focus Blast", "폭풍": "Hurricane",
+    "번개": "Thunder", "눈보라": "Blizzard", "대지의힘": "Earth Power", "러스터캐논": "Flash Cannon",
+    "기가드레인": "Giga Drain", "치근거리기": "Play Rough", "고스트다이브": "Phantom Force",
+    "폭포오르기": "Waterfall", "아쿠아브레이크": "Liquidation", "웨이브태클": "Wave Crash",
+    "드레인펀치": "Drain Punch", "블러드문": "Blood Moon", "하이퍼보이스": "Hyper Voice",
+    "나이트헤드": "Night Shade", "아이스스피너": "Ice Spinner", "트리플악셀": "Triple Axel",
+    "고드름떨구기": "Icicle Crash", "얼음뭉치": "Ice Shard", "암흑강타": "Wicked Blow",
+    "솔라빔": "Solar Beam", "잠자기": "Rest",
+
+    # --- 능력 랭크를 올리는 기술 (battle_log_parser.SETUP_BOOSTS와 연동) ---
+    "칼춤": "Swords Dance", "나쁜음모": "Nasty Plot", "용의춤": "Dragon Dance", "명상": "Calm Mind",
+    "벌크업": "Bulk Up", "껍질깨기": "Shell Smash", "나비춤": "Quiver Dance", "고속이동": "Agility",
+}
+
+
+def _base_name(english_name):
+    """ 폼 이름 앞부분 (Landorus-Therian -> Landorus) """
+    return english_name.split("-")[0]
+
+# 기본 이름 -> 그 이름을 쓰는 사전 속 포켓몬 수 (Urshifu / Urshifu-Rapid-Strike처럼 둘 이상이면 모호)
+_BASE_COUNTS = Counter(_base_name(en) for en in set(POKEMON_KO_TO_EN.values()))
+
+
+def get_aliases(english_name):
+    """
+    영어 공식 명칭 하나에 대해 매칭에 쓸 수 있는 모든 표기를 반환합니다.
+    (영어 명칭 + 폼 이전 기본 이름 + 한국어 별칭)
+    기본 이름은 다른 폼과 겹치지 않을 때만 (Urshifu-Rapid-Strike의 "Urshifu"는 일격 우라오스 이름이라 제외)
+    """
+    aliases = [english_name]
+
+    base = _base_name(english_name)
+    if base != english_name and len(base) >= 4 and _BASE_COUNTS.get(base, 0) <= 1:
+        aliases.append(base)
+
+    aliases += [ko for ko, en in POKEMON_KO_TO_EN.items() if en == english_name]
+    return aliases
+
+
+def to_english(name):
+    """ 한국어/영어 표기를 영어 공식 명칭으로 변환 (모르면 None) """
+    name = name.strip()
+    if name in POKEMON_KO_TO_EN:
+        return POKEMON_KO_TO_EN[name]
+    if name in POKEMON_KO_TO_EN.values():
+        return name
+    return None
+
+
+def _move_id(name):
+    """ Showdown 기술 ID ("Draco Meteor" -> "dracometeor") """
+    return "".join(ch for ch in name.lower() if ch.isalnum())
+
+_MOVE_ID_TO_EN = {_move_id(en): en for en in MOVE_KO_TO_EN.values()}
+
+
+def move_to_english(name):
+    """ 한국어/영어/Showdown ID 기술 표기를 영어 공식 명칭으로 변환 (모르면 None) """
+    name = name.strip()
+    if name in MOVE_KO_TO_EN:
+        return MOVE_KO_TO_EN[name]
+    return _MOVE_ID_TO_EN.get(_move_id(name))
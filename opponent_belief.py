@@ -0,0 +1,279 @@
+# opponent_belief.py
+"""
+[상대 샘플 추론 - 베이즈 믿음 상태]
+상대 포켓몬 한 마리의 (도구 x 노력치 x 테라 x 특성 x 기술 4개 조합) 결합 확률분포입니다.
+rank_battle_data.json 사용률로 사전분포를 만들고, 관측이 들어올 때마다 우도를 곱해 사후분포로 갱신합니다.
+
+- 저장: float32 평탄 배열 하나 (축 모양은 shape). 갱신은 축별 우도를 브로드캐스트로 곱하고 정규화
+- 관측: 기술 사용 (그 기술이 든 조합만) / 공개 (도구, 특성, 테라) / 선후공 (스피드 구간 -> 노력치 x 스카프)
+        / 데미지 수치 (노력치 x 도구 -> 계산기 난수 범위와 비교)
+- 사전분포 결합: 구애 계열 / 돌격조끼 도구는 변화기가 든 기술 조합과 거의 같이 나오지 않음
+- 결과: 축별 주변확률 -> BattlePokemon.info (예측 목록 순서 / 추정 실수치 / 확정 여부 / 프롬프트용 확률)
+
+사용 예:
+    belief = SetBelief.from_usage("Flutter Mane")
+    belief.observe_move("Moonblast")
+    belief.top("item")   # [("focussash", 0.46), ("boosterenergy", 0.37), ...]
+"""
+import os
+import itertools
+
+import numpy as np
+
+from Calculator.calculator import calculate_damage_math
+from Calculator.move_loader import get_move_data
+from Calculator.stat_estimator import get_base_stats
+from Calculator.stat_utils import calculate_stat, parse_smogon_spread, NATURE_MODS
+from name_aliases import move_to_english
+from rag_retriever import get_smogon_db
+
+# --- [설정] ---
+ITEM_LIMIT = 5          # 도구 축: 사용률 상위 + 기타
+TERA_LIMIT = 4          # 테라 축: 사용률 상위 + 기타
+MOVE_POOL = int(os.getenv("BELIEF_MOVE_POOL", 8))   # 기술 조합을 만드는 후보 기술 수 (8C4 = 70 조합)
+SET_SIZE = 4
+CONFIRM_THRESHOLD = 0.99    # 이 이상이면 확정으로 취급
+MISMATCH = 0.02             # 관측과 안 맞는 경우의 우도 (급소 / 입력 오차 / 데이터에 없는 샘플 대비)
+DAMAGE_TOLERANCE = 2.0      # 데미지 % 비교 허용 오차 (HP 표시 반올림)
+STATUS_PENALTY = 0.05       # 구애 / 돌격조끼 + 변화기 조합의 사전 가중치
+SCARF_SHARE = 0.25          # 사용률 목록에 스카프가 없을 때, 목록 밖 나머지 중 스카프 몫
+
+OTHER = "other"
+AXES = ("item", "spread", "tera_type", "ability", "moveset")
+LOCKED_ITEMS = {"choiceband", "choicespecs", "choicescarf", "assaultvest"}
+
+# 계산기가 알아듣는 도구 이름 (Smogon ID -> 표기)
+ITEM_LABELS = {
+    "choiceband": "Choice Band", "choicespecs": "Choice Specs", "choicescarf": "Choice Scarf",
+    "lifeorb": "Life Orb", "assaultvest": "Assault Vest", "ironball": "Iron Ball",
+}
+
+
+def to_id(name):
+    """ "Choice Scarf" / "choicescarf" / "Choice-Scarf" -> "choicescarf" """
+    return "".join(ch for ch in str(name).lower() if ch.isalnum())
+
+def _normalize(weights):
+    weights = np.asarray(weights, dtype=np.float64)
+    total = weights.sum()
+    return weights / total if total > 0 else np.full(len(weights), 1 / max(1, len(weights)))
+
+def _spread_stats(base_stats, spread):
+    nature, evs = parse_smogon_spread(spread)
+    mods = NATURE_MODS.get(nature, {})
+    return {stat: calculate_stat(base_stats[stat], 31, evs[stat], mods.get(stat, 1.0), is_hp=(stat == 'hp'))
+            for stat in ('hp', 'atk', 'def', 'spa', 'spd', 'spe')}
+
+def _is_status(move_id):
+    return get_move_data(move_to_english(move_id) or move_id).get('category') == "Status"
+
+
+class SetBelief:
+    """ 상대 한 마리의 샘플 결합분포 (축: AXES) """
+    def __init__(self, name, labels, priors, move_pool, move_priors, spread_stats, slots=SET_SIZE):
+        self.name = name
+        self.labels = labels                # axis -> [라벨] (moveset 제외)
+        self.spread_stats = spread_stats    # 노력치 축 순서의 실수치 dict (종족값이 없으면 None)
+        self.move_pool = move_pool          # 기술 조합 후보 (Smogon ID)
+        self.move_priors = move_priors      # 기술별 채용률 (0~1)
+        self.off_pool = []                  # 후보 밖에서 확인된 기술
+        self.observed = set()               # 확인된 후보 기술 (ID)
+        self._build_movesets(slots)
+        joint = priors[0]
+        for prior in priors[1:] + [self._moveset_prior()]:
+            joint = np.multiply.outer(joint, prior)
+        joint = joint * self._compat()
+        self.shape = joint.shape
+        self.p = (joint / joint.sum()).astype(np.float32).ravel()
+
+    @classmethod
+    def from_usage(cls, name):
+        """ rank_battle_data.json 사용률 -> 사전분포 (데이터가 없으면 None) """
+        data = get_smogon_db().get(name)
+        if not data or not data.get('Abilities'): return None
+        total = sum(w for _, w in data['Abilities'])
+
+        def axis(entries, limit):
+            entries = entries[:limit] if limit else entries
+            labels = [label for label, _ in entries]
+            weights = [w for _, w in entries]
+            if limit:   # 상위 목록 밖의 나머지 -> 기타
+                labels.append(OTHER)
+                weights.append(max(total - sum(weights), 0.01 * total))
+            return labels, _normalize(weights)
+
+        items = [list(entry) for entry in (data.get('Items') or [])[:ITEM_LIMIT]]
+        rest = max(total - sum(w for _, w in items), 0.01 * total)
+        if "choicescarf" not in (label for label, _ in items):
+            # 스카프는 선후공으로만 드러나는 경우가 많아서, 목록에 없어도 나머지 몫의 일부로 항상 후보에 둠
+            items.append(["choicescarf", SCARF_SHARE * rest])
+            rest -= SCARF_SHARE * rest
+        item_labels, item_prior = axis(items + [[OTHER, rest]], None)
+        tera_labels, tera_prior = axis(data.get('TeraTypes') or [[OTHER, 1.0]], TERA_LIMIT)
+        ability_labels, ability_prior = axis(data['Abilities'], None)
+        spreads = data.get('Spreads') or []
+        spread_labels, spread_prior = axis(spreads, None) if spreads else ([OTHER], np.ones(1))
+
+        base_stats = get_base_stats(name)
+        spread_stats = [_spread_stats(base_stats, s) for s in spread_labels] if base_stats and spreads else None
+
+        moves = (data.get('Moves') or [])[:MOVE_POOL]
+        move_pool = [m for m, _ in moves]
+        move_priors = np.clip([w / total for _, w in moves], 0.01, 0.99)
+        labels = {"item": item_labels, "spread": spread_labels, "tera_type": tera_labels, "ability": ability_labels}
+        return cls(name, labels, [item_prior, spread_prior, tera_prior, ability_prior],
+                   move_pool, move_priors, spread_stats)
+
+    # --- [기술 조합 축] ---
+    def _build_movesets(self, slots):
+        self.slots = max(0, min(slots, len(self.move_pool)))
+        self.movesets = list(itertools.combinations(range(len(self.move_pool)), self.slots))
+        self.has = np.zeros((len(self.movesets), len(self.move_pool)), dtype=bool)
+        for row, combo in enumerate(self.movesets):
+            self.has[row, list(combo)] = True
+
+    def _moveset_prior(self):
+        """ 기술별 채용률의 독립 베르누이를 조합 크기로 조건부 (확인된 기술이 든 조합만) """
+        p = np.asarray(self.move_priors, dtype=np.float64)
+        prior = np.prod(np.where(self.has, p, 1 - p), axis=1) if len(p) else np.ones(len(self.movesets))
+        for move_id in self.observed:
+            prior = prior * self.has[:, self.move_pool.index(move_id)]
+        return prior if prior.sum() > 0 else np.ones(len(self.movesets))
+
+    def _compat(self):
+        """ 도구 x 기술 조합 사전 결합 (구애/조끼 + 변화기 억제) -> 브로드캐스트용 배열 """
+        status = np.array([_is_status(m) for m in self.move_pool], dtype=bool)
+        has_status = (self.has & status).any(axis=1) if len(status) else np.zeros(len(self.movesets), dtype=bool)
+        locked = np.array([to_id(label) in LOCKED_ITEMS for label in self.labels["item"]])
+        compat = np.where(np.outer(locked, has_status), STATUS_PENALTY, 1.0)
+        return compat[:, None, None, None, :]
+
+    # --- [공통 갱신] ---
+    def _view(self):
+        return self.p.reshape(self.shape)
+
+    def _along(self, axis, vector):
+        shape = [1] * len(self.shape)
+        shape[AXES.index(axis)] = len(vector)
+        return np.asarray(vector, dtype=np.float32).reshape(shape)
+
+    def _apply(self, likelihood):
+        """ 사후 = 사전 x 우도 (정규화). 모든 경우가 0이 되는 관측은 무시 -> 반영 여부 """
+        posterior = self._view() * likelihood
+        total = posterior.sum()
+        if not np.isfinite(total) or total <= 0: return False
+        self.p = (posterior / total).astype(np.float32).ravel()
+        return True
+
+    def marginal(self, axis):
+        index = AXES.index(axis)
+        return self._view().sum(axis=tuple(i for i in range(len(self.shape)) if i != index))
+
+    def move_probs(self):
+        """ 기술별 채용 확률 (확인된 기술은 1) -> [(기술, 확률)] 내림차순 """
+        probs = self.marginal("moveset") @ self.has if len(self.move_pool) else []
+        pairs = [(m, 1.0) for m in self.off_pool] + list(zip(self.move_pool, (float(p) for p in probs)))
+        return sorted(pairs, key=lambda pair: -pair[1])
+
+    def top(self, axis, n=None):
+        """ 축의 주변확률 내림차순 [(라벨, 확률)] """
+        if axis == "moves": return self.move_probs()[:n]
+        probs = self.marginal(axis)
+        order = np.argsort(-probs)[:n]
+        return [(self.labels[axis][i], float(probs[i])) for i in order]
+
+    def certain(self, axis):
+        """ 확률이 CONFIRM_THRESHOLD 이상인 라벨 (없으면 None, '기타'는 확정으로 보지 않음) """
+        label, prob = self.top(axis, 1)[0]
+        return label if prob >= CONFIRM_THRESHOLD and label != OTHER else None
+
+    # --- [관측] ---
+    def reveal(self, axis, value):
+        """ 도구 / 특성 / 테라 공개 -> 그 값만 남김 (목록에 없던 값이면 축을 그 값 하나로) """
+        labels = self.labels[axis]
+        ids = [to_id(label) for label in labels]
+        if to_id(value) in ids:
+            one_hot = np.zeros(len(labels))
+            one_hot[ids.index(to_id(value))] = 1.0
+            return self._apply(self._along(axis, one_hot))
+        index = AXES.index(axis)
+        collapsed = self._view().sum(axis=index, keepdims=True)
+        self.shape = collapsed.shape
+        self.p = collapsed.ravel()
+        self.labels[axis] = [value]
+        if axis == "spread": self.spread_stats = None
+        return True
+
+    def observe_move(self, move):
+        """ 기술 사용 -> 그 기술이 든 조합만 (후보 밖 기술이면 남은 칸 수를 줄여 조합 축을 다시 만듦) """
+        move_id = to_id(move)
+        pool_ids = [to_id(m) for m in self.move_pool]
+        if move_id in pool_ids:
+            key = self.move_pool[pool_ids.index(move_id)]
+            if key in self.observed: return False
+            self.observed.add(key)
+            return self._apply(self._along("moveset", self.has[:, pool_ids.index(move_id)]))
+        if move_id in (to_id(m) for m in self.off_pool) or len(self.off_pool) >= SET_SIZE: return False
+        self.off_pool.append(move)
+        others = self._view().sum(axis=AXES.index("moveset"))
+        self._build_movesets(SET_SIZE - len(self.off_pool))
+        joint = np.multiply.outer(others, self._moveset_prior()) * self._compat()
+        self.shape = joint.shape
+        self.p = (joint / joint.sum()).astype(np.float32).ravel()
+        return True
+
+    def _item_spread_grid(self, func):
+        """ (도구, 노력치) 칸마다 func(도구 표기, 실수치) -> 우도 배열 (I, S, 1, 1, 1) """
+        grid = np.array([[func(ITEM_LABELS.get(to_id(item), item), stats) for stats in self.spread_stats]
+                         for item in self.labels["item"]], dtype=np.float32)
+        return grid[:, :, None, None, None]
+
+    def observe_speed_range(self, raw_range):
+        """
+        선후공으로 좁힌 스피드 구간(speed_bounds.SpeedBounds) -> (노력치 x 스카프) 우도
+        raw_range(도구 표기) -> 그 도구 가설의 스피드 실수치 구간 (제외된 가설이면 None)
+        """
+        if not self.spread_stats: return False
+
+        def likelihood(item, stats):
+            bounds = raw_range(item)
+            return 1.0 if bounds and bounds[0] <= stats['spe'] <= bounds[1] else MISMATCH
+        return self._apply(self._item_spread_grid(likelihood))
+
+    def observe_damage(self, role, att_spec, def_spec, move, field_spec, percent, capped=False):
+        """
+        데미지 수치 -> (도구 x 노력치) 우도
+        role: "attacker"(상대가 때림 -> 공격 실수치/도구) / "defender"(상대가 맞음 -> HP/방어 실수치)
+        percent: 최대 HP 대비 %, capped: 기절로 끝나서 실제 데미지가 그 이상일 수 있음
+        """
+        if not self.spread_stats or move.get('power', 0) <= 0: return False
+
+        def likelihood(item, stats):
+            if role == "attacker": att, defender = {**att_spec, 'stats': stats, 'item': item}, def_spec
+            else: att, defender = att_spec, {**def_spec, 'stats': stats}
+            res = calculate_damage_math(att, defender, move, field_spec)
+            lo, hi = (int(v) / defender['stats']['hp'] * 100 for v in res['damage_range'].split('~'))
+            if capped: return 1.0 if hi + DAMAGE_TOLERANCE >= percent else MISMATCH
+            return 1.0 if lo - DAMAGE_TOLERANCE <= percent <= hi + DAMAGE_TOLERANCE else MISMATCH
+        return self._apply(self._item_spread_grid(likelihood))
+
+    # --- [결과] ---
+    def map_stats(self):
+        """ 사후확률이 가장 높은 노력치의 실수치 """
+        if not self.spread_stats: return None
+        return dict(self.spread_stats[int(np.argmax(self.marginal("spread")))])
+
+    def item_label(self, label):
+        """ 계산기 / 화면 표기 ("choicescarf" -> "Choice Scarf") """
+        return ITEM_LABELS.get(to_id(label), label)
+
+    def to_posterior(self, n=None):
+        """ info['posterior']에 넣을 축별 확률 내림차순 (소수 셋째 자리) """
+        rounded = lambda pairs: [(label, round(prob, 3)) for label, prob in pairs]
+        return {
+            "item": rounded((self.item_label(label), p) for label, p in self.top("item", n)),
+            "spread": rounded(self.top("spread", n)),
+            "tera_type": rounded(self.top("tera_type", n)),
+            "ability": rounded(self.top("ability", n)),
+            "moves": rounded(self.top("moves")),
+        }
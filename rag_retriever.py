@@ -2,6 +2,9 @@ import json
 import os
 import sys
 
+from resources import lazy_resource
+from telemetry import telemetry
+
 # --- [경로 설정] ---
 # 현재 파일 위치를 기준으로 경로를 잡습니다.
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -58,9 +61,21 @@ def load_lead_data():
         print(f"⚠️ 선봉 데이터 파싱 중 오류: {e}")
         return {}
 
-# --- [전역 데이터 로드] ---
-SMOGON_DB = load_usage_data()
-LEAD_STATS = load_lead_data()
+# --- [전역 데이터 (지연 로드)] ---
+# 임포트 시점에는 읽지 않고, 처음 조회될 때 한 번만 로드하여 모든 세션이 공유합니다.
+@lazy_resource("smogon_db")
+def get_smogon_db():
+    return load_usage_data()
+
+@lazy_resource("lead_stats")
+def get_lead_stats():
+    return load_lead_data()
+
+def __getattr__(name):
+    # 기존 코드 호환: `from rag_retriever import SMOGON_DB, LEAD_STATS`
+    if name == "SMOGON_DB": return get_smogon_db()
+    if name == "LEAD_STATS": return get_lead_stats()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # --- [기존 기능: 선출 분석용 텍스트 요약] ---
@@ -69,13 +84,14 @@ def get_pokemon_summary(pokemon_name):
     특정 포켓몬의 정보를 LLM이 읽기 좋은 텍스트로 요약 반환
     (entry.py 및 battle.py 프롬프트용)
     """
-    if pokemon_name not in SMOGON_DB:
+    smogon_db = get_smogon_db()
+    if pokemon_name not in smogon_db:
         return f"⚠️ [{pokemon_name}]: Smogon 통계 데이터가 없습니다."
 
-    data = SMOGON_DB[pokemon_name]
+    data = smogon_db[pokemon_name]
     
     # 선봉 확률 정보
-    lead_prob = LEAD_STATS.get(pokemon_name, 0.0)
+    lead_prob = get_lead_stats().get(pokemon_name, 0.0)
     lead_info = ""
     if lead_prob >= 10.0:
         lead_info = f"🔥선봉출전율: {lead_prob}% (매우 높음)"
@@ -103,6 +119,7 @@ def get_pokemon_summary(pokemon_name):
     """
     return summary.strip()
 
+@telemetry.traced("data.party_report")
 def get_opponent_party_report(pokemon_list):
     """
     상대 엔트리 리스트(6마리)를 받아 전체 브리핑 리포트를 생성
@@ -124,16 +141,18 @@ def get_opponent_party_report(pokemon_list):
 
 
 # --- [NEW 기능: 배틀 상태 저장용 Raw Data 반환] ---
+@telemetry.traced("data.raw_data")
 def get_pokemon_raw_data(pokemon_name):
     """
     [Battle Phase 용도]
     BattleState 객체에 저장하기 위해 가공되지 않은 리스트/딕셔너리 형태의 데이터를 반환합니다.
     (battle_state.py 사용)
     """
-    if pokemon_name not in SMOGON_DB:
+    smogon_db = get_smogon_db()
+    if pokemon_name not in smogon_db:
         return None
 
-    data = SMOGON_DB[pokemon_name]
+    data = smogon_db[pokemon_name]
     
     return {
         # 기술 TOP 7 (이름만 리스트로) -> 방어 시뮬레이션용
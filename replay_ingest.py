@@ -0,0 +1,628 @@
+# replay_ingest.py
+"""
+[Showdown 리플레이 재생 - 계산기 정확도 / 처리량 측정]
+로컬에 저장한 Showdown 배틀 로그(|switch| / |move| / |-damage| ... 프로토콜 줄)를 한 줄씩 읽으며
+BattleState.apply_llm_update로 상태를 재현하고, 계산기 예측을 실제로 일어난 일과 대조합니다.
+
+- 데미지: |move| 직후 대상의 |-damage| ([from] 없는 것, 첫 타만) -> 같은 시점 상태로 calculate_damage_math 예측 범위와 비교
+  (HP 표시 반올림 때문에 DAMAGE_TOLERANCE %p 허용, 급소는 따로 집계, 기절로 잘린 데미지는 "최대치 이상인지"만 확인)
+- 선후공: 한 턴에 양쪽이 모두 기술을 썼고 그 사이 교체가 없으면 -> 턴 시작 시점 스펙으로 check_turn_order 예측과 비교
+  (확정 판정(certain)만 따로 집계) 이후 observe_turn_order로 상대 스피드 구간을 좁히는 것까지 앱과 같은 순서로 진행
+- 데미지 수치는 observe_damage로 상대 샘플 사후분포에도 반영 -> 뒤 턴의 예측일수록 앱에서와 같은 정보로 계산
+- 병렬화: 리플레이 단위로 프로세스 풀에 나눠 실행 (리플레이마다 세션 하나), 작업자별 상태 / 계산 계층 시간을 따로 잼
+  -> 정확도 보고 + 상태 / 계산 계층의 실제 처리량 벤치마크
+
+입력: 파일 / 디렉터리 (.log / .txt = 프로토콜 원문, .json = {"log": ...} 리플레이 파일, .jsonl = 줄마다 {"id", "log"})
+"me" 진영은 --side (기본 p1). 세트를 모르는 내 포켓몬은 Smogon 1순위 샘플 실수치로 추정 (--team 파일에 있으면 그 세트)
+
+[단순화]
+- 싱글 배틀만 (BattleState가 진영마다 활성 포켓몬 1마리) -> |gametype|이 singles가 아니면 건너뜀
+- 예측에 반영하지 않는 것: 특성 / 도구의 데미지 보정 대부분, 다른 기술로 바뀐 기술(마법거울 / 댄서 등은 대조 제외)
+
+사용 예:
+    python replay_ingest.py replays/ -o results.jsonl
+    python replay_ingest.py logs.jsonl --workers 8 --side p2
+"""
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import contextlib
+import contextvars
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+# 리플레이마다 상대 명단 프리페치 스레드를 돌릴 필요가 없음 (battle_state 임포트 전에 지정)
+os.environ.setdefault("BATTLE_PREFETCH_WORKERS", "0")
+
+from battle import pack_specs
+from battle_state import current_battle, BattlePokemon
+from Battle_Preparing.user_party import my_party
+from Calculator.calculator import calculate_damage_math
+from Calculator.speed_checker import check_turn_order
+from Calculator.move_loader import get_move_data
+from Calculator.stat_estimator import estimate_stats
+from session_manager import session_manager
+from turn_search import _calc_spec
+
+REPLAY_WORKERS = int(os.getenv("REPLAY_WORKERS", os.cpu_count() or 1))
+REPLAY_INFLIGHT = int(os.getenv("REPLAY_INFLIGHT", 4))                   # 작업자당 미리 맡겨 두는 리플레이 수
+DAMAGE_TOLERANCE = float(os.getenv("REPLAY_DAMAGE_TOLERANCE", 1.0))     # HP 표시(/100) 반올림 허용 오차 (%p)
+REPLAY_EXTENSIONS = (".log", ".txt", ".json", ".jsonl")
+
+DEFAULT_STATS = {'hp': 100, 'atk': 100, 'def': 100, 'spa': 100, 'spd': 100, 'spe': 100}
+PREFIX = {"me": "my", "opp": "opp"}   # 진영 -> 스키마 키 접두어
+
+# --- [프로토콜 값 -> 상태 스키마] ---
+STATUS = {"par": "Paralysis", "brn": "Burn", "slp": "Sleep", "psn": "Poison", "tox": "Toxic", "frz": "Freeze"}
+WEATHER = {"RainDance": "Rain", "PrimordialSea": "Rain", "SunnyDay": "Sun", "DesolateLand": "Sun",
+           "Sandstorm": "Sand", "Snow": "Snow", "Hail": "Snow"}
+TERRAIN = {"Electric Terrain": "Electric", "Grassy Terrain": "Grassy",
+           "Psychic Terrain": "Psychic", "Misty Terrain": "Misty"}
+SCREENS = {"Reflect": ("reflect",), "Light Screen": ("light_screen",), "Aurora Veil": ("reflect", "light_screen")}
+
+
+# --------------------------------------------------------------------------
+# [1] 프로토콜 파싱
+# --------------------------------------------------------------------------
+def iter_events(lines):
+    """
+    프로토콜 줄 -> (태그, 인자 목록, 꼬리표 dict) 를 하나씩 (지연 읽기)
+    "|-damage|p2a: Miraidon|45/100|[from] item: Life Orb" -> ("-damage", ["p2a: Miraidon", "45/100"], {"from": "item: Life Orb"})
+    """
+    for line in lines:
+        if not line.startswith("|"): continue
+        parts = line.rstrip("\r\n").split("|")[1:]
+        if not parts or not parts[0]: continue
+        args, tags = [], {}
+        for part in parts[1:]:
+            if part.startswith("["):
+                key, _, value = part[1:].partition("]")
+                tags[key] = value.strip()
+            else:
+                args.append(part)
+        yield parts[0], args, tags
+
+def _ident(text):
+    """ "p2a: Miraidon" -> ("p2", "Miraidon") """
+    side, _, nick = text.partition(": ")
+    return side[:2], nick.strip()
+
+def _species(details):
+    """ "Urshifu-Rapid-Strike, L50, F" -> "Urshifu-Rapid-Strike" (팀 미리보기의 "Urshifu-*"는 기본 폼) """
+    name = details.split(",")[0].strip()
+    return name[:-2] if name.endswith("-*") else name
+
+def _hp_percent(text):
+    """ "45/100 par" / "250/331" / "0 fnt" -> 남은 HP % """
+    value = text.split()[0] if text.strip() else "0"
+    current, _, maximum = value.partition("/")
+    return float(current) / float(maximum) * 100 if maximum else 0.0
+
+
+# --------------------------------------------------------------------------
+# [2] 리플레이 1개 재생
+# --------------------------------------------------------------------------
+class ReplayRunner:
+    """ 프로토콜 이벤트 -> BattleState 갱신 + 예측 대조 (리플레이 하나 = 세션 하나) """
+    HANDLERS = {
+        "gametype": "on_gametype", "poke": "on_poke", "switch": "on_switch", "drag": "on_switch",
+        "move": "on_move", "-damage": "on_hp", "-heal": "on_hp", "-sethp": "on_hp", "faint": "on_faint",
+        "-crit": "on_crit", "-boost": "on_boost", "-unboost": "on_boost", "-setboost": "on_boost",
+        "-clearboost": "on_clearboost", "-clearallboost": "on_clearboost",
+        "-status": "on_status", "-curestatus": "on_status", "-weather": "on_weather",
+        "-fieldstart": "on_field", "-fieldend": "on_field", "-sidestart": "on_side", "-sideend": "on_side",
+        "-item": "on_item", "-enditem": "on_item", "-ability": "on_ability", "-terastallize": "on_tera",
+        "turn": "on_turn",
+    }
+
+    def __init__(self, replay_id, my_side="p1", team=None):
+        self.replay_id = replay_id
+        self.sides = {my_side: "me", ("p2" if my_side == "p1" else "p1"): "opp"}
+        self.team = team or {}                  # 내 세트 (이름 -> user_party 항목)
+        self.names = {"me": {}, "opp": {}}      # 별명 -> 종
+        self.roster = {"me": [], "opp": []}     # 팀 미리보기 (|poke|)
+        self.tera = {"me": None, "opp": None}   # 테라스탈한 포켓몬 (종, 타입)
+        self.started = False
+        self.turn_no = 0
+        self.turn = {"moves": {}, "switched": False}
+        self.pending = None                     # 직전 공격 기술의 예측 (데미지 대조 대기)
+        self.damage, self.order = [], []
+        self.timing = {"state": 0.0, "calc": 0.0}
+        self.events = 0
+        self.skipped = None
+
+    @contextlib.contextmanager
+    def timed(self, layer):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timing[layer] += time.perf_counter() - start
+
+    def run(self, lines):
+        # 복사한 컨텍스트에서 재생 -> 이 리플레이의 세션(내 파티 / 배틀)이 호출한 쪽에 current로 남지 않음
+        return contextvars.copy_context().run(self._run, lines)
+
+    def _run(self, lines):
+        start = time.perf_counter()
+        session_id = f"replay:{self.replay_id}"
+        session_manager.activate(session_id)
+        my_party.team = {}   # 리플레이마다 빈 파티에서 시작 (_add_mine이 이 리플레이의 종만 등록)
+        try:
+            for tag, args, tags in iter_events(lines):
+                self.events += 1
+                handler = self.HANDLERS.get(tag)
+                if handler and args: getattr(self, handler)(tag, args, tags)
+                if self.skipped: break
+        finally:
+            session_manager.drop(session_id)
+        return self.result(time.perf_counter() - start)
+
+    def result(self, elapsed, error=None):
+        return {"id": self.replay_id, "turns": self.turn_no, "events": self.events, "skipped": self.skipped,
+                "error": error, "damage": self.damage, "order": self.order,
+                "timing": {**self.timing, "total": elapsed}}
+
+    # --- [상태 접근] ---
+    def update(self, data):
+        with self.timed("state"):
+            current_battle.apply_llm_update(data)
+
+    def role_of(self, ident):
+        side, nick = _ident(ident)
+        return self.sides.get(side), nick
+
+    def active(self, role):
+        return current_battle.my_active if role == "me" else current_battle.opp_active
+
+    def find(self, role, nick):
+        species = self.names[role].get(nick)
+        party = current_battle.my_party_status if role == "me" else current_battle.opp_revealed_party
+        return party.get(species)
+
+    def _add_mine(self, species):
+        """ 내 파티에 없는 종 -> --team 세트 또는 Smogon 1순위 샘플 추정 실수치로 등록 """
+        if species in my_party.team: return False
+        entry = self.team.get(species)
+        if entry:
+            my_party.add_pokemon(species, dict(entry["stats"]), entry.get("item"), entry.get("ability"),
+                                 list(entry.get("moves") or []), entry.get("tera_type"))
+        else:
+            est = estimate_stats(species)
+            my_party.add_pokemon(species, est["stats"] if est else dict(DEFAULT_STATS))
+        return True
+
+    def start(self):
+        """ 첫 등장 직전: 팀 미리보기로 내 파티 / 상대 명단 준비 """
+        with self.timed("state"):
+            for species in self.roster["me"]: self._add_mine(species)
+            current_battle.refresh_my_party()
+            current_battle.initialize_opponent(list(self.roster["opp"]))
+        self.started = True
+
+    def sync_hp(self, role, percent):
+        """ 로그의 남은 HP로 맞춤 (차이만큼 hp_change_input) """
+        poke = self.active(role)
+        if poke and percent != poke.current_hp_percent:
+            self.update({f"{PREFIX[role]}_hp_change_input": percent - poke.current_hp_percent})
+
+    def reveal(self, role, category, value):
+        """ 도구 / 특성 공개 (상대는 확정 정보로 사후분포 갱신, 이미 아는 값이면 무시) """
+        poke = self.active(role)
+        if not poke or not value or (poke.info.get(category) == value and poke.confirmed[category]): return
+        with self.timed("state"):
+            if role == "opp" and category == "item": current_battle.apply_llm_update({"opp_item": value})
+            else: poke.reveal_info(category, value)   # 내 쪽도 reveal_info로 -> 정보 버전이 올라 스냅샷 갱신
+
+    def reveal_source(self, role, tags):
+        """ [from] item: X / ability: X -> 그 효과의 주인 ([of]가 있으면 그쪽) 정보 공개 """
+        source = tags.get("from", "")
+        if tags.get("of"): role = self.role_of(tags["of"])[0]
+        for category in ("item", "ability"):
+            if source.startswith(category + ":"):
+                self.reveal(role, category, source.split(":", 1)[1].strip())
+
+    # --- [계산기 예측] ---
+    def specs(self):
+        """ 계산기 입력: 양쪽 활성 포켓몬 스펙 (타입 / 테라스탈 포함) + 필드 """
+        specs = {}
+        for role in ("me", "opp"):
+            poke = self.active(role)
+            spec = _calc_spec(poke, poke.info.get('stats') or dict(DEFAULT_STATS), dict(poke.ranks),
+                              dict(current_battle.side_effects[role]))
+            tera = self.tera[role]
+            if tera and tera[0] == poke.name: spec.update(is_terastal=True, tera_type=tera[1])
+            specs[role] = spec
+        return specs, pack_specs()[2]
+
+    def _defender(self, spec):
+        """ 테라스탈했으면 방어 타입은 테라 타입 하나 """
+        return {**spec, 'types': [spec['tera_type']]} if spec.get('is_terastal') else spec
+
+    def predict_damage(self, role, move):
+        """ 기술 사용 시점 상태로 데미지 예측 (대상 최대 HP 대비 %) """
+        target = "opp" if role == "me" else "me"
+        if not self.active(role) or not self.active(target): return None
+        with self.timed("calc"):
+            info = get_move_data(move)
+            if not info.get('power') or info.get('category') not in ("Physical", "Special"): return None
+            specs, field = self.specs()
+            att_spec, def_spec = specs[role], self._defender(specs[target])
+            lo, hi = (int(v) for v in calculate_damage_math(att_spec, def_spec, info, field)['damage_range'].split('~'))
+        hp = def_spec['stats']['hp']
+        return {"side": role, "target": target, "move": move, "crit": False, "hits": 0,
+                "attacker": self.active(role).name, "defender": self.active(target).name,
+                "lo": lo / hp * 100, "hi": hi / hp * 100, "specs": (att_spec, def_spec, info, field)}
+
+    def record_damage(self, pending, before, after):
+        """ 첫 타 데미지 대조 -> damage 목록, 급소가 아니면 상대 사후분포에도 반영 """
+        att_spec, def_spec, info, field = pending["specs"]
+        lo, hi = pending["lo"], pending["hi"]
+        if pending["crit"]:
+            with self.timed("calc"):
+                res = calculate_damage_math(att_spec, def_spec, {**info, 'is_crit': True}, field)
+            lo, hi = (int(v) / def_spec['stats']['hp'] * 100 for v in res['damage_range'].split('~'))
+        actual, capped = before - after, after <= 0
+        self.damage.append({
+            "turn": self.turn_no, "side": pending["side"], "attacker": pending["attacker"],
+            "defender": pending["defender"], "move": pending["move"], "crit": pending["crit"], "capped": capped,
+            "predicted": [round(lo, 1), round(hi, 1)], "actual": round(actual, 1),
+        })
+        if pending["crit"] or actual <= 0: return
+        opp = current_battle.opp_active
+        with self.timed("state"):
+            if pending["side"] == "me":
+                opp.observe_damage("defender", pending["attacker"], att_spec, def_spec, info, field, actual, capped)
+            else:
+                opp.observe_damage("attacker", pending["defender"], att_spec, def_spec, info, field, actual, capped)
+
+    def check_order(self, first):
+        """ 양쪽이 모두 움직인 턴: 턴 시작 스펙으로 선후공 예측 대조 -> 상대 스피드 구간 갱신 """
+        moves, (specs, field), state = self.turn["moves"], self.turn["specs"], self.turn["state"]
+        with self.timed("calc"):
+            my_info, opp_info = get_move_data(moves["me"]), get_move_data(moves["opp"])
+            res = check_turn_order({**specs["me"], 'priority': my_info.get('priority', 0)}, specs["opp"],
+                                   field, my_info, opp_info)
+        predicted = None if res['is_my_turn'] is None else ("me" if res['is_my_turn'] else "opp")
+        self.order.append({"turn": self.turn_no, "my_move": moves["me"], "opp_move": moves["opp"],
+                           "predicted": predicted, "actual": first, "certain": res['certain']})
+        with self.timed("state"):
+            current_battle.apply_llm_update({"my_move_used": moves["me"], "opp_move_used": moves["opp"]})
+            current_battle.observe_turn_order(first == "opp", before=state)
+
+    # --- [이벤트 처리] ---
+    def on_gametype(self, tag, args, tags):
+        if args[0] != "singles": self.skipped = f"gametype {args[0]}"
+
+    def on_poke(self, tag, args, tags):
+        role = self.sides.get(args[0])
+        if role and len(args) > 1: self.roster[role].append(_species(args[1]))
+
+    def on_switch(self, tag, args, tags):
+        role, nick = self.role_of(args[0])
+        if not role or len(args) < 2: return
+        if not self.started: self.start()
+        species = _species(args[1])
+        self.names[role][nick] = species
+        if role == "me" and self._add_mine(species):
+            current_battle.my_party_status[species] = BattlePokemon(species, True)
+        if len(self.turn["moves"]) < 2: self.turn["switched"] = True   # 행동 사이 교체 (유턴 등) -> 선후공 대조 제외
+        self.update({f"{PREFIX[role]}_switch": species})
+        if len(args) > 2: self.sync_hp(role, _hp_percent(args[2]))
+
+    def on_move(self, tag, args, tags):
+        role, _ = self.role_of(args[0])
+        if not role or not self.started or len(args) < 2: return
+        move = args[1]
+        self.pending = None
+        if "from" in tags: return   # 다른 기술 / 특성이 대신 쓴 기술 (마법거울, 댄서 등) -> 행동 순서와 무관
+        moves = self.turn["moves"]
+        if role not in moves:
+            if not moves:
+                if not current_battle.my_active or not current_battle.opp_active: self.turn["switched"] = True
+                else: self.turn["specs"], self.turn["state"] = self.specs(), current_battle.speed_state()
+            moves[role] = move
+            if len(moves) == 2 and not self.turn["switched"]: self.check_order(first=next(iter(moves)))
+        self.update({f"{PREFIX[role]}_move_used": move})
+        target = self.role_of(args[2])[0] if len(args) > 2 and args[2] else None
+        if target and target != role: self.pending = self.predict_damage(role, move)
+
+    def on_hp(self, tag, args, tags):
+        role, _ = self.role_of(args[0])
+        poke = self.active(role) if role else None
+        if not poke or len(args) < 2: return
+        self.reveal_source(role, tags)
+        percent = _hp_percent(args[1])
+        pending = self.pending
+        if tag == "-damage" and "from" not in tags and pending and pending["target"] == role:
+            if pending["hits"] == 0: self.record_damage(pending, poke.current_hp_percent, percent)
+            pending["hits"] += 1
+            pending["crit"] = False   # 다단 공격: 타마다 |-crit|이 따로 옴
+        self.sync_hp(role, percent)
+
+    def on_faint(self, tag, args, tags):
+        role, _ = self.role_of(args[0])
+        if role: self.sync_hp(role, 0.0)
+
+    def on_crit(self, tag, args, tags):
+        if self.pending and self.role_of(args[0])[0] == self.pending["target"]: self.pending["crit"] = True
+
+    def on_boost(self, tag, args, tags):
+        role, _ = self.role_of(args[0])
+        poke = self.active(role) if role else None
+        if not poke or len(args) < 3 or args[1] not in poke.ranks: return
+        stat, amount = args[1], int(args[2])
+        change = {"-boost": amount, "-unboost": -amount, "-setboost": amount - poke.ranks[stat]}[tag]
+        if change: self.update({f"{PREFIX[role]}_rank_change": {stat: change}})
+
+    def on_clearboost(self, tag, args, tags):
+        roles = ("me", "opp") if tag == "-clearallboost" else (self.role_of(args[0])[0],)
+        for role in roles:
+            poke = self.active(role) if role else None
+            if poke and any(poke.ranks.values()):
+                self.update({f"{PREFIX[role]}_rank_change": {stat: -rank for stat, rank in poke.ranks.items() if rank}})
+
+    def on_status(self, tag, args, tags):
+        role, nick = self.role_of(args[0])
+        if not role: return
+        if tag == "-status":
+            if STATUS.get(args[1] if len(args) > 1 else ""):
+                self.update({f"{PREFIX[role]}_status": STATUS[args[1]]})
+        else:   # 벤치에 있는 포켓몬이 나을 수도 있음 (자연회복 / 아로마테라피)
+            poke = self.find(role, nick)
+            if poke:
+                with self.timed("state"): poke.status_condition = None
+
+    def on_weather(self, tag, args, tags):
+        if args[0] == "none":
+            with self.timed("state"): current_battle.global_effects['weather'] = None
+        elif args[0] in WEATHER and "upkeep" not in tags:
+            if tags.get("of"): self.reveal_source(None, tags)   # 날씨 특성 ([from] ability: Drought / [of] 주인)
+            self.update({"weather": WEATHER[args[0]]})
+
+    def on_field(self, tag, args, tags):
+        condition = args[0].split(":", 1)[-1].strip()
+        start = tag == "-fieldstart"
+        if condition == "Trick Room":
+            self.update({"trick_room": start})
+        elif condition in TERRAIN:
+            if start: self.update({"terrain": TERRAIN[condition]})
+            elif current_battle.global_effects['terrain'] == TERRAIN[condition]:
+                with self.timed("state"): current_battle.global_effects['terrain'] = None
+
+    def on_side(self, tag, args, tags):
+        role = self.sides.get(args[0][:2])
+        if not role or len(args) < 2: return
+        condition = args[1].split(":", 1)[-1].strip()
+        start = tag == "-sidestart"
+        if condition == "Tailwind":
+            self.update({f"tailwind_{role}": start})
+        elif condition in SCREENS:
+            if role == "opp":
+                self.update({f"{key}_opp": start for key in SCREENS[condition]})
+            else:   # 스키마에 내 벽 키는 없음
+                with self.timed("state"):
+                    for key in SCREENS[condition]: current_battle.side_effects['me'][key] = start
+
+    def on_item(self, tag, args, tags):
+        role, _ = self.role_of(args[0])
+        if not role or len(args) < 2: return
+        if tags.get("from", "").startswith("move:"): return   # 트릭 / 탁쳐서떨구기 등으로 바뀐 도구는 원래 세트가 아님
+        self.reveal(role, "item", args[1])
+
+    def on_ability(self, tag, args, tags):
+        role, _ = self.role_of(args[0])
+        if role and len(args) > 1 and "from" not in tags: self.reveal(role, "ability", args[1])
+
+    def on_tera(self, tag, args, tags):
+        role, _ = self.role_of(args[0])
+        poke = self.active(role) if role else None
+        if not poke or len(args) < 2: return
+        self.tera[role] = (poke.name, args[1])
+        if role == "opp": self.update({"opp_tera_type": args[1]})
+        else:
+            with self.timed("state"): poke.reveal_info("tera_type", args[1])
+
+    def on_turn(self, tag, args, tags):
+        if self.turn_no: self.update({"turn_end": True})
+        self.turn_no = int(args[0]) if args[0].isdigit() else self.turn_no + 1
+        self.turn = {"moves": {}, "switched": False}
+        self.pending = None
+
+
+# --------------------------------------------------------------------------
+# [3] 입력 / 작업자
+# --------------------------------------------------------------------------
+def iter_replays(paths):
+    """
+    파일 / 디렉터리 인자 -> (리플레이 ID, 파일 경로, 로그 문자열) 를 하나씩 (지연 읽기)
+    .jsonl은 줄마다 {"id", "log"} -> 로그 문자열로, 나머지는 작업자가 파일을 직접 읽음
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.endswith(REPLAY_EXTENSIONS): yield from iter_replays([os.path.join(root, name)])
+        elif path.endswith(".jsonl"):
+            stem = os.path.splitext(os.path.basename(path))[0]
+            with open(path, "r", encoding="utf-8") as f:
+                for line_no, line in enumerate(f, 1):
+                    if not line.strip(): continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        print(f"⚠️ [Replay] {path}:{line_no} JSON 형식이 아님 -> 건너뜀")
+                        continue
+                    yield str(record.get("id") or f"{stem}_{line_no}"), None, record.get("log", "")
+        else:
+            yield os.path.splitext(os.path.basename(path))[0], path, None
+
+_WORKER = {"side": "p1", "team": {}}
+
+def _init_worker(side, team, verbose):
+    """ 작업자 프로세스 설정 (상태 갱신 로그는 이벤트마다 찍히므로 기본은 버림) """
+    _WORKER.update(side=side, team=team)
+    if not verbose: sys.stdout = open(os.devnull, "w", encoding="utf-8")
+
+def replay_file(unit):
+    """ (리플레이 ID, 파일 경로, 로그 문자열) -> 결과 dict (작업자 프로세스에서 실행) """
+    replay_id, path, text = unit
+    runner = ReplayRunner(replay_id, _WORKER["side"], _WORKER["team"])
+    start = time.perf_counter()
+    try:
+        if text is not None: return runner.run(io.StringIO(text))
+        with open(path, "r", encoding="utf-8") as f:
+            if path.endswith(".json"): return runner.run(io.StringIO(json.load(f).get("log", "")))
+            return runner.run(f)
+    except Exception as e:
+        return runner.result(time.perf_counter() - start, f"{type(e).__name__}: {e}")
+
+def run_replays(units, on_result, workers=REPLAY_WORKERS, side="p1", team=None, verbose=False):
+    """ 리플레이를 작업자 프로세스에 나눠 재생 -> 끝나는 대로 on_result(결과) (workers <= 1이면 이 프로세스에서) """
+    if workers <= 1:
+        _WORKER.update(side=side, team=team or {})
+        with open(os.devnull, "w", encoding="utf-8") as sink, contextlib.redirect_stdout(sys.stdout if verbose else sink):
+            for unit in units: on_result(replay_file(unit))
+        return
+
+    inflight = set()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_worker, initargs=(side, team or {}, verbose)) as executor:
+        for unit in units:
+            if len(inflight) >= workers * REPLAY_INFLIGHT:
+                done, inflight = wait(inflight, return_when=FIRST_COMPLETED)
+                for future in done: on_result(future.result())
+            inflight.add(executor.submit(replay_file, unit))
+        for future in wait(inflight).done: on_result(future.result())
+
+
+# --------------------------------------------------------------------------
+# [4] 집계 / 보고
+# --------------------------------------------------------------------------
+class ReplayReport:
+    """ 리플레이 결과 누적 -> 계산기 정확도 + 상태 / 계산 계층 처리량 """
+    def __init__(self, tolerance=DAMAGE_TOLERANCE):
+        self.tolerance = tolerance
+        self.counts = {"replays": 0, "skipped": 0, "errors": 0, "events": 0, "turns": 0}
+        self.damage = {kind: {"n": 0, "hit": 0, "abs_err": 0.0, "err": 0.0} for kind in ("normal", "crit", "capped")}
+        self.moves = {}     # 기술 -> [대조 수, 범위 밖]
+        self.order = {"n": 0, "hit": 0, "ties": 0, "certain": 0, "certain_hit": 0}
+        self.timing = {"state": 0.0, "calc": 0.0, "total": 0.0}
+        self.calcs = 0
+
+    def add(self, result):
+        counts = self.counts
+        counts["replays"] += 1
+        if result["error"]: counts["errors"] += 1
+        if result["skipped"]: counts["skipped"] += 1
+        counts["events"] += result["events"]
+        counts["turns"] += result["turns"]
+        for layer in self.timing: self.timing[layer] += result["timing"][layer]
+
+        tol = self.tolerance
+        for sample in result["damage"]:
+            lo, hi = sample["predicted"]
+            actual = sample["actual"]
+            kind = "crit" if sample["crit"] else "capped" if sample["capped"] else "normal"
+            # 기절로 잘린 데미지는 실제 데미지의 하한 -> 최대치가 그 이상이면 맞음
+            hit = actual <= hi + tol if kind == "capped" else lo - tol <= actual <= hi + tol
+            stats = self.damage[kind]
+            stats["n"] += 1
+            stats["hit"] += hit
+            stats["abs_err"] += abs(actual - (lo + hi) / 2)
+            stats["err"] += actual - (lo + hi) / 2
+            move = self.moves.setdefault(sample["move"], [0, 0])
+            move[0] += 1
+            move[1] += not hit
+        self.calcs += len(result["damage"]) + len(result["order"])
+
+        for sample in result["order"]:
+            order = self.order
+            if sample["predicted"] is None:
+                order["ties"] += 1
+                continue
+            hit = sample["predicted"] == sample["actual"]
+            order["n"] += 1
+            order["hit"] += hit
+            if sample["certain"]:
+                order["certain"] += 1
+                order["certain_hit"] += hit
+
+    def format(self, elapsed):
+        def rate(hit, n): return f"{hit / n * 100:.1f}%" if n else "-"
+        def per_sec(count): return count / elapsed if elapsed > 0 else 0
+
+        c, d, o = self.counts, self.damage, self.order
+        lines = [f"📊 [Replay] 리플레이 {c['replays']}개 (건너뜀 {c['skipped']}, 실패 {c['errors']}) / "
+                 f"이벤트 {c['events']} / 턴 {c['turns']}"]
+        normal = d["normal"]
+        if normal["n"]:
+            lines.append(f"🎯 데미지 {normal['n']}건: 범위 안 {rate(normal['hit'], normal['n'])} "
+                         f"(허용 ±{self.tolerance:g}%p) / 평균 오차 {normal['abs_err'] / normal['n']:.1f}%p / "
+                         f"편향 {normal['err'] / normal['n']:+.1f}%p (실제 - 예측 중앙)")
+        if d["crit"]["n"]:
+            lines.append(f"   급소 {d['crit']['n']}건: 범위 안 {rate(d['crit']['hit'], d['crit']['n'])} / "
+                         f"편향 {d['crit']['err'] / d['crit']['n']:+.1f}%p")
+        if d["capped"]["n"]:
+            lines.append(f"   기절로 잘린 데미지 {d['capped']['n']}건: 예측 최대치 이상 {rate(d['capped']['hit'], d['capped']['n'])}")
+        worst = sorted(((miss, n, move) for move, (n, miss) in self.moves.items() if miss), reverse=True)[:5]
+        if worst:
+            lines.append("   많이 빗나간 기술: " + ", ".join(f"{move} {miss}/{n}" for miss, n, move in worst))
+        lines.append(f"⚡ 선후공 {o['n']}턴: 적중 {rate(o['hit'], o['n'])} (동속 예측 {o['ties']}턴 제외) / "
+                     f"확정 판정 {o['certain']}턴: 적중 {rate(o['certain_hit'], o['certain'])}")
+
+        t = self.timing
+        share = lambda layer: f"{t[layer] / t['total'] * 100:.0f}%" if t["total"] else "-"
+        lines.append(f"🚀 처리량: {c['replays']}개 / {elapsed:.2f}초 = {per_sec(c['replays']):.1f}개/초, "
+                     f"이벤트 {per_sec(c['events']):.0f}/초, 턴 {per_sec(c['turns']):.0f}/초, 예측 {per_sec(self.calcs):.0f}/초")
+        lines.append(f"   작업자 시간 {t['total']:.2f}초 중 상태 계층 {share('state')} ({t['state']:.2f}초) / "
+                     f"계산 계층 {share('calc')} ({t['calc']:.2f}초) / 나머지(파싱 등)")
+        return "\n".join(lines)
+
+
+# --------------------------------------------------------------------------
+# [5] CLI
+# --------------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Showdown 리플레이 재생 - 계산기 정확도 / 처리량 측정")
+    parser.add_argument("paths", nargs="+", help="리플레이 파일 또는 디렉터리 (.log / .txt / .json / .jsonl)")
+    parser.add_argument("-o", "--output", help="리플레이별 결과 JSONL 파일")
+    parser.add_argument("--workers", type=int, default=REPLAY_WORKERS, help="작업자 프로세스 수 (1이면 이 프로세스에서)")
+    parser.add_argument("--side", default="p1", choices=["p1", "p2"], help="내 진영으로 볼 플레이어")
+    parser.add_argument("--team", help="내 세트 파일 (Showdown 형식, 없는 포켓몬은 Smogon 샘플로 추정)")
+    parser.add_argument("--tolerance", type=float, default=DAMAGE_TOLERANCE, help="데미지 허용 오차 (%%p)")
+    parser.add_argument("--verbose", action="store_true", help="상태 갱신 로그 출력")
+    args = parser.parse_args(argv)
+
+    team = {}
+    if args.team:
+        from Battle_Preparing.party_loader import load_party_from_file
+        load_party_from_file(args.team)
+        team = {name: {k: v for k, v in entry.items() if k != "is_user"} for name, entry in my_party.team.items()}
+
+    report = ReplayReport(args.tolerance)
+    out = open(args.output, "w", encoding="utf-8") if args.output else None
+
+    def on_result(result):
+        report.add(result)
+        if out: out.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+    start = time.perf_counter()
+    try:
+        run_replays(iter_replays(args.paths), on_result, args.workers, args.side, team, args.verbose)
+    finally:
+        if out: out.close()
+    print(report.format(time.perf_counter() - start))
+    return 1 if report.counts["errors"] and report.counts["errors"] == report.counts["replays"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+# resources.py
+"""
+[지연 초기화 리소스 & 시작 시간 프로파일]
+무거운 데이터(JSON 통계, LLM 클라이언트 등)는 임포트 시점이 아니라 처음 쓰일 때 한 번만 만듭니다.
+각 리소스의 초기화 소요 시간을 기록하고, 모듈 임포트 시간과 함께 보고서로 출력합니다.
+
+    python resources.py   # 시작 시간 프로파일 보고서
+"""
+import os
+import re
+import sys
+import time
+import threading
+import functools
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+
+# 프로파일 대상 모듈 (app.py가 임포트하는 순서)
+STARTUP_MODULES = ["rag_retriever", "battle_state", "entry", "battle"]
+
+_init_lock = threading.Lock()
+_init_times = {}   # 리소스 이름 -> 초기화 소요 시간(초)
+
+
+def record_init(name, seconds):
+    with _init_lock:
+        _init_times[name] = seconds
+
+
+def lazy_resource(name):
+    """
+    [Decorator] 인자 없는 팩토리 함수를 스레드 안전한 1회 초기화 접근자로 만듭니다.
+    같은 프로세스 안의 모든 세션/스레드가 하나의 인스턴스를 공유합니다.
+    """
+    def decorator(factory):
+        lock = threading.Lock()
+        holder = []
+
+        @functools.wraps(factory)
+        def accessor():
+            if holder: return holder[0]
+            with lock:
+                if not holder:
+                    start = time.perf_counter()
+                    holder.append(factory())
+                    record_init(name, time.perf_counter() - start)
+            return holder[0]
+
+        accessor.is_initialized = lambda: bool(holder)
+        return accessor
+    return decorator
+
+
+def get_init_times():
+    with _init_lock:
+        return dict(_init_times)
+
+
+def measure_import_time(module_name):
+    """ 새 프로세스에서 모듈을 임포트하여 누적 임포트 시간(ms) 측정 (-X importtime) """
+    import subprocess
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module_name}"],
+        cwd=current_dir, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        return None
+    # 형식: "import time:  self [us] | cumulative | imported package"
+    for line in reversed(result.stderr.splitlines()):
+        match = re.match(r"import time:\s+\d+\s+\|\s+(\d+)\s+\|\s+(\S+)$", line)
+        if match and match.group(2) == module_name:
+            return int(match.group(1)) / 1000
+    return None
+
+
+def get_startup_report(modules=STARTUP_MODULES):
+    """ 모듈별 임포트 시간 + 이 프로세스에서 초기화된 리소스 시간 보고서 """
+    lines = ["=== ⏱️ Startup Profile ===", "[모듈 임포트 (새 프로세스 기준)]"]
+    for module_name in modules:
+        ms = measure_import_time(module_name)
+        lines.append(f"  - {module_name:<16} {'실패' if ms is None else f'{ms:8.1f} ms'}")
+
+    lines.append("[지연 초기화 리소스 (최초 사용 시)]")
+    init_times = get_init_times()
+    if not init_times:
+        lines.append("  - (아직 초기화된 리소스 없음)")
+    for name, seconds in sorted(init_times.items(), key=lambda x: -x[1]):
+        lines.append(f"  - {name:<24} {seconds * 1000:8.1f} ms")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    if current_dir not in sys.path:
+        sys.path.append(current_dir)
+
+    # 최초 사용 비용 측정을 위해 대표 리소스 초기화
+    # (__main__이 아닌 resources 모듈에 기록되므로 모듈을 다시 임포트해서 보고)
+    import resources
+    from rag_retriever import get_smogon_db, get_lead_stats
+    get_smogon_db()
+    get_lead_stats()
+
+    print(resources.get_startup_report())
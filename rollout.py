@@ -0,0 +1,374 @@
+# rollout.py
+"""
+[몬테카를로 롤아웃 - 남은 3vs3 승률 추정]
+현재 BattleState에서 남은 배틀을 끝까지 수천 번 플레이해 보고, 이번 턴 내 행동(기술/교체)별 승률을 추정합니다.
+어드바이저 프롬프트에 [롤아웃 승률]로 붙습니다.
+
+- 표본: 상대 미공개 후속 포켓몬 (opp_full_roster 중 사용률 가중), 상대 기술 구성 (확인된 기술 + 사용률 가중 추첨),
+        데미지 난수 16단계, 명중률, 동속 선후공
+- 데미지 표: 계산기로 (공격자, 방어자, 기술, 난수) -> HP% 배열을 한 번만 만들고, 롤아웃은 numpy 인덱싱으로 조회
+- 병렬화: 행동 x 묶음(chunk) 단위로 프로세스 풀에 나눠 실행, 제한 시간(BATTLE_ROLLOUT_BUDGET_MS) 안에 끝난 묶음만 집계
+- 행동 정책: 첫 턴 이후 양쪽 모두 "현재 대면에서 평균 데미지가 가장 큰 기술", 기절 시 가장 유리한 포켓몬으로 교체
+
+[단순화]
+- 변화기 / 자발적 교체 / 테라스탈 / 급소 / 상태이상 / 턴 종료 효과는 제외
+- 랭크는 시작 시점 활성 포켓몬에만 반영 (표를 만들 때 고정)
+"""
+import os
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from Calculator.calculator import calculate_damage_math
+from Calculator.speed_checker import check_turn_order
+from Calculator.move_loader import get_move_data
+from Calculator.stat_estimator import estimate_stats
+from name_aliases import move_to_english
+from rag_retriever import get_smogon_db
+from telemetry import telemetry
+from turn_search import _calc_spec
+
+ROLLOUT_COUNT = int(os.getenv("BATTLE_ROLLOUTS", 2000))               # 행동당 롤아웃 수
+ROLLOUT_BUDGET_MS = float(os.getenv("BATTLE_ROLLOUT_BUDGET_MS", 800))   # 0이면 롤아웃 생략
+ROLLOUT_WORKERS = int(os.getenv("BATTLE_ROLLOUT_WORKERS", os.cpu_count() or 1))
+CHUNK_SIZE = int(os.getenv("BATTLE_ROLLOUT_CHUNK", 500))
+MAX_TURNS = 30          # 이 턴 수를 넘기면 남은 HP 비율로 판정
+TEAM_SIZE = 3
+SET_SIZE = 4            # 상대 기술 구성 크기
+MOVE_POOL = 8           # 상대 기술 후보 (사용률 상위)
+ROLLS = np.arange(85, 101) / 100.0
+
+
+# --------------------------------------------------------------------------
+# [1] 표 만들기 (메인 프로세스, 계산기 사용)
+# --------------------------------------------------------------------------
+def _roll_percents(att_spec, def_spec, move, field_spec):
+    """ 16단계 난수별 데미지 (방어자 HP %) """
+    if move['power'] <= 0: return np.zeros(len(ROLLS))
+    res = calculate_damage_math(att_spec, def_spec, move, field_spec)
+    max_damage = int(res['damage_range'].split('~')[1])
+    return np.floor(max_damage * ROLLS) / def_spec['stats']['hp'] * 100
+
+def _accuracy(move):
+    acc = move.get('accuracy')
+    return 1.0 if acc is None else acc / 100
+
+def _opp_move_pool(poke, usage):
+    """
+    확인된 기술(무조건 포함) + 사용률 상위 공격기 -> [(기술 스펙, 가중치)] (가중치 inf = 확인됨)
+    샘플 사후분포가 있으면 사용률 대신 사후 채용 확률을 가중치로
+    """
+    known = [move_to_english(m) or m for m in poke.info.get('moves', [])]
+    posterior = dict((poke.info.get('posterior') or {}).get('moves', ()))
+    pool = [(get_move_data(m), float("inf")) for m in known]
+    for move_id, weight in (usage.get('Moves') or [])[:MOVE_POOL]:
+        name = move_to_english(move_id) or move_id
+        if name in known: continue
+        weight = posterior.get(move_id, weight) if posterior else weight
+        if weight <= 0: continue
+        move = get_move_data(name)
+        if move['power'] > 0: pool.append((move, weight))
+    if not pool:
+        pool = [(get_move_data(m), 1.0) for m in poke.info['predictions']['moves'][:SET_SIZE]]
+    return pool[:max(MOVE_POOL, len(known))]
+
+def build_tables(battle):
+    """
+    현재 배틀 상태 -> 롤아웃용 numpy 표 (프로세스 풀로 그대로 전달)
+    Returns: dict 또는 None (정보 부족)
+    """
+    from battle_state import BattlePokemon
+
+    my_active, opp_active = battle.my_active, battle.opp_active
+    if not my_active or not opp_active: return None
+    db = get_smogon_db()
+
+    names = battle.my_entry_selection or list(battle.my_party_status.keys())
+    team = [battle.my_party_status[n] for n in names if n in battle.my_party_status][:TEAM_SIZE]
+    if my_active not in team: team = [my_active] + team[:TEAM_SIZE - 1]
+
+    # 상대: 공개된 포켓몬 (고정 슬롯) + 미공개 후보 (사용률 가중)
+    revealed = [opp_active] + [p for p in battle.opp_revealed_party.values() if p is not opp_active]
+    unknown_slots = max(0, TEAM_SIZE - len(revealed))
+    candidates = [BattlePokemon(n, is_mine=False) for n in battle.opp_full_roster
+                  if n not in battle.opp_revealed_party] if unknown_slots else []
+    opp_pokes, opp_stats, n_fixed = [], [], 0
+    for poke in revealed + candidates:
+        stats = poke.info.get('stats') or (estimate_stats(poke.name) or {}).get('stats')
+        if not stats: continue
+        opp_pokes.append(poke)
+        opp_stats.append(stats)
+        if poke in revealed: n_fixed += 1
+    if not opp_pokes or opp_pokes[0] is not opp_active: return None
+    candidates = opp_pokes[n_fixed:]
+    unknown_slots = min(unknown_slots, len(candidates))
+
+    field_spec = {
+        'weather': battle.global_effects['weather'], 'terrain': battle.global_effects['terrain'],
+        'trick_room': battle.global_effects['trick_room'],
+        'tailwind_me': battle.side_effects['me']['tailwind'], 'tailwind_opp': battle.side_effects['opp']['tailwind']
+    }
+    my_specs = [_calc_spec(p, p.info['stats'], dict(p.ranks) if p is my_active else {}, battle.side_effects['me'])
+                for p in team]
+    opp_specs = [_calc_spec(p, s, dict(p.ranks) if p is opp_active else {}, battle.side_effects['opp'])
+                 for p, s in zip(opp_pokes, opp_stats)]
+
+    my_moves = [[m for m in (get_move_data(n) for n in p.info.get('moves', [])) if m['power'] > 0] or
+                [{"name": "-", "power": 0, "priority": 0}] for p in team]
+    opp_pools = [_opp_move_pool(p, db.get(p.name, {})) for p in opp_pokes]
+
+    n_my, n_opp = len(team), len(opp_pokes)
+    M = max(len(m) for m in my_moves)
+    P = max(SET_SIZE, max(len(p) for p in opp_pools))
+    t = {
+        "my_names": [p.name for p in team], "opp_names": [p.name for p in opp_pokes],
+        "my_move_names": [[m['name'] for m in moves] for moves in my_moves],
+        "my_dmg": np.zeros((n_my, n_opp, M, len(ROLLS)), np.float32),
+        "opp_dmg": np.zeros((n_opp, n_my, P, len(ROLLS)), np.float32),
+        "my_acc": np.zeros((n_my, M), np.float32), "my_prio": np.full((n_my, M), -99, np.int8),
+        "opp_acc": np.zeros((n_opp, P), np.float32), "opp_prio": np.full((n_opp, P), -99, np.int8),
+        "opp_weight": np.zeros((n_opp, P)),         # 0 = 빈 칸, inf = 확인된 기술
+        "my_first": np.zeros((n_my, n_opp), np.float32),
+        "my_hp": np.array([0 if p.is_fainted else p.current_hp_percent for p in team], np.float32),
+        "opp_hp": np.array([0 if p.is_fainted else p.current_hp_percent for p in opp_pokes], np.float32),
+        "my_active": team.index(my_active),
+        "n_fixed": n_fixed, "unknown_slots": unknown_slots,
+        "usage": np.array([db.get(p.name, {}).get('Usage_Rate', 1.0) or 1.0 for p in candidates]),
+    }
+    for i, moves in enumerate(my_moves):
+        for m, move in enumerate(moves):
+            t["my_acc"][i, m], t["my_prio"][i, m] = _accuracy(move), move.get('priority', 0)
+    for j, pool in enumerate(opp_pools):
+        for k, (move, weight) in enumerate(pool):
+            t["opp_acc"][j, k], t["opp_prio"][j, k] = _accuracy(move), move.get('priority', 0)
+            t["opp_weight"][j, k] = weight
+    for i, my_spec in enumerate(my_specs):
+        for j, opp_spec in enumerate(opp_specs):
+            for m, move in enumerate(my_moves[i]):
+                t["my_dmg"][i, j, m] = _roll_percents(my_spec, opp_spec, move, field_spec)
+            for k, (move, _) in enumerate(opp_pools[j]):
+                t["opp_dmg"][j, i, k] = _roll_percents(opp_spec, my_spec, move, field_spec)
+            first = check_turn_order(my_spec, opp_spec, field_spec, {}, {})['is_my_turn']
+            t["my_first"][i, j] = 0.5 if first is None else float(first)
+    return t
+
+
+# --------------------------------------------------------------------------
+# [2] 롤아웃 (작업 프로세스, numpy 벡터 연산으로 n개를 동시에 진행)
+# --------------------------------------------------------------------------
+def _weighted_sample(rng, weights, k):
+    """ 행마다 weights 가중 비복원 추출 k개 (Efraimidis-Spirakis 키) -> 열 번호 (n, k) """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        keys = np.log(rng.random(weights.shape)) / weights
+    keys[weights == 0] = -np.inf
+    keys[np.isinf(weights)] = np.inf
+    return np.argsort(-keys, axis=1, kind="stable")[:, :k]
+
+def run_rollouts(t, action, n, seed):
+    """ action으로 시작하는 롤아웃 n개 -> 승리 점수 합 (승 1 / 패 0 / 판정 0~1) """
+    rng = np.random.default_rng(seed)
+    rows = np.arange(n)
+    n_my = len(t["my_hp"])
+
+    # 상대 3마리 구성: 공개 슬롯 + 미공개 후보 추첨
+    opp_ids = np.tile(np.arange(t["n_fixed"]), (n, 1))
+    if t["unknown_slots"]:
+        picks = _weighted_sample(rng, np.tile(t["usage"], (n, 1)), t["unknown_slots"]) + t["n_fixed"]
+        opp_ids = np.concatenate([opp_ids, picks], axis=1)
+    n_slots = opp_ids.shape[1]
+    opp_hp = t["opp_hp"][opp_ids].copy()
+    my_hp = np.tile(t["my_hp"], (n, 1))
+
+    # 상대 기술 구성 (슬롯별 SET_SIZE개)
+    opp_sets = np.stack([
+        _weighted_sample(rng, t["opp_weight"][opp_ids[:, s]], SET_SIZE) for s in range(n_slots)
+    ], axis=1)
+
+    my_mean = t["my_dmg"].mean(axis=3) * t["my_acc"][:, None, :]            # (n_my, n_opp, M)
+    opp_mean = t["opp_dmg"].mean(axis=3) * t["opp_acc"][:, None, :]         # (n_opp, n_my, P)
+    my_best = my_mean.argmax(axis=2)                                         # 대면별 최선 기술
+    my_best_dmg = my_mean.max(axis=2)
+
+    my_act = np.full(n, t["my_active"])
+    opp_slot = (opp_hp > 0).argmax(axis=1)
+    if action[0] == "switch" and t["my_hp"][t["my_active"]] <= 0:
+        # 기절 후 교체는 턴을 쓰지 않음
+        my_act, action = np.full(n, action[1]), None
+    live = np.ones(n, dtype=bool)
+    score = np.full(n, 0.5)
+
+    for turn in range(MAX_TURNS):
+        i, j = my_act, opp_ids[rows, opp_slot]
+        move = my_best[i, j]
+        switching = np.zeros(n, dtype=bool)
+        if turn == 0 and action is not None:
+            if action[0] == "switch":
+                switching[:] = True
+                my_act = np.full(n, action[1])
+            else:
+                move = np.full(n, action[1])
+
+        # 상대: 현재 대면(교체 전 내 포켓몬) 기준 평균 데미지가 가장 큰 기술
+        opp_set = opp_sets[rows, opp_slot]                                   # (n, SET_SIZE)
+        opp_move = opp_set[rows, opp_mean[j[:, None], i[:, None], opp_set].argmax(axis=1)]
+
+        target = my_act
+        my_prio, opp_prio = t["my_prio"][i, move], t["opp_prio"][j, opp_move]
+        me_first = switching | (my_prio > opp_prio) | (
+            (my_prio == opp_prio) & (rng.random(n) < t["my_first"][i, j]))
+
+        my_hit = t["my_dmg"][i, j, move, rng.integers(0, len(ROLLS), n)] * (rng.random(n) < t["my_acc"][i, move])
+        my_hit[switching] = 0
+        opp_hit = t["opp_dmg"][j, target, opp_move, rng.integers(0, len(ROLLS), n)] * (
+            rng.random(n) < t["opp_acc"][j, opp_move])
+
+        # 선공 -> (살아 있으면) 후공
+        cur_opp = opp_hp[rows, opp_slot]
+        cur_my = my_hp[rows, target]
+        opp_after_first = np.where(me_first, cur_opp - my_hit, cur_opp)
+        my_after_first = np.where(~me_first, cur_my - opp_hit, cur_my)
+        new_my = np.where(me_first & (opp_after_first > 0), my_after_first - opp_hit, my_after_first)
+        new_opp = np.where(~me_first & (my_after_first > 0), opp_after_first - my_hit, opp_after_first)
+        opp_hp[rows[live], opp_slot[live]] = np.maximum(new_opp[live], 0)
+        my_hp[rows[live], target[live]] = np.maximum(new_my[live], 0)
+
+        # 종료 판정
+        won = live & ~(opp_hp > 0).any(axis=1)
+        lost = live & ~(my_hp > 0).any(axis=1)
+        score[won], score[lost] = 1.0, 0.0
+        live &= ~(won | lost)
+        if not live.any(): break
+
+        # 기절 교체: 상대는 다음 슬롯, 나는 새 상대에게 가장 큰 데미지를 주는 포켓몬
+        opp_slot = np.where(opp_hp[rows, opp_slot] > 0, opp_slot, (opp_hp > 0).argmax(axis=1))
+        j = opp_ids[rows, opp_slot]
+        choice = np.where(my_hp > 0, my_best_dmg[:, j].T, -1.0).argmax(axis=1)
+        my_act = np.where(my_hp[rows, my_act] > 0, my_act, choice)
+
+    # 턴 제한 초과: 남은 HP 비율로 판정
+    if live.any():
+        my_frac = my_hp[live].sum(axis=1) / (100 * n_my)
+        opp_frac = opp_hp[live].sum(axis=1) / (100 * n_slots)
+        score[live] = 0.5 + (my_frac - opp_frac) / 2
+    return float(score.sum()), n
+
+
+# --------------------------------------------------------------------------
+# [3] 프로세스 풀 / 메인 함수
+# --------------------------------------------------------------------------
+class RolloutPool:
+    """ 롤아웃 작업 프로세스 풀 (처음 쓸 때 생성, 스레드가 있는 앱이므로 spawn 방식) """
+    def __init__(self, workers=ROLLOUT_WORKERS):
+        self.workers = workers
+        self._executor = None
+
+    def executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def prewarm(self):
+        """ 작업 프로세스를 미리 띄워 첫 턴의 시작 비용을 없앰 """
+        if self.workers > 1:
+            for _ in range(self.workers): self.executor().submit(int)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def _run_in_pool(pool, t, jobs, deadline, totals):
+    """
+    묶음을 풀에 나눠 실행하고 deadline까지 끝난 결과를 totals에 더함 -> 시작도 못 한 묶음 [(행동, 수, 시드)]
+    - 작업 프로세스가 아직 안 떴거나(콜드 풀) 다른 세션 작업으로 바쁘면, 대기 중인 묶음을 취소하고 현재 프로세스에서 직접 실행
+    - 결과는 모두 모은 뒤에 한 번에 더함 (도중에 풀이 깨지면 totals는 그대로 -> 호출 측이 전부 다시 실행)
+    """
+    futures = [(pool.executor().submit(run_rollouts, t, action, n, job_seed), (action, n, job_seed))
+               for action, n, job_seed in jobs]
+    results = []
+    for future, (action, n, job_seed) in reversed(futures):   # 뒤쪽(나중에 시작될) 묶음부터 가져옴
+        if time.perf_counter() > deadline: break
+        if future.cancel(): results.append((action, run_rollouts(t, action, n, job_seed)))
+
+    remaining = [future for future, _ in futures if not future.cancelled()]
+    done, pending = wait(remaining, timeout=max(0.0, deadline - time.perf_counter()))
+    for future in pending: future.cancel()
+    results.extend((job[0], future.result()) for future, job in futures if future in done)
+    for action, (wins, count) in results:
+        totals[action][0] += wins
+        totals[action][1] += count
+    return [job for future, job in futures if future in pending and future.cancelled()]
+
+def candidate_actions(t):
+    i = t["my_active"]
+    if t["my_hp"][i] <= 0:
+        actions = []
+    else:
+        actions = [("move", m) for m, name in enumerate(t["my_move_names"][i]) if name != "-"]
+    return actions + [("switch", j) for j, hp in enumerate(t["my_hp"]) if j != i and hp > 0]
+
+def action_label(t, action):
+    if action[0] == "switch": return f"교체 -> {t['my_names'][action[1]]}"
+    return t["my_move_names"][t["my_active"]][action[1]]
+
+def estimate_win_rates(battle, rollouts=ROLLOUT_COUNT, budget_ms=ROLLOUT_BUDGET_MS, pool=None, seed=0):
+    """
+    [Interface Function]
+    행동별 롤아웃 승률을 제한 시간 안에 추정합니다.
+    battle: BattleState 또는 BattleSnapshot (읽기만 함)
+    Returns: {actions: [{action, label, win_rate, rollouts}], rollouts, elapsed_ms} 또는 None
+    """
+    start = time.perf_counter()
+    pool = pool or rollout_pool
+    with telemetry.span("battle.rollout") as span:
+        t = build_tables(battle)
+        if not t: return None
+        actions = candidate_actions(t)
+        if not actions: return None
+
+        # 묶음을 행동끼리 번갈아 배치 -> 시간이 모자라도 모든 행동이 비슷한 수의 표본을 가짐
+        jobs = [(action, min(CHUNK_SIZE, rollouts - done), seed + a * rollouts + done)
+                for done in range(0, rollouts, CHUNK_SIZE) for a, action in enumerate(actions)]
+
+        totals = {action: [0.0, 0] for action in actions}
+        deadline = start + budget_ms / 1000
+        if pool.workers > 1:
+            try:
+                jobs = _run_in_pool(pool, t, jobs, deadline, totals)
+            except BrokenProcessPool as e:
+                # 결과를 더하기 전에 실패 -> totals가 비어 있으므로 전부 다시 실행해도 중복 집계 없음
+                print(f"⚠️ [Rollout] 프로세스 풀 오류, 현재 프로세스에서 실행: {e}")
+                pool.shutdown()
+        for action, n, job_seed in jobs:
+            if time.perf_counter() > deadline: break
+            wins, count = run_rollouts(t, action, n, job_seed)
+            totals[action][0] += wins
+            totals[action][1] += count
+
+        ranked = sorted(((a, w / c, c) for a, (w, c) in totals.items() if c), key=lambda item: -item[1])
+        total_rollouts = sum(c for _, c in totals.values())
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        span.update(rollouts=total_rollouts, actions=len(actions))
+        if not ranked: return None
+        return {
+            "actions": [{"action": a, "label": action_label(t, a), "win_rate": round(rate, 3), "rollouts": c}
+                        for a, rate, c in ranked],
+            "rollouts": total_rollouts,
+            "elapsed_ms": round(elapsed_ms, 1)
+        }
+
+def format_rollout_report(result, top=3):
+    """ 어드바이저 프롬프트용 요약 """
+    if not result or not result["actions"]: return ""
+    lines = [f"🎲 [롤아웃 승률] (총 {result['rollouts']}회, {result['elapsed_ms']}ms)"]
+    for rank, entry in enumerate(result["actions"][:top], 1):
+        lines.append(f" {rank}. {entry['label']} (승률 {entry['win_rate'] * 100:.0f}%, {entry['rollouts']}회)")
+    return "\n".join(lines) + "\n"
+
+
+rollout_pool = RolloutPool()
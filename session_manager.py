@@ -0,0 +1,120 @@
+# session_manager.py
+"""
+[세션별 배틀 상태 관리]
+current_battle(battle_state.py) / my_party(user_party.py)는 원래 프로세스 전역 싱글턴이라서,
+Streamlit 배포에서 동시에 접속한 사용자들이 하나의 배틀/파티를 같이 덮어썼습니다.
+
+- 세션 ID -> Session(배틀, 파티) 저장소. 현재 세션은 contextvar로 지정 (activate)
+- current_battle / my_party는 SessionProxy: 속성 접근 시 현재 세션의 객체로 전달
+  (기존 코드의 `from battle_state import current_battle` 그대로 동작)
+- 세션이 지정되지 않은 실행(CLI / benchmark / 배치)은 기본 세션 하나를 씀 (예전 싱글턴과 같음)
+- LRU: 최대 세션 수(BATTLE_MAX_SESSIONS)를 넘거나 유휴 시간(BATTLE_SESSION_IDLE_SEC)이 지나면 정리
+- 불변 메타 데이터(Smogon 통계, 종족값/기술 캐시, 스냅샷, 상대 명단 프리페치 풀)는 모듈 전역이라 세션끼리 공유
+"""
+import os
+import time
+import threading
+import contextvars
+from collections import OrderedDict
+
+from telemetry import telemetry, set_session
+
+MAX_SESSIONS = int(os.getenv("BATTLE_MAX_SESSIONS", 512))
+SESSION_IDLE_SEC = float(os.getenv("BATTLE_SESSION_IDLE_SEC", 3600))
+
+_current_session = contextvars.ContextVar("battle_session", default=None)
+
+
+class Session:
+    """ 한 사용자의 배틀 / 파티 (처음 접근할 때 생성) """
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.created_at = self.last_used = time.time()
+        self.runs = 0
+        self.lock = threading.RLock()
+        self._objects = {}
+
+    def get(self, slot, factory):
+        obj = self._objects.get(slot)
+        if obj is None:
+            with self.lock:
+                obj = self._objects.get(slot)
+                if obj is None:
+                    obj = self._objects[slot] = factory()
+        return obj
+
+
+class SessionProxy:
+    """ 현재 세션의 slot 객체로 속성 읽기/쓰기를 전달 (current_battle.turn_count += 1 등) """
+    def __init__(self, slot, factory):
+        object.__setattr__(self, "_slot", slot)
+        object.__setattr__(self, "_factory", factory)
+
+    def _target(self):
+        session = _current_session.get() or session_manager.default
+        return session.get(self._slot, self._factory)
+
+    def __getattr__(self, name):
+        return getattr(self._target(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._target(), name, value)
+
+    def __repr__(self):
+        return f"<SessionProxy {self._slot} -> {self._target()!r}>"
+
+
+class SessionManager:
+    def __init__(self, max_sessions=MAX_SESSIONS, idle_sec=SESSION_IDLE_SEC):
+        self.max_sessions = max_sessions
+        self.idle_sec = idle_sec
+        self.default = Session("default")
+        self._lock = threading.Lock()
+        self._sessions = OrderedDict()
+        self.stats = {"created": 0, "evicted_lru": 0, "evicted_idle": 0}
+
+    def activate(self, session_id):
+        """ 현재 컨텍스트(Streamlit 스크립트 실행 스레드 등)의 세션을 지정 -> Session """
+        now = time.time()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = Session(session_id)
+                self.stats["created"] += 1
+            self._sessions.move_to_end(session_id)
+            session.last_used = now
+            session.runs += 1
+            self._evict(now)
+        _current_session.set(session)
+        set_session(session_id)
+        return session
+
+    def _evict(self, now):
+        """ 오래 안 쓴 세션부터 정리 (방금 쓴 세션은 맨 뒤라 남음) """
+        while self._sessions:
+            session_id, oldest = next(iter(self._sessions.items()))
+            if len(self._sessions) > self.max_sessions:
+                self.stats["evicted_lru"] += 1
+            elif now - oldest.last_used > self.idle_sec:
+                self.stats["evicted_idle"] += 1
+            else:
+                break
+            del self._sessions[session_id]
+            telemetry.drop_session(session_id)
+
+    def current(self):
+        return _current_session.get() or self.default
+
+    def drop(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+        telemetry.drop_session(session_id)
+
+    def get_stats(self):
+        with self._lock:
+            return {**self.stats, "active": len(self._sessions), "max_sessions": self.max_sessions}
+
+
+# 전역 인스턴스 생성
+session_manager = SessionManager()
+telemetry.register_collector("sessions", session_manager.get_stats)
@@ -0,0 +1,202 @@
+# speculator.py
+"""
+[다음 턴 시뮬레이션 선계산 (Speculative Precomputation)]
+사용자가 다음 입력을 치는 동안, 다음 턴에 나올 가능성이 높은 상태들의 시뮬레이션 리포트를
+백그라운드 스레드에서 미리 계산해 상태 해시 키로 저장합니다.
+
+- 상대 교체: opp_full_roster의 각 포켓몬 등장 (날씨/필드 특성이면 날씨/필드가 바뀐 상태도 함께)
+- 내 교체: 선출 멤버 중 대기 포켓몬 (위협 특성이면 상대 공격 -1 상태도 함께)
+- 상대 기술 사용: 예측 기술이 확인된 상태 (랭크업 기술이면 랭크도 오른 상태)
+- 랭크업: 내가 가진 랭크업 기술(칼춤, 나쁜음모 등)을 쓴 상태
+
+실제 업데이트가 반영된 뒤 battle.run_battle_simulation_report가 같은 키를 찾으면 계산 없이 바로 반환합니다.
+"""
+import os
+import json
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from battle_log_parser import SETUP_BOOSTS
+from name_aliases import move_to_english
+from session_manager import session_manager
+from telemetry import telemetry
+
+SPECULATION_ENABLED = os.getenv("BATTLE_SPECULATION", "1").lower() not in ("0", "false", "no")
+MAX_CACHED_STATES = int(os.getenv("BATTLE_SPECULATION_MAX_STATES", 256))
+
+# 등장 시 날씨/필드를 바꾸는 특성
+WEATHER_ABILITIES = {
+    "Drizzle": ("weather", "Rain"), "Drought": ("weather", "Sun"), "Orichalcum Pulse": ("weather", "Sun"),
+    "Sand Stream": ("weather", "Sand"), "Snow Warning": ("weather", "Snow"),
+    "Electric Surge": ("terrain", "Electric"), "Hadron Engine": ("terrain", "Electric"),
+    "Grassy Surge": ("terrain", "Grassy"), "Psychic Surge": ("terrain", "Psychic"), "Misty Surge": ("terrain", "Misty"),
+}
+
+
+# --- [상태 해시] ---
+def pokemon_key(poke):
+    """ 시뮬레이션 결과에 영향을 주는 포켓몬 정보만 추림 (HP는 리포트에 쓰이지 않으므로 제외) """
+    info = poke.info
+    return (
+        poke.name, sorted(poke.ranks.items()), poke.status_condition,
+        info.get('item'), info.get('ability'), sorted((info.get('stats') or {}).items()),
+        list(info.get('moves', [])), list(info['predictions']['moves']), info.get('speed_range')
+    )
+
+def state_key(my_poke, opp_poke, global_effects, side_effects):
+    """ 대면 + 필드 상태의 해시 (같은 상태면 같은 시뮬레이션 결과) """
+    payload = json.dumps([
+        pokemon_key(my_poke), pokemon_key(opp_poke),
+        sorted(global_effects.items()),
+        sorted(side_effects['me'].items()), sorted(side_effects['opp'].items())
+    ], ensure_ascii=False, default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class SimulationCache:
+    """ 상태 해시 -> (리포트, 메타) LRU 저장소 """
+    def __init__(self, max_entries=MAX_CACHED_STATES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.stats = {"lookups": 0, "hits": 0, "speculated": 0, "discarded_jobs": 0}
+
+    def get(self, key):
+        with self._lock:
+            self.stats["lookups"] += 1
+            entry = self._entries.get(key)
+            if entry is None: return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry
+
+    def put(self, key, value, speculative=False):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            if speculative: self.stats["speculated"] += 1
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        with self._lock:
+            lookups = self.stats["lookups"]
+            return {**self.stats, "entries": len(self._entries),
+                    "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0}
+
+
+# --- [후보 상태 생성] (스냅샷 사본 -> info 등은 원본과 공유) ---
+def _revealed(poke, move):
+    """ 상대가 move를 써서 확인된 기술에 추가되고, 랭크업 기술이면 랭크까지 오른 사본 """
+    move = move_to_english(move) or move   # 예측 기술은 Showdown ID ("dracometeor") -> 파서 출력과 같은 표기로
+    return poke.with_known_move(move).boosted(SETUP_BOOSTS.get(move, {}))
+
+def _with_field(global_effects, ability):
+    """ 등장 특성으로 날씨/필드가 바뀐 필드 상태 (해당 없으면 None) """
+    change = WEATHER_ABILITIES.get(ability)
+    if not change or global_effects.get(change[0]) == change[1]: return None
+    return global_effects.set(**{change[0]: change[1]})
+
+
+class Speculator:
+    """
+    턴이 끝날 때 schedule(battle)을 호출하면 다음 턴 후보 상태들의 시뮬레이션을 백그라운드에서 채웁니다.
+    같은 세션에 새 턴이 들어오면 그 세션의 이전 작업은 남은 후보를 버리고 중단됩니다.
+    """
+    def __init__(self, simulate, cache=None, enabled=SPECULATION_ENABLED):
+        self.simulate = simulate          # (my_poke, opp_poke, global_effects, side_effects) -> (report, meta)
+        self.cache = cache or SimulationCache()
+        self.enabled = enabled
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="speculator")
+        self._generations = weakref.WeakKeyDictionary()   # 세션 -> 마지막 예약 번호
+        self._lock = threading.Lock()
+        self._opp_pool = {}               # 아직 안 나온 상대 포켓몬 (가정용 BattlePokemon)
+
+    def schedule(self, battle):
+        """ 현재 상태의 스냅샷으로 백그라운드 선계산 시작 -> Future (비활성이면 None) """
+        if not self.enabled or not battle.my_active or not battle.opp_active: return None
+        session = session_manager.current()
+        with self._lock:
+            generation = self._generations[session] = self._generations.get(session, 0) + 1
+        return self._executor.submit(self._run, session, generation, battle.snapshot())
+
+    def _opp_pokemon(self, name, revealed):
+        if name in revealed: return revealed[name]
+        if name not in self._opp_pool:
+            from battle_state import BattlePokemon
+            self._opp_pool[name] = BattlePokemon(name, is_mine=False).snapshot()
+        return self._opp_pool[name]
+
+    @staticmethod
+    def _bench(snapshot):
+        names = snapshot.my_entry_selection or tuple(snapshot.my_party_status.keys())
+        party = snapshot.my_party_status
+        return [party[n] for n in names
+                if n in party and n != snapshot.my_active.name and not party[n].is_fainted]
+
+    def candidates(self, snapshot):
+        """ 다음 턴 후보 상태 (가능성이 높은 순서) """
+        my, opp = snapshot.my_active, snapshot.opp_active
+        field, side = snapshot.global_effects, snapshot.side_effects
+
+        # 1. 상대 교체
+        for name in snapshot.opp_full_roster:
+            if name == opp.name: continue
+            incoming = self._opp_pokemon(name, snapshot.opp_revealed_party)
+            if incoming.is_fainted: continue
+            incoming = incoming.switched_in()
+            yield my, incoming, field, side
+            abilities = [incoming.info.get('ability')] + list(incoming.info['predictions'].get('abilities', ())[:1])
+            for ability in abilities:
+                changed = _with_field(field, ability)
+                if changed: yield my, incoming, changed, side
+
+        # 2. 내 교체
+        for poke in self._bench(snapshot):
+            incoming = poke.switched_in()
+            yield incoming, opp, field, side
+            if poke.info.get('ability') == "Intimidate":
+                yield incoming, opp.boosted({"atk": -1}), field, side
+
+        # 3. 상대 기술 사용 (확인된 기술 목록이 바뀌므로 예측 기술마다 / 랭크업 기술은 랭크까지)
+        opp_moves = dict.fromkeys(tuple(opp.info.get('moves', ())) + tuple(opp.info['predictions']['moves']))
+        known = {move_to_english(m) or m for m in opp.info.get('moves', ())}
+        for move in opp_moves:
+            name = move_to_english(move) or move
+            if name in SETUP_BOOSTS or name not in known:
+                yield my, _revealed(opp, move), field, side
+
+        # 4. 내 랭크업 기술
+        for move in my.info.get('moves', ()):
+            if move in SETUP_BOOSTS: yield my.boosted(SETUP_BOOSTS[move]), opp, field, side
+
+    def _run(self, session, generation, snapshot):
+        computed = 0
+        with telemetry.span("battle.speculation") as span:
+            try:
+                for my, opp, field, side in self.candidates(snapshot):
+                    if generation != self._generations.get(session):
+                        self.cache.stats["discarded_jobs"] += 1
+                        break
+                    key = state_key(my, opp, field, side)
+                    if key in self.cache: continue
+                    self.cache.put(key, self.simulate(my, opp, field, side), speculative=True)
+                    computed += 1
+            except Exception as e:
+                print(f"⚠️ [Speculator] 선계산 중단: {e}")
+            span["states"] = computed
+        return computed
+
+    def get_stats(self):
+        return self.cache.get_stats()
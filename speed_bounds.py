@@ -0,0 +1,112 @@
+# speed_bounds.py
+"""
+[상대 스피드 범위 추적]
+선후공을 관측할 때마다 상대 스피드 실수치가 될 수 있는 구간을 교집합으로 좁힙니다.
+
+- 시작 구간: 종족값으로 가능한 실수치 전체 (최저: 개체값 0 / 노력치 0 / 하락 성격, 최고: 노력치 252 / 상승 성격)
+- 가설별 구간: 구애스카프 없음 / 있음. 관측과 안 맞아 구간이 비면 그 가설은 제외 (-> 스카프 확정 / 배제)
+- 관측 시점의 랭크 / 순풍 / 마비 / 트릭룸 / 고대활성·쿼크차지를 반영해 역산
+  (실수치 -> 최종 스피드는 단조 증가라 구간 끝을 이분 탐색, 관측 1회 = 계산기 호출 수십 번)
+- 결과: held_range() = 도구까지 포함한 스피드 구간 -> BattlePokemon.info['speed_range']
+        -> check_turn_order가 이후 모든 선후공 판정에서 확정 여부 / 추정치 보정에 재사용
+"""
+from Calculator.speed_checker import calculate_dynamic_speed
+from Calculator.stat_utils import calculate_stat
+
+SCARF = "Choice Scarf"
+STATS = ('atk', 'def', 'spa', 'spd', 'spe')
+
+# 고대활성 / 쿼크차지: 발동 조건 (날씨/필드) - 부스트에너지로도 발동
+PARADOX_TRIGGERS = {"protosynthesis": ("weather", "Sun"), "quarkdrive": ("terrain", "Electric")}
+
+
+def _id(name):
+    return "".join(ch for ch in str(name or "").lower() if ch.isalnum())
+
+def paradox_speed_boost(ability, items, field_state, stats=None):
+    """
+    고대활성 / 쿼크차지로 스피드가 1.5배가 되는지 -> (최소 배율, 최대 배율)
+    items: 가지고 있을 수 있는 도구 목록 (확정이면 하나), stats: 실수치 (모르면 None -> 가장 높은 능력치를 모름)
+    """
+    trigger = PARADOX_TRIGGERS.get(_id(ability))
+    if not trigger: return 1.0, 1.0
+    by_field = field_state.get(trigger[0]) == trigger[1]
+    item_ids = [_id(item) for item in items]
+    sure = by_field or item_ids == ["boosterenergy"]
+    possible = by_field or "boosterenergy" in item_ids
+    if not possible: return 1.0, 1.0
+    if stats is None: return 1.0, 1.5
+    speed_best = max(STATS, key=lambda stat: stats.get(stat, 0)) == 'spe'
+    return (1.5 if sure and speed_best else 1.0), (1.5 if speed_best else 1.0)
+
+def effective_speed(raw, ranks, item, status, ability, field_state, boost=1.0):
+    """ 실수치 -> 최종 스피드 (calculate_dynamic_speed + 고대활성/쿼크차지 배율) """
+    return calculate_dynamic_speed({'spe': int(raw * boost)}, ranks, item, status, ability, field_state)
+
+def _first(lo, hi, pred):
+    """ [lo, hi]에서 pred가 참인 가장 작은 값 (pred는 거짓 -> 참 단조) / 없으면 None """
+    if not pred(hi): return None
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if pred(mid): hi = mid
+        else: lo = mid + 1
+    return lo
+
+def _last(lo, hi, pred):
+    """ [lo, hi]에서 pred가 참인 가장 큰 값 (pred는 참 -> 거짓 단조) / 없으면 None """
+    if not pred(lo): return None
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if pred(mid): lo = mid
+        else: hi = mid - 1
+    return lo
+
+
+class SpeedBounds:
+    """ 상대 한 마리의 스피드 실수치 구간 (가설: 도구 None / Choice Scarf) """
+    def __init__(self, base_spe, scarf_possible=True):
+        self.tier = (calculate_stat(base_spe, 0, 0, 0.9), calculate_stat(base_spe, 31, 252, 1.1))
+        self.hypotheses = {None: list(self.tier)}
+        if scarf_possible: self.hypotheses[SCARF] = list(self.tier)
+        self.observations = 0
+
+    def fix_item(self, item):
+        """ 도구 공개 -> 맞는 가설만 남김 """
+        keep = SCARF if _id(item) == _id(SCARF) else None
+        if keep in self.hypotheses:
+            self.hypotheses = {keep: self.hypotheses[keep]}
+
+    def observe(self, my_speed, opp_first, ranks, status, ability, field_state, trick_room=False, boost=(1.0, 1.0)):
+        """
+        같은 우선도에서의 선후공 1회 -> 가설별 구간 교집합
+        my_speed: 내 최종 스피드, boost: 상대 고대활성/쿼크차지 (최소, 최대) 배율
+        Returns: 제외된 가설 목록 (모든 가설과 모순이면 관측을 버리고 None)
+        """
+        faster = opp_first != trick_room   # 트릭룸이면 먼저 움직인 쪽이 더 느림
+        updated, dropped = {}, []
+        for item, (lo, hi) in self.hypotheses.items():
+            if faster:   # 최종 스피드 >= 내 스피드 (동속 포함)
+                lo = _first(lo, hi, lambda raw: effective_speed(
+                    raw, ranks, item, status, ability, field_state, boost[1]) >= my_speed)
+            else:        # 최종 스피드 <= 내 스피드
+                hi = _last(lo, hi, lambda raw: effective_speed(
+                    raw, ranks, item, status, ability, field_state, boost[0]) <= my_speed)
+            if lo is None or hi is None: dropped.append(item)
+            else: updated[item] = [lo, hi]
+        if not updated: return None
+        self.hypotheses = updated
+        self.observations += 1
+        return dropped
+
+    def raw_range(self, item=None):
+        bounds = self.hypotheses.get(SCARF if _id(item) == _id(SCARF) else None)
+        return tuple(bounds) if bounds else None
+
+    def held_range(self):
+        """ 도구 배율까지 포함한 스피드 구간 (남은 가설의 합집합) """
+        lows, highs = [], []
+        for item, (lo, hi) in self.hypotheses.items():
+            factor = 1.5 if item == SCARF else 1.0
+            lows.append(int(lo * factor))
+            highs.append(int(hi * factor))
+        return min(lows), max(highs)
@@ -0,0 +1,263 @@
+# team_cache.py
+"""
+[상대 파티 분석 캐시]
+상대 6마리 구성(집합) + 내 파티 지문을 키로 선출 분석 리포트를 저장하고,
+MinHash + LSH 인덱스로 '동일하거나 거의 같은' 파티의 이전 분석을 찾아 재사용합니다.
+(리포트는 내 파티 기준으로 쓴 것이므로 내 파티가 같은 분석끼리만 재사용)
+
+- 완전 일치: 저장된 리포트를 그대로 반환
+- 유사 일치 (기본: 6마리 중 5마리 이상 동일): 차이 나는 포켓몬 정보를 덧붙여 반환
+- 적중률 / 절약된 시간 / 절약된 토큰 통계 제공
+"""
+import os
+import json
+import time
+import random
+import sqlite3
+import hashlib
+import threading
+from contextlib import contextmanager
+
+from rag_retriever import get_pokemon_summary
+from resources import lazy_resource
+from telemetry import telemetry
+
+# --- [경로 및 설정] ---
+current_dir = os.path.dirname(os.path.abspath(__file__))
+TEAM_CACHE_PATH = os.path.join(current_dir, ".cache", "team_cache.sqlite3")
+
+NUM_PERM = 32            # MinHash 해시 함수 개수
+LSH_BANDS = 16           # 밴드 수 (밴드당 NUM_PERM / LSH_BANDS 개 행)
+DEFAULT_THRESHOLD = float(os.getenv("TEAM_CACHE_THRESHOLD", 5 / 7))   # 6마리 중 5마리 동일 = J 0.714
+DEFAULT_MAX_ENTRIES = int(os.getenv("TEAM_CACHE_MAX_ENTRIES", 2000))
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(2025)
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME)) for _ in range(NUM_PERM)]
+
+
+# --- [집합 유틸리티] ---
+def normalize_team(team):
+    """ 파티 리스트 -> 비교용 집합 (소문자/공백 정리) """
+    return frozenset(name.strip().lower() for name in team if name and name.strip())
+
+def party_fingerprint(party):
+    """ 내 파티 {이름: 세트} -> 짧은 지문 (종 + 실수치 / 도구 / 특성 / 기술 / 테라, 순서 무관, 비어 있으면 "") """
+    if not party: return ""
+    members = sorted(
+        [name.strip().lower(), sorted((data.get("stats") or {}).items()), data.get("item") or "",
+         data.get("ability") or "", sorted(data.get("moves") or []), data.get("tera_type") or ""]
+        for name, data in party.items()
+    )
+    return hashlib.blake2b(json.dumps(members, ensure_ascii=False).encode("utf-8"), digest_size=8).hexdigest()
+
+def make_team_key(team, party=""):
+    """ 순서와 무관한 파티 키 ("<내 파티 지문>:amoonguss|flutter mane|...") """
+    return f"{party}:" + "|".join(sorted(normalize_team(team)))
+
+def jaccard(set_a, set_b):
+    if not set_a and not set_b: return 1.0
+    return len(set_a & set_b) / len(set_a | set_b)
+
+def minhash_signature(team_set):
+    """ 파티 집합의 MinHash 서명 (NUM_PERM 길이 튜플) """
+    base_hashes = [
+        int.from_bytes(hashlib.blake2b(name.encode("utf-8"), digest_size=8).digest(), "big")
+        for name in team_set
+    ]
+    if not base_hashes:
+        return tuple([_MERSENNE_PRIME] * NUM_PERM)
+    return tuple(
+        min((a * h + b) % _MERSENNE_PRIME for h in base_hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+def lsh_bands(signature, party=""):
+    """ 서명을 밴드로 나눈 (내 파티 지문, 밴드 번호, 값 튜플) 리스트 -> 내 파티가 다르면 같은 버킷에 안 들어감 """
+    rows = NUM_PERM // LSH_BANDS
+    return [(party, i, signature[i * rows:(i + 1) * rows]) for i in range(LSH_BANDS)]
+
+
+class TeamAnalysisCache:
+    def __init__(self, path=TEAM_CACHE_PATH, threshold=DEFAULT_THRESHOLD, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.threshold = threshold
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._teams = {}          # team_key -> (내 파티 지문, frozenset)
+        self._buckets = {}        # (내 파티 지문, band, values) -> set(team_key)
+
+        # 통계
+        self.stats = {
+            "lookups": 0, "exact_hits": 0, "near_hits": 0, "misses": 0,
+            "latency_saved_sec": 0.0, "tokens_saved": 0
+        }
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS analyses (
+                    team_key TEXT PRIMARY KEY,
+                    team TEXT NOT NULL,
+                    report TEXT NOT NULL,
+                    latency REAL DEFAULT 0,
+                    tokens INTEGER DEFAULT 0,
+                    source TEXT DEFAULT 'live',
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    party TEXT DEFAULT ''
+                )
+            """)
+            # 내 파티 지문 이전에 만든 DB -> 열 추가 (기존 항목은 지문 "" = 어떤 파티와도 안 맞음)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(analyses)")}
+            if "party" not in columns:
+                conn.execute("ALTER TABLE analyses ADD COLUMN party TEXT DEFAULT ''")
+            rows = conn.execute("SELECT team_key, team, party FROM analyses").fetchall()
+
+        for team_key, team_json, party in rows:
+            self._index(team_key, normalize_team(json.loads(team_json)), party or "")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # --- [인덱스 관리] ---
+    def _index(self, team_key, team_set, party=""):
+        with self._lock:
+            self._teams[team_key] = (party, team_set)
+            for band in lsh_bands(minhash_signature(team_set), party):
+                self._buckets.setdefault(band, set()).add(team_key)
+
+    def _unindex(self, team_key):
+        with self._lock:
+            entry = self._teams.pop(team_key, None)
+            if entry is None: return
+            party, team_set = entry
+            for band in lsh_bands(minhash_signature(team_set), party):
+                bucket = self._buckets.get(band)
+                if bucket:
+                    bucket.discard(team_key)
+                    if not bucket: del self._buckets[band]
+
+    def find_similar(self, team, party=""):
+        """ 내 파티(지문)가 같은 LSH 후보 중 Jaccard 유사도가 가장 높은 (team_key, 유사도) 반환 """
+        team_set = normalize_team(team)
+        team_key = make_team_key(team, party)
+        with self._lock:
+            if team_key in self._teams:
+                return team_key, 1.0
+            candidates = set()
+            for band in lsh_bands(minhash_signature(team_set), party):
+                candidates |= self._buckets.get(band, set())
+            scored = [(jaccard(team_set, self._teams[k][1]), k) for k in candidates]
+
+        scored = [(sim, k) for sim, k in scored if sim >= self.threshold]
+        if not scored: return None, 0.0
+        sim, best_key = max(scored)
+        return best_key, sim
+
+    # --- [조회 / 저장] ---
+    def _count(self, **deltas):
+        """ 통계 갱신 (작업 큐 / 배치 스레드에서 동시에 조회하므로 lock 안에서) """
+        with self._lock:
+            for name, delta in deltas.items(): self.stats[name] += delta
+
+    def lookup(self, team, party=""):
+        """
+        이전 분석 조회 (party: 내 파티 지문, party_fingerprint)
+        Returns: (report_text, similarity) 또는 (None, 0.0)
+        """
+        team_key, similarity = self.find_similar(team, party)
+        if not team_key:
+            self._count(lookups=1, misses=1)
+            return None, 0.0
+
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT team, report, latency, tokens FROM analyses WHERE team_key = ?", (team_key,)
+            ).fetchone()
+            if row:
+                conn.execute("UPDATE analyses SET last_access = ? WHERE team_key = ?", (time.time(), team_key))
+
+        if not row:
+            self._unindex(team_key)
+            self._count(lookups=1, misses=1)
+            return None, 0.0
+
+        cached_team, report, latency, tokens = json.loads(row[0]), row[1], row[2], row[3]
+        hit = "exact_hits" if similarity == 1.0 else "near_hits"
+        self._count(lookups=1, latency_saved_sec=latency, tokens_saved=tokens, **{hit: 1})
+
+        if similarity == 1.0:
+            return report, similarity
+        return self.adapt_report(report, cached_team, team), similarity
+
+    def adapt_report(self, report, cached_team, team):
+        """ 유사 파티 리포트에 차이 나는 포켓몬 안내와 통계 요약을 덧붙임 """
+        cached_set = normalize_team(cached_team)
+        team_set = normalize_team(team)
+        removed = [n for n in cached_team if n.strip().lower() not in team_set]
+        added = [n for n in team if n.strip().lower() not in cached_set]
+
+        note = f"♻️ 유사 파티 분석 재사용 (일치 {len(team_set & cached_set)}/{len(team_set)})"
+        if added:
+            note += f" | 차이: {', '.join(removed) or '-'} 대신 {', '.join(added)}"
+        extra = "\n".join(get_pokemon_summary(name) for name in added)
+        return f"{note}\n{report}\n\n[추가 확인 필요]\n{extra}" if extra else f"{note}\n{report}"
+
+    def store(self, team, report, latency=0.0, tokens=0, source="live", party=""):
+        """ 분석 결과 저장 (latency/tokens: 이 분석에 든 비용 -> 재사용 시 절약량으로 집계, party: 분석 기준 내 파티 지문) """
+        if not report or not isinstance(report, str): return
+        team_key = make_team_key(team, party)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO analyses (team_key, team, report, latency, tokens, source, created_at, last_access, party) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (team_key, json.dumps(list(team), ensure_ascii=False), report, latency, int(tokens), source, now, now, party)
+            )
+            evicted = self._evict(conn)
+        self._index(team_key, normalize_team(team), party)
+        for key in evicted:
+            self._unindex(key)
+
+    def _evict(self, conn):
+        """ 최대 개수 초과 시 오래 안 쓰인 'live' 항목부터 제거 """
+        count = conn.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+        if count <= self.max_entries: return []
+        keys = [r[0] for r in conn.execute(
+            "SELECT team_key FROM analyses WHERE source = 'live' ORDER BY last_access ASC LIMIT ?",
+            (count - self.max_entries,)
+        ).fetchall()]
+        conn.executemany("DELETE FROM analyses WHERE team_key = ?", [(k,) for k in keys])
+        return keys
+
+    def get_stats(self):
+        with self._lock:
+            stats, entries = dict(self.stats), len(self._teams)
+        lookups = stats["lookups"]
+        hits = stats["exact_hits"] + stats["near_hits"]
+        return {
+            **stats,
+            "latency_saved_sec": round(stats["latency_saved_sec"], 2),
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "entries": entries
+        }
+
+
+# 전역 인스턴스 (처음 쓰일 때 생성)
+@lazy_resource("team_cache")
+def get_team_cache():
+    return TeamAnalysisCache()
+
+def _cache_stats():
+    return get_team_cache().get_stats() if get_team_cache.is_initialized() else {}
+
+telemetry.register_collector("team_cache", _cache_stats)
@@ -0,0 +1,289 @@
+# telemetry.py
+"""
+[통합 계측 (Telemetry)]
+LLM 호출 / 데이터 조회 / 계산기 배치를 구간(span) 단위로 기록합니다.
+구간 정보: 단계 이름(stage), 모델, 입력/출력 토큰, 소요 시간, 캐시 적중 여부, 재시도 횟수, 오류(예외 타입), 세션
+
+- JSON Lines 내보내기: 환경변수 TELEMETRY_JSONL=경로 (기록될 때마다 한 줄씩 추가)
+- Prometheus 텍스트: render_prometheus() / start_metrics_server() -> http://host:port/metrics
+  (환경변수 TELEMETRY_PORT가 있으면 app.py가 그 포트로 시작)
+- app.py 토큰 패널: 세션별 누적 합계 session_totals() 를 작업 / 턴 전후로 빼서 사용 (summarize(baseline=...))
+"""
+import os
+import json
+import time
+import threading
+import functools
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+
+MAX_SPANS = int(os.getenv("TELEMETRY_MAX_SPANS", 20000))   # 메모리에 보관할 최근 구간 수
+JSONL_PATH = os.getenv("TELEMETRY_JSONL")
+TELEMETRY_PORT = int(os.getenv("TELEMETRY_PORT", 9464))
+
+# Prometheus 히스토그램 구간 (초)
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# 현재 세션 (Streamlit 세션 / 배치 작업 구분용)
+_current_session = contextvars.ContextVar("telemetry_session", default=None)
+
+
+def set_session(session_id):
+    _current_session.set(session_id)
+
+def get_session():
+    return _current_session.get()
+
+
+def extract_usage(response):
+    """ LangChain 응답 객체에서 토큰 사용량 추출 -> {input_tokens, output_tokens, total_tokens} """
+    try:
+        usage = None
+        if hasattr(response, 'usage_metadata') and response.usage_metadata:
+            usage = response.usage_metadata
+        elif hasattr(response, 'response_metadata') and 'usage_metadata' in response.response_metadata:
+            usage = response.response_metadata['usage_metadata']
+
+        if usage:
+            return {
+                "input_tokens": usage.get('input_tokens', 0),
+                "output_tokens": usage.get('output_tokens', 0),
+                "total_tokens": usage.get('total_tokens', 0)
+            }
+    except Exception:
+        pass
+    return {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+
+
+class Telemetry:
+    def __init__(self, max_spans=MAX_SPANS, jsonl_path=JSONL_PATH):
+        self._lock = threading.Lock()
+        self.spans = deque(maxlen=max_spans)
+        self.jsonl_path = jsonl_path
+        self._stage_totals = {}     # stage -> 누적 집계 (보관 한도와 무관)
+        self._session_totals = {}   # 세션 -> {stage -> 토큰 / 소요 시간 누적} (보관 한도와 무관)
+        self._collectors = {}       # 이름 -> 외부 통계 함수 (캐시 적중률 등)
+
+    # --- [기록] ---
+    def record(self, stage, latency, model=None, input_tokens=0, output_tokens=0,
+               cache_hit=False, retries=0, error=None, **attrs):
+        span = {
+            "ts": time.time(),
+            "stage": stage,
+            "session": get_session(),
+            "model": model,
+            "input_tokens": int(input_tokens or 0),
+            "output_tokens": int(output_tokens or 0),
+            "latency": latency,
+            "cache_hit": bool(cache_hit),
+            "retries": int(retries or 0),
+            "error": error,
+        }
+        if attrs: span["attrs"] = attrs
+
+        with self._lock:
+            self.spans.append(span)
+            totals = self._stage_totals.setdefault(stage, {
+                "calls": 0, "latency_sum": 0.0, "input_tokens": 0, "output_tokens": 0,
+                "cache_hits": 0, "retries": 0, "errors": 0, "buckets": [0] * len(LATENCY_BUCKETS)
+            })
+            totals["calls"] += 1
+            totals["latency_sum"] += latency
+            totals["input_tokens"] += span["input_tokens"]
+            totals["output_tokens"] += span["output_tokens"]
+            totals["cache_hits"] += span["cache_hit"]
+            totals["retries"] += span["retries"]
+            totals["errors"] += error is not None
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if latency <= bound: totals["buckets"][i] += 1
+
+            sums = self._session_totals.setdefault(span["session"], {}).setdefault(stage, {
+                "calls": 0, "input_tokens": 0, "output_tokens": 0, "latency": 0.0, "cache_hits": 0})
+            sums["calls"] += 1
+            sums["input_tokens"] += span["input_tokens"]
+            sums["output_tokens"] += span["output_tokens"]
+            sums["latency"] += latency
+            sums["cache_hits"] += span["cache_hit"]
+
+            if self.jsonl_path:
+                try:
+                    with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(span, ensure_ascii=False, default=str) + "\n")
+                except OSError as e:
+                    print(f"⚠️ [Telemetry] JSONL 기록 실패: {e}")
+        return span
+
+    @contextmanager
+    def span(self, stage, **attrs):
+        """
+        with telemetry.span("entry.simulation") as s:
+            ...
+            s["input_tokens"] = 10   # 필요한 필드는 블록 안에서 채움
+        예외로 끝나면 error=<예외 타입 이름>을 남기고 예외는 그대로 전달
+        """
+        fields = dict(attrs)
+        start = time.perf_counter()
+        try:
+            yield fields
+        except Exception as e:
+            fields.setdefault("error", type(e).__name__)
+            raise
+        finally:
+            self.record(stage, time.perf_counter() - start, **fields)
+
+    def traced(self, stage):
+        """ [Decorator] 함수 호출 전체를 하나의 구간으로 기록 """
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(stage):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def register_collector(self, name, func):
+        """ 외부 통계(dict[str, number])를 Prometheus 출력에 포함 """
+        self._collectors[name] = func
+
+    # --- [조회] ---
+    def session_totals(self, session):
+        """ 세션의 단계별 누적 합계 복사본 {stage: {calls, input/output_tokens, latency, cache_hits}} """
+        with self._lock:
+            return {stage: dict(sums) for stage, sums in self._session_totals.get(session, {}).items()}
+
+    def drop_session(self, session):
+        with self._lock:
+            self._session_totals.pop(session, None)
+
+    def summarize(self, session=None, stage_prefix=None, since=None, baseline=None):
+        """
+        조건에 맞는 구간의 합계 {calls, input/output/total_tokens, latency, cache_hits}
+        - session만 주면: 세션 누적 합계 (baseline = 이전 session_totals() 결과를 주면 그 이후 증가분)
+        - since를 주면: 보관 중인 최근 구간을 훑어 그 시각 이후만 (보관 한도를 넘은 구간은 빠짐)
+        latency는 구간 소요 시간의 합 (겹치는 / 병렬 구간은 중복 -> 실제 경과 시간은 호출 측에서 잼)
+        """
+        result = {"calls": 0, "input_tokens": 0, "output_tokens": 0, "total_tokens": 0,
+                  "latency": 0.0, "cache_hits": 0}
+        if session is not None and since is None:
+            baseline = baseline or {}
+            for stage, sums in self.session_totals(session).items():
+                if stage_prefix and not stage.startswith(stage_prefix): continue
+                base = baseline.get(stage, {})
+                for key in ("calls", "input_tokens", "output_tokens", "latency", "cache_hits"):
+                    result[key] += sums[key] - base.get(key, 0)
+            result["total_tokens"] = result["input_tokens"] + result["output_tokens"]
+            return result
+
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            if session is not None and span["session"] != session: continue
+            if stage_prefix and not span["stage"].startswith(stage_prefix): continue
+            if since is not None and span["ts"] < since: continue
+            result["calls"] += 1
+            result["input_tokens"] += span["input_tokens"]
+            result["output_tokens"] += span["output_tokens"]
+            result["latency"] += span["latency"]
+            result["cache_hits"] += span["cache_hit"]
+        result["total_tokens"] = result["input_tokens"] + result["output_tokens"]
+        return result
+
+    def get_spans(self, session=None, stage_prefix=None):
+        with self._lock:
+            spans = list(self.spans)
+        return [s for s in spans
+                if (session is None or s["session"] == session)
+                and (not stage_prefix or s["stage"].startswith(stage_prefix))]
+
+    # --- [내보내기] ---
+    def export_jsonl(self, path, session=None):
+        """ 보관 중인 구간을 JSON Lines 파일로 저장 """
+        spans = self.get_spans(session=session)
+        with open(path, "w", encoding="utf-8") as f:
+            for span in spans:
+                f.write(json.dumps(span, ensure_ascii=False, default=str) + "\n")
+        return len(spans)
+
+    def render_prometheus(self):
+        """ Prometheus 텍스트 노출 형식 """
+        with self._lock:
+            totals = {stage: {**t, "buckets": list(t["buckets"])} for stage, t in self._stage_totals.items()}
+
+        lines = [
+            "# HELP pokemon_stage_calls_total Number of recorded spans per stage",
+            "# TYPE pokemon_stage_calls_total counter",
+        ]
+        lines += [f'pokemon_stage_calls_total{{stage="{s}"}} {t["calls"]}' for s, t in totals.items()]
+
+        lines += ["# HELP pokemon_stage_tokens_total LLM tokens per stage", "# TYPE pokemon_stage_tokens_total counter"]
+        for s, t in totals.items():
+            lines.append(f'pokemon_stage_tokens_total{{stage="{s}",direction="input"}} {t["input_tokens"]}')
+            lines.append(f'pokemon_stage_tokens_total{{stage="{s}",direction="output"}} {t["output_tokens"]}')
+
+        lines += ["# HELP pokemon_stage_cache_hits_total Cache hits per stage", "# TYPE pokemon_stage_cache_hits_total counter"]
+        lines += [f'pokemon_stage_cache_hits_total{{stage="{s}"}} {t["cache_hits"]}' for s, t in totals.items()]
+
+        lines += ["# HELP pokemon_stage_retries_total LLM client retries per stage", "# TYPE pokemon_stage_retries_total counter"]
+        lines += [f'pokemon_stage_retries_total{{stage="{s}"}} {t["retries"]}' for s, t in totals.items()]
+
+        lines += ["# HELP pokemon_stage_errors_total Spans that ended with an exception", "# TYPE pokemon_stage_errors_total counter"]
+        lines += [f'pokemon_stage_errors_total{{stage="{s}"}} {t["errors"]}' for s, t in totals.items()]
+
+        lines += ["# HELP pokemon_stage_latency_seconds Span latency", "# TYPE pokemon_stage_latency_seconds histogram"]
+        for s, t in totals.items():
+            for bound, count in zip(LATENCY_BUCKETS, t["buckets"]):
+                lines.append(f'pokemon_stage_latency_seconds_bucket{{stage="{s}",le="{bound}"}} {count}')
+            lines.append(f'pokemon_stage_latency_seconds_bucket{{stage="{s}",le="+Inf"}} {t["calls"]}')
+            lines.append(f'pokemon_stage_latency_seconds_sum{{stage="{s}"}} {t["latency_sum"]:.6f}')
+            lines.append(f'pokemon_stage_latency_seconds_count{{stage="{s}"}} {t["calls"]}')
+
+        for name, func in list(self._collectors.items()):
+            try:
+                stats = func()
+            except Exception:
+                continue
+            for key, value in stats.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    lines.append(f"# TYPE pokemon_{name}_{key} gauge")
+                    lines.append(f"pokemon_{name}_{key} {value}")
+        return "\n".join(lines) + "\n"
+
+
+# 전역 인스턴스 생성
+telemetry = Telemetry()
+
+_server_lock = threading.Lock()
+_server = None
+
+def start_metrics_server(port=TELEMETRY_PORT, host="0.0.0.0"):
+    """ /metrics 엔드포인트를 제공하는 백그라운드 HTTP 서버 (프로세스당 1회만 시작) """
+    global _server
+    with _server_lock:
+        if _server is not None: return _server
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") != "/metrics":
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                body = telemetry.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        try:
+            _server = ThreadingHTTPServer((host, port), MetricsHandler)
+        except OSError as e:
+            print(f"⚠️ [Telemetry] 메트릭 서버 시작 실패 (port {port}): {e}")
+            return None
+        threading.Thread(target=_server.serve_forever, daemon=True).start()
+        print(f"📈 [Telemetry] http://{host}:{port}/metrics")
+        return _server
@@ -0,0 +1,74 @@
+# test_battle.py
+import battle
+from battle_state import current_battle
+from Battle_Preparing.user_party import my_party
+from session_manager import session_manager
+
+
+def _party(mine, my_spe):
+    return {mine: ({'hp': 150, 'atk': 100, 'def': 100, 'spa': 150, 'spd': 100, 'spe': my_spe}, ["Shadow Ball"])}
+
+
+def test_simulation_rows_are_kept_per_session(battle_session):
+    """ 한 세션의 시뮬레이션 항목이 다른 세션 보고서에 섞이지 않음 """
+    battle_session("rows-a", _party("Gholdengo", 104), ["Miraidon"])
+    report_a, _ = battle.run_battle_simulation_report()
+    battle_session("rows-b", _party("Flutter Mane", 205), ["Dondozo"])
+    report_b, _ = battle.run_battle_simulation_report()
+
+    # 저장된 시뮬레이션을 비워서 항목 재사용 경로를 타게 함
+    battle.simulation_cache.clear()
+    session_manager.activate("rows-a")
+    again_a, _ = battle.run_battle_simulation_report()
+
+    assert again_a == report_a
+    assert report_a != report_b
+    assert current_battle.simulation_rows["speed"]["my_final_speed"] == 104
+    session_manager.activate("rows-b")
+    assert current_battle.simulation_rows["speed"]["my_final_speed"] == 205
+
+
+def test_my_pokemon_does_not_share_party_data(battle_session):
+    """ 배틀 중 내 포켓몬 정보가 바뀌어도 파티 원본(다른 세션과 공유 가능)은 그대로 """
+    state = battle_session("party-copy", _party("Gholdengo", 104), ["Miraidon"])
+    state.my_active.info['moves'].append("Make It Rain")
+    state.my_active.info['stats']['spe'] = 1
+
+    data = my_party.get_pokemon("Gholdengo")
+    assert data['moves'] == ["Shadow Ball"]
+    assert data['stats']['spe'] == 104
+
+
+def test_fused_turn_keeps_lookahead_when_advice_is_reused(monkeypatch, battle_session):
+    """ 통합 모드에서 조언을 재요청하지 않아도 탐색 / 롤아웃 결과는 붙음 """
+    monkeypatch.setattr(battle, "rule_parse", lambda user_input: None)
+    monkeypatch.setattr(battle, "cached_invoke",
+                        lambda llm, prompt, stage, **kwargs: {"content": '{"delta": {}, "advice": "섀도볼"}'})
+    monkeypatch.setattr(battle, "get_lookahead_report", lambda: "\n[탐색]")
+    battle_session("fused-lookahead", _party("Gholdengo", 104), ["Miraidon"])
+
+    advice, _, retry_tokens = battle.analyze_battle_turn("그대로", fused=True)
+    assert advice.startswith("섀도볼") and advice.endswith("\n[탐색]")
+    assert retry_tokens == [0, 0, 0]
+
+
+def test_fused_failure_does_not_rerun_rule_parser(monkeypatch, battle_session):
+    """ 통합 호출 실패 -> 2단계 방식으로 넘어갈 때 이미 실패한 규칙 파싱은 다시 하지 않음 """
+    calls = []
+
+    def rule_parse(user_input):
+        calls.append(user_input)
+        return None
+
+    def invoke(llm, prompt, stage, **kwargs):
+        if stage == "battle.fused": raise ValueError("bad json")
+        return {"content": '{"my_move_used": null}' if stage == "battle.parse" else "조언"}
+
+    monkeypatch.setattr(battle, "rule_parse", rule_parse)
+    monkeypatch.setattr(battle, "cached_invoke", invoke)
+    monkeypatch.setattr(battle, "get_lookahead_report", lambda: "")
+    battle_session("fused-fallback", _party("Gholdengo", 104), ["Miraidon"])
+
+    advice, _, _ = battle.analyze_battle_turn("알 수 없는 입력", fused=True)
+    assert advice == "조언"
+    assert len(calls) == 1
@@ -0,0 +1,42 @@
+# test_battle_log_parser.py
+import pytest
+
+from battle_log_parser import parse_battle_log
+
+
+@pytest.fixture
+def battle(battle_session):
+    stats = {'hp': 150, 'atk': 100, 'def': 100, 'spa': 150, 'spd': 100, 'spe': 104}
+    return battle_session("parser-test", {"Gholdengo": (stats, ["Shadow Ball", "Make It Rain"])}, ["Miraidon"])
+
+
+@pytest.mark.parametrize("text, key, value", [
+    ("순풍", "tailwind_me", True),
+    ("상대 순풍", "tailwind_opp", True),
+    ("상대 리플렉터", "reflect_opp", True),
+    ("빛의장막", "light_screen_opp", True),
+    ("트릭룸 끝", "trick_room", False),
+    ("상대 마비", "opp_status", "Paralysis"),
+    ("내 화상", "my_status", "Burn"),
+])
+def test_emits_apply_llm_update_keys(battle, text, key, value):
+    parsed, confidence = parse_battle_log(text, battle)
+    assert confidence >= 0.9
+    assert parsed[key] == value
+
+
+def test_rule_output_updates_battle_state(battle):
+    """ 규칙 파서 출력을 그대로 apply_llm_update에 넣으면 필드 / 상태이상이 반영됨 """
+    for text in ("상대 순풍", "상대 리플렉터", "내 순풍", "상대 마비"):
+        parsed, _ = parse_battle_log(text, battle)
+        battle.apply_llm_update(parsed)
+
+    assert battle.side_effects['opp']['tailwind'] and battle.side_effects['me']['tailwind']
+    assert battle.side_effects['opp']['reflect']
+    assert battle.opp_active.status_condition == "Paralysis"
+
+
+def test_my_screens_go_to_llm(battle):
+    """ 스키마에 없는 내 쪽 벽은 규칙 파서가 확신하지 않음 """
+    parsed, confidence = parse_battle_log("내 리플렉터", battle)
+    assert parsed is None or confidence < 0.9
@@ -0,0 +1,39 @@
+# test_battle_state.py
+
+
+def _party(my_spe):
+    stats = {'hp': 150, 'atk': 100, 'def': 100, 'spa': 150, 'spd': 100, 'spe': my_spe}
+    return {"Dragonite": (stats, ["Dragon Dance", "Extreme Speed"])}
+
+
+def test_turn_order_uses_ranks_from_before_the_moves(battle_session):
+    """ 같은 턴에 오른 내 스피드 랭크로 선후공을 역산하면 스카프 없이도 가능한 선공을 스카프 확정으로 오판 """
+    state = battle_session("order-ranks", _party(120), ["Miraidon"])
+    state.apply_llm_update({"my_move_used": "Dragon Dance", "opp_move_used": "Dazzling Gleam",
+                            "my_rank_change": {"atk": 1, "spe": 1}})
+    assert state.my_active.ranks['spe'] == 1
+
+    msg = state.observe_turn_order(opp_moved_first=True)
+    assert not (msg and "확정" in msg)
+    assert not state.opp_active.confirmed['item']
+
+
+def test_turn_order_uses_status_from_before_the_moves(battle_session):
+    """ 선공한 상대가 이번 턴 뒤에 마비돼도 선후공은 마비 전 스피드로 역산 """
+    state = battle_session("order-status", _party(100), ["Miraidon"])
+    state.apply_llm_update({"my_move_used": "Thunder Wave", "opp_move_used": "Dazzling Gleam",
+                            "opp_status": "Paralysis"})
+    assert state.opp_active.status_condition == "Paralysis"
+
+    msg = state.observe_turn_order(opp_moved_first=True)
+    assert not (msg and "확정" in msg)
+    assert not state.opp_active.confirmed['item']
+
+
+def test_turn_order_needs_both_moves(battle_session):
+    """ 기술이 한쪽만 (또는 없이) 반영된 턴은 선후공 역산을 하지 않음 """
+    state = battle_session("order-moves", _party(100), ["Miraidon"])
+    state.apply_llm_update({"opp_move_used": "Dazzling Gleam"})
+    before = state.opp_active.info['speed_range']
+    assert state.observe_turn_order(opp_moved_first=True) is None
+    assert state.opp_active.info['speed_range'] == before
@@ -0,0 +1,98 @@
+# test_endgame.py
+import os
+import sys
+import pickle
+import sqlite3
+import subprocess
+
+import endgame
+from endgame import Tablebase, EndgameTimeout, encode_positions, decode_positions, solve_endgame, format_endgame_report
+
+STATE = ((0, 1), ((25, 0), (10, 7)), ((1, 0, 0, 0, 2), (0, 0, 0, 0, 0)), 0)
+POSITIONS = {STATE: (0.75, ("move", 2)), (STATE[0], STATE[1], STATE[2], 2): (0.5, None)}
+
+
+def _tablebase(tmp_path, **kwargs):
+    return Tablebase(path=str(tmp_path / "endgame.sqlite3"), **kwargs)
+
+
+def test_positions_round_trip_as_json():
+    blob = encode_positions(POSITIONS)
+    assert isinstance(blob, str)
+    decoded = decode_positions(blob)
+    assert decoded == POSITIONS
+    assert STATE in decoded     # 상태 키가 다시 튜플로 복원되어야 조회 가능
+
+
+def test_saved_positions_reload_in_new_instance(tmp_path):
+    tablebase = _tablebase(tmp_path)
+    tablebase.table("scenario").update(POSITIONS)
+    tablebase.save("scenario")
+
+    reloaded = _tablebase(tmp_path).table("scenario")
+    assert reloaded == POSITIONS
+
+
+def test_legacy_pickle_row_is_treated_as_miss(tmp_path):
+    tablebase = _tablebase(tmp_path)
+    with sqlite3.connect(tablebase.path) as conn:
+        conn.execute("INSERT INTO scenarios (key, positions, size, updated_at) VALUES (?, ?, ?, ?)",
+                     ("scenario", pickle.dumps(POSITIONS), len(POSITIONS), 0.0))
+    assert tablebase.table("scenario") == {}
+
+
+def test_tables_are_lru_bounded_and_evicted_positions_persist(tmp_path):
+    tablebase = _tablebase(tmp_path, max_tables=2)
+    tablebase.table("a").update(POSITIONS)      # 저장 전에 밀려나도 디스크에 반영되어야 함
+    tablebase.table("b")
+    tablebase.table("a")                        # 최근 사용 -> b가 가장 오래됨
+    tablebase.table("c")
+
+    stats = tablebase.get_stats()
+    assert stats["scenarios"] == 2 and stats["evicted"] == 1
+    tablebase.table("d")                        # 이번에는 a가 밀려남
+    assert _tablebase(tmp_path).table("a") == POSITIONS
+
+
+def _start_endgame(battle_session):
+    """ 내 2마리 vs 상대 1마리 (나머지 2마리 기절) """
+    stats = {'hp': 150, 'atk': 100, 'def': 100, 'spa': 150, 'spd': 100, 'spe': 104}
+    party = {"Gholdengo": (stats, ["Make It Rain", "Shadow Ball"]),
+             "Dragonite": ({**stats, 'atk': 150, 'spe': 100}, ["Extreme Speed", "Dragon Dance"])}
+    state = battle_session("endgame-test", party, ["Miraidon", "Ting-Lu", "Chien-Pao"])
+    for name in ("Ting-Lu", "Chien-Pao"):
+        state.set_active("opp", name)
+        state.opp_active.update_hp(-100)
+    state.set_active("opp", "Miraidon")
+    return state
+
+
+def test_cold_solve_returns_shallow_estimate(tmp_path, monkeypatch, battle_session):
+    """ 끝까지 풀 시간이 없으면 None 대신 얕은 단계의 추정치, 정확히 풀린 위치만 저장 """
+    class ShallowOnly(endgame.EndgameSolver):
+        def value(self, state, depth=0):
+            if self.horizon is None or self.horizon > 2: raise EndgameTimeout()
+            return super().value(state, depth)
+
+    tablebase = _tablebase(tmp_path)
+    snapshot = _start_endgame(battle_session).snapshot()
+    with monkeypatch.context() as m:
+        m.setattr(endgame, "EndgameSolver", ShallowOnly)
+        estimate = solve_endgame(snapshot, budget_ms=10_000, tablebase=tablebase)
+    assert not estimate["exact"] and estimate["depth"] == 2
+    assert estimate["label"] and "추정 승률" in format_endgame_report(estimate)
+
+    solved = solve_endgame(snapshot, budget_ms=60_000, tablebase=tablebase)
+    assert solved["exact"] and solved["depth"] is None
+    assert solved["positions"] > estimate["positions"]
+
+
+def test_importing_app_modules_creates_no_databases():
+    """ 캐시 / 테이블베이스 DB는 처음 쓰일 때 생성 (임포트만으로는 만들지 않음) """
+    code = ("import battle, entry, endgame, team_cache, llm_cache; "
+            "print(endgame.get_endgame_tablebase.is_initialized(), team_cache.get_team_cache.is_initialized(), "
+            "llm_cache.get_response_cache.is_initialized())")
+    result = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(endgame.__file__),
+                            capture_output=True, text=True, env={**os.environ, "LLM_CACHE_DISABLED": ""})
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split()[-3:] == ["False", "False", "False"]
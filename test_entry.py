@@ -0,0 +1,40 @@
+# test_entry.py
+import asyncio
+
+import entry
+
+TEAMS = {"party_0": ["Miraidon", "Ting-Lu", "Chien-Pao"], "party_1": ["Koraidon", "Flutter Mane", "Amoonguss"]}
+NO_TOKENS = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+
+
+async def _select(batch):
+    return {pid: {"lead": None} for pid in batch}, dict(NO_TOKENS)
+
+
+def test_cached_parties_skip_context_building(monkeypatch):
+    """ 파티 분석 캐시에 모두 있으면 RAG/시뮬레이션 컨텍스트를 만들지 않음 """
+    built = []
+    monkeypatch.setattr(entry, "lookup_cached_analyses", lambda batch: {pid: f"report {pid}" for pid in batch})
+    monkeypatch.setattr(entry, "build_party_context", lambda pid, opp: built.append(pid) or "")
+    monkeypatch.setattr(entry, "parse_recommended_selection_async", _select)
+
+    lines = " / ".join(", ".join(team) for team in TEAMS.values())
+    parsed, analysis, _, tokens = asyncio.run(entry.run_entry_pipeline_async(lines))
+    assert parsed == TEAMS
+    assert analysis == {"party_0": "report party_0", "party_1": "report party_1"}
+    assert built == [] and tokens["total_tokens"] == 0
+
+
+def test_zero_sub_batch_size_sends_no_empty_prompt(monkeypatch):
+    """ sub_batch_size=0 -> 파티 1개씩 (빈 서브 배치 / 빈 프롬프트 없음) """
+    contexts = []
+
+    async def invoke(llm, prompt, stage, **kwargs):
+        contexts.append(prompt)
+        return {"content": "{}"}
+
+    monkeypatch.setattr(entry, "cached_ainvoke", invoke)
+    monkeypatch.setattr(entry, "format_strategy_prompt", lambda text: text)
+    asyncio.run(entry.analyze_entry_strategy_async(
+        TEAMS, use_team_cache=False, contexts={pid: f"<{pid}>" for pid in TEAMS}, sub_batch_size=0))
+    assert sorted(contexts) == ["<party_0>", "<party_1>"]
@@ -0,0 +1,89 @@
+# test_llm_cache.py
+import asyncio
+import sqlite3
+
+import pytest
+
+import llm_cache
+from llm_cache import LLMResponseCache, cached_invoke, cached_ainvoke
+
+
+class FakeResponse:
+    def __init__(self, content):
+        self.content = content
+        self.usage_metadata = {"input_tokens": 10, "output_tokens": 5, "total_tokens": 15}
+
+
+class FakeLLM:
+    model = "fake-model"
+    temperature = 0.1
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.calls = 0
+
+    def invoke(self, prompt):
+        self.calls += 1
+        return FakeResponse(self.replies.pop(0))
+
+    async def ainvoke(self, prompt):
+        return self.invoke(prompt)
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = LLMResponseCache(path=str(tmp_path / "llm_cache.sqlite3"), ttl_seconds=60, max_entries=2)
+    monkeypatch.setattr(llm_cache, "CACHE_DISABLED", False)
+    monkeypatch.setattr(llm_cache, "get_response_cache", lambda: cache)
+    return cache
+
+
+def test_hit_returns_stored_content_without_calling(cache):
+    llm = FakeLLM('{"a": 1}')
+    assert cached_invoke(llm, "prompt").content == '{"a": 1}'
+    again = cached_invoke(llm, "prompt")
+    assert again.content == '{"a": 1}' and again.response_metadata["cache_hit"]
+    assert llm.calls == 1
+    assert cache.get_stats()["hits"] == 1
+
+
+def test_expired_entry_is_a_miss(cache):
+    key = cache.make_key("fake-model", 0.1, "prompt")
+    cache.set(key, "fake-model", "old")
+    with sqlite3.connect(cache.path) as conn:
+        conn.execute("UPDATE responses SET created_at = created_at - 120")
+    assert cache.get(key) is None
+    assert cache.get_stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted(cache):
+    cache.set("a", "m", "A")
+    cache.set("b", "m", "B")
+    assert cache.get("a") == "A"     # b가 가장 오래 안 쓰임
+    cache.set("c", "m", "C")
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == ("A", "C")
+
+
+def test_invalid_or_empty_replies_are_not_stored(cache):
+    """ 호출 측 검사를 통과하지 못한 응답은 저장하지 않음 -> 다음 호출에서 재시도 """
+    is_json = lambda response: response.content.startswith("{")
+    llm = FakeLLM("not json", "", '{"ok": true}', "unused")
+    assert cached_invoke(llm, "prompt", validate=is_json).content == "not json"
+    assert cached_invoke(llm, "prompt", validate=is_json).content == ""
+    assert cached_invoke(llm, "prompt", validate=is_json).content == '{"ok": true}'
+    assert cached_invoke(llm, "prompt", validate=is_json).content == '{"ok": true}'
+    assert llm.calls == 3
+
+    llm = FakeLLM("broken")
+    asyncio.run(cached_ainvoke(llm, "other", validate=is_json))
+    assert cache.get_stats()["entries"] == 1
+
+
+def test_disabled_cache_is_never_built(monkeypatch):
+    monkeypatch.setattr(llm_cache, "CACHE_DISABLED", True)
+    llm = FakeLLM("a", "b")
+    cached_invoke(llm, "prompt")
+    cached_invoke(llm, "prompt")
+    assert llm.calls == 2
+    assert not llm_cache.get_response_cache.is_initialized()
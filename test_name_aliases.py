@@ -0,0 +1,19 @@
+# test_name_aliases.py
+from name_aliases import get_aliases, to_english, POKEMON_KO_TO_EN
+
+
+def test_base_name_alias_only_when_unambiguous():
+    """ 기본 이름이 다른 폼(또는 그 자체로 다른 포켓몬)과 겹치면 별칭으로 쓰지 않음 """
+    assert "Urshifu" not in get_aliases("Urshifu-Rapid-Strike")
+    assert "Ogerpon" not in get_aliases("Ogerpon-Wellspring")
+    assert "Landorus" in get_aliases("Landorus-Therian")
+
+
+def test_aliases_point_to_one_pokemon():
+    """ 한 별칭이 여러 포켓몬의 별칭으로 잡히지 않음 """
+    owners = {}
+    for en in set(POKEMON_KO_TO_EN.values()):
+        for alias in get_aliases(en):
+            owners.setdefault(alias, set()).add(en)
+    assert {alias: ens for alias, ens in owners.items() if len(ens) > 1} == {}
+    assert to_english("에스퍼") is None
@@ -0,0 +1,67 @@
+# test_opponent_belief.py
+import numpy as np
+
+from opponent_belief import SetBelief, OTHER, AXES, CONFIRM_THRESHOLD
+
+
+def _belief():
+    belief = SetBelief.from_usage("Flutter Mane")
+    assert belief is not None
+    return belief
+
+def _prob(belief, axis, label):
+    return dict(belief.top(axis))[label]
+
+
+def test_prior_is_normalized_joint_over_all_axes():
+    belief = _belief()
+    assert len(belief.shape) == len(AXES)
+    assert abs(float(belief.p.sum()) - 1.0) < 1e-4
+    items = belief.labels["item"]
+    assert "choicescarf" in items and items[-1] == OTHER    # 스카프는 목록에 없어도 후보
+    assert belief.certain("item") is None
+
+
+def test_observed_move_is_certain_and_not_applied_twice():
+    belief = _belief()
+    assert belief.observe_move("Moonblast")
+    assert dict(belief.move_probs())["moonblast"] == 1.0
+    assert not belief.observe_move("moonblast")
+
+    # 후보 밖 기술 -> 확정 목록에 추가, 남은 칸으로 조합 축 재구성
+    assert belief.observe_move("Dazzling Gleam")
+    assert belief.slots == 3 and belief.off_pool == ["Dazzling Gleam"]
+    assert dict(belief.move_probs())["Dazzling Gleam"] == 1.0
+    assert abs(float(belief.p.sum()) - 1.0) < 1e-4
+
+
+def test_status_move_suppresses_locked_items():
+    belief = _belief()
+    specs = _prob(belief, "item", "choicespecs")
+    belief.observe_move("Taunt")
+    assert _prob(belief, "item", "choicespecs") < specs / 5
+
+
+def test_reveal_collapses_axis():
+    belief = _belief()
+    belief.reveal("item", "Booster Energy")
+    assert belief.certain("item") == "boosterenergy"
+    assert belief.to_posterior(1)["item"] == [("boosterenergy", 1.0)]
+
+    # 목록에 없던 값 -> 축을 그 값 하나로
+    belief = _belief()
+    belief.reveal("tera_type", "Steel")
+    assert belief.labels["tera_type"] == ["Steel"]
+    assert belief.shape[AXES.index("tera_type")] == 1
+    assert _prob(belief, "tera_type", "Steel") >= CONFIRM_THRESHOLD
+
+
+def test_speed_range_shifts_mass_to_scarf():
+    belief = _belief()
+    spe = belief.map_stats()['spe']
+    scarf = _prob(belief, "item", "choicescarf")
+    # 스카프 없음 가설로는 설명 안 되는 선후공 -> 스카프 쪽으로
+    assert belief.observe_speed_range(
+        lambda item: (spe - 5, spe + 5) if item == "Choice Scarf" else (spe - 40, spe - 1))
+    assert _prob(belief, "item", "choicescarf") > 10 * scarf
+    assert np.isclose(float(belief.p.sum()), 1.0, atol=1e-4)
@@ -0,0 +1,46 @@
+# test_replay_ingest.py
+from replay_ingest import ReplayRunner, iter_events
+from Battle_Preparing.user_party import my_party
+
+LOG = """|gametype|singles
+|poke|p1|{mine}, L50|
+|poke|p2|Miraidon, L50|
+|start
+|switch|p1a: {mine}|{mine}, L50|100/100
+|switch|p2a: Miraidon|Miraidon, L50|100/100
+|turn|1
+"""
+
+
+def test_my_reveals_refresh_the_snapshot(battle_session):
+    """ 내 쪽 도구 / 테라 공개가 정보 버전을 올려 캐시된 스냅샷이 낡지 않음 """
+    runner = ReplayRunner("snapshot")
+    state = battle_session("replay-test:snapshot")
+    for tag, args, tags in iter_events(LOG.format(mine="Gholdengo").splitlines()):
+        handler = runner.HANDLERS.get(tag)
+        if handler and args: getattr(runner, handler)(tag, args, tags)
+    before = state.my_active.snapshot()
+
+    runner.on_item("-item", ["p1a: Gholdengo", "Leftovers"], {})
+    runner.on_tera("-terastallize", ["p1a: Gholdengo", "Steel"], {})
+    after = state.my_active.snapshot()
+
+    assert before.info['item'] != "Leftovers"
+    assert after.info['item'] == "Leftovers"
+    assert after.info['tera_type'] == "Steel"
+
+
+def test_replays_do_not_share_my_party():
+    """ 리플레이마다 내 파티를 새로 채움 (앞 리플레이의 포켓몬이 남지 않음) """
+    my_party.team = {}
+    ReplayRunner("party-a").run(LOG.format(mine="Gholdengo").splitlines())
+    seen = {}
+
+    class Probe(ReplayRunner):
+        def on_turn(self, tag, args, tags):
+            seen.update(my_party.team)
+            super().on_turn(tag, args, tags)
+
+    Probe("party-b").run(LOG.format(mine="Dragonite").splitlines())
+    assert list(seen) == ["Dragonite"]
+    assert my_party.team == {}
@@ -0,0 +1,63 @@
+# test_rollout.py
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+import rollout
+
+ROLLOUTS = 2 * rollout.CHUNK_SIZE
+
+
+@pytest.fixture
+def tables(monkeypatch, battle_session):
+    stats = {'hp': 150, 'atk': 100, 'def': 100, 'spa': 150, 'spd': 100, 'spe': 104}
+    party = {"Gholdengo": (stats, ["Make It Rain", "Shadow Ball"]), "Dragonite": (stats, ["Extreme Speed"]),
+             "Flutter Mane": (stats, ["Moonblast"])}
+    t = rollout.build_tables(battle_session("rollout-test", party, ["Miraidon", "Ting-Lu", "Chien-Pao"]))
+    assert t is not None
+    monkeypatch.setattr(rollout, "build_tables", lambda battle: t)
+    return t
+
+
+class FakePool:
+    """ submit마다 make_future(인자)로 만든 Future를 돌려주는 풀 """
+    workers = 4
+
+    def __init__(self, make_future):
+        self.make_future = make_future
+        self.submitted = 0
+
+    def executor(self):
+        return self
+
+    def submit(self, fn, *args):
+        self.submitted += 1
+        return self.make_future(self.submitted, fn, args)
+
+    def shutdown(self):
+        pass
+
+
+def test_cold_pool_runs_queued_chunks_inline(tables):
+    """ 작업 프로세스가 아직 안 떴으면 대기 중인 묶음을 가져와 직접 실행 (제한 시간을 기다리다 None이 되지 않음) """
+    pool = FakePool(lambda i, fn, args: Future())     # 시작되지 않는 작업 = 콜드 / 바쁜 풀
+    result = rollout.estimate_win_rates(None, rollouts=ROLLOUTS, budget_ms=5000, pool=pool)
+    actions = rollout.candidate_actions(tables)
+    assert result is not None
+    assert result["rollouts"] == ROLLOUTS * len(actions)
+    assert result["elapsed_ms"] < 5000
+
+
+def test_broken_pool_does_not_double_count(tables):
+    """ 일부 묶음이 끝난 뒤 풀이 깨져도 현재 프로세스 재실행분과 중복 집계하지 않음 """
+    def make_future(i, fn, args):
+        future = Future()
+        if i != 3: future.set_result(fn(*args))
+        else: future.set_exception(BrokenProcessPool("worker died"))
+        return future
+
+    result = rollout.estimate_win_rates(None, rollouts=ROLLOUTS, budget_ms=5000, pool=FakePool(make_future))
+    actions = rollout.candidate_actions(tables)
+    assert result["rollouts"] == ROLLOUTS * len(actions)
+    assert all(entry["rollouts"] == ROLLOUTS for entry in result["actions"])
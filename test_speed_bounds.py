@@ -0,0 +1,63 @@
+# test_speed_bounds.py
+from speed_bounds import SpeedBounds, SCARF, paradox_speed_boost, effective_speed
+
+NO_RANKS = {'spe': 0}
+SPEED_BEST = {'atk': 100, 'def': 90, 'spa': 120, 'spd': 100, 'spe': 150}
+ATTACK_BEST = {**SPEED_BEST, 'atk': 200}
+
+
+def test_effective_speed_applies_ranks_status_and_boost():
+    assert effective_speed(100, NO_RANKS, None, None, None, {}) == 100
+    assert effective_speed(100, {'spe': 1}, None, None, None, {}) == 150
+    assert effective_speed(100, NO_RANKS, SCARF, None, None, {}) == 150
+    assert effective_speed(100, NO_RANKS, None, "Paralysis", None, {}) == 50
+    assert effective_speed(100, NO_RANKS, None, None, "Protosynthesis", {}, boost=1.5) == 150
+
+
+def test_paradox_boost_depends_on_trigger_item_and_best_stat():
+    sun = {'weather': "Sun"}
+    assert paradox_speed_boost("Intimidate", ["Booster Energy"], sun, SPEED_BEST) == (1.0, 1.0)
+    assert paradox_speed_boost("Protosynthesis", ["Focus Sash"], {}, SPEED_BEST) == (1.0, 1.0)
+    assert paradox_speed_boost("Protosynthesis", ["Focus Sash"], sun, SPEED_BEST) == (1.5, 1.5)
+    assert paradox_speed_boost("Protosynthesis", ["Booster Energy"], {}, SPEED_BEST) == (1.5, 1.5)
+    # 부스트에너지일 수도 있음 / 실수치를 모름 -> 범위로
+    assert paradox_speed_boost("Quark Drive", ["Booster Energy", "Choice Specs"], {}, SPEED_BEST) == (1.0, 1.5)
+    assert paradox_speed_boost("Quark Drive", ["Booster Energy"], {}, None) == (1.0, 1.5)
+    # 스피드가 가장 높은 능력치가 아니면 오르지 않음
+    assert paradox_speed_boost("Protosynthesis", ["Booster Energy"], sun, ATTACK_BEST) == (1.0, 1.0)
+
+
+def test_observe_narrows_each_hypothesis():
+    bounds = SpeedBounds(135)
+    low, high = bounds.tier
+    assert bounds.observe(200, True, NO_RANKS, None, None, {}) == []
+    no_item, scarf = bounds.raw_range(None), bounds.raw_range(SCARF)
+    assert no_item == (200, high)
+    assert low < scarf[0] < 200 and int(scarf[0] * 1.5) >= 200 > int((scarf[0] - 1) * 1.5)
+    assert bounds.held_range() == (200, int(high * 1.5))
+    assert bounds.observations == 1
+
+
+def test_outsped_beyond_tier_confirms_scarf():
+    bounds = SpeedBounds(135)
+    assert bounds.observe(bounds.tier[1] + 20, True, NO_RANKS, None, None, {}) == [None]
+    assert list(bounds.hypotheses) == [SCARF]
+
+    # 모든 가설과 모순되는 관측은 버림
+    before = dict(bounds.hypotheses)
+    assert bounds.observe(50, False, NO_RANKS, None, None, {}) is None
+    assert bounds.hypotheses == before and bounds.observations == 1
+
+
+def test_trick_room_and_revealed_item():
+    bounds = SpeedBounds(135)
+    # 트릭룸에서 먼저 움직임 -> 내 스피드 이하
+    bounds.observe(150, True, NO_RANKS, None, None, {}, trick_room=True)
+    assert bounds.raw_range(None)[1] == 150
+    assert bounds.raw_range(SCARF) is None     # 스카프면 실수치 100 이하 -> 종족값 범위 밖
+
+    bounds = SpeedBounds(135)
+    bounds.fix_item("Life Orb")
+    assert list(bounds.hypotheses) == [None]
+    assert bounds.raw_range(SCARF) is None
+    assert SpeedBounds(135, scarf_possible=False).held_range() == SpeedBounds(135).tier
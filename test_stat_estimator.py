@@ -0,0 +1,14 @@
+# test_stat_estimator.py
+from Calculator.stat_estimator import estimate_stats
+
+
+def test_estimate_returns_independent_copies():
+    """ 돌려받은 추정치를 고쳐도 캐시된 추정치(evs / stats)는 그대로 """
+    first = estimate_stats("Miraidon")
+    evs, stats = dict(first["evs"]), dict(first["stats"])
+    first["evs"]["spe"] = -1
+    first["stats"]["spe"] = -1
+
+    second = estimate_stats("Miraidon")
+    assert second["evs"] == evs
+    assert second["stats"] == stats
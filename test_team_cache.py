@@ -0,0 +1,47 @@
+# test_team_cache.py
+from team_cache import TeamAnalysisCache, party_fingerprint, make_team_key
+
+TEAM = ["Flutter Mane", "Miraidon", "Ting-Lu", "Chien-Pao", "Amoonguss", "Incineroar"]
+NEAR = TEAM[:5] + ["Rillaboom"]
+
+PARTY_A = {"Gholdengo": {"stats": {"hp": 163, "spe": 136}, "item": "Choice Specs", "ability": "Good as Gold",
+                         "moves": ["Make It Rain", "Shadow Ball"], "tera_type": "Steel"}}
+PARTY_B = {"Gholdengo": {**PARTY_A["Gholdengo"], "item": "Life Orb"}}
+
+
+def _cache(tmp_path):
+    return TeamAnalysisCache(path=str(tmp_path / "team_cache.sqlite3"))
+
+
+def test_fingerprint_ignores_order_but_not_sets():
+    moves_swapped = {"Gholdengo": {**PARTY_A["Gholdengo"], "moves": ["Shadow Ball", "Make It Rain"]}}
+    assert party_fingerprint(PARTY_A) == party_fingerprint(moves_swapped)
+    assert party_fingerprint(PARTY_A) != party_fingerprint(PARTY_B)
+    assert party_fingerprint({}) == ""
+    assert make_team_key(TEAM, "a") == make_team_key(list(reversed(TEAM)), "a") != make_team_key(TEAM, "b")
+
+
+def test_reports_are_reused_only_for_the_same_party(tmp_path):
+    cache = _cache(tmp_path)
+    party_a, party_b = party_fingerprint(PARTY_A), party_fingerprint(PARTY_B)
+    cache.store(TEAM, "report for A", latency=2.0, tokens=100, party=party_a)
+
+    assert cache.lookup(TEAM, party_a) == ("report for A", 1.0)
+    report, similarity = cache.lookup(NEAR, party_a)
+    assert "report for A" in report and similarity < 1.0
+
+    # 다른 내 파티: 완전 일치 / 유사 일치 모두 재사용하지 않음
+    assert cache.lookup(TEAM, party_b) == (None, 0.0)
+    assert cache.lookup(NEAR, party_b) == (None, 0.0)
+
+    stats = cache.get_stats()
+    assert (stats["lookups"], stats["exact_hits"], stats["near_hits"], stats["misses"]) == (4, 1, 1, 2)
+    assert stats["tokens_saved"] == 200
+
+
+def test_party_survives_reload(tmp_path):
+    party_a = party_fingerprint(PARTY_A)
+    _cache(tmp_path).store(TEAM, "report for A", party=party_a)
+    reloaded = _cache(tmp_path)
+    assert reloaded.lookup(NEAR, party_a)[0] is not None
+    assert reloaded.lookup(NEAR, party_fingerprint(PARTY_B))[0] is None
@@ -0,0 +1,76 @@
+# test_telemetry.py
+import contextvars
+
+import pytest
+
+import llm_cache
+from telemetry import Telemetry, set_session
+
+
+def _in_session(session_id, func):
+    def run():
+        set_session(session_id)
+        return func()
+    return contextvars.copy_context().run(run)
+
+
+def test_session_totals_survive_span_eviction():
+    """ 세션 합계는 보관 한도(max_spans)를 넘어 밀려난 구간도 포함 """
+    t = Telemetry(max_spans=2, jsonl_path=None)
+    for _ in range(5):
+        _in_session("s1", lambda: t.record("battle.advisor", 0.5, input_tokens=10, output_tokens=5))
+    _in_session("s2", lambda: t.record("battle.advisor", 0.5, input_tokens=100))
+
+    totals = t.summarize(session="s1", stage_prefix="battle.")
+    assert len(t.spans) == 2
+    assert totals["calls"] == 5 and totals["total_tokens"] == 75
+
+
+def test_summarize_baseline_gives_increment():
+    """ 이전 session_totals() 기준 증가분만 (작업 / 턴 단위 토큰) """
+    t = Telemetry(jsonl_path=None)
+
+    def run():
+        t.record("entry.parse_names", 0.1, input_tokens=3, output_tokens=2)
+        before = t.session_totals("s1")
+        t.record("entry.strategy", 0.2, input_tokens=7, output_tokens=1)
+        t.record("battle.advisor", 0.3, input_tokens=50)
+        return t.summarize(session="s1", stage_prefix="entry.", baseline=before)
+
+    used = _in_session("s1", run)
+    assert used["calls"] == 1 and used["total_tokens"] == 8
+
+    t.drop_session("s1")
+    assert t.session_totals("s1") == {}
+
+
+def test_failed_llm_call_records_error_span(monkeypatch):
+    """ 예외로 끝난 LLM 호출도 error=<예외 타입>으로 기록 (꼬리 지연 원인 추적) """
+    class QuotaError(Exception):
+        pass
+
+    class FailingLLM:
+        model = "fake-model"
+
+        def invoke(self, prompt):
+            raise QuotaError("quota")
+
+    t = Telemetry(jsonl_path=None)
+    monkeypatch.setattr(llm_cache, "telemetry", t)
+    monkeypatch.setattr(llm_cache, "CACHE_DISABLED", True)
+    with pytest.raises(QuotaError):
+        llm_cache.cached_invoke(FailingLLM(), "prompt", stage="battle.advisor")
+
+    span, = t.get_spans()
+    assert span["stage"] == "battle.advisor" and span["model"] == "fake-model"
+    assert span["error"] == "QuotaError" and span["retries"] == 0
+    assert 'pokemon_stage_errors_total{stage="battle.advisor"} 1' in t.render_prometheus()
+
+
+def test_retries_are_totalled_for_prometheus():
+    t = Telemetry(jsonl_path=None)
+    t.record("entry.strategy", 1.0, retries=2)
+    t.record("entry.strategy", 1.0)
+    text = t.render_prometheus()
+    assert 'pokemon_stage_retries_total{stage="entry.strategy"} 2' in text
+    assert 'pokemon_stage_errors_total{stage="entry.strategy"} 0' in text
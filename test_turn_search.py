@@ -0,0 +1,46 @@
+# test_turn_search.py
+import time
+
+import turn_search
+from turn_search import ExpectimaxSearch, SearchTimeout, search_turn
+
+TABLES = {
+    "names": ["Gholdengo", "Dragonite"],
+    "my_moves": [[("Make It Rain", 0), ("Shadow Ball", 0)], [("Extreme Speed", 2)]],
+    "my_dmg": [[(45, 55), (30, 36)], [(20, 24)]],
+    "opp_dmg": [[(30, 36)], [(50, 60)]],
+    "my_first": [True, False],
+    "opp_moves": [("Draco Meteor", 0, 1.0)],
+    "root": (0, (100, 100), 100, False),
+}
+
+
+def test_full_search_ranks_every_action(monkeypatch):
+    monkeypatch.setattr(turn_search, "build_tables", lambda battle: TABLES)
+    result = search_turn(None, budget_ms=1000, max_depth=3)
+    assert result["depth"] == 3 and not result["partial"]
+    assert {entry["label"] for entry in result["actions"]} == {"Make It Rain", "Shadow Ball", "교체 -> Dragonite"}
+
+
+def test_table_building_counts_against_budget(monkeypatch):
+    """ 표 계산(조회)에 제한 시간을 다 쓰면 탐색 없이 None """
+    def slow_tables(battle):
+        time.sleep(0.02)
+        return TABLES
+    monkeypatch.setattr(turn_search, "build_tables", slow_tables)
+    assert search_turn(None, budget_ms=5) is None
+
+
+def test_depth_one_timeout_returns_finished_actions(monkeypatch):
+    """ 깊이 1도 못 끝내면 제한 없이 다시 돌리지 않고, 끝난 행동만 부분 결과로 """
+    class Interrupted(ExpectimaxSearch):
+        def expected(self, state, action, depth):
+            if action != ("move", 0): raise SearchTimeout()
+            return super().expected(state, action, depth)
+
+    monkeypatch.setattr(turn_search, "build_tables", lambda battle: TABLES)
+    monkeypatch.setattr(turn_search, "ExpectimaxSearch", Interrupted)
+    result = search_turn(None, budget_ms=1000)
+    assert result["partial"] and result["depth"] == 1
+    assert [entry["action"] for entry in result["actions"]] == [("move", 0)]
+    assert "일부" in turn_search.format_search_report(result)
@@ -0,0 +1,316 @@
+# turn_search.py
+"""
+[턴 추천 탐색 엔진 - Expectimax]
+내 기술/교체 x 상대 예측 기술(info['predictions']['moves'])의 게임 트리를 로컬에서 탐색해
+행동별 기대값 순위를 만듭니다. 어드바이저 프롬프트에 근거로 붙습니다.
+
+- 전이: 계산기(calculate_damage_math)로 미리 만든 데미지 표 + 스피드/우선도로 행동 순서 결정
+- 난수: 한 번의 공격을 "기절" / "생존(평균 데미지)" 두 결과로 압축 (기절 확률은 난수 균등 가정)
+- 상대 행동: 샘플 사후분포의 채용 확률을 가중치로 한 기회(Chance) 노드 (사후분포가 없으면 예측 순위 기반)
+- 치환표(Transposition Table): (상태, 남은 깊이) -> 값 / HP는 정수 %로 양자화
+- 반복 심화(Iterative Deepening): 제한 시간(BATTLE_SEARCH_BUDGET_MS) 안에 끝난 가장 깊은 결과 사용
+  (표 계산(기술 / 타입 조회) 시간도 제한 시간에 포함, 깊이 1도 못 끝내면 끝난 행동만 부분 결과로)
+
+[단순화]
+- 상대는 현재 필드의 포켓몬만 고려 (상대 교체 / 변화기 / 테라스탈 / 급소는 제외)
+- 탐색 중 랭크 변화는 반영하지 않음 (현재 랭크 기준 데미지 표를 그대로 사용)
+"""
+import os
+import time
+import functools
+
+from Calculator.calculator import calculate_damage_math
+from Calculator.speed_checker import check_turn_order
+from Calculator.move_loader import get_move_data
+from Calculator.stat_estimator import estimate_stats, get_pokemon_types
+from name_aliases import move_to_english
+from telemetry import telemetry
+
+SEARCH_BUDGET_MS = float(os.getenv("BATTLE_SEARCH_BUDGET_MS", 50))   # 0이면 탐색 생략
+MAX_DEPTH = int(os.getenv("BATTLE_SEARCH_MAX_DEPTH", 8))
+OPP_MOVE_LIMIT = 4          # 상대 기술 후보 수 (예측 상위)
+TIME_CHECK_INTERVAL = 64    # 노드 몇 개마다 시간 확인할지
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+# --------------------------------------------------------------------------
+# [1] 데미지 / 순서 표 (탐색 시작 시 한 번만 계산)
+# --------------------------------------------------------------------------
+def _calc_spec(poke, stats, ranks, screens):
+    return {
+        'stats': stats, 'ranks': ranks,
+        'item': poke.info.get('item'), 'status': poke.status_condition,
+        'ability': poke.info.get('ability'), 'types': get_pokemon_types(poke.name),
+        'is_terastal': False, 'screens': screens, 'speed_range': poke.info.get('speed_range')
+    }
+
+def _percent_range(att_spec, def_spec, move, field_spec):
+    res = calculate_damage_math(att_spec, def_spec, move, field_spec)
+    lo, hi = (int(v) for v in res['damage_range'].split('~'))
+    hp = def_spec['stats']['hp']
+    return min(100, round(lo / hp * 100)), min(100, round(hi / hp * 100))
+
+def _opp_move_candidates(opp):
+    """
+    확인된 기술 + 예측 기술 중 공격기 상위 OPP_MOVE_LIMIT개 -> [(기술 스펙, 가중치)]
+    가중치: 샘플 사후분포의 채용 확률 (없으면 예측 순위)
+    """
+    known = list(opp.info.get('moves', []))
+    ordered = list(dict.fromkeys(known + list(opp.info['predictions']['moves'])))
+    posterior = dict((opp.info.get('posterior') or {}).get('moves', ()))
+    candidates = []
+    for rank, name in enumerate(ordered):
+        move = get_move_data(move_to_english(name) or name)
+        if move['power'] <= 0: continue
+        if posterior: weight = 1.0 if name in known else posterior.get(name, 0.0)
+        else: weight = 1.0 / (rank + 1) * (2.0 if name in known else 1.0)
+        if weight <= 0: continue
+        candidates.append((move, weight))
+        if len(candidates) >= OPP_MOVE_LIMIT: break
+    total = sum(w for _, w in candidates)
+    return [(move, w / total) for move, w in candidates]
+
+def build_tables(battle):
+    """
+    현재 배틀 상태 -> 탐색용 표
+    Returns: dict 또는 None (정보 부족)
+    """
+    my_active, opp = battle.my_active, battle.opp_active
+    if not my_active or not opp: return None
+
+    names = battle.my_entry_selection or list(battle.my_party_status.keys())
+    team = [battle.my_party_status[n] for n in names if n in battle.my_party_status]
+    if my_active not in team: team.insert(0, my_active)
+
+    opp_stats = opp.info.get('stats') or (estimate_stats(opp.name) or {}).get('stats')
+    if not opp_stats: return None
+
+    field_spec = {
+        'weather': battle.global_effects['weather'], 'terrain': battle.global_effects['terrain'],
+        'trick_room': battle.global_effects['trick_room'],
+        'tailwind_me': battle.side_effects['me']['tailwind'], 'tailwind_opp': battle.side_effects['opp']['tailwind']
+    }
+    opp_spec = _calc_spec(opp, opp_stats, dict(opp.ranks), battle.side_effects['opp'])
+    opp_moves = _opp_move_candidates(opp)
+    if not opp_moves: return None
+
+    tables = {"names": [], "my_moves": [], "my_dmg": [], "opp_dmg": [], "my_first": [],
+              "opp_moves": [(m['name'], m.get('priority', 0), w) for m, w in opp_moves]}
+    for poke in team:
+        # 교체로 나오는 포켓몬은 랭크 초기화
+        ranks = dict(poke.ranks) if poke is my_active else {}
+        my_spec = _calc_spec(poke, poke.info['stats'], ranks, battle.side_effects['me'])
+        moves = [m for m in (get_move_data(name) for name in poke.info.get('moves', [])) if m['power'] > 0]
+
+        speed = check_turn_order(my_spec, opp_spec, field_spec, {}, {})
+        tables["names"].append(poke.name)
+        tables["my_moves"].append([(m['name'], m.get('priority', 0)) for m in moves])
+        tables["my_dmg"].append([_percent_range(my_spec, opp_spec, m, field_spec) for m in moves])
+        tables["opp_dmg"].append([_percent_range(opp_spec, my_spec, m, field_spec) for m, _ in opp_moves])
+        tables["my_first"].append(speed['is_my_turn'])   # True / False / None(동속)
+
+    tables["root"] = (
+        team.index(my_active),
+        tuple(0 if p.is_fainted else int(round(p.current_hp_percent)) for p in team),
+        int(round(opp.current_hp_percent)),
+        False
+    )
+    return tables
+
+
+@functools.lru_cache(maxsize=65536)
+def hit_outcomes(hp, lo, hi):
+    """ HP hp%에 lo~hi% 공격 -> [(확률, 남은 HP)] (기절 / 생존 두 결과로 압축) """
+    if hi <= 0 or hp <= 0: return ((1.0, hp),)
+    if lo >= hp: return ((1.0, 0),)
+    if hi < hp: return ((1.0, hp - (lo + hi) // 2),)
+    ko_prob = (hi - hp + 1) / (hi - lo + 1)
+    survive_hp = max(1, hp - (lo + hp - 1) // 2)
+    return ((ko_prob, 0), (1.0 - ko_prob, survive_hp))
+
+
+# --------------------------------------------------------------------------
+# [2] Expectimax 탐색
+# --------------------------------------------------------------------------
+class ExpectimaxSearch:
+    """
+    상태: (내 활성 번호, 내 HP 튜플, 상대 HP, 강제 교체 여부)
+    행동: ("move", 기술 번호) / ("switch", 포켓몬 번호)
+    """
+    def __init__(self, tables, deadline):
+        self.t = tables
+        self.deadline = deadline
+        self.tt = {}
+        self.nodes = 0
+        self.tt_hits = 0
+
+    # --- [규칙] ---
+    def actions(self, state):
+        idx, hps, _, forced = state
+        switches = [("switch", j) for j, hp in enumerate(hps) if j != idx and hp > 0]
+        if forced: return switches
+        return [("move", m) for m in range(len(self.t["my_moves"][idx]))] + switches
+
+    def evaluate(self, state):
+        """ 상대에게 준 피해 비율 - 내 팀이 잃은 HP 비율 (-1 ~ 1) """
+        _, hps, opp_hp, _ = state
+        return (100 - opp_hp) / 100 - sum(100 - hp for hp in hps) / (100 * len(hps))
+
+    def is_terminal(self, state):
+        _, hps, opp_hp, _ = state
+        return opp_hp <= 0 or not any(hps)
+
+    def transitions(self, state, action, k):
+        """ 내 행동 action + 상대 기술 k -> [(확률, 다음 상태)] """
+        idx, hps, opp_hp, _ = state
+        _, opp_priority, _ = self.t["opp_moves"][k]
+
+        if action[0] == "switch":
+            # 교체가 먼저, 들어온 포켓몬이 상대 기술을 맞음
+            j = action[1]
+            lo, hi = self.t["opp_dmg"][j][k]
+            return [(p, self._after(j, hps, j, new_hp, opp_hp)) for p, new_hp in hit_outcomes(hps[j], lo, hi)]
+
+        m = action[1]
+        _, my_priority = self.t["my_moves"][idx][m]
+        if my_priority != opp_priority: orders = [(1.0, my_priority > opp_priority)]
+        else:
+            first = self.t["my_first"][idx]
+            orders = [(0.5, True), (0.5, False)] if first is None else [(1.0, first)]
+
+        my_lo, my_hi = self.t["my_dmg"][idx][m]
+        opp_lo, opp_hi = self.t["opp_dmg"][idx][k]
+        results = []
+        for p_order, me_first in orders:
+            if me_first:
+                for p1, o_hp in hit_outcomes(opp_hp, my_lo, my_hi):
+                    if o_hp == 0:
+                        results.append((p_order * p1, (idx, hps, 0, False)))
+                        continue
+                    for p2, m_hp in hit_outcomes(hps[idx], opp_lo, opp_hi):
+                        results.append((p_order * p1 * p2, self._after(idx, hps, idx, m_hp, o_hp)))
+            else:
+                for p1, m_hp in hit_outcomes(hps[idx], opp_lo, opp_hi):
+                    if m_hp == 0:
+                        results.append((p_order * p1, self._after(idx, hps, idx, 0, opp_hp)))
+                        continue
+                    for p2, o_hp in hit_outcomes(opp_hp, my_lo, my_hi):
+                        results.append((p_order * p1 * p2, (idx, hps, o_hp, False)))
+        return results
+
+    @staticmethod
+    def _after(active, hps, hit_idx, new_hp, opp_hp):
+        hps = hps[:hit_idx] + (new_hp,) + hps[hit_idx + 1:]
+        return (active, hps, opp_hp, new_hp == 0 and hit_idx == active)
+
+    # --- [탐색] ---
+    def value(self, state, depth):
+        if self.is_terminal(state) or depth == 0:
+            return self.evaluate(state)
+
+        self.nodes += 1
+        if self.nodes % TIME_CHECK_INTERVAL == 0 and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+
+        key = (state, depth)
+        cached = self.tt.get(key)
+        if cached is not None:
+            self.tt_hits += 1
+            return cached
+
+        actions = self.actions(state)
+        if not actions:
+            best = self.evaluate(state)
+        elif state[3]:
+            # 강제 교체는 턴을 쓰지 않음 (상대 행동 없음)
+            best = max(self.value((j, state[1], state[2], False), depth) for _, j in actions)
+        else:
+            best = max(self.expected(state, action, depth) for action in actions)
+        self.tt[key] = best
+        return best
+
+    def expected(self, state, action, depth):
+        """ 상대 기술 가중치 x 난수 결과에 대한 기대값 (Chance 노드) """
+        total = 0.0
+        for k, (_, _, weight) in enumerate(self.t["opp_moves"]):
+            for prob, next_state in self.transitions(state, action, k):
+                total += weight * prob * self.value(next_state, depth - 1)
+        return total
+
+    def root_values(self, depth, values=None):
+        """ 루트 행동별 값 (values에 행동이 끝날 때마다 채움 -> 시간 초과 시 끝난 행동까지는 남음) """
+        values = {} if values is None else values
+        state = self.t["root"]
+        for action in self.actions(state):
+            if state[3]: values[action] = self.value((action[1], state[1], state[2], False), depth)
+            else: values[action] = self.expected(state, action, depth)
+        return values
+
+
+# --------------------------------------------------------------------------
+# [3] 메인 함수
+# --------------------------------------------------------------------------
+def action_label(tables, state, action):
+    if action[0] == "switch": return f"교체 -> {tables['names'][action[1]]}"
+    return tables["my_moves"][state[0]][action[1]][0]
+
+def search_turn(battle, budget_ms=SEARCH_BUDGET_MS, max_depth=MAX_DEPTH):
+    """
+    [Interface Function]
+    현재 상태에서 내 행동별 기대값 순위를 제한 시간 안에 계산합니다.
+    battle: BattleState 또는 BattleSnapshot (읽기만 함)
+    제한 시간은 표 계산(기술 / 타입 조회, 처음이면 네트워크)부터 포함합니다.
+    Returns: {actions: [{action, label, value}], depth, partial, nodes, tt_hits, elapsed_ms} 또는 None
+             (partial: 깊이 1도 못 끝내 일부 행동만 평가한 결과)
+    """
+    start = time.perf_counter()
+    deadline = start + budget_ms / 1000
+    with telemetry.span("battle.search") as span:
+        tables = build_tables(battle)
+        span["build_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        if not tables: return None
+        if time.perf_counter() > deadline:
+            span["timeout"] = True
+            return None
+
+        search = ExpectimaxSearch(tables, deadline=deadline)
+        best_values, depth_done, partial, is_partial = None, 0, {}, False
+        for depth in range(1, max_depth + 1):
+            partial = {}
+            try:
+                best_values = search.root_values(depth, partial)
+                depth_done = depth
+            except SearchTimeout:
+                break
+            if time.perf_counter() > search.deadline: break
+
+        if best_values is None:
+            # 깊이 1도 못 끝냄 -> 끝난 행동만 (하나도 없으면 결과 없음)
+            span["timeout"] = True
+            if not partial: return None
+            best_values, depth_done, is_partial = partial, 1, True
+
+        ranked = sorted(best_values.items(), key=lambda item: -item[1])
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        span.update(depth=depth_done, partial=is_partial, nodes=search.nodes, tt_hits=search.tt_hits)
+        return {
+            "actions": [{"action": a, "label": action_label(tables, tables["root"], a), "value": round(v, 3)}
+                        for a, v in ranked],
+            "depth": depth_done,
+            "partial": is_partial,
+            "nodes": search.nodes,
+            "tt_hits": search.tt_hits,
+            "elapsed_ms": round(elapsed_ms, 1)
+        }
+
+def format_search_report(result, top=3):
+    """ 어드바이저 프롬프트용 요약 """
+    if not result or not result["actions"]: return ""
+    depth = f"깊이 {result['depth']}턴" + (" 일부 행동만" if result.get("partial") else "")
+    lines = [f"🧠 [탐색 추천] ({depth}, 노드 {result['nodes']}, {result['elapsed_ms']}ms)"]
+    for rank, entry in enumerate(result["actions"][:top], 1):
+        lines.append(f" {rank}. {entry['label']} (기대값 {entry['value']:+.2f})")
+    return "\n".join(lines) + "\n"